@@ -998,6 +998,11 @@ class BaseAlgo:
         self.intraday_start_min = None
         self.intraday_end_min = None
         self.intraday_events = {}
+        # latest member variables for each ticker
+        # set by analysis_engine.algo_event_loop
+        self.ticker_views = {}
+        # report restored by analysis_engine.backtest_cache
+        self.cached_report_dataset = None
 
         self.ignore_history_keys = [
         ]
@@ -1609,7 +1614,9 @@ class BaseAlgo:
                     f'{self.name} - tickers={self.tickers}')
             return status
 
-        output_record = self.create_report_dataset()
+        output_record = self.cached_report_dataset
+        if not output_record:
+            output_record = self.create_report_dataset()
 
         if output_file or s3_enabled or redis_enabled or slack_enabled:
             if self.verbose:
@@ -1992,10 +1999,11 @@ class BaseAlgo:
                 # used by a derived class with:
                 # node = copy.deepcopy(org_node)
                 node = org_node
-                is_valid = True
-                for i in ignore_keys:
-                    node.pop(i, None)
+                # multi-ticker algorithms record every ticker
+                is_valid = (node.get('ticker', ticker) == ticker)
                 if is_valid:
+                    for i in ignore_keys:
+                        node.pop(i, None)
                     history_for_ticker.append(node)
         # end of all order history records
 
@@ -2068,6 +2076,12 @@ class BaseAlgo:
                 f'{self.name} - tickers={self.tickers}')
             return status
 
+        if not self.has_input_datasets():
+            log.error(
+                'input publish - datasets not available - '
+                f'{self.name} - tickers={self.tickers}')
+            return ae_consts.ERR
+
         output_record = self.create_algorithm_ready_dataset()
 
         if output_file or s3_enabled or redis_enabled or slack_enabled:
@@ -2130,6 +2144,26 @@ class BaseAlgo:
         return status
     # end of publish_input_dataset
 
+    def has_input_datasets(
+            self):
+        """has_input_datasets
+
+        Return ``True`` if every node in ``self.last_handle_data``
+        still holds its extracted datasets for building the
+        ``Algorithm-Ready`` dataset (results restored from the
+        backtest cache, merged from a ticker pool or streamed
+        by the event loop only keep the ids and dates)
+        """
+        if not self.last_handle_data:
+            return True
+        for ticker in self.get_supported_tickers_in_data(
+                data=self.last_handle_data):
+            for node in self.last_handle_data[ticker]:
+                if not node.get('data', None):
+                    return False
+        return True
+    # end of has_input_datasets
+
     def create_algorithm_ready_dataset(
             self):
         """create_algorithm_ready_dataset
@@ -2431,7 +2465,9 @@ class BaseAlgo:
             self):
         """get_report_dataset"""
         return prepare_report.prepare_report_dataset(
-            data=self.create_report_dataset(),
+            data=(
+                self.cached_report_dataset or
+                self.create_report_dataset()),
             convert_to_dict=False)
     # end of get_report_dataset
 
@@ -3032,6 +3068,7 @@ class BaseAlgo:
         self.intraday_start_min = None
         self.intraday_end_min = None
         self.intraday_events = {}
+        self.ticker_views = {}
     # end of reset_for_next_run
 
     def populate_intraday_events_dict(
@@ -3458,135 +3495,185 @@ class BaseAlgo:
         # if no minute data found
 
         for minute_idx, row in self.df_minute[start_row:].iterrows():
-
-            # map the latest values for the algo to use
-            # as if the minute was the latest trading time
-            # as it iterates minute-by-minute
-            self.latest_min = row.get('date', None)
-            if not self.latest_min:
-                log.warn(
-                    f'no cached minute data found in cache for {ticker} '
-                    f'on: {node_id} rows={num_rows}')
+            handled = self.handle_minute_bar(
+                algo_id=algo_id,
+                ticker=ticker,
+                node=node,
+                minute_idx=minute_idx,
+                num_rows=num_rows,
+                minute=row.get('date', None),
+                high=row.get('high', None),
+                low=row.get('low', None),
+                open_val=row.get('open', None),
+                close=row.get('close', None),
+                volume=row.get('volume', None))
+            if not handled:
                 return
-            self.latest_high = row.get('high', None)
-            self.latest_low = row.get('low', None)
-            self.latest_open = row.get('open', None)
-            self.latest_close = row.get('close', None)
-            self.latest_volume = row.get('volume', None)
-            self.trade_price = self.latest_close
-            self.use_minute = self.latest_min.strftime(
-                ae_consts.COMMON_TICK_DATE_FORMAT)
-
-            self.show_log = False
-            # log every 5 days just to see progress
-            if self.last_minute:
-                num_day_since_last_log = (
-                    self.latest_min - self.last_minute).days
-                if num_day_since_last_log > 5:
-                    self.show_log = True
-                    self.last_minute = self.latest_min
-            else:
-                # start on monday
-                if self.latest_min.weekday() == 0:
-                    self.last_minute = self.latest_min
+        # end for all rows in the minute dataset
+    # end of handle_minute_dataset
 
-            if not self.starting_close:
-                self.starting_close = self.latest_close
+    def handle_minute_bar(
+            self,
+            algo_id,
+            ticker,
+            node,
+            minute_idx,
+            num_rows,
+            minute,
+            high=None,
+            low=None,
+            open_val=None,
+            close=None,
+            volume=None):
+        """handle_minute_bar
+
+        handle running the algorithm for one minute row of the
+        ``self.df_minute`` dataset loaded by
+        ``self.load_from_dataset()`` and return ``False`` if the
+        minute is missing
 
-            # allow algos to set these custom strings
-            # for tracking why a buy and sell happened
-            self.buy_reason = None
-            self.sell_reason = None
+        :param algo_id: string - algo identifier label for debugging datasets
+            during specific dates
+        :param ticker: string - ticker
+        :param node: dataset to process
+        :param minute_idx: row number of the minute in ``self.df_minute``
+        :param num_rows: number of rows in ``self.df_minute``
+        :param minute: ``pandas.Timestamp`` for the minute
+        :param high: optional - minute high
+        :param low: optional - minute low
+        :param open_val: optional - minute open
+        :param close: optional - minute close
+        :param volume: optional - minute volume
+        """
+        # map the latest values for the algo to use
+        # as if the minute was the latest trading time
+        # as it iterates minute-by-minute
+        node_id = node.get('id', 'missing-id')
+        self.latest_min = minute
+        if not self.latest_min:
+            log.warn(
+                f'no cached minute data found in cache for {ticker} '
+                f'on: {node_id} rows={num_rows}')
+            return False
+        self.latest_high = high
+        self.latest_low = low
+        self.latest_open = open_val
+        self.latest_close = close
+        self.latest_volume = volume
+        self.trade_price = self.latest_close
+        self.use_minute = self.latest_min.strftime(
+            ae_consts.COMMON_TICK_DATE_FORMAT)
 
-            self.prepare_for_new_indicator_run()
+        self.show_log = False
+        # log every 5 days just to see progress
+        if self.last_minute:
+            num_day_since_last_log = (
+                self.latest_min - self.last_minute).days
+            if num_day_since_last_log > 5:
+                self.show_log = True
+                self.last_minute = self.latest_min
+        else:
+            # start on monday
+            if self.latest_min.weekday() == 0:
+                self.last_minute = self.latest_min
 
-            track_label = self.build_progress_label(
-                progress=(minute_idx + 1),
-                total=num_rows)
-            minute_algo_id = (
-                f'{algo_id} at minute '
-                f'{self.latest_min} - {track_label}')
+        if not self.starting_close:
+            self.starting_close = self.latest_close
 
-            (self.num_owned,
-             self.ticker_buys,
-             self.ticker_sells) = self.get_ticker_positions(
-                ticker=ticker)
+        # allow algos to set these custom strings
+        # for tracking why a buy and sell happened
+        self.buy_reason = None
+        self.sell_reason = None
 
-            """
-            Indicator Processor
+        self.prepare_for_new_indicator_run()
 
-            processes the dataset: minute df
-            """
-            self.latest_buys = []
-            self.latest_sells = []
-            if self.iproc:
-                self.debug_msg = (
-                    f'{ticker} START - indicator processing '
-                    f'daily [0-{minute_idx + 1}]')
-
-                # prune off the minutes that are not the latest
-                node['data']['minute'] = self.df_minute.iloc[0:(minute_idx+1)]
-                self.latest_ind_report = self.iproc.process(
-                    algo_id=minute_algo_id,
-                    ticker=self.ticker,
-                    dataset=node)
-                self.latest_buys = self.latest_ind_report.get(
-                    'buys',
-                    [])
-                self.latest_sells = self.latest_ind_report.get(
-                    'sells',
-                    [])
-                self.debug_msg = (
-                    f'{ticker} END - indicator processing')
-            # end of indicator processing
+        track_label = self.build_progress_label(
+            progress=(minute_idx + 1),
+            total=num_rows)
+        minute_algo_id = (
+            f'{algo_id} at minute '
+            f'{self.latest_min} - {track_label}')
 
-            self.num_latest_buys = len(self.latest_buys)
-            self.num_latest_sells = len(self.latest_sells)
+        (self.num_owned,
+         self.ticker_buys,
+         self.ticker_sells) = self.get_ticker_positions(
+            ticker=ticker)
 
-            if self.inspect_datasets:
-                self.inspect_dataset(
-                    algo_id=algo_id,
-                    ticker=ticker,
-                    dataset=node)
+        """
+        Indicator Processor
 
-            """
-            Call the Algorithm's process() method
-            """
+        processes the dataset: minute df
+        """
+        self.latest_buys = []
+        self.latest_sells = []
+        if self.iproc:
             self.debug_msg = (
-                f'{ticker} START - process id={node_id}')
-            self.process(
-                algo_id=algo_id,
+                f'{ticker} START - indicator processing '
+                f'daily [0-{minute_idx + 1}]')
+
+            # prune off the minutes that are not the latest
+            node['data']['minute'] = self.df_minute.iloc[0:(minute_idx+1)]
+            self.latest_ind_report = self.iproc.process(
+                algo_id=minute_algo_id,
                 ticker=self.ticker,
                 dataset=node)
+            self.latest_buys = self.latest_ind_report.get(
+                'buys',
+                [])
+            self.latest_sells = self.latest_ind_report.get(
+                'sells',
+                [])
             self.debug_msg = (
-                f'{ticker} END - process id={node_id}')
+                f'{ticker} END - indicator processing')
+        # end of indicator processing
 
-            """
-            Execute trades based off self.trade_strategy
-            """
-            self.debug_msg = (
-                f'{ticker} START - trade id={node_id}')
-            self.trade_off_indicator_buy_and_sell_signals(
-                ticker=ticker,
+        self.num_latest_buys = len(self.latest_buys)
+        self.num_latest_sells = len(self.latest_sells)
+
+        if self.inspect_datasets:
+            self.inspect_dataset(
                 algo_id=algo_id,
-                reason_for_buy=self.buy_reason,
-                reason_for_sell=self.sell_reason)
-            self.debug_msg = (
-                f'{ticker} END - trade id={node_id}')
+                ticker=ticker,
+                dataset=node)
 
-            """
-            Record the Trading History record
+        """
+        Call the Algorithm's process() method
+        """
+        self.debug_msg = (
+            f'{ticker} START - process id={node_id}')
+        self.process(
+            algo_id=algo_id,
+            ticker=self.ticker,
+            dataset=node)
+        self.debug_msg = (
+            f'{ticker} END - process id={node_id}')
 
-            analysis/review using: myalgo.get_result()
-            """
-            self.debug_msg = (
-                f'{ticker} START - history id={node_id}')
-            self.record_trade_history_for_dataset(
-                node=node)
-            self.debug_msg = (
-                f'{ticker} END - history id={node_id}')
-        # end for all rows in the minute dataset
-    # end of handle_minute_dataset
+        """
+        Execute trades based off self.trade_strategy
+        """
+        self.debug_msg = (
+            f'{ticker} START - trade id={node_id}')
+        self.trade_off_indicator_buy_and_sell_signals(
+            ticker=ticker,
+            algo_id=algo_id,
+            reason_for_buy=self.buy_reason,
+            reason_for_sell=self.sell_reason)
+        self.debug_msg = (
+            f'{ticker} END - trade id={node_id}')
+
+        """
+        Record the Trading History record
+
+        analysis/review using: myalgo.get_result()
+        """
+        self.debug_msg = (
+            f'{ticker} START - history id={node_id}')
+        self.record_trade_history_for_dataset(
+            node=node)
+        self.debug_msg = (
+            f'{ticker} END - history id={node_id}')
+        return True
+    # end of handle_minute_bar
 
     def plot_trading_history_with_balance(
             self,
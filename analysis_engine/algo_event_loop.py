@@ -0,0 +1,436 @@
+"""
+Run a multi-ticker algorithm over one time-ordered event loop
+
+``BaseAlgo.handle_data`` runs every dataset of the first ticker
+before it starts on the next ticker, so an algorithm trading
+several tickers against one balance sees all of ``SPY``'s days
+before any of ``QQQ``'s. The event loop streams one cursor per
+ticker and merges their bars with ``heapq.merge`` in timestamp
+order. Each bar (a minute for the ``minute`` timeseries or the
+close of a day for the ``day`` timeseries) is dispatched to
+``process()`` with ``self.ticker`` and the ticker's own
+``self.df_*`` and ``self.latest_*`` member variables:
+
+.. code-block:: python
+
+    import analysis_engine.run_algo as run_algo
+
+    res = run_algo.run_algo(
+        tickers=['SPY', 'QQQ', 'AAPL'],
+        algo=my_portfolio_algo,
+        start_date='2019-01-02 00:00:00',
+        end_date='2019-02-15 00:00:00',
+        event_loop=True)
+
+Bars with the same timestamp are dispatched in the order of
+``algo.tickers``. Each cursor only holds the current day of its
+ticker, and a ticker's datasets can be a generator that extracts
+each day when the cursor reaches it, so memory grows with the
+number of tickers instead of the number of bars.
+
+``algo.ticker_views`` holds the member variables from each
+ticker's latest bar for algorithms comparing tickers inside
+``process()``:
+
+.. code-block:: python
+
+    qqq_close = self.ticker_views['QQQ']['latest_close']
+
+Like ``handle_data``, the minutes of a node start at its
+``start_row`` and ``SHOW_ALGO_BALANCE=1`` plots the trading
+history after each of a ticker's datasets.
+
+.. note:: streamed datasets (generators like the ones
+    ``run_algo`` builds with ``event_loop=True``) are not kept
+    after the event loop passes them, so ``last_handle_data``
+    only holds their ids and dates. ``publish_input_dataset()``
+    returns ``ERR`` for them and ``run_custom_algo``,
+    ``task_run_algo`` and ``run_distributed_algorithm`` skip
+    publishing the ``Algorithm-Ready`` (extract) dataset. Pass
+    lists of dataset nodes to publish it.
+
+**Supported environment variables**
+
+::
+
+    # use the event loop in run_algo
+    export ALGO_EVENT_LOOP=1
+"""
+
+import heapq
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+# member variables holding one ticker's dataset and latest bar
+VIEW_KEYS = (
+    'ds_id',
+    'ds_date',
+    'ds_data',
+    'last_ds_id',
+    'last_ds_date',
+    'last_ds_data',
+    'df_daily',
+    'df_minute',
+    'df_stats',
+    'df_peers',
+    'df_financials',
+    'df_earnings',
+    'df_dividends',
+    'df_quote',
+    'df_company',
+    'df_iex_news',
+    'df_yahoo_news',
+    'df_calls',
+    'df_puts',
+    'df_pricing',
+    'df_tdcalls',
+    'df_tdputs',
+    'backtest_date',
+    'found_minute_data',
+    'trade_date',
+    'use_minute',
+    'trade_price',
+    'today_high',
+    'today_low',
+    'today_open',
+    'today_close',
+    'today_volume',
+    'latest_min',
+    'latest_high',
+    'latest_low',
+    'latest_open',
+    'latest_close',
+    'latest_volume',
+    'created_buy',
+    'created_sell'
+)
+
+# minute columns passed to BaseAlgo.handle_minute_bar
+BAR_COLUMNS = {
+    'high': 'high',
+    'low': 'low',
+    'open_val': 'open',
+    'close': 'close',
+    'volume': 'volume'
+}
+
+
+def get_close_timestamp(
+        date):
+    """get_close_timestamp
+
+    Return the close of trading (16:00:00) on ``date`` as
+    nanoseconds
+
+    :param date: string date ``YYYY-MM-DD``
+    """
+    return pd.Timestamp(f'{str(date)[0:10]} 16:00:00').value
+# end of get_close_timestamp
+
+
+def build_minute_bars(
+        node):
+    """build_minute_bars
+
+    Return a dictionary with the nanosecond ``timestamps``, row
+    numbers and column lists for the minutes in a dataset node
+    from its ``start_row`` or ``None`` if the node has no
+    minute data
+
+    :param node: dataset node with a ``data`` dictionary
+    """
+    df = node['data'].get('minute', None)
+    if not hasattr(df, 'index') or 'date' not in df or not len(df.index):
+        return None
+    minutes = pd.to_datetime(
+        df['date'],
+        errors='coerce')
+    rows = np.flatnonzero(minutes.notna().values)
+    rows = rows[rows >= int(node.get('start_row', 0) or 0)]
+    if not len(rows):
+        return None
+    # datetime64 values of timezone-aware minutes are in UTC
+    timestamps = minutes.values.astype('datetime64[ns]').view('i8')
+    bars = {
+        'num_rows': len(df.index),
+        'rows': rows.tolist(),
+        'timestamps': timestamps[rows].tolist(),
+        'minute': minutes.iloc[rows].tolist()
+    }
+    for arg_name, column in BAR_COLUMNS.items():
+        if column in df:
+            bars[arg_name] = df[column].values[rows].tolist()
+        else:
+            bars[arg_name] = [None] * len(rows)
+    return bars
+# end of build_minute_bars
+
+
+def iter_ticker_bars(
+        ticker_idx,
+        nodes,
+        use_minutes=False,
+        run_this_date=None):
+    """iter_ticker_bars
+
+    Cursor streaming one ticker's datasets as sorted
+    ``(timestamp, ticker_idx, seq, node, bars, bar_idx)`` events.
+    A ``bar_idx`` of ``-1`` is a whole-day event, and ``bars``
+    only holds the minutes of the current ``node``.
+
+    :param ticker_idx: position of the ticker in the merge
+    :param nodes: list or generator of the ticker's dataset
+        nodes in ascending date order
+    :param use_minutes: optional - emit one event per minute
+        for nodes with minute data
+    :param run_this_date: optional - only emit this date
+    """
+    seq = 0
+    for node in nodes:
+        if run_this_date and node.get('date', None) != run_this_date:
+            continue
+        bars = None
+        if use_minutes:
+            bars = build_minute_bars(
+                node=node)
+        if not bars:
+            yield (
+                get_close_timestamp(node['date']),
+                ticker_idx,
+                seq,
+                node,
+                None,
+                -1)
+            seq += 1
+            continue
+        for bar_idx, timestamp in enumerate(bars['timestamps']):
+            yield (
+                timestamp,
+                ticker_idx,
+                seq,
+                node,
+                bars,
+                bar_idx)
+            seq += 1
+        # end of for all minutes in the node
+    # end of for all nodes
+# end of iter_ticker_bars
+
+
+def merge_ticker_bars(
+        data,
+        tickers,
+        use_minutes=False,
+        run_this_date=None):
+    """merge_ticker_bars
+
+    Heap-merge the cursors of each ticker in ``tickers`` into
+    one generator of events in timestamp order (ties keep the
+    order of ``tickers``)
+
+    :param data: dictionary of ticker to a list or generator
+        of dataset nodes
+    :param tickers: list of tickers to merge
+    :param use_minutes: optional - emit one event per minute
+    :param run_this_date: optional - only emit this date
+    """
+    return heapq.merge(*[
+        iter_ticker_bars(
+            ticker_idx=ticker_idx,
+            nodes=data[ticker],
+            use_minutes=use_minutes,
+            run_this_date=run_this_date)
+        for ticker_idx, ticker in enumerate(tickers)
+    ])
+# end of merge_ticker_bars
+
+
+def start_ticker_dataset(
+        algo,
+        ticker,
+        node):
+    """start_ticker_dataset
+
+    Set the per-dataset member variables ``handle_data`` sets
+    before handling a ticker's dataset
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` object
+    :param ticker: ticker for the dataset
+    :param node: dataset node
+    """
+    algo.prev_bal = algo.balance
+    algo.prev_num_owned = algo.num_owned
+    (algo.num_owned,
+     algo.ticker_buys,
+     algo.ticker_sells) = algo.get_ticker_positions(
+        ticker=ticker)
+    node['data']['custom'] = algo.include_custom
+# end of start_ticker_dataset
+
+
+def end_ticker_dataset(
+        algo,
+        algo_id,
+        ticker,
+        node):
+    """end_ticker_dataset
+
+    Plot the trading history after a ticker's dataset when
+    ``algo.show_balance`` is set like ``handle_data``
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` object
+    :param algo_id: algo identifier label
+    :param ticker: ticker for the dataset
+    :param node: dataset node
+    """
+    if algo.show_balance and (algo.num_buys > 0 or algo.num_sells > 0):
+        algo.plot_trading_history_with_balance(
+            algo_id=algo_id,
+            ticker=ticker,
+            node=node)
+# end of end_ticker_dataset
+
+
+def run_event_loop(
+        algo,
+        data,
+        label='event-loop'):
+    """run_event_loop
+
+    Run ``algo`` over the ``data`` of every ticker in one
+    time-ordered event loop instead of ``algo.handle_data(data)``
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` object
+    :param data: dictionary of ticker to a list or generator
+        of dataset nodes (the ``handle_data`` structure)
+    :param label: optional - log label
+    """
+    if algo.loaded_dataset:
+        data = algo.loaded_dataset
+    tickers = algo.get_supported_tickers_in_data(
+        data=data)
+    use_minutes = (
+        algo.timeseries_value == ae_consts.ALGO_TIMESERIES_MINUTE)
+    initial_view = {
+        key: getattr(algo, key, None)
+        for key in VIEW_KEYS
+    }
+    algo.ticker_views = {
+        ticker: dict(initial_view)
+        for ticker in tickers
+    }
+    # lists are kept for publishing like handle_data,
+    # generators only keep the ids and dates
+    streamed = {
+        ticker: not isinstance(data[ticker], (list, tuple))
+        for ticker in tickers
+    }
+    handled_nodes = {
+        ticker: []
+        for ticker in tickers
+    }
+    algo_dict = algo.__dict__
+    active_ticker = None
+    num_events = 0
+
+    algo.debug_msg = (
+        f'{algo.name} event loop - start tickers={tickers}')
+    for timestamp, ticker_idx, seq, node, bars, bar_idx in (
+            merge_ticker_bars(
+                data=data,
+                tickers=tickers,
+                use_minutes=use_minutes,
+                run_this_date=algo.run_this_date)):
+        ticker = tickers[ticker_idx]
+        if ticker != active_ticker:
+            # swap in the ticker's own datasets and latest bar
+            if active_ticker:
+                algo.ticker_views[active_ticker] = {
+                    key: algo_dict[key]
+                    for key in VIEW_KEYS
+                }
+            algo_dict.update(algo.ticker_views[ticker])
+            algo.ticker = ticker
+            active_ticker = ticker
+        algo_id = f'{ticker} {node["date"]}'
+        num_events += 1
+
+        if bar_idx <= 0:
+            algo.debug_msg = (
+                f'{algo.name} event loop - {algo_id} - id={node["id"]}')
+            if streamed[ticker]:
+                handled_nodes[ticker].append({
+                    'id': node['id'],
+                    'date': node['date'],
+                    'data': {}
+                })
+            start_ticker_dataset(
+                algo=algo,
+                ticker=ticker,
+                node=node)
+            if not bars:
+                if use_minutes:
+                    # records the day when the minute data is missing
+                    algo.handle_minute_dataset(
+                        algo_id=algo_id,
+                        ticker=ticker,
+                        node=node,
+                        start_row=node.get('start_row', 0))
+                else:
+                    algo.handle_daily_dataset(
+                        algo_id=algo_id,
+                        ticker=ticker,
+                        node=node)
+                end_ticker_dataset(
+                    algo=algo,
+                    algo_id=algo_id,
+                    ticker=ticker,
+                    node=node)
+                continue
+            algo.load_from_dataset(
+                ds_data=node)
+        # end of starting the ticker's next dataset
+
+        algo.handle_minute_bar(
+            algo_id=algo_id,
+            ticker=ticker,
+            node=node,
+            minute_idx=bars['rows'][bar_idx],
+            num_rows=bars['num_rows'],
+            minute=bars['minute'][bar_idx],
+            high=bars['high'][bar_idx],
+            low=bars['low'][bar_idx],
+            open_val=bars['open_val'][bar_idx],
+            close=bars['close'][bar_idx],
+            volume=bars['volume'][bar_idx])
+        if bar_idx == len(bars['rows']) - 1:
+            end_ticker_dataset(
+                algo=algo,
+                algo_id=algo_id,
+                ticker=ticker,
+                node=node)
+    # end of for all events
+
+    if active_ticker:
+        algo.ticker_views[active_ticker] = {
+            key: algo_dict[key]
+            for key in VIEW_KEYS
+        }
+    algo.last_handle_data = {
+        ticker: (
+            handled_nodes[ticker] if streamed[ticker]
+            else data[ticker])
+        for ticker in tickers
+    }
+    algo.debug_msg = (
+        f'{algo.name} event loop - end tickers={len(tickers)} '
+        f'events={num_events}')
+    log.debug(
+        f'{label} - done tickers={len(tickers)} events={num_events}')
+    return num_events
+# end of run_event_loop
@@ -0,0 +1,567 @@
+"""
+Store distributed algorithm results by reference
+
+The ``task_run_algo`` and ``run_distributed_algorithm`` tasks
+return their result through the Celery json result backend.
+With ``result_by_reference`` set in the algorithm request the
+task writes the ``Trading History`` and the
+``Trading Performance Report`` to redis or S3 in a compact
+binary format and only returns a pointer and a summary:
+
+.. code-block:: python
+
+    {
+        'result_ref': {
+            'version': 1,
+            'format': 'npz',
+            'store': 'redis',
+            'key': 'ae:algoresult:SPY:0b6c...',
+            'redis_address': 'localhost:6379',
+            'redis_db': 0,
+            's3_address': None,
+            's3_bucket': None,
+            'size_bytes': 48211
+        },
+        'summary': {
+            'ticker': 'SPY',
+            'balance': 10230.5,
+            'starting_balance': 10000.0,
+            'num_buys': 12,
+            'num_sells': 11,
+            'num_history_rows': 24570,
+            'num_report_rows': 60,
+            'start_date': '2019-01-02 09:30:00',
+            'end_date': '2019-03-29 16:00:00',
+            'run_seconds': 41.2,
+            'store_seconds': 0.3
+        }
+    }
+
+``analysis_engine.algo_runner.AlgoRunner`` only loads the
+payload with ``load_result`` the first time the history is
+used.
+
+The payload is a ``numpy.savez_compressed`` archive with one
+array per column (``pyarrow`` and ``msgpack`` are not
+dependencies of the engine):
+
+- numeric and bool columns keep their dtype
+- datetime columns are stored as ``int64`` nanoseconds
+- string columns are stored as ``int32`` codes into an array
+  of the unique values (dates, tickers and statuses repeat on
+  every row)
+- any other column (dictionaries, lists or mixed types) is
+  stored as json strings
+
+The archive is loaded with ``allow_pickle=False``.
+
+**Supported environment variables**
+
+::
+
+    # turn on results by reference for all algorithm tasks
+    export ALGO_RESULT_BY_REFERENCE=1
+    # redis or s3
+    export ALGO_RESULT_STORE=redis
+    export ALGO_RESULT_KEY_PREFIX=ae:algoresult
+    export ALGO_RESULT_S3_BUCKET=algoresults
+    # seconds before stored results expire in redis
+    export ALGO_RESULT_EXPIRE=86400
+"""
+
+import io
+import json
+import time
+import uuid
+import boto3
+import numpy as np
+import pandas as pd
+import redis
+import analysis_engine.consts as ae_consts
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+RESULT_VERSION = 1
+RESULT_FORMAT = 'npz'
+META_KEY = '__meta__'
+
+
+def encode_value(
+        value):
+    """encode_value
+
+    ``json.dumps`` handler for numpy scalars and dates
+
+    :param value: value that is not json serializable
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+# end of encode_value
+
+
+def encode_frame(
+        name,
+        df,
+        arrays):
+    """encode_frame
+
+    Add one array per column of ``df`` to ``arrays`` and return
+    the column metadata needed to rebuild the frame
+
+    :param name: frame name used in the array keys
+    :param df: ``pandas.DataFrame`` to encode
+    :param arrays: dictionary of arrays for ``numpy.savez``
+    """
+    columns = []
+    for idx, column in enumerate(df.columns):
+        series = df[column]
+        key = f'{name}_{idx}'
+        if pd.api.types.is_datetime64_any_dtype(series):
+            kind = 'datetime'
+            arrays[key] = series.values.astype('datetime64[ns]').astype(
+                np.int64)
+        elif (pd.api.types.is_numeric_dtype(series) or
+                pd.api.types.is_bool_dtype(series)):
+            kind = 'num'
+            arrays[key] = series.values
+        elif series.map(
+                lambda v: v is None or isinstance(v, str)).all():
+            kind = 'str'
+            codes, uniques = pd.factorize(series)
+            arrays[f'{key}_codes'] = codes.astype(np.int32)
+            arrays[f'{key}_uniques'] = np.array(
+                list(uniques),
+                dtype=str)
+        else:
+            kind = 'json'
+            arrays[key] = np.array(
+                [
+                    json.dumps(v, default=encode_value)
+                    for v in series.tolist()
+                ],
+                dtype=str)
+        columns.append({
+            'name': str(column),
+            'kind': kind
+        })
+    # end of for all columns
+    return {
+        'num_rows': len(df.index),
+        'columns': columns
+    }
+# end of encode_frame
+
+
+def decode_frame(
+        name,
+        frame_meta,
+        archive):
+    """decode_frame
+
+    Rebuild a ``pandas.DataFrame`` encoded with ``encode_frame``
+
+    :param name: frame name used in the array keys
+    :param frame_meta: column metadata from ``encode_frame``
+    :param archive: loaded ``numpy`` archive
+    """
+    data = {}
+    for idx, column in enumerate(frame_meta['columns']):
+        key = f'{name}_{idx}'
+        kind = column['kind']
+        if kind == 'datetime':
+            values = pd.to_datetime(archive[key])
+        elif kind == 'num':
+            values = archive[key]
+        elif kind == 'str':
+            codes = archive[f'{key}_codes']
+            uniques = archive[f'{key}_uniques'].astype(object)
+            values = np.empty(len(codes), dtype=object)
+            valid = codes >= 0
+            values[valid] = uniques[codes[valid]]
+            values[~valid] = None
+        else:
+            values = [
+                json.loads(v)
+                for v in archive[key].tolist()
+            ]
+        data[column['name']] = values
+    # end of for all columns
+    return pd.DataFrame(
+        data,
+        columns=[c['name'] for c in frame_meta['columns']],
+        index=pd.RangeIndex(frame_meta['num_rows']))
+# end of decode_frame
+
+
+def encode_result(
+        frames,
+        summary=None):
+    """encode_result
+
+    Encode a dictionary of ``pandas.DataFrame`` objects into
+    one compressed ``npz`` payload
+
+    :param frames: dictionary of frame name to ``pandas.DataFrame``
+    :param summary: optional - summary dictionary stored with
+        the frames
+    """
+    arrays = {}
+    meta = {
+        'version': RESULT_VERSION,
+        'summary': summary or {},
+        'frames': {}
+    }
+    for name, df in frames.items():
+        meta['frames'][name] = encode_frame(
+            name=name,
+            df=df,
+            arrays=arrays)
+    arrays[META_KEY] = np.frombuffer(
+        json.dumps(meta, default=encode_value).encode('utf-8'),
+        dtype=np.uint8)
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        **arrays)
+    return buf.getvalue()
+# end of encode_result
+
+
+def decode_result(
+        data):
+    """decode_result
+
+    Decode a payload from ``encode_result`` into a dictionary
+    with the ``summary`` and every frame by name
+
+    :param data: payload bytes
+    """
+    with np.load(io.BytesIO(data), allow_pickle=False) as archive:
+        meta = json.loads(archive[META_KEY].tobytes().decode('utf-8'))
+        if meta.get('version') != RESULT_VERSION:
+            raise ValueError(
+                f'unsupported algo result version={meta.get("version")}')
+        result = {
+            'summary': meta.get('summary', {})
+        }
+        for name, frame_meta in meta['frames'].items():
+            result[name] = decode_frame(
+                name=name,
+                frame_meta=frame_meta,
+                archive=archive)
+    return result
+# end of decode_result
+
+
+def build_report_df(
+        algo):
+    """build_report_df
+
+    Build the ``Trading Performance Report`` rows for every
+    ticker the algorithm processed
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` that ran
+    """
+    rows = []
+    for ticker, nodes in algo.create_report_dataset().items():
+        for node in nodes:
+            rows.append({
+                'ticker': ticker,
+                'id': node['id'],
+                'date': node['date']
+            })
+    return pd.DataFrame(
+        rows,
+        columns=['ticker', 'id', 'date'])
+# end of build_report_df
+
+
+def build_summary(
+        algo,
+        ticker,
+        history_df,
+        report_df,
+        run_seconds):
+    """build_summary
+
+    Build the small summary returned with the result reference
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` that ran
+    :param ticker: ticker symbol
+    :param history_df: ``Trading History`` frame
+    :param report_df: ``Trading Performance Report`` frame
+    :param run_seconds: seconds the backtest ran
+    """
+    start_date = None
+    end_date = None
+    if len(history_df.index) > 0:
+        time_column = 'minute' if 'minute' in history_df else 'date'
+        if time_column in history_df:
+            start_date = history_df[time_column].iloc[0]
+            end_date = history_df[time_column].iloc[-1]
+    return {
+        'ticker': ticker,
+        'balance': ae_consts.to_f(algo.get_balance()),
+        'starting_balance': ae_consts.to_f(algo.starting_balance),
+        'num_buys': len(algo.get_buys()),
+        'num_sells': len(algo.get_sells()),
+        'num_history_rows': len(history_df.index),
+        'num_report_rows': len(report_df.index),
+        'start_date': str(start_date) if start_date is not None else None,
+        'end_date': str(end_date) if end_date is not None else None,
+        'run_seconds': round(run_seconds, 3),
+        'store_seconds': None
+    }
+# end of build_summary
+
+
+def build_result_key(
+        ticker,
+        task_id=None,
+        prefix=ae_consts.ALGO_RESULT_KEY_PREFIX):
+    """build_result_key
+
+    Build a unique redis key or S3 key for one algorithm result
+
+    :param ticker: ticker symbol
+    :param task_id: optional - Celery task id
+        (default is a new ``uuid4``)
+    :param prefix: optional - key prefix
+        (default is ``ALGO_RESULT_KEY_PREFIX``)
+    """
+    if not task_id:
+        task_id = uuid.uuid4().hex
+    return f'{prefix}:{ticker}:{task_id}'
+# end of build_result_key
+
+
+def get_redis_client(
+        address,
+        db,
+        password=None):
+    """get_redis_client
+
+    Build a redis client for a ``host:port`` address
+
+    :param address: redis ``host:port`` address
+    :param db: redis db
+    :param password: optional - redis password
+    """
+    host, port = address.split(':')
+    return redis.Redis(
+        host=host,
+        port=port,
+        password=password,
+        db=db)
+# end of get_redis_client
+
+
+def get_s3_resource(
+        address,
+        access_key,
+        secret_key,
+        region_name,
+        secure=False):
+    """get_s3_resource
+
+    Build a ``boto3.resource('s3')`` for an S3 address
+
+    :param address: S3 ``host:port`` address
+    :param access_key: S3 access key
+    :param secret_key: S3 secret key
+    :param region_name: S3 region
+    :param secure: optional - bool to use https
+    """
+    endpoint_url = f'http{"s" if secure else ""}://{address}'
+    return boto3.resource(
+        's3',
+        endpoint_url=endpoint_url,
+        aws_access_key_id=access_key,
+        aws_secret_access_key=secret_key,
+        region_name=region_name,
+        config=boto3.session.Config(
+            signature_version='s3v4'))
+# end of get_s3_resource
+
+
+def store_algo_result(
+        algo,
+        algo_req,
+        run_seconds,
+        task_id=None,
+        store=None,
+        client=None,
+        s3=None):
+    """store_algo_result
+
+    Write the algorithm's ``Trading History`` and
+    ``Trading Performance Report`` to redis or S3 and return
+    the task ``rec`` with the ``result_ref`` pointer and the
+    ``summary``. The connection settings come from the
+    ``history_config`` in the algorithm request.
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` that ran
+    :param algo_req: algorithm request dictionary
+    :param run_seconds: seconds the backtest ran
+    :param task_id: optional - Celery task id for the key
+    :param store: optional - ``redis`` or ``s3`` (default is
+        ``algo_req['result_store']`` or ``ALGO_RESULT_STORE``)
+    :param client: optional - redis client
+    :param s3: optional - ``boto3.resource('s3')``
+    """
+    start_time = time.time()
+    config = algo_req.get('history_config', None) or {}
+    ticker = algo_req.get(
+        'ticker',
+        None)
+    if not ticker:
+        ticker = algo.get_tickers()[0]
+    if not store:
+        store = algo_req.get(
+            'result_store',
+            ae_consts.ALGO_RESULT_STORE)
+
+    history_df = pd.DataFrame(algo.order_history)
+    report_df = build_report_df(
+        algo=algo)
+    summary = build_summary(
+        algo=algo,
+        ticker=ticker,
+        history_df=history_df,
+        report_df=report_df,
+        run_seconds=run_seconds)
+    data = encode_result(
+        frames={
+            'history': history_df,
+            'report': report_df
+        },
+        summary=summary)
+
+    ref = {
+        'version': RESULT_VERSION,
+        'format': RESULT_FORMAT,
+        'store': store,
+        'key': build_result_key(
+            ticker=ticker,
+            task_id=task_id),
+        'redis_address': None,
+        'redis_db': None,
+        's3_address': None,
+        's3_bucket': None,
+        'size_bytes': len(data)
+    }
+    if store == 's3':
+        ref['s3_address'] = config.get(
+            's3_address',
+            None) or ae_consts.S3_ADDRESS
+        ref['s3_bucket'] = algo_req.get(
+            'result_s3_bucket',
+            ae_consts.ALGO_RESULT_S3_BUCKET)
+        if not s3:
+            s3 = get_s3_resource(
+                address=ref['s3_address'],
+                access_key=config.get(
+                    's3_access_key',
+                    None) or ae_consts.S3_ACCESS_KEY,
+                secret_key=config.get(
+                    's3_secret_key',
+                    None) or ae_consts.S3_SECRET_KEY,
+                region_name=config.get(
+                    's3_region_name',
+                    None) or ae_consts.S3_REGION_NAME,
+                secure=config.get(
+                    's3_secure',
+                    ae_consts.S3_SECURE) in [True, '1'])
+        if s3.Bucket(ref['s3_bucket']) not in s3.buckets.all():
+            s3.create_bucket(
+                Bucket=ref['s3_bucket'])
+        s3.Bucket(ref['s3_bucket']).put_object(
+            Key=ref['key'],
+            Body=data)
+    else:
+        ref['store'] = 'redis'
+        ref['redis_address'] = config.get(
+            'redis_address',
+            None) or ae_consts.REDIS_ADDRESS
+        ref['redis_db'] = int(config.get(
+            'redis_db',
+            ae_consts.REDIS_DB))
+        if not client:
+            client = get_redis_client(
+                address=ref['redis_address'],
+                db=ref['redis_db'],
+                password=config.get(
+                    'redis_password',
+                    ae_consts.REDIS_PASSWORD))
+        expire = algo_req.get(
+            'result_expire',
+            ae_consts.ALGO_RESULT_EXPIRE)
+        client.set(
+            name=ref['key'],
+            value=data,
+            ex=expire if expire else None)
+    # end of writing to the store
+
+    summary['store_seconds'] = round(time.time() - start_time, 3)
+    log.info(
+        f'stored algo result store={ref["store"]} key={ref["key"]} '
+        f'size={ae_consts.get_mb(len(data))}MB '
+        f'rows={summary["num_history_rows"]}')
+    return {
+        'result_ref': ref,
+        'summary': summary
+    }
+# end of store_algo_result
+
+
+def load_result(
+        ref,
+        client=None,
+        s3=None,
+        redis_password=ae_consts.REDIS_PASSWORD,
+        s3_access_key=ae_consts.S3_ACCESS_KEY,
+        s3_secret_key=ae_consts.S3_SECRET_KEY,
+        s3_region_name=ae_consts.S3_REGION_NAME,
+        s3_secure=ae_consts.S3_SECURE):
+    """load_result
+
+    Load the payload a ``result_ref`` points to and return a
+    dictionary with the ``summary``, the ``history`` frame and
+    the ``report`` frame
+
+    :param ref: ``result_ref`` dictionary from the task result
+    :param client: optional - redis client
+    :param s3: optional - ``boto3.resource('s3')``
+    :param redis_password: optional - redis password
+    :param s3_access_key: optional - S3 access key
+    :param s3_secret_key: optional - S3 secret key
+    :param s3_region_name: optional - S3 region
+    :param s3_secure: optional - S3 secure flag
+    """
+    if ref.get('store') == 's3':
+        if not s3:
+            s3 = get_s3_resource(
+                address=ref['s3_address'],
+                access_key=s3_access_key,
+                secret_key=s3_secret_key,
+                region_name=s3_region_name,
+                secure=s3_secure in [True, '1'])
+        data = s3.Object(
+            ref['s3_bucket'],
+            ref['key']).get()['Body'].read()
+    else:
+        if not client:
+            client = get_redis_client(
+                address=ref['redis_address'],
+                db=ref['redis_db'],
+                password=redis_password)
+        data = client.get(ref['key'])
+    if not data:
+        raise ValueError(
+            f'missing algo result store={ref.get("store")} '
+            f'key={ref.get("key")}')
+    return decode_result(
+        data=data)
+# end of load_result
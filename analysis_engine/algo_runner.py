@@ -9,7 +9,9 @@ import json
 import pandas as pd
 import analysis_engine.consts as ae_consts
 import analysis_engine.utils as ae_utils
+import analysis_engine.algo_result_store as algo_result_store
 import analysis_engine.build_dataset_node as build_dataset_node
+import analysis_engine.get_bars_from_stream as get_bars_from_stream
 import analysis_engine.load_history_dataset as load_history_utils
 import analysis_engine.run_custom_algo as run_custom_algo
 import analysis_engine.publish as publish
@@ -66,6 +68,9 @@ class AlgoRunner:
             verbose_algo=False,
             verbose_processor=False,
             verbose_indicators=False,
+            use_cache=ae_consts.ENABLED_BACKTEST_CACHE,
+            cache_store=ae_consts.BACKTEST_CACHE_STORE,
+            result_by_reference=ae_consts.ALGO_RESULT_BY_REFERENCE,
             **kwargs):
         """__init__
 
@@ -91,8 +96,24 @@ class AlgoRunner:
         :param verbose_indicators: optional - bool flag for
             debugging the algo's indicators
             (default is ``False``)
+        :param use_cache: optional - bool flag for returning a
+            cached trading history from a previous backtest with
+            the same inputs (default is ``ENABLED_BACKTEST_CACHE``)
+        :param cache_store: optional - backtest cache store
+            ``file``, ``redis`` or ``s3``
+            (default is ``BACKTEST_CACHE_STORE``)
+        :param result_by_reference: optional - bool flag for
+            the engine to store the trading history and only
+            return a pointer that is loaded the first time
+            ``self.history_df`` is used
+            (default is ``ALGO_RESULT_BY_REFERENCE``)
         :param kwargs: keyword args dictionary
         """
+        self._history_df = None
+        self.result_by_reference = result_by_reference
+        self.result_ref = None
+        self.result_summary = None
+        self.result_report_df = None
         self.ticker = None
         if ticker:
             self.ticker = str(ticker).upper()
@@ -101,6 +122,8 @@ class AlgoRunner:
         self.start_day = None
         self.end_day = None
         self.run_on_engine = run_on_engine
+        self.use_cache = use_cache
+        self.cache_store = cache_store
         self.algo_history_loc = (
             f's3://algohistory/trade_history_{self.ticker}')
         self.algo_predictions_loc = (
@@ -471,11 +494,19 @@ class AlgoRunner:
             ssl_options=self.ssl_options,
             transport_options=self.transport_options,
             path_to_config_module=self.path_to_config_module,
+            result_by_reference=self.result_by_reference,
             timeseries=self.timeseries,
             trade_strategy=self.trade_strategy,
             verbose=self.verbose_algo,
+            use_cache=self.use_cache,
+            cache_store=self.cache_store,
             raise_on_err=self.raise_on_err)
 
+        if self.algo_res.get('cache_hit', False):
+            log.info(
+                'using cached backtest '
+                f'key={self.algo_res["cache_key"]}')
+
         self.wait_for_algo_to_finish()
     # end of start
 
@@ -496,6 +527,28 @@ class AlgoRunner:
             log.info(
                 f'waiting - algo task_id={self.task_id} to finish')
             res = self.task_id.get()
+            result_ref = (res.get('rec', None) or {}).get(
+                'result_ref',
+                None)
+            if result_ref:
+                self.result_ref = result_ref
+                self.result_summary = res['rec'].get('summary', {})
+                self.num_rows = self.result_summary.get(
+                    'num_history_rows',
+                    0)
+                self.start_date = self.result_summary.get(
+                    'start_date',
+                    self.start_date)
+                self.end_date = self.result_summary.get(
+                    'end_date',
+                    self.end_date)
+                log.info(
+                    f'algo result by reference '
+                    f'key={result_ref["key"]} rows={self.num_rows} '
+                    f'balance={self.result_summary.get("balance")} '
+                    f'dates={self.start_date} to {self.end_date}')
+                return
+            # end of loading the history on first use
             history_config = res.get(
                 'algo_req', {}).get(
                     'history_config', None)
@@ -520,6 +573,67 @@ class AlgoRunner:
             f'dates={self.start_date} to {self.end_date}')
     # end of wait_for_algo_to_finish
 
+    @property
+    def history_df(
+            self):
+        """history_df
+
+        ``Trading History`` ``pandas.DataFrame`` that is loaded
+        from ``self.result_ref`` the first time it is used
+        """
+        if self._history_df is None and self.result_ref:
+            self.load_result_by_reference()
+        return self._history_df
+    # end of history_df
+
+    @history_df.setter
+    def history_df(
+            self,
+            value):
+        """history_df
+
+        :param value: ``pandas.DataFrame`` or ``None``
+        """
+        self._history_df = value
+    # end of history_df
+
+    def load_result_by_reference(
+            self,
+            client=None,
+            s3=None):
+        """load_result_by_reference
+
+        Load the ``Trading History`` and
+        ``Trading Performance Report`` that ``self.result_ref``
+        points to
+
+        :param client: optional - redis client
+        :param s3: optional - ``boto3.resource('s3')``
+        """
+        result_ref = self.result_ref
+        # only try once if the payload is missing
+        self.result_ref = None
+        log.info(
+            f'loading algo result store={result_ref["store"]} '
+            f'key={result_ref["key"]} '
+            f'size={ae_consts.get_mb(result_ref["size_bytes"])}MB')
+        result = algo_result_store.load_result(
+            ref=result_ref,
+            client=client,
+            s3=s3,
+            redis_password=self.redis_password,
+            s3_access_key=self.s3_access_key,
+            s3_secret_key=self.s3_secret_key,
+            s3_region_name=self.s3_region_name,
+            s3_secure=self.s3_secure)
+        self.result_ref = result_ref
+        self.result_report_df = result['report']
+        self._history_df = result['history']
+        self.num_rows = len(self._history_df.index)
+        if self.num_rows > 0:
+            self.determine_latest_times_in_history()
+    # end of load_result_by_reference
+
     def determine_latest_times_in_history(
             self):
         """determine_latest_times_in_history
@@ -951,4 +1065,124 @@ class AlgoRunner:
         return self.get_history()
     # end of latest
 
+    def stream(
+            self,
+            date_str=None,
+            start_row=-200,
+            client=None,
+            last_id='$',
+            block_ms=ae_consts.REDIS_STREAM_BLOCK_MS,
+            max_bars=None,
+            max_empty_reads=None,
+            verbose=False,
+            **kwargs):
+        """stream
+
+        Run the algorithm with the latest pricing data and then
+        keep running it on each new ``minute`` bar published
+        to the ticker's redis stream (requires the engine to
+        publish with ``ENABLED_REDIS_STREAM=1``)
+
+        :param date_str: optional - string start date ``YYYY-MM-DD``
+            default is the latest close date
+        :param start_row: negative number of rows back
+            from the end of the cached minute dataset to process
+            before streaming (default is ``-200``)
+        :param client: optional - initialized redis client
+        :param last_id: optional - stream id to start after
+            (default is ``$`` for only new bars)
+        :param block_ms: optional - milliseconds to block per read
+            (default is ``REDIS_STREAM_BLOCK_MS``)
+        :param max_bars: optional - stop after this many bars
+            (default is ``None`` to run until stopped)
+        :param max_empty_reads: optional - stop after this many
+            reads without a new bar
+            (default is ``None`` to run until stopped)
+        :param verbose: bool flag for logs
+        :param kwargs: keyword arg dict
+        """
+        use_date_str = date_str
+        if not use_date_str:
+            use_date_str = ae_utils.get_last_close_str()
+
+        self.latest(
+            date_str=use_date_str,
+            start_row=start_row,
+            verbose=verbose)
+
+        ticker = self.config_dict['ticker']
+        dataset_id = f'{ticker}_{use_date_str}'
+        node = None
+        if self.algo_obj.last_handle_data:
+            node = self.algo_obj.last_handle_data.get(
+                ticker, [None])[-1]
+        if not node:
+            node = {
+                'id': dataset_id,
+                'date': use_date_str,
+                'data': {}
+            }
+        df_minute = node['data'].get('minute', None)
+        if not ae_consts.is_df(df=df_minute):
+            df_minute = None
+
+        log.info(
+            f'run stream - start {ticker} last_id={last_id}')
+
+        num_bars = 0
+        for bar in get_bars_from_stream.get_bars_from_stream(
+                ticker=ticker,
+                dataset='minute',
+                client=client,
+                redis_address=self.redis_address,
+                redis_db=self.redis_db,
+                redis_password=self.redis_password,
+                last_id=last_id,
+                block_ms=block_ms,
+                max_bars=max_bars,
+                max_empty_reads=max_empty_reads):
+            bar.pop('stream_id', None)
+            bar_df = pd.DataFrame([bar])
+            bar_df['date'] = pd.to_datetime(bar_df['date'])
+            if df_minute is None:
+                df_minute = bar_df
+            else:
+                df_minute = pd.concat(
+                    [df_minute, bar_df],
+                    ignore_index=True,
+                    sort=False)
+            node['data']['minute'] = df_minute
+            node['start_row'] = -1
+            try:
+                self.algo_obj.handle_data(
+                    data={
+                        ticker: [
+                            node
+                        ]
+                    })
+            except Exception as e:
+                log.critical(
+                    f'{dataset_id} - algo={self.algo_obj.get_name()} '
+                    f'failed handle_data for bar={bar["date"]} '
+                    f'ex={e} during: {self.algo_obj.get_debug_msg()}')
+            # end try/ex
+            num_bars += 1
+            if verbose:
+                log.info(
+                    f'run stream - {ticker} bar={bar["date"]} '
+                    f'close={bar.get("close", None)}')
+        # end of for all new bars in the stream
+
+        history_ds = self.algo_obj.create_history_dataset()
+        self.history_df = pd.DataFrame(history_ds[ticker])
+        self.determine_latest_times_in_history()
+        self.num_rows = len(self.history_df.index)
+
+        log.info(
+            f'run stream - {ticker} bars={num_bars} '
+            f'rows={self.num_rows} - done')
+
+        return self.get_history()
+    # end of stream
+
 # end of AlgoRunner
@@ -0,0 +1,296 @@
+"""
+Run one backtest per ticker in a process pool and merge the
+results
+
+``BaseAlgo.handle_data`` processes every ticker in one process.
+When the tickers keep independent balances (one config, many
+tickers) each ticker's backtest can run on its own core. Each
+process runs ``run_custom_algo`` for one ticker with a new
+algorithm object built from the same module and config, and
+the trading histories and reports are merged into a
+``TickerPoolAlgo`` that publishes like a multi-ticker algorithm:
+
+.. code-block:: python
+
+    import analysis_engine.run_custom_algo as run_custom_algo
+
+    res = run_custom_algo.run_custom_algo(
+        mod_path='/opt/sa/analysis_engine/mocks/example_algo_minute.py',
+        tickers=['SPY', 'QQQ', 'AAPL', 'MSFT'],
+        balance=10000.0,
+        start_date='2019-01-02 00:00:00',
+        end_date='2019-02-15 00:00:00',
+        ticker_workers=4)
+    # merged trading history for every ticker
+    print(res['rec']['history'])
+    # per-ticker results
+    print(res['rec']['by_ticker']['SPY']['balance'])
+
+Every ticker starts with ``balance``, so the merged balance is
+the sum of the per-ticker balances. Each process uses the
+backtest result cache the same way a single-ticker run does.
+
+.. note:: publishing the ``Algorithm-Ready`` (extract) dataset
+    is not supported in this mode. The per-ticker datasets stay
+    in the worker processes, so ``run_custom_algo`` skips the
+    extract publish, ``TickerPoolAlgo.publish_input_dataset()``
+    returns ``ERR`` and
+    ``TickerPoolAlgo.create_algorithm_ready_dataset()`` raises.
+    Run the tickers without ``tickers``/``ticker_workers`` to
+    publish the extract dataset.
+
+**Supported environment variables**
+
+::
+
+    # processes for per-ticker backtests (0 uses every core)
+    export ALGO_TICKER_WORKERS=0
+"""
+
+import os
+import copy
+import time
+import concurrent.futures
+import analysis_engine.consts as ae_consts
+import analysis_engine.algo as ae_algo
+import analysis_engine.backtest_cache as backtest_cache
+import analysis_engine.build_result as build_result
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def run_ticker_backtest(
+        algo_kwargs):
+    """run_ticker_backtest
+
+    Run ``run_custom_algo`` for ``algo_kwargs['ticker']`` and
+    return a picklable dictionary with the ``status``, ``err``,
+    ``cache_hit`` and the ``cached`` result (the same format
+    as ``backtest_cache.build_cached_result``)
+
+    :param algo_kwargs: ``run_custom_algo`` keyword arguments
+    """
+    import analysis_engine.run_custom_algo as run_custom_algo
+    ticker = algo_kwargs['ticker']
+    start_time = time.time()
+    res = {
+        'ticker': ticker,
+        'status': ae_consts.ERR,
+        'err': None,
+        'cache_hit': False,
+        'cached': None
+    }
+    try:
+        algo_res = run_custom_algo.run_custom_algo(
+            **algo_kwargs)
+    except Exception as e:
+        res['err'] = f'failed backtest ticker={ticker} ex={e}'
+        return res
+    res['status'] = algo_res['status']
+    res['err'] = algo_res['err']
+    algo = algo_res.get('algo', None)
+    if algo_res['status'] == ae_consts.SUCCESS and algo:
+        res['cache_hit'] = algo_res.get('cache_hit', False)
+        res['cached'] = backtest_cache.build_cached_result(
+            cache_key=algo_res.get('cache_key', None),
+            algo=algo,
+            result=algo_res['rec'],
+            elapsed_seconds=time.time() - start_time)
+    return res
+# end of run_ticker_backtest
+
+
+class TickerPoolAlgo(ae_algo.BaseAlgo):
+    """TickerPoolAlgo
+
+    Algorithm holding the merged per-ticker backtest results so
+    the trading history and report publish with the
+    ``BaseAlgo`` methods. ``last_handle_data`` only holds the
+    ids and dates of each ticker's datasets, so the
+    ``Algorithm-Ready`` dataset cannot be built.
+
+    :param ticker_results: dictionary of ticker to the
+        ``cached`` result from ``run_ticker_backtest``
+    :param balance: starting balance of each ticker
+    :param kwargs: ``BaseAlgo`` keyword arguments
+    """
+
+    def __init__(
+            self,
+            ticker_results,
+            balance,
+            **kwargs):
+        """__init__
+
+        :param ticker_results: dictionary of ticker to the
+            ``cached`` result from ``run_ticker_backtest``
+        :param balance: starting balance of each ticker
+        :param kwargs: ``BaseAlgo`` keyword arguments
+        """
+        config_dict = kwargs.pop('config_dict', None)
+        super().__init__(
+            ticker=None,
+            tickers=list(ticker_results.keys()),
+            balance=balance * len(ticker_results),
+            **kwargs)
+        # set after BaseAlgo so the indicators are not loaded again
+        self.config_dict = config_dict
+        self.ticker_results = ticker_results
+        self.balance = 0.0
+        self.last_handle_data = {}
+        for ticker, cached in ticker_results.items():
+            result = cached['result']
+            self.order_history += result.get('history', [])
+            self.buys += result.get('buys', [])
+            self.sells += result.get('sells', [])
+            self.positions.update(result.get('open_positions', {}))
+            self.balance += result.get('balance', balance)
+            self.last_handle_data[ticker] = cached['report_nodes'].get(
+                ticker,
+                [])
+        # end of for all tickers
+    # end of __init__
+
+    def build_ticker_history(
+            self,
+            ticker,
+            ignore_keys):
+        """build_ticker_history
+
+        Return the trading history from the ticker's own backtest
+
+        :param ticker: string ticker symbol
+        :param ignore_keys: list of keys to not include in the
+            history report
+        """
+        history_for_ticker = []
+        for node in self.ticker_results[ticker]['result'].get(
+                'history', []):
+            if node.get('status', ae_consts.INVALID) != ae_consts.INVALID:
+                for key in ignore_keys:
+                    node.pop(key, None)
+                history_for_ticker.append(node)
+        return history_for_ticker
+    # end of build_ticker_history
+
+    def create_algorithm_ready_dataset(
+            self):
+        """create_algorithm_ready_dataset
+
+        Raise because the per-ticker datasets are not kept
+        after the pool's backtests finish
+        """
+        raise NotImplementedError(
+            f'{self.name} - the algorithm-ready dataset is not '
+            f'available for tickers={self.tickers} backtested in a '
+            'ticker pool - run without tickers to publish it')
+    # end of create_algorithm_ready_dataset
+
+# end of TickerPoolAlgo
+
+
+def run_ticker_pool(
+        tickers,
+        algo_kwargs,
+        max_workers=ae_consts.ALGO_TICKER_WORKERS,
+        raise_on_err=True,
+        label='ticker-pool'):
+    """run_ticker_pool
+
+    Run one ``run_custom_algo`` backtest per ticker in a process
+    pool and return a ``build_result`` dictionary like
+    ``run_custom_algo`` with the ``TickerPoolAlgo`` in
+    ``res['algo']`` and the per-ticker results in
+    ``res['rec']['by_ticker']``
+
+    :param tickers: list of tickers
+    :param algo_kwargs: ``run_custom_algo`` keyword arguments
+        shared by every ticker
+    :param max_workers: optional - processes (``0`` uses every
+        core and ``1`` runs the tickers in this process, default
+        is ``ALGO_TICKER_WORKERS``)
+    :param raise_on_err: optional - raise when a ticker's
+        backtest fails (default is ``True``)
+    :param label: optional - log label
+    """
+    start_time = time.time()
+    use_tickers = list(dict.fromkeys(str(t).upper() for t in tickers))
+    jobs = []
+    for ticker in use_tickers:
+        job = dict(algo_kwargs)
+        # algorithms update their config_dict (like the positions)
+        job['config_dict'] = copy.deepcopy(algo_kwargs.get('config_dict'))
+        job['ticker'] = ticker
+        job['tickers'] = None
+        job['raise_on_err'] = raise_on_err
+        jobs.append(job)
+    max_workers = int(max_workers) or os.cpu_count() or 1
+    max_workers = max(1, min(max_workers, len(jobs)))
+    if max_workers == 1:
+        results = [run_ticker_backtest(job) for job in jobs]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=max_workers) as pool:
+            results = list(pool.map(run_ticker_backtest, jobs))
+    # end of running the backtests
+
+    failed = [
+        res for res in results
+        if res['status'] not in [ae_consts.SUCCESS, ae_consts.EMPTY]
+    ]
+    if failed:
+        err = (
+            f'{label} - failed tickers=' +
+            ', '.join(f'{res["ticker"]}: {res["err"]}' for res in failed))
+        log.error(err)
+        if raise_on_err:
+            raise Exception(err)
+        return build_result.build_result(
+            status=ae_consts.ERR,
+            err=err,
+            rec=None)
+
+    ticker_results = {
+        res['ticker']: res['cached']
+        for res in results
+        if res['cached']
+    }
+    empty = [res['ticker'] for res in results if not res['cached']]
+    if not ticker_results:
+        return build_result.build_result(
+            status=ae_consts.EMPTY,
+            err=f'{label} - no data for tickers={use_tickers}',
+            rec=None)
+
+    algo = TickerPoolAlgo(
+        ticker_results=ticker_results,
+        balance=algo_kwargs.get('balance', 5000.0),
+        commission=algo_kwargs.get('commission', 6.0),
+        name=algo_kwargs.get('name', label),
+        config_dict=algo_kwargs.get('config_dict', None),
+        timeseries=algo_kwargs.get('timeseries', None),
+        trade_strategy=algo_kwargs.get('trade_strategy', None))
+    rec = algo.get_result()
+    rec['tickers'] = list(ticker_results.keys())
+    rec['empty_tickers'] = empty
+    rec['by_ticker'] = {
+        ticker: cached['result']
+        for ticker, cached in ticker_results.items()
+    }
+    elapsed_seconds = time.time() - start_time
+    ticker_seconds = sum(
+        cached['elapsed_seconds'] for cached in ticker_results.values())
+    log.info(
+        f'{label} - done tickers={len(ticker_results)} empty={empty} '
+        f'workers={max_workers} elapsed={elapsed_seconds:.2f}s '
+        f'ticker_time={ticker_seconds:.2f}s')
+    algo_res = build_result.build_result(
+        status=ae_consts.SUCCESS,
+        err=None,
+        rec=rec)
+    algo_res['algo'] = algo
+    algo_res['cache_key'] = None
+    algo_res['cache_hit'] = all(res['cache_hit'] for res in results)
+    return algo_res
+# end of run_ticker_pool
@@ -0,0 +1,421 @@
+"""
+Plan and run historical backfills for IEX Cloud minute data
+
+The planner enumerates the real trading sessions between
+two dates with the cached ``analysis_engine.trading_calendar``
+(no weekends or market holidays), removes the
+``(ticker, date)`` pairs already cached in Redis or S3 or
+finished by an earlier run, and fetches the rest concurrently
+under one global rate limit. Progress is saved to a json file
+after each fetch so an interrupted backfill resumes where it
+stopped.
+
+.. code-block:: python
+
+    import analysis_engine.backfill as backfill
+
+    res = backfill.run_backfill(
+        tickers=['SPY', 'QQQ'],
+        start_date='2019-01-02',
+        end_date='2019-02-15',
+        work_dict=work)
+    print(res['rec']['num_done'])
+
+From the command line:
+
+::
+
+    fetch -t SPY,QQQ -g backfill -F 2019-01-02 -E 2019-02-15
+
+**Supported environment variables**
+
+::
+
+    export BACKFILL_MAX_WORKERS=4
+    export BACKFILL_MAX_PER_SECOND=5
+    export BACKFILL_PROGRESS_DIR=/tmp
+"""
+
+import os
+import copy
+import json
+import boto3
+import redis
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import analysis_engine.trading_calendar as trading_calendar
+import analysis_engine.build_result as build_result
+import analysis_engine.fetch_pool as fetch_pool
+import analysis_engine.rate_limiter as rate_limiter
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def get_trading_sessions(
+        start_date,
+        end_date=None):
+    """get_trading_sessions
+
+    Return the trading session date strings formatted
+    ``YYYY-MM-DD`` between ``start_date`` and ``end_date``
+    (inclusive) without weekends or market holidays
+
+    :param start_date: first date string or ``datetime``
+    :param end_date: optional - last date string or ``datetime``
+        (default is ``ae_utils.last_close()``)
+    """
+    if not end_date:
+        end_date = ae_utils.last_close()
+    return trading_calendar.get_calendar().sessions_between(
+        start_date=start_date,
+        end_date=end_date,
+        fmt=ae_consts.COMMON_DATE_FORMAT)
+# end of get_trading_sessions
+
+
+def get_cached_dates(
+        ticker,
+        dates,
+        field='minute',
+        redis_client=None,
+        s3=None,
+        s3_bucket=None):
+    """get_cached_dates
+
+    Return the set of ``dates`` with a ``<TICKER>_<DATE>_<field>``
+    key in Redis (one pipelined ``EXISTS`` round trip) or
+    in the S3 bucket (one listing by ticker prefix)
+
+    :param ticker: ticker
+    :param dates: list of date strings
+    :param field: optional - dataset name (default is ``minute``)
+    :param redis_client: optional - redis client
+    :param s3: optional - ``boto3.resource('s3')``
+    :param s3_bucket: optional - S3 bucket name
+    """
+    keys = [
+        f'{ticker}_{date_str}_{field}'
+        for date_str in dates
+    ]
+    found = set()
+    if redis_client and keys:
+        pipe = redis_client.pipeline(transaction=False)
+        for key in keys:
+            pipe.exists(key)
+        for date_str, exists in zip(dates, pipe.execute()):
+            if exists:
+                found.add(date_str)
+    if s3 and s3_bucket and keys:
+        s3_keys = set()
+        list_args = {
+            'Bucket': s3_bucket,
+            'Prefix': f'{ticker}_'
+        }
+        while True:
+            res = s3.meta.client.list_objects_v2(**list_args)
+            for node in res.get('Contents', []):
+                s3_keys.add(node['Key'])
+            if not res.get('IsTruncated', False):
+                break
+            list_args['ContinuationToken'] = res['NextContinuationToken']
+        for date_str, key in zip(dates, keys):
+            if key in s3_keys:
+                found.add(date_str)
+    return found
+# end of get_cached_dates
+
+
+def load_progress(
+        path):
+    """load_progress
+
+    Load a backfill progress file or return a new progress
+    dictionary
+
+    :param path: path to the json progress file
+    """
+    progress = {
+        'done': [],
+        'failed': {}
+    }
+    if path and os.path.exists(path):
+        with open(path, 'r') as f:
+            progress.update(json.load(f))
+    return progress
+# end of load_progress
+
+
+def save_progress(
+        path,
+        progress):
+    """save_progress
+
+    Atomically write the backfill progress file
+
+    :param path: path to the json progress file
+    :param progress: progress dictionary
+    """
+    if not path:
+        return
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(progress, f)
+    os.replace(tmp_path, path)
+# end of save_progress
+
+
+def plan_backfill(
+        tickers,
+        start_date,
+        end_date=None,
+        field='minute',
+        redis_client=None,
+        s3=None,
+        s3_bucket=None,
+        progress=None):
+    """plan_backfill
+
+    Return the list of ``(ticker, date)`` fetches that are not
+    cached or finished yet and the number of skipped fetches
+
+    :param tickers: list of tickers
+    :param start_date: first date
+    :param end_date: optional - last date
+        (default is ``ae_utils.last_close()``)
+    :param field: optional - dataset name (default is ``minute``)
+    :param redis_client: optional - redis client
+    :param s3: optional - ``boto3.resource('s3')``
+    :param s3_bucket: optional - S3 bucket name
+    :param progress: optional - progress dictionary from
+        ``load_progress``
+    """
+    sessions = get_trading_sessions(
+        start_date=start_date,
+        end_date=end_date)
+    done = set((progress or {}).get('done', []))
+    plan = []
+    num_skipped = 0
+    for ticker in tickers:
+        cached = get_cached_dates(
+            ticker=ticker,
+            dates=sessions,
+            field=field,
+            redis_client=redis_client,
+            s3=s3,
+            s3_bucket=s3_bucket)
+        for date_str in sessions:
+            if date_str in cached or f'{ticker}_{date_str}' in done:
+                num_skipped += 1
+            else:
+                plan.append((ticker, date_str))
+    return plan, num_skipped
+# end of plan_backfill
+
+
+def build_clients(
+        work_dict):
+    """build_clients
+
+    Build the redis client and S3 resource for checking
+    the cached dates from the fetch ``work_dict`` values
+
+    :param work_dict: fetch request dictionary
+    """
+    redis_client = None
+    s3 = None
+    if work_dict.get('redis_enabled', True) and work_dict.get(
+            'redis_address', None):
+        redis_host, redis_port = work_dict['redis_address'].split(':')
+        redis_client = redis.Redis(
+            host=redis_host,
+            port=int(redis_port),
+            password=work_dict.get('redis_password', None),
+            db=work_dict.get('redis_db', None))
+    if work_dict.get('s3_enabled', True) and work_dict.get(
+            's3_address', None):
+        s3_secure = work_dict.get('s3_secure', False)
+        s3 = boto3.resource(
+            's3',
+            endpoint_url=(
+                f'http{"s" if s3_secure else ""}://'
+                f'{work_dict["s3_address"]}'),
+            aws_access_key_id=work_dict.get('s3_access_key', None),
+            aws_secret_access_key=work_dict.get('s3_secret_key', None),
+            region_name=work_dict.get('s3_region_name', None),
+            config=boto3.session.Config(
+                signature_version='s3v4'))
+    return redis_client, s3
+# end of build_clients
+
+
+def run_backfill(
+        tickers,
+        start_date,
+        end_date=None,
+        work_dict=None,
+        field='minute',
+        fetch_func=None,
+        max_workers=None,
+        max_per_second=None,
+        progress_file=None,
+        redis_client=None,
+        s3=None):
+    """run_backfill
+
+    Plan and run a backfill and return a ``build_result``
+    dictionary with the counts:
+
+    .. code-block:: python
+
+        {
+            'num_planned': 40,
+            'num_skipped': 20,
+            'num_done': 39,
+            'num_failed': 1,
+            'progress_file': '/tmp/backfill-minute-SPY.json'
+        }
+
+    :param tickers: list of tickers
+    :param start_date: first date
+    :param end_date: optional - last date
+        (default is ``ae_utils.last_close()``)
+    :param work_dict: optional - fetch request dictionary with
+        the redis and S3 values copied into each fetch
+    :param field: optional - dataset name (default is ``minute``)
+    :param fetch_func: optional - function called with
+        ``work_dict=`` for each fetch (default is
+        ``analysis_engine.iex.get_data.get_data_from_iex``)
+    :param max_workers: optional - fetch threads
+        (default is ``BACKFILL_MAX_WORKERS``)
+    :param max_per_second: optional - global limit on fetches
+        started per second (default is ``BACKFILL_MAX_PER_SECOND``)
+    :param progress_file: optional - json progress file
+        (default is ``BACKFILL_PROGRESS_DIR/backfill-<field>-<tickers>.json``)
+    :param redis_client: optional - redis client for the
+        cached date checks (default is built from ``work_dict``)
+    :param s3: optional - S3 resource for the cached date
+        checks (default is built from ``work_dict``)
+    """
+    work_dict = work_dict or {}
+    tickers = [str(t).upper() for t in tickers]
+    rec = {
+        'num_planned': 0,
+        'num_skipped': 0,
+        'num_done': 0,
+        'num_failed': 0,
+        'progress_file': progress_file
+    }
+    label = work_dict.get('label', 'backfill')
+
+    try:
+        if not fetch_func:
+            # imported on use so planning does not load the task modules
+            import analysis_engine.iex.get_data as iex_data
+            fetch_func = iex_data.get_data_from_iex
+        if max_workers is None:
+            max_workers = ae_consts.BACKFILL_MAX_WORKERS
+        if max_per_second is None:
+            max_per_second = ae_consts.BACKFILL_MAX_PER_SECOND
+        if not progress_file:
+            progress_file = os.path.join(
+                ae_consts.BACKFILL_PROGRESS_DIR,
+                f'backfill-{field}-{"-".join(tickers)}.json')
+            rec['progress_file'] = progress_file
+        if not redis_client and not s3:
+            redis_client, s3 = build_clients(
+                work_dict=work_dict)
+
+        progress = load_progress(progress_file)
+        plan, rec['num_skipped'] = plan_backfill(
+            tickers=tickers,
+            start_date=start_date,
+            end_date=end_date,
+            field=field,
+            redis_client=redis_client,
+            s3=s3,
+            s3_bucket=work_dict.get('s3_bucket', None),
+            progress=progress)
+        rec['num_planned'] = len(plan)
+        log.info(
+            f'{label} - tickers={tickers} field={field} '
+            f'planned={rec["num_planned"]} '
+            f'skipped={rec["num_skipped"]} '
+            f'progress={progress_file}')
+
+        # shared by every process running a backfill when the
+        # rate limiter uses redis
+        limiter = rate_limiter.TokenBucketLimiter(
+            provider='backfill',
+            rate=max_per_second,
+            capacity=1)
+
+        def limited_fetch(
+                work_dict):
+            """limited_fetch
+
+            :param work_dict: fetch request dictionary
+            """
+            limiter.acquire()
+            return fetch_func(work_dict=work_dict)
+
+        jobs = []
+        for ticker, date_str in plan:
+            fetch_req = copy.deepcopy(work_dict)
+            fetch_req.update({
+                'ticker': ticker,
+                'ft_type': field,
+                'field': field,
+                'backfill_date': date_str,
+                'redis_key': f'{ticker}_{date_str}',
+                's3_key': f'{ticker}_{date_str}',
+                'label': f'{label}-{ticker}-{date_str}',
+                'celery_disabled': True
+            })
+            jobs.append({
+                'provider': 'iex',
+                'func': limited_fetch,
+                'progress_key': f'{ticker}_{date_str}',
+                'work_dict': fetch_req
+            })
+
+        for job, res in fetch_pool.run_fetch_jobs(
+                jobs=jobs,
+                max_workers=max_workers):
+            progress_key = job['progress_key']
+            if res['status'] == ae_consts.SUCCESS:
+                rec['num_done'] += 1
+                progress['done'].append(progress_key)
+                progress['failed'].pop(progress_key, None)
+            else:
+                rec['num_failed'] += 1
+                progress['failed'][progress_key] = res['err']
+                log.error(
+                    f'{label} - failed {progress_key} err={res["err"]}')
+            save_progress(
+                path=progress_file,
+                progress=progress)
+        # end of for all finished fetches
+
+        log.info(
+            f'{label} - done={rec["num_done"]} '
+            f'failed={rec["num_failed"]} skipped={rec["num_skipped"]}')
+        res = build_result.build_result(
+            status=(
+                ae_consts.SUCCESS if rec['num_failed'] == 0
+                else ae_consts.ERR),
+            err=(
+                None if rec['num_failed'] == 0
+                else f'{rec["num_failed"]} backfill fetches failed'),
+            rec=rec)
+    except Exception as e:
+        res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=(
+                f'{label} - failed backfill tickers={tickers} '
+                f'with ex={e}'),
+            rec=rec)
+    # end of try/ex
+
+    return res
+# end of run_backfill
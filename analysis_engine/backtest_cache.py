@@ -0,0 +1,566 @@
+"""
+Content-addressed backtest result cache
+
+Backtests with the same algorithm source, indicator sources,
+``config_dict``, tickers, dates and datasets always produce the
+same ``Trading History`` and ``Trading Performance Report``. This
+module builds a cache key from a sha256 hash of all of those
+inputs so ``analysis_engine.run_custom_algo.run_custom_algo``
+(and ``analysis_engine.algo_runner.AlgoRunner.start``) can return
+a previous result instead of re-running the backtest.
+
+The dataset fingerprint uses the size and the last bytes of each
+extracted redis key (with a pipeline) so any newly-fetched data
+creates a new cache key without reading the full datasets.
+
+Results are stored as zlib-compressed json in a local
+directory, redis or S3 and every lookup is counted in the
+hit/miss metrics (see ``get_cache_metrics``).
+
+**Supported environment variables**
+
+::
+
+    # turn on the backtest cache for run_custom_algo
+    export ENABLED_BACKTEST_CACHE=1
+    # file, redis or s3
+    export BACKTEST_CACHE_STORE=file
+    export BACKTEST_CACHE_DIR=/tmp/backtest-cache
+    export BACKTEST_CACHE_S3_BUCKET=backtestcache
+    # seconds before cached results expire in redis
+    export BACKTEST_CACHE_EXPIRE=604800
+"""
+
+import os
+import json
+import zlib
+import hashlib
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+CACHE_VERSION = 2
+CACHE_KEY_PREFIX = 'backtest_cache'
+METRICS_KEY = f'{CACHE_KEY_PREFIX}:metrics'
+
+# indicator dataset names that are stored under a different key
+DATASET_KEY_NAMES = {
+    'news': 'news1',
+    'calls': 'tdcalls',
+    'puts': 'tdputs'
+}
+
+# per-process hit/miss counters
+CACHE_METRICS = {
+    'hits': 0,
+    'misses': 0,
+    'stores': 0,
+    'errors': 0,
+    'saved_seconds': 0.0
+}
+
+
+def encode_value(
+        value):
+    """encode_value
+
+    ``json.dumps`` handler for numpy scalars and dates
+
+    :param value: value that is not json serializable
+    """
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+# end of encode_value
+
+
+def resolve_module_path(
+        path):
+    """resolve_module_path
+
+    Find a module file on disk using the same relative
+    paths as the algorithm config files
+
+    :param path: absolute or repo-relative path
+    """
+    if not path or os.path.exists(path):
+        return path
+    repo_dir = os.path.dirname(os.path.dirname(
+        os.path.abspath(ae_consts.__file__)))
+    repo_path = os.path.join(repo_dir, path)
+    if os.path.exists(repo_path):
+        return repo_path
+    return path
+# end of resolve_module_path
+
+
+def build_source_digest(
+        path):
+    """build_source_digest
+
+    sha256 hex digest of a source file or the path
+    if the file is not on disk
+
+    :param path: path to the source file
+    """
+    use_path = resolve_module_path(path)
+    if not use_path or not os.path.exists(use_path):
+        return f'missing:{path}'
+    with open(use_path, 'rb') as cur_file:
+        return hashlib.sha256(cur_file.read()).hexdigest()
+# end of build_source_digest
+
+
+def build_dataset_keys(
+        extract_datasets,
+        datasets):
+    """build_dataset_keys
+
+    Build the redis keys a backtest will extract
+
+    :param extract_datasets: list of ``<TICKER>_<YYYY-MM-DD>``
+        keys from ``build_algo_request``
+    :param datasets: list of dataset names from
+        ``algo.get_indicator_datasets()``
+    """
+    use_datasets = sorted(set(
+        DATASET_KEY_NAMES.get(ds, ds)
+        for ds in datasets))
+    return [
+        f'{date_key}_{ds}'
+        for date_key in extract_datasets
+        for ds in use_datasets
+    ]
+# end of build_dataset_keys
+
+
+def build_dataset_fingerprint(
+        redis_keys=None,
+        client=None,
+        s3=None,
+        s3_bucket=None,
+        files=None,
+        tail_bytes=256):
+    """build_dataset_fingerprint
+
+    Build a sha256 fingerprint for the datasets a backtest
+    uses without downloading them:
+
+    - redis keys use ``STRLEN`` and ``GETRANGE`` of the last
+      ``tail_bytes`` (sent in one pipeline)
+    - keys that are not in redis use the S3 ``ETag`` and
+      ``ContentLength`` if ``s3`` is set
+    - files use the size and modified time
+
+    :param redis_keys: optional - list of redis keys
+    :param client: optional - redis client for ``redis_keys``
+    :param s3: optional - ``boto3.resource('s3')`` for keys
+        that are not in redis
+    :param s3_bucket: optional - S3 bucket for keys that are
+        not in redis
+    :param files: optional - list of file paths
+    :param tail_bytes: optional - bytes from the end of each
+        redis value to include (default is ``256``)
+    """
+    digest = hashlib.sha256()
+    use_keys = redis_keys if redis_keys else []
+    if use_keys and client:
+        pipe = client.pipeline(transaction=False)
+        for key in use_keys:
+            pipe.strlen(key)
+            pipe.getrange(key, -tail_bytes, -1)
+        values = pipe.execute()
+        for idx, key in enumerate(use_keys):
+            num_bytes = values[idx * 2]
+            tail = values[idx * 2 + 1] or b''
+            if not num_bytes and s3 and s3_bucket:
+                try:
+                    head = s3.meta.client.head_object(
+                        Bucket=s3_bucket,
+                        Key=key)
+                    num_bytes = (
+                        f's3:{head["ContentLength"]}:{head.get("ETag")}')
+                except Exception:
+                    num_bytes = 0
+            if isinstance(tail, str):
+                tail = tail.encode('utf-8')
+            digest.update(f'{key}:{num_bytes}:'.encode('utf-8'))
+            digest.update(tail)
+    # end of redis keys
+
+    for path in sorted(files if files else []):
+        if path and os.path.exists(path):
+            stat = os.stat(path)
+            digest.update(
+                f'{path}:{stat.st_size}:{stat.st_mtime}'.encode('utf-8'))
+        else:
+            digest.update(f'{path}:missing'.encode('utf-8'))
+    # end of files
+
+    return digest.hexdigest()
+# end of build_dataset_fingerprint
+
+
+def build_cache_key(
+        mod_path,
+        config_dict,
+        tickers,
+        start_date,
+        end_date,
+        dataset_fingerprint,
+        extra=None):
+    """build_cache_key
+
+    Build the content-addressed cache key for a backtest
+
+    :param mod_path: path to the algorithm module (``None``
+        for the ``BaseAlgo``)
+    :param config_dict: algorithm config dictionary with the
+        ``indicators`` list
+    :param tickers: list of tickers
+    :param start_date: backtest start date string
+    :param end_date: backtest end date string
+    :param dataset_fingerprint: value from
+        ``build_dataset_fingerprint``
+    :param extra: optional - dictionary of other values that
+        change the result (balance, commission, timeseries)
+    """
+    use_config = config_dict if config_dict else {}
+    indicator_digests = []
+    for node in use_config.get('indicators', []):
+        indicator_digests.append(build_source_digest(
+            node.get(
+                'module_path',
+                ae_consts.INDICATOR_BASE_MODULE_PATH)))
+    base_algo_path = os.path.join(
+        os.path.dirname(os.path.abspath(ae_consts.__file__)),
+        'algo.py')
+    inputs = {
+        'version': CACHE_VERSION,
+        'algo': build_source_digest(mod_path) if mod_path else None,
+        'base_algo': build_source_digest(base_algo_path),
+        'indicators': indicator_digests,
+        'config': use_config,
+        'tickers': sorted(tickers),
+        'start_date': start_date,
+        'end_date': end_date,
+        'datasets': dataset_fingerprint,
+        'extra': extra if extra else {}
+    }
+    normalized = json.dumps(
+        inputs,
+        sort_keys=True,
+        default=encode_value)
+    return (
+        f'{CACHE_KEY_PREFIX}_'
+        f'{hashlib.sha256(normalized.encode("utf-8")).hexdigest()}')
+# end of build_cache_key
+
+
+def build_backtest_cache_key(
+        algo,
+        algo_req,
+        mod_path,
+        client,
+        s3=None,
+        s3_bucket=None,
+        files=None,
+        extra=None):
+    """build_backtest_cache_key
+
+    Build the cache key for a backtest request from
+    ``analysis_engine.build_algo_request.build_algo_request``
+    using the same datasets ``run_algo`` will extract
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` for the backtest
+    :param algo_req: algorithm request dictionary
+    :param mod_path: path to the algorithm module
+    :param client: redis client with the pricing datasets
+    :param s3: optional - ``boto3.resource('s3')`` for datasets
+        that were offloaded to S3
+    :param s3_bucket: optional - S3 bucket for offloaded datasets
+    :param files: optional - list of dataset files the backtest
+        loads
+    :param extra: optional - dictionary of other values that
+        change the result
+    """
+    datasets = algo.get_indicator_datasets()
+    if len(datasets) == 0:
+        datasets = ae_consts.BACKUP_DATASETS
+    redis_keys = build_dataset_keys(
+        extract_datasets=algo_req.get('extract_datasets', []),
+        datasets=datasets)
+    fingerprint = build_dataset_fingerprint(
+        redis_keys=redis_keys,
+        client=client,
+        s3=s3,
+        s3_bucket=s3_bucket,
+        files=files)
+    return build_cache_key(
+        mod_path=mod_path,
+        config_dict=algo_req.get('config_dict', None),
+        tickers=algo.get_tickers(),
+        start_date=algo_req.get('start_date', None),
+        end_date=algo_req.get('end_date', None),
+        dataset_fingerprint=fingerprint,
+        extra=extra)
+# end of build_backtest_cache_key
+
+
+def record_metric(
+        name,
+        amount=1,
+        client=None):
+    """record_metric
+
+    Update the per-process metrics and the shared redis
+    hash ``backtest_cache:metrics`` if a client is set
+
+    :param name: metric name
+    :param amount: optional - amount to add
+    :param client: optional - redis client
+    """
+    CACHE_METRICS[name] = CACHE_METRICS.get(name, 0) + amount
+    if client and isinstance(amount, int):
+        try:
+            client.hincrby(METRICS_KEY, name, amount)
+        except Exception as e:
+            log.debug(f'failed recording metric={name} ex={e}')
+# end of record_metric
+
+
+def get_cache_metrics(
+        client=None):
+    """get_cache_metrics
+
+    Get the hit/miss metrics as a dictionary with the
+    ``hit_rate``. If ``client`` is set the shared
+    metrics from redis are returned
+
+    :param client: optional - redis client
+    """
+    metrics = dict(CACHE_METRICS)
+    if client:
+        metrics = {
+            k.decode('utf-8') if isinstance(k, bytes) else k: int(v)
+            for k, v in client.hgetall(METRICS_KEY).items()
+        }
+    lookups = metrics.get('hits', 0) + metrics.get('misses', 0)
+    metrics['hit_rate'] = (
+        float(metrics.get('hits', 0)) / lookups if lookups else 0.0)
+    return metrics
+# end of get_cache_metrics
+
+
+def build_cached_result(
+        cache_key,
+        algo,
+        result,
+        elapsed_seconds):
+    """build_cached_result
+
+    Build the dictionary stored in the cache from a finished
+    backtest
+
+    :param cache_key: key from ``build_cache_key``
+    :param algo: ``analysis_engine.algo.BaseAlgo`` that ran
+    :param result: ``rec`` from ``run_algo`` (``algo.get_result()``)
+    :param elapsed_seconds: backtest run time
+    """
+    report_nodes = {}
+    if algo.last_handle_data:
+        for ticker in algo.get_supported_tickers_in_data(
+                data=algo.last_handle_data):
+            report_nodes[ticker] = [
+                {
+                    'id': node['id'],
+                    'date': node['date']
+                }
+                for node in algo.last_handle_data[ticker]
+            ]
+    return {
+        'version': CACHE_VERSION,
+        'cache_key': cache_key,
+        'created': ae_utils.utc_now_str(),
+        'elapsed_seconds': elapsed_seconds,
+        'result': {
+            k: v for k, v in result.items() if k != 'algo'
+        },
+        'report_nodes': report_nodes,
+        'report': algo.create_report_dataset()
+    }
+# end of build_cached_result
+
+
+def restore_algo_from_cache(
+        algo,
+        cached):
+    """restore_algo_from_cache
+
+    Load the cached trading state into a new algorithm object
+    so the history and report datasets can be published
+    without re-running the backtest
+
+    .. note:: The extracted datasets are not cached, so the
+        restored algorithm cannot publish the
+        ``Algorithm-Ready`` dataset
+        (``algo.has_input_datasets()`` is ``False``)
+
+    :param algo: new ``analysis_engine.algo.BaseAlgo``
+    :param cached: dictionary from ``get_cached_result``
+    """
+    result = cached['result']
+    algo.order_history = result.get('history', [])
+    algo.balance = result.get('balance', algo.balance)
+    algo.buys = result.get('buys', [])
+    algo.sells = result.get('sells', [])
+    algo.positions = result.get('open_positions', {})
+    if cached.get('report_nodes'):
+        algo.last_handle_data = cached['report_nodes']
+    algo.cached_report_dataset = cached.get('report', None)
+    return algo
+# end of restore_algo_from_cache
+
+
+def get_cached_result(
+        cache_key,
+        store=ae_consts.BACKTEST_CACHE_STORE,
+        client=None,
+        s3=None,
+        s3_bucket=ae_consts.BACKTEST_CACHE_S3_BUCKET,
+        cache_dir=ae_consts.BACKTEST_CACHE_DIR):
+    """get_cached_result
+
+    Get a cached backtest result dictionary or ``None``
+    on a miss. Lookup failures count as misses.
+
+    :param cache_key: key from ``build_cache_key``
+    :param store: optional - ``file``, ``redis`` or ``s3``
+        (default is ``BACKTEST_CACHE_STORE``)
+    :param client: optional - redis client for the ``redis``
+        store and shared metrics
+    :param s3: optional - ``boto3.resource('s3')`` for the
+        ``s3`` store
+    :param s3_bucket: optional - S3 bucket
+        (default is ``BACKTEST_CACHE_S3_BUCKET``)
+    :param cache_dir: optional - directory for the ``file`` store
+        (default is ``BACKTEST_CACHE_DIR``)
+    """
+    data = None
+    try:
+        if store == 'redis':
+            data = client.get(cache_key)
+        elif store == 's3':
+            data = s3.Object(s3_bucket, cache_key).get()['Body'].read()
+        else:
+            path = os.path.join(cache_dir, cache_key)
+            if os.path.exists(path):
+                with open(path, 'rb') as cur_file:
+                    data = cur_file.read()
+    except Exception as e:
+        log.debug(f'backtest cache lookup failed key={cache_key} ex={e}')
+        data = None
+    # end of reading from the store
+
+    cached = None
+    if data:
+        try:
+            cached = json.loads(zlib.decompress(data).decode('utf-8'))
+            if cached.get('version') != CACHE_VERSION:
+                cached = None
+        except Exception as e:
+            log.error(f'invalid backtest cache key={cache_key} ex={e}')
+            record_metric(
+                name='errors',
+                client=client)
+            cached = None
+
+    if cached:
+        record_metric(
+            name='hits',
+            client=client)
+        CACHE_METRICS['saved_seconds'] += cached.get('elapsed_seconds', 0)
+        log.info(
+            f'backtest cache hit store={store} key={cache_key} '
+            f'saved={cached.get("elapsed_seconds", 0):.2f}s')
+    else:
+        record_metric(
+            name='misses',
+            client=client)
+        log.info(f'backtest cache miss store={store} key={cache_key}')
+    return cached
+# end of get_cached_result
+
+
+def set_cached_result(
+        cache_key,
+        cached,
+        store=ae_consts.BACKTEST_CACHE_STORE,
+        client=None,
+        s3=None,
+        s3_bucket=ae_consts.BACKTEST_CACHE_S3_BUCKET,
+        cache_dir=ae_consts.BACKTEST_CACHE_DIR,
+        expire=ae_consts.BACKTEST_CACHE_EXPIRE):
+    """set_cached_result
+
+    Store a backtest result dictionary from
+    ``build_cached_result``. Returns ``True`` if the result
+    was stored.
+
+    :param cache_key: key from ``build_cache_key``
+    :param cached: dictionary from ``build_cached_result``
+    :param store: optional - ``file``, ``redis`` or ``s3``
+        (default is ``BACKTEST_CACHE_STORE``)
+    :param client: optional - redis client for the ``redis``
+        store and shared metrics
+    :param s3: optional - ``boto3.resource('s3')`` for the
+        ``s3`` store
+    :param s3_bucket: optional - S3 bucket
+        (default is ``BACKTEST_CACHE_S3_BUCKET``)
+    :param cache_dir: optional - directory for the ``file`` store
+        (default is ``BACKTEST_CACHE_DIR``)
+    :param expire: optional - seconds before the redis key
+        expires (default is ``BACKTEST_CACHE_EXPIRE``)
+    """
+    try:
+        data = zlib.compress(json.dumps(
+            cached,
+            default=encode_value).encode('utf-8'))
+        if store == 'redis':
+            client.set(
+                name=cache_key,
+                value=data,
+                ex=expire if expire else None)
+        elif store == 's3':
+            if s3.Bucket(s3_bucket) not in s3.buckets.all():
+                s3.create_bucket(
+                    Bucket=s3_bucket)
+            s3.Bucket(s3_bucket).put_object(
+                Key=cache_key,
+                Body=data)
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, cache_key)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as cur_file:
+                cur_file.write(data)
+            os.replace(tmp_path, path)
+        record_metric(
+            name='stores',
+            client=client)
+        log.info(
+            f'backtest cache stored store={store} key={cache_key} '
+            f'size={ae_consts.get_mb(len(data))}MB')
+        return True
+    except Exception as e:
+        log.error(
+            f'failed storing backtest cache store={store} '
+            f'key={cache_key} ex={e}')
+        record_metric(
+            name='errors',
+            client=client)
+        return False
+    # end of try/ex
+# end of set_cached_result
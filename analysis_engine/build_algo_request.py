@@ -5,6 +5,7 @@ Build a dictionary for running an algorithm
 import datetime
 import analysis_engine.consts as ae_consts
 import analysis_engine.utils as ae_utils
+import analysis_engine.trading_calendar as trading_calendar
 import spylunking.log.setup_logging as log_utils
 
 log = log_utils.build_colorized_logger(name=__name__)
@@ -34,8 +35,9 @@ def build_algo_request(
 
     Create a dictionary for building an algorithm. This is
     opinionated to how the underlying date-based caching
-    strategy is running per day. Each business day becomes
-    a possible dataset to process with an algorithm.
+    strategy is running per day. Each trading session (no
+    weekends or market holidays) becomes a possible dataset
+    to process with an algorithm.
 
     :param ticker: ticker
     :param tickers: optional - list of tickers
@@ -141,6 +143,7 @@ def build_algo_request(
 
     use_dates = []
     new_dataset = None
+    calendar = trading_calendar.get_calendar()
     cur_date = start_date_val
     if not work['start_date']:
         work['start_date'] = start_date_val.strftime(
@@ -149,7 +152,7 @@ def build_algo_request(
         work['end_date'] = end_date_val.strftime(
             ae_consts.COMMON_TICK_DATE_FORMAT)
     while cur_date <= end_date_val:
-        if cur_date.weekday() < 5:
+        if calendar.is_trading_day(cur_date):
             for t in use_tickers:
                 if cache_freq == 'daily':
                     new_dataset = f'''{t}_{cur_date.strftime(
@@ -161,7 +164,7 @@ def build_algo_request(
                     use_dates.append(new_dataset)
                 new_dataset = None
             # end for all tickers
-        # end of valid days M-F
+        # end of valid trading sessions
         if cache_freq == 'daily':
             cur_date += datetime.timedelta(days=1)
         else:
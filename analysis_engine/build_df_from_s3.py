@@ -0,0 +1,145 @@
+"""
+Helper for getting json-serialized pandas DataFrames
+from S3 using the same key layout as redis
+(``<TICKER>_<YYYY-MM-DD>_<dataset>``)
+
+This is the extraction fallback for datasets that
+were offloaded from redis with
+``analysis_engine.manage_redis_budget``.
+
+Debug S3 calls with:
+
+::
+
+    export DEBUG_S3_EXTRACT=1
+"""
+
+import boto3
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.s3_read_contents_from_key as s3_utils
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def is_missing_key_error(
+        ex):
+    """is_missing_key_error
+
+    Check if an exception from S3 means the bucket or
+    key does not exist
+
+    :param ex: exception
+    """
+    ex_str = str(ex)
+    return (
+        '404' in ex_str
+        or 'NoSuchKey' in ex_str
+        or 'NoSuchBucket' in ex_str
+        or 'Not Found' in ex_str)
+# end of is_missing_key_error
+
+
+def build_df_from_s3(
+        key,
+        label=None,
+        s3=None,
+        s3_bucket=ae_consts.S3_BUCKET,
+        s3_address=ae_consts.S3_ADDRESS,
+        s3_access_key=ae_consts.S3_ACCESS_KEY,
+        s3_secret_key=ae_consts.S3_SECRET_KEY,
+        s3_region_name=ae_consts.S3_REGION_NAME,
+        s3_secure=ae_consts.S3_SECURE,
+        encoding='utf-8',
+        orient='records',
+        verbose=False):
+    """build_df_from_s3
+
+    Load a ``pandas.DataFrame`` from an S3 key that holds
+    the same json-serialized contents as the redis key.
+    Missing keys return ``SUCCESS`` with ``valid_df=False``
+    like ``build_df_from_redis``.
+
+    :param key: S3 key
+    :param label: log tracking label
+    :param s3: optional - initialized ``boto3.resource('s3')``
+    :param s3_bucket: S3 bucket (default is ``S3_BUCKET``)
+    :param s3_address: S3 address
+    :param s3_access_key: S3 access key
+    :param s3_secret_key: S3 secret key
+    :param s3_region_name: S3 region name
+    :param s3_secure: transmit using tls encryption
+    :param encoding: format of the encoded key in S3
+    :param orient: use the same orient value as
+        the ``to_json(orient='records')`` used
+        to deserialize the DataFrame correctly.
+    :param verbose: optional - boolean for turning on logging
+    """
+    rec = {
+        'valid_df': False,
+        'data': None
+    }
+    log_id = label if label else 'build-df-s3'
+
+    try:
+        use_s3 = s3
+        if not use_s3:
+            endpoint_url = (
+                f'http{"s" if s3_secure else ""}://{s3_address}')
+            use_s3 = boto3.resource(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=s3_access_key,
+                aws_secret_access_key=s3_secret_key,
+                region_name=s3_region_name,
+                config=boto3.session.Config(signature_version='s3v4'))
+
+        try:
+            data = s3_utils.s3_read_contents_from_key(
+                s3=use_s3,
+                s3_bucket_name=s3_bucket,
+                s3_key=key,
+                encoding=encoding,
+                convert_as_json=True)
+        except Exception as e:
+            if is_missing_key_error(e):
+                if verbose:
+                    log.info(
+                        f'{log_id} no data s3={s3_bucket}/{key}')
+                return build_result.build_result(
+                    status=ae_consts.SUCCESS,
+                    err=None,
+                    rec=rec)
+            raise e
+        # end of try/ex reading the key
+
+        if data:
+            if verbose:
+                log.info(
+                    f'{log_id} loading df from s3={s3_bucket}/{key}')
+            if isinstance(data, str):
+                rec['data'] = pd.read_json(
+                    data,
+                    orient=orient)
+            else:
+                rec['data'] = pd.DataFrame(data)
+            rec['valid_df'] = True
+        # if data
+
+        return build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+    except Exception as e:
+        err = (
+            f'{log_id} failed - build_df_from_s3 '
+            f's3={s3_bucket}/{key} ex={e}')
+        log.error(err)
+        return build_result.build_result(
+            status=ae_consts.ERR,
+            err=err,
+            rec=rec)
+    # end of try/ex for getting s3 data
+# end of build_df_from_s3
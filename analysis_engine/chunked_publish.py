@@ -0,0 +1,588 @@
+"""
+Streaming Dataset Publishing API
+
+Publish large datasets (multi-ticker ``Trading History``,
+algorithm-ready datasets) without holding the full json string,
+the full compressed bytes and a copy for the upload in memory
+at the same time. Records are serialized incrementally into a
+``zlib.compressobj`` and the compressed output is flushed in
+parts of ``part_size`` bytes to:
+
+- an S3 multipart upload (``s3_bucket`` and ``s3_key``)
+- a redis ``APPEND`` sequence on a temporary key that is
+  renamed to ``redis_key`` once the upload is done
+- a local file handle (``output_file`` keeps the uncompressed
+  json format used by ``analysis_engine.write_to_file``)
+
+Peak memory is bounded by the part size instead of the payload
+size. The payloads match ``analysis_engine.publish.publish``
+so existing loaders work unchanged: compressed payloads
+decompress to the same json, and uncompressed redis values are
+byte-identical to the ``set_data_in_redis_key`` value (a
+``json.dumps`` of the published json string).
+
+Enable streaming for all ``publish.publish`` calls with:
+
+::
+
+    export ENABLED_CHUNKED_PUBLISH=1
+    # optional - size of each uploaded part shared with
+    # analysis_engine.s3_transfer (default is 8 MB, s3
+    # requires >= 5 MB)
+    export S3_TRANSFER_PART_SIZE=8388608
+    # optional - rows per serialized DataFrame chunk
+    export PUBLISH_CHUNK_ROWS=10000
+"""
+
+import json
+import zlib
+import boto3
+import redis
+import analysis_engine.consts as ae_consts
+import analysis_engine.s3_transfer as s3_transfer
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def build_json_chunks(
+        data,
+        is_df=False,
+        df_compress=False,
+        convert_to_json=False,
+        chunk_rows=ae_consts.PUBLISH_CHUNK_ROWS):
+    """build_json_chunks
+
+    Generator that yields the same json string that
+    ``publish.publish`` would build for ``data`` in
+    small string chunks
+
+    :param data: data to publish
+    :param is_df: ``data`` is a ``pandas.DataFrame`` that is
+        serialized with ``to_json(orient='records',
+        date_format='iso')``
+    :param df_compress: match the ``compress_data.compress_data``
+        format where ``DataFrame`` json is stored as a json string
+    :param convert_to_json: serialize ``data`` with ``json.dumps``
+        (other objects that are not a ``str`` are serialized
+        with ``json.dumps`` too)
+    :param chunk_rows: optional - number of ``DataFrame`` rows
+        to serialize at a time
+        (default is ``PUBLISH_CHUNK_ROWS``)
+    """
+    if df_compress or is_df:
+        if ae_consts.is_df(df=data):
+            date_format = 'iso'
+            prefix = '['
+            suffix = ']'
+            if df_compress:
+                # compress_data stores json.dumps(df.to_json())
+                date_format = None
+                prefix = '"['
+                suffix = ']"'
+            yield prefix
+            num_rows = len(data.index)
+            for start_idx in range(0, num_rows, chunk_rows):
+                chunk_df = data.iloc[start_idx:start_idx + chunk_rows]
+                if date_format:
+                    chunk_json = chunk_df.to_json(
+                        orient='records',
+                        date_format=date_format)
+                else:
+                    chunk_json = chunk_df.to_json(
+                        orient='records')
+                chunk_json = chunk_json[1:-1]
+                if df_compress:
+                    chunk_json = json.dumps(chunk_json)[1:-1]
+                if start_idx > 0:
+                    yield ','
+                yield chunk_json
+            # end of for all row chunks
+            yield suffix
+            return
+        elif df_compress:
+            for chunk in json.JSONEncoder().iterencode(data):
+                yield chunk
+            return
+    # end of DataFrame chunking
+
+    if convert_to_json or not isinstance(data, str):
+        for chunk in json.JSONEncoder().iterencode(data):
+            yield chunk
+        return
+
+    chunk_size = ae_consts.S3_TRANSFER_PART_SIZE
+    for start_idx in range(0, len(data), chunk_size):
+        yield data[start_idx:start_idx + chunk_size]
+# end of build_json_chunks
+
+
+class PartWriter:
+    """PartWriter
+
+    Encode (and optionally compress) string chunks and write
+    them to ``sinks`` in parts of at least ``part_size`` bytes
+    """
+
+    def __init__(
+            self,
+            sinks,
+            part_size,
+            compress=False,
+            encoding='utf-8'):
+        """__init__
+
+        :param sinks: list of sinks with ``write`` and ``close``
+        :param part_size: bytes per part
+        :param compress: optional - compress with ``zlib``
+        :param encoding: optional - string encoding
+        """
+        self.sinks = sinks
+        self.part_size = part_size
+        self.encoding = encoding
+        self.compressor = None
+        if compress:
+            self.compressor = zlib.compressobj(9)
+        self.pending = []
+        self.pending_bytes = 0
+        self.num_bytes = 0
+        self.num_parts = 0
+    # end of __init__
+
+    def flush_part(
+            self,
+            part):
+        """flush_part
+
+        :param part: bytes for the next part
+        """
+        for sink in self.sinks:
+            sink.write(part)
+        self.num_bytes += len(part)
+        self.num_parts += 1
+    # end of flush_part
+
+    def write(
+            self,
+            chunk):
+        """write
+
+        :param chunk: string chunk
+        """
+        encoded = chunk.encode(self.encoding)
+        if self.compressor:
+            encoded = self.compressor.compress(encoded)
+        if not encoded:
+            return
+        self.pending.append(encoded)
+        self.pending_bytes += len(encoded)
+        if self.pending_bytes >= self.part_size:
+            part = b''.join(self.pending)
+            self.pending = []
+            self.pending_bytes = 0
+            self.flush_part(part)
+    # end of write
+
+    def close(
+            self):
+        """close"""
+        if self.compressor:
+            self.pending.append(self.compressor.flush())
+        part = b''.join(self.pending)
+        self.pending = []
+        if part or self.num_parts == 0:
+            self.flush_part(part)
+        for sink in self.sinks:
+            sink.close()
+    # end of close
+
+# end of PartWriter
+
+
+class S3MultipartSink:
+    """S3MultipartSink
+
+    Upload parts with an S3 multipart upload using
+    ``s3_transfer.upload_part`` for the checksum verification
+    and retries. If the payload fits in a single part a regular
+    ``put_object`` is used.
+    """
+
+    def __init__(
+            self,
+            s3,
+            bucket,
+            key,
+            part_size=ae_consts.S3_TRANSFER_PART_SIZE,
+            verify=ae_consts.S3_TRANSFER_VERIFY,
+            retries=ae_consts.S3_TRANSFER_RETRIES):
+        """__init__
+
+        This will raise if ``part_size`` is below the
+        ``S3_MIN_PART_SIZE``
+
+        :param s3: ``boto3.resource('s3')`` object
+        :param bucket: S3 bucket name
+        :param key: S3 key
+        :param part_size: optional - minimum bytes per part
+            written to the sink (default is
+            ``S3_TRANSFER_PART_SIZE``)
+        :param verify: optional - verify the ``ETag`` for each
+            part (default is ``S3_TRANSFER_VERIFY``)
+        :param retries: optional - retries for a failed part
+            (default is ``S3_TRANSFER_RETRIES``)
+        """
+        s3_transfer.validate_part_size(
+            part_size=part_size)
+        self.s3 = s3
+        self.client = s3.meta.client
+        self.bucket = bucket
+        self.key = key
+        self.verify = verify
+        self.retries = retries
+        self.upload_id = None
+        self.parts = []
+        self.pending = None
+    # end of __init__
+
+    def write(
+            self,
+            part):
+        """write
+
+        :param part: bytes for the next part
+        """
+        # hold one part back so the last (possibly small)
+        # part can fall back to put_object
+        if self.pending is not None:
+            self.upload_part(self.pending)
+        self.pending = part
+    # end of write
+
+    def upload_part(
+            self,
+            part):
+        """upload_part
+
+        :param part: bytes for the next part
+        """
+        if not self.upload_id:
+            mpu = self.client.create_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key)
+            self.upload_id = mpu['UploadId']
+        self.parts.append(s3_transfer.upload_part(
+            client=self.client,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            upload_id=self.upload_id,
+            part_number=len(self.parts) + 1,
+            part=part,
+            verify=self.verify,
+            retries=self.retries))
+    # end of upload_part
+
+    def close(
+            self):
+        """close"""
+        if not self.upload_id:
+            self.s3.Bucket(self.bucket).put_object(
+                Key=self.key,
+                Body=self.pending if self.pending is not None else b'')
+            self.pending = None
+            return
+        if self.pending is not None:
+            self.upload_part(self.pending)
+            self.pending = None
+        self.client.complete_multipart_upload(
+            Bucket=self.bucket,
+            Key=self.key,
+            UploadId=self.upload_id,
+            MultipartUpload={
+                'Parts': self.parts
+            })
+    # end of close
+
+    def abort(
+            self):
+        """abort"""
+        if self.upload_id:
+            self.client.abort_multipart_upload(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self.upload_id)
+    # end of abort
+
+# end of S3MultipartSink
+
+
+class RedisAppendSink:
+    """RedisAppendSink
+
+    ``APPEND`` parts to a temporary key and ``RENAME`` it to
+    the target key once all parts are written so readers never
+    see a partial value
+    """
+
+    def __init__(
+            self,
+            client,
+            key,
+            expire=None):
+        """__init__
+
+        :param client: initialized redis client
+        :param key: redis key
+        :param expire: optional - redis expire in seconds
+        """
+        self.client = client
+        self.key = key
+        self.tmp_key = f'{key}:publishing'
+        self.expire = expire
+        self.client.delete(self.tmp_key)
+    # end of __init__
+
+    def write(
+            self,
+            part):
+        """write
+
+        :param part: bytes for the next part
+        """
+        self.client.append(
+            self.tmp_key,
+            part)
+    # end of write
+
+    def close(
+            self):
+        """close"""
+        self.client.rename(
+            self.tmp_key,
+            self.key)
+        if self.expire:
+            self.client.expire(
+                self.key,
+                int(self.expire))
+    # end of close
+
+    def abort(
+            self):
+        """abort"""
+        self.client.delete(self.tmp_key)
+    # end of abort
+
+# end of RedisAppendSink
+
+
+def chunked_publish(
+        data,
+        label=None,
+        convert_to_json=False,
+        is_df=False,
+        output_file=None,
+        df_compress=False,
+        compress=False,
+        part_size=ae_consts.S3_TRANSFER_PART_SIZE,
+        chunk_rows=ae_consts.PUBLISH_CHUNK_ROWS,
+        redis_enabled=True,
+        redis_key=None,
+        redis_address=None,
+        redis_db=None,
+        redis_password=None,
+        redis_expire=None,
+        redis_encoding='utf-8',
+        s3_enabled=True,
+        s3_key=None,
+        s3_address=None,
+        s3_bucket=None,
+        s3_access_key=None,
+        s3_secret_key=None,
+        s3_region_name=None,
+        s3_secure=False,
+        verbose=False,
+        **kwargs):
+    """chunked_publish
+
+    Publish ``data`` by streaming serialized and compressed
+    parts to a local file, minio (s3) and redis. Arguments
+    match ``analysis_engine.publish.publish``.
+
+    :return: status value
+    :param data: data to publish
+    :param label: log tracking label
+    :param convert_to_json: serialize ``data`` with ``json.dumps``
+    :param is_df: serialize the ``pandas.DataFrame`` with
+        ``to_json(orient='records', date_format='iso')``
+    :param output_file: optional - path to save the uncompressed
+        json to a file
+    :param df_compress: compress the data with the
+        ``compress_data.compress_data`` format
+    :param compress: compress the json string with ``zlib``
+    :param part_size: optional - bytes per uploaded part
+        (default is ``S3_TRANSFER_PART_SIZE``)
+    :param chunk_rows: optional - ``DataFrame`` rows serialized
+        at a time (default is ``PUBLISH_CHUNK_ROWS``)
+    :param kwargs: optional - future argument support
+
+    **(Optional) Redis connectivity arguments**
+
+    :param redis_enabled: bool - toggle for publishing to redis
+    :param redis_key: string - key to save the data in redis
+    :param redis_address: Redis connection string format: ``host:port``
+    :param redis_db: Redis db to use
+    :param redis_password: optional - Redis password
+    :param redis_expire: optional - Redis expire value
+    :param redis_encoding: format of the encoded key in redis
+
+    **(Optional) Minio (S3) connectivity arguments**
+
+    :param s3_enabled: bool - toggle for publishing to Minio (S3)
+    :param s3_key: string - key to save the data in s3
+    :param s3_address: Minio S3 connection string format: ``host:port``
+    :param s3_bucket: S3 Bucket for storing the artifacts
+    :param s3_access_key: S3 Access key
+    :param s3_secret_key: S3 Secret key
+    :param s3_region_name: S3 region name
+    :param s3_secure: Transmit using tls encryption
+    """
+
+    use_compress = compress or df_compress
+    sinks = []
+    s3_sinks = []
+    redis_sinks = []
+    out_file = None
+    num_bytes = 0
+    num_parts = 0
+    # publish uploads the json string to s3 and stores
+    # json.dumps(json string) in redis (the original object
+    # for other data) and write_to_file saves json.dumps(data)
+    is_json_str = (
+        df_compress or
+        convert_to_json or
+        isinstance(data, str) or
+        (is_df and ae_consts.is_df(df=data)))
+    quote_redis = not use_compress and is_json_str
+    quote_file = (
+        isinstance(data, str) and
+        not convert_to_json and
+        not df_compress)
+
+    try:
+        if s3_enabled and s3_address and s3_bucket and s3_key:
+            endpoint_url = (
+                f'http{"s" if s3_secure else ""}://{s3_address}')
+            s3 = boto3.resource(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=s3_access_key,
+                aws_secret_access_key=s3_secret_key,
+                region_name=s3_region_name,
+                config=boto3.session.Config(
+                    signature_version='s3v4'))
+            if s3.Bucket(s3_bucket) not in s3.buckets.all():
+                s3.create_bucket(
+                    Bucket=s3_bucket)
+            s3_sinks.append(S3MultipartSink(
+                s3=s3,
+                bucket=s3_bucket,
+                key=s3_key,
+                part_size=part_size))
+        # end of s3_enabled
+
+        if redis_enabled and redis_address and redis_key:
+            redis_split = redis_address.split(':')
+            rc = redis.Redis(
+                host=redis_split[0],
+                port=int(redis_split[1]),
+                password=redis_password,
+                db=redis_db)
+            redis_sinks.append(RedisAppendSink(
+                client=rc,
+                key=redis_key,
+                expire=redis_expire))
+        # end of redis_enabled
+        sinks = s3_sinks + redis_sinks
+
+        if output_file:
+            out_file = open(output_file, 'w')
+
+        writers = []
+        quoted_writers = []
+        if quote_redis and redis_sinks:
+            quoted_writers.append(PartWriter(
+                sinks=redis_sinks,
+                part_size=part_size,
+                encoding=redis_encoding))
+            if s3_sinks:
+                writers.append(PartWriter(
+                    sinks=s3_sinks,
+                    part_size=part_size,
+                    compress=use_compress,
+                    encoding=redis_encoding))
+        elif sinks:
+            writers.append(PartWriter(
+                sinks=sinks,
+                part_size=part_size,
+                compress=use_compress,
+                encoding=redis_encoding))
+
+        quote_file = quote_file and out_file is not None
+        if quote_file:
+            out_file.write('"')
+        for writer in quoted_writers:
+            writer.write('"')
+        for chunk in build_json_chunks(
+                data=data,
+                is_df=is_df,
+                df_compress=df_compress,
+                convert_to_json=convert_to_json,
+                chunk_rows=chunk_rows):
+            quoted = None
+            if quoted_writers or quote_file:
+                # json.dumps escapes each character on its own
+                quoted = json.dumps(chunk)[1:-1]
+            if out_file:
+                out_file.write(quoted if quote_file else chunk)
+            for writer in writers:
+                writer.write(chunk)
+            for writer in quoted_writers:
+                writer.write(quoted)
+        # end of for all json chunks
+        if quote_file:
+            out_file.write('"')
+        for writer in quoted_writers:
+            writer.write('"')
+
+        for writer in writers + quoted_writers:
+            writer.close()
+            num_bytes += writer.num_bytes
+            num_parts += writer.num_parts
+        # end of flushing the last part
+    except Exception as e:
+        log.error(
+            f'{label if label else ""} chunked publish failed '
+            f's3_key={s3_key} redis_key={redis_key} '
+            f'output_file={output_file} ex={e}')
+        for sink in sinks:
+            try:
+                sink.abort()
+            except Exception as a:
+                log.error(
+                    f'{label if label else ""} failed aborting '
+                    f'{sink.__class__.__name__} ex={a}')
+        return ae_consts.ERR
+    finally:
+        if out_file:
+            out_file.close()
+    # end of try/ex/finally
+
+    if verbose:
+        log.debug(
+            f'{label if label else ""} chunked publish done '
+            f's3_key={s3_key} redis_key={redis_key} '
+            f'file={output_file} compress={use_compress} '
+            f'parts={num_parts} size={ae_consts.get_mb(num_bytes)}MB')
+
+    return ae_consts.SUCCESS
+# end of chunked_publish
@@ -94,6 +94,9 @@ Consts and helper functions
     DEFAULT_TICKERS = ev(
         'DEFAULT_TICKERS',
         'SPY,AMZN,TSLA,NFLX').split(',')
+    # the next option expiration is built on first use (also
+    # with get_next_exp() and get_next_exp_str()) so importing
+    # the constants does not load the pandas holiday calendar
     NEXT_EXP = opt_dates.option_expiration()
     NEXT_EXP_STR = NEXT_EXP.strftime('%Y-%m-%d')
 
@@ -244,12 +247,321 @@ Consts and helper functions
         'REDIS_EXPIRE',
         None)
 
+**Supported Redis Streams Environment Variables**
+
+.. code-block:: python
+
+    ENABLED_REDIS_STREAM = ev(
+        'ENABLED_REDIS_STREAM',
+        '0') == '1'
+    REDIS_STREAM_MAXLEN = int(ev(
+        'REDIS_STREAM_MAXLEN',
+        '1440'))
+    REDIS_STREAM_BLOCK_MS = int(ev(
+        'REDIS_STREAM_BLOCK_MS',
+        '5000'))
+    REDIS_STREAM_DATASETS = [
+        'minute',
+        'quote'
+    ]
+
+**Supported Redis Budget Environment Variables**
+
+.. code-block:: python
+
+    REDIS_BUDGET_HOT_DAYS = int(ev(
+        'REDIS_BUDGET_HOT_DAYS',
+        '5'))
+    REDIS_BUDGET_MAX_MB = ev(
+        'REDIS_BUDGET_MAX_MB',
+        None)
+    REDIS_BUDGET_DATASETS = ev(
+        'REDIS_BUDGET_DATASETS',
+        'minute,tdcalls,tdputs').split(',')
+    ENABLED_S3_EXTRACT_FALLBACK = ev(
+        'ENABLED_S3_EXTRACT_FALLBACK',
+        '0') == '1'
+
+**Supported S3 Transfer Environment Variables**
+
+.. code-block:: python
+
+    S3_TRANSFER_PART_SIZE = int(ev(
+        'S3_TRANSFER_PART_SIZE',
+        '8388608'))
+    S3_TRANSFER_MAX_WORKERS = int(ev(
+        'S3_TRANSFER_MAX_WORKERS',
+        '8'))
+    S3_TRANSFER_VERIFY = ev(
+        'S3_TRANSFER_VERIFY',
+        '1') == '1'
+    S3_TRANSFER_RETRIES = int(ev(
+        'S3_TRANSFER_RETRIES',
+        '2'))
+
+**Supported Chunked Publishing Environment Variables**
+
+.. code-block:: python
+
+    ENABLED_CHUNKED_PUBLISH = ev(
+        'ENABLED_CHUNKED_PUBLISH',
+        '0') == '1'
+    PUBLISH_CHUNK_ROWS = int(ev(
+        'PUBLISH_CHUNK_ROWS',
+        '10000'))
+
+**Supported Backtest Cache Environment Variables**
+
+.. code-block:: python
+
+    ENABLED_BACKTEST_CACHE = ev(
+        'ENABLED_BACKTEST_CACHE',
+        '0') == '1'
+    BACKTEST_CACHE_STORE = ev(
+        'BACKTEST_CACHE_STORE',
+        'file')
+    BACKTEST_CACHE_DIR = ev(
+        'BACKTEST_CACHE_DIR',
+        '/tmp/backtest-cache')
+    BACKTEST_CACHE_S3_BUCKET = ev(
+        'BACKTEST_CACHE_S3_BUCKET',
+        'backtestcache')
+    BACKTEST_CACHE_EXPIRE = int(ev(
+        'BACKTEST_CACHE_EXPIRE',
+        '604800'))
+
+**Supported Concurrent Fetch Environment Variables**
+
+.. code-block:: python
+
+    FETCH_MAX_WORKERS = int(ev(
+        'FETCH_MAX_WORKERS',
+        '8'))
+    FETCH_IEX_CONCURRENCY = int(ev(
+        'FETCH_IEX_CONCURRENCY',
+        '4'))
+    FETCH_TD_CONCURRENCY = int(ev(
+        'FETCH_TD_CONCURRENCY',
+        '2'))
+    FETCH_FINVIZ_CONCURRENCY = int(ev(
+        'FETCH_FINVIZ_CONCURRENCY',
+        '1'))
+    HTTP_POOL_MAXSIZE = int(ev(
+        'HTTP_POOL_MAXSIZE',
+        '10'))
+    FETCH_CHUNK_SIZE = int(ev(
+        'FETCH_CHUNK_SIZE',
+        '50'))
+    FETCH_CHUNK_MAX_WORKERS = int(ev(
+        'FETCH_CHUNK_MAX_WORKERS',
+        '4'))
+    FETCH_IEX_BATCH = ev(
+        'FETCH_IEX_BATCH',
+        '1') == '1'
+
+**Supported Backfill Environment Variables**
+
+.. code-block:: python
+
+    BACKFILL_MAX_WORKERS = int(ev(
+        'BACKFILL_MAX_WORKERS',
+        '4'))
+    BACKFILL_MAX_PER_SECOND = float(ev(
+        'BACKFILL_MAX_PER_SECOND',
+        '5'))
+    BACKFILL_PROGRESS_DIR = ev(
+        'BACKFILL_PROGRESS_DIR',
+        '/tmp')
+
+**Supported Rate Limit Environment Variables**
+
+.. code-block:: python
+
+    RATE_LIMIT_ENABLED = ev(
+        'RATE_LIMIT_ENABLED',
+        '1') == '1'
+    RATE_LIMIT_BACKEND = ev(
+        'RATE_LIMIT_BACKEND',
+        'redis')
+    RATE_LIMIT_KEY_PREFIX = ev(
+        'RATE_LIMIT_KEY_PREFIX',
+        'ae:ratelimit')
+    RATE_LIMIT_IEX_PER_SECOND = float(ev(
+        'RATE_LIMIT_IEX_PER_SECOND',
+        '50'))
+    RATE_LIMIT_TD_PER_SECOND = float(ev(
+        'RATE_LIMIT_TD_PER_SECOND',
+        '2'))
+    RATE_LIMIT_FINVIZ_PER_SECOND = float(ev(
+        'RATE_LIMIT_FINVIZ_PER_SECOND',
+        '1'))
+    RATE_LIMIT_BURST_SECONDS = float(ev(
+        'RATE_LIMIT_BURST_SECONDS',
+        '5'))
+    RATE_LIMIT_MAX_RETRIES = int(ev(
+        'RATE_LIMIT_MAX_RETRIES',
+        '3'))
+    RATE_LIMIT_BACKOFF_BASE = float(ev(
+        'RATE_LIMIT_BACKOFF_BASE',
+        '0.5'))
+    RATE_LIMIT_BACKOFF_MAX = float(ev(
+        'RATE_LIMIT_BACKOFF_MAX',
+        '30'))
+    RATE_LIMIT_FALLBACK_SECONDS = float(ev(
+        'RATE_LIMIT_FALLBACK_SECONDS',
+        '30'))
+
+**Supported Algo Result Reference Environment Variables**
+
+.. code-block:: python
+
+    ALGO_RESULT_BY_REFERENCE = ev(
+        'ALGO_RESULT_BY_REFERENCE',
+        '0') == '1'
+    ALGO_RESULT_STORE = ev(
+        'ALGO_RESULT_STORE',
+        'redis')
+    ALGO_RESULT_KEY_PREFIX = ev(
+        'ALGO_RESULT_KEY_PREFIX',
+        'ae:algoresult')
+    ALGO_RESULT_S3_BUCKET = ev(
+        'ALGO_RESULT_S3_BUCKET',
+        'algoresults')
+    ALGO_RESULT_EXPIRE = int(ev(
+        'ALGO_RESULT_EXPIRE',
+        '86400'))
+
+**Supported Worker Warmup Environment Variables**
+
+.. code-block:: python
+
+    WORKER_WARMUP_ENABLED = ev(
+        'WORKER_WARMUP_ENABLED',
+        '1') == '1'
+    WORKER_WARMUP_MODULES = ev(
+        'WORKER_WARMUP_MODULES',
+        (
+            'pandas,'
+            'numpy,'
+            'analysis_engine.algo,'
+            'analysis_engine.run_algo,'
+            'analysis_engine.ae_talib,'
+            'analysis_engine.indicators.base_indicator,'
+            'analysis_engine.indicators.indicator_processor,'
+            'analysis_engine.load_history_dataset,'
+            'analysis_engine.algo_result_store'))
+    WORKER_WARMUP_ALGO_CONFIG = ev(
+        'WORKER_WARMUP_ALGO_CONFIG',
+        '/opt/sa/cfg/default_algo.json')
+    WORKER_WARMUP_FILES = ev(
+        'WORKER_WARMUP_FILES',
+        '')
+    WORKER_WARMUP_CLIENTS = ev(
+        'WORKER_WARMUP_CLIENTS',
+        '1') == '1'
+    WORKER_WARMUP_TICKERS = ev(
+        'WORKER_WARMUP_TICKERS',
+        '')
+
+**Supported Task Metrics Environment Variables**
+
+.. code-block:: python
+
+    TASK_METRICS_ENABLED = ev(
+        'TASK_METRICS_ENABLED',
+        '1') == '1'
+    TASK_METRICS_EXPORT = ev(
+        'TASK_METRICS_EXPORT',
+        'file')
+    TASK_METRICS_FILE = ev(
+        'TASK_METRICS_FILE',
+        '/tmp/ae-task-metrics-{pid}.prom')
+    TASK_METRICS_REDIS_KEY = ev(
+        'TASK_METRICS_REDIS_KEY',
+        'ae:taskmetrics')
+    TASK_METRICS_HTTP_PORT = int(ev(
+        'TASK_METRICS_HTTP_PORT',
+        '9808'))
+    TASK_METRICS_HTTP_PORTS = int(ev(
+        'TASK_METRICS_HTTP_PORTS',
+        '16'))
+    TASK_METRICS_FLUSH_SECONDS = float(ev(
+        'TASK_METRICS_FLUSH_SECONDS',
+        '10'))
+    TASK_METRICS_PAYLOAD_SIZES = ev(
+        'TASK_METRICS_PAYLOAD_SIZES',
+        '0') == '1'
+
+**Supported Indicator Shard Environment Variables**
+
+.. code-block:: python
+
+    INDICATOR_SHARDS = int(ev(
+        'INDICATOR_SHARDS',
+        '0'))
+    INDICATOR_SHARD_MAX_WORKERS = int(ev(
+        'INDICATOR_SHARD_MAX_WORKERS',
+        '4'))
+    INDICATOR_SHARD_KEY_PREFIX = ev(
+        'INDICATOR_SHARD_KEY_PREFIX',
+        'ae:indshard')
+    INDICATOR_SHARD_EXPIRE = int(ev(
+        'INDICATOR_SHARD_EXPIRE',
+        '3600'))
+    INDICATOR_SHARD_TIMEOUT = float(ev(
+        'INDICATOR_SHARD_TIMEOUT',
+        '600'))
+
+**Supported Universe Screener Environment Variables**
+
+.. code-block:: python
+
+    SCREENER_NUM_DAYS = int(ev(
+        'SCREENER_NUM_DAYS',
+        '60'))
+    SCREENER_BATCH_SIZE = int(ev(
+        'SCREENER_BATCH_SIZE',
+        '500'))
+    SCREENER_LIMIT = int(ev(
+        'SCREENER_LIMIT',
+        '25'))
+
+**Supported Panel Extraction Environment Variables**
+
+.. code-block:: python
+
+    PANEL_MAX_WORKERS = int(ev(
+        'PANEL_MAX_WORKERS',
+        '8'))
+    PANEL_BATCH_SIZE = int(ev(
+        'PANEL_BATCH_SIZE',
+        '100'))
+    PANEL_FLOAT_DTYPE = ev(
+        'PANEL_FLOAT_DTYPE',
+        'float32')
+
+**Supported Ticker Pool Environment Variables**
+
+.. code-block:: python
+
+    ALGO_TICKER_WORKERS = int(ev(
+        'ALGO_TICKER_WORKERS',
+        '0'))
+
+**Supported Event Loop Environment Variables**
+
+.. code-block:: python
+
+    ALGO_EVENT_LOOP = ev(
+        'ALGO_EVENT_LOOP',
+        '0') == '1'
+
 """
 
 import os
 import sys
 import json
-import analysis_engine.options_dates as opt_dates
+import types
 
 
 def ev(
@@ -468,6 +780,8 @@ WORKER_TASKS = ev(
     'WORKER_TASKS',
     ('analysis_engine.work_tasks.task_run_algo,'
      'analysis_engine.work_tasks.get_new_pricing_data,'
+     'analysis_engine.work_tasks.get_new_pricing_data_chunk,'
+     'analysis_engine.work_tasks.compute_indicator_shard,'
      'analysis_engine.work_tasks.handle_pricing_update_task,'
      'analysis_engine.work_tasks.prepare_pricing_dataset,'
      'analysis_engine.work_tasks.publish_from_s3_to_redis,'
@@ -491,8 +805,8 @@ TICKER_ID = int(ev(
 DEFAULT_TICKERS = ev(
     'DEFAULT_TICKERS',
     'SPY,AMZN,TSLA,NFLX').split(',')
-NEXT_EXP = opt_dates.option_expiration()
-NEXT_EXP_STR = NEXT_EXP.strftime('%Y-%m-%d')
+# next option expiration cached by get_next_exp()
+NEXT_EXP_CACHE = {}
 DAILY_S3_BUCKET_NAME = ev(
     'DAILY_S3_BUCKET_NAME',
     'daily')
@@ -835,6 +1149,28 @@ S3_KEY = ev(
     'S3_KEY',
     'test_key')
 
+########################################
+#
+# S3 Transfer Variables
+#
+########################################
+# s3 multipart uploads require parts of at least 5 MB
+# (except the last part)
+S3_MIN_PART_SIZE = 5242880
+S3_TRANSFER_PART_SIZE = int(ev(
+    'S3_TRANSFER_PART_SIZE',
+    '8388608'))
+S3_TRANSFER_MAX_WORKERS = int(ev(
+    'S3_TRANSFER_MAX_WORKERS',
+    '8'))
+S3_TRANSFER_VERIFY = ev(
+    'S3_TRANSFER_VERIFY',
+    '1') == '1'
+# retries for each failed multipart upload part
+S3_TRANSFER_RETRIES = int(ev(
+    'S3_TRANSFER_RETRIES',
+    '2'))
+
 ########################################
 #
 # Redis Variables
@@ -859,6 +1195,369 @@ REDIS_EXPIRE = ev(
     'REDIS_EXPIRE',
     None)
 
+########################################
+#
+# Redis Streams Variables
+#
+########################################
+ENABLED_REDIS_STREAM = ev(
+    'ENABLED_REDIS_STREAM',
+    '0') == '1'
+# cap each stream to about one trading day of minute bars
+REDIS_STREAM_MAXLEN = int(ev(
+    'REDIS_STREAM_MAXLEN',
+    '1440'))
+REDIS_STREAM_BLOCK_MS = int(ev(
+    'REDIS_STREAM_BLOCK_MS',
+    '5000'))
+REDIS_STREAM_DATASETS = [
+    'minute',
+    'quote'
+]
+
+########################################
+#
+# Redis Budget Variables
+#
+########################################
+# trading days of datasets to keep in redis before offloading to s3
+REDIS_BUDGET_HOT_DAYS = int(ev(
+    'REDIS_BUDGET_HOT_DAYS',
+    '5'))
+REDIS_BUDGET_MAX_MB = ev(
+    'REDIS_BUDGET_MAX_MB',
+    None)
+REDIS_BUDGET_DATASETS = ev(
+    'REDIS_BUDGET_DATASETS',
+    'minute,tdcalls,tdputs').split(',')
+# extraction reads s3 when a key is missing in redis
+# (turn on when manage_redis_budget offloads keys to s3)
+ENABLED_S3_EXTRACT_FALLBACK = ev(
+    'ENABLED_S3_EXTRACT_FALLBACK',
+    '0') == '1'
+
+########################################
+#
+# Chunked Publishing Variables
+#
+########################################
+ENABLED_CHUNKED_PUBLISH = ev(
+    'ENABLED_CHUNKED_PUBLISH',
+    '0') == '1'
+PUBLISH_CHUNK_ROWS = int(ev(
+    'PUBLISH_CHUNK_ROWS',
+    '10000'))
+
+########################################
+#
+# Backtest Cache Variables
+#
+########################################
+ENABLED_BACKTEST_CACHE = ev(
+    'ENABLED_BACKTEST_CACHE',
+    '0') == '1'
+# file, redis or s3
+BACKTEST_CACHE_STORE = ev(
+    'BACKTEST_CACHE_STORE',
+    'file')
+BACKTEST_CACHE_DIR = ev(
+    'BACKTEST_CACHE_DIR',
+    '/tmp/backtest-cache')
+BACKTEST_CACHE_S3_BUCKET = ev(
+    'BACKTEST_CACHE_S3_BUCKET',
+    'backtestcache')
+# seconds before cached results expire in redis (default is 7 days)
+BACKTEST_CACHE_EXPIRE = int(ev(
+    'BACKTEST_CACHE_EXPIRE',
+    '604800'))
+
+########################################
+#
+# Concurrent Fetch Variables
+#
+########################################
+# max threads fetching datasets for one ticker
+FETCH_MAX_WORKERS = int(ev(
+    'FETCH_MAX_WORKERS',
+    '8'))
+# max in-flight requests per provider in each process
+FETCH_IEX_CONCURRENCY = int(ev(
+    'FETCH_IEX_CONCURRENCY',
+    '4'))
+FETCH_TD_CONCURRENCY = int(ev(
+    'FETCH_TD_CONCURRENCY',
+    '2'))
+FETCH_FINVIZ_CONCURRENCY = int(ev(
+    'FETCH_FINVIZ_CONCURRENCY',
+    '1'))
+# keep-alive connections per host in each pooled session
+HTTP_POOL_MAXSIZE = int(ev(
+    'HTTP_POOL_MAXSIZE',
+    '10'))
+# tickers per get_new_pricing_data_chunk task
+FETCH_CHUNK_SIZE = int(ev(
+    'FETCH_CHUNK_SIZE',
+    '50'))
+# tickers fetched at the same time inside one chunk task
+FETCH_CHUNK_MAX_WORKERS = int(ev(
+    'FETCH_CHUNK_MAX_WORKERS',
+    '4'))
+# fetch the IEX datasets of a chunk with IEX Cloud batch requests
+FETCH_IEX_BATCH = ev(
+    'FETCH_IEX_BATCH',
+    '1') == '1'
+
+########################################
+#
+# Backfill Variables
+#
+########################################
+# threads running (ticker, date) backfill fetches
+BACKFILL_MAX_WORKERS = int(ev(
+    'BACKFILL_MAX_WORKERS',
+    '4'))
+# global limit on backfill fetches started per second
+BACKFILL_MAX_PER_SECOND = float(ev(
+    'BACKFILL_MAX_PER_SECOND',
+    '5'))
+# directory for the resumable backfill progress files
+BACKFILL_PROGRESS_DIR = ev(
+    'BACKFILL_PROGRESS_DIR',
+    '/tmp')
+
+########################################
+#
+# Rate Limit Variables
+#
+########################################
+RATE_LIMIT_ENABLED = ev(
+    'RATE_LIMIT_ENABLED',
+    '1') == '1'
+# redis = share the token buckets across all workers
+# local = one token bucket per process
+RATE_LIMIT_BACKEND = ev(
+    'RATE_LIMIT_BACKEND',
+    'redis')
+RATE_LIMIT_KEY_PREFIX = ev(
+    'RATE_LIMIT_KEY_PREFIX',
+    'ae:ratelimit')
+# requests per second per provider across all workers
+RATE_LIMIT_IEX_PER_SECOND = float(ev(
+    'RATE_LIMIT_IEX_PER_SECOND',
+    '50'))
+RATE_LIMIT_TD_PER_SECOND = float(ev(
+    'RATE_LIMIT_TD_PER_SECOND',
+    '2'))
+RATE_LIMIT_FINVIZ_PER_SECOND = float(ev(
+    'RATE_LIMIT_FINVIZ_PER_SECOND',
+    '1'))
+# bucket capacity in seconds of tokens
+RATE_LIMIT_BURST_SECONDS = float(ev(
+    'RATE_LIMIT_BURST_SECONDS',
+    '5'))
+# retries after a 429 response with jittered backoff
+RATE_LIMIT_MAX_RETRIES = int(ev(
+    'RATE_LIMIT_MAX_RETRIES',
+    '3'))
+RATE_LIMIT_BACKOFF_BASE = float(ev(
+    'RATE_LIMIT_BACKOFF_BASE',
+    '0.5'))
+RATE_LIMIT_BACKOFF_MAX = float(ev(
+    'RATE_LIMIT_BACKOFF_MAX',
+    '30'))
+# seconds to use the local buckets after a redis error
+RATE_LIMIT_FALLBACK_SECONDS = float(ev(
+    'RATE_LIMIT_FALLBACK_SECONDS',
+    '30'))
+
+########################################
+#
+# Algo Result Reference Variables
+#
+########################################
+# return a pointer and a summary from the algorithm tasks
+# instead of the full result
+ALGO_RESULT_BY_REFERENCE = ev(
+    'ALGO_RESULT_BY_REFERENCE',
+    '0') == '1'
+# redis or s3
+ALGO_RESULT_STORE = ev(
+    'ALGO_RESULT_STORE',
+    'redis')
+ALGO_RESULT_KEY_PREFIX = ev(
+    'ALGO_RESULT_KEY_PREFIX',
+    'ae:algoresult')
+ALGO_RESULT_S3_BUCKET = ev(
+    'ALGO_RESULT_S3_BUCKET',
+    'algoresults')
+# seconds before stored results expire in redis (default is 1 day)
+ALGO_RESULT_EXPIRE = int(ev(
+    'ALGO_RESULT_EXPIRE',
+    '86400'))
+
+########################################
+#
+# Worker Warmup Variables
+#
+########################################
+# warm each celery worker process before its first task
+WORKER_WARMUP_ENABLED = ev(
+    'WORKER_WARMUP_ENABLED',
+    '1') == '1'
+# comma-separated modules to import in each worker process
+WORKER_WARMUP_MODULES = ev(
+    'WORKER_WARMUP_MODULES',
+    (
+        'pandas,'
+        'numpy,'
+        'analysis_engine.algo,'
+        'analysis_engine.run_algo,'
+        'analysis_engine.ae_talib,'
+        'analysis_engine.indicators.base_indicator,'
+        'analysis_engine.indicators.indicator_processor,'
+        'analysis_engine.load_history_dataset,'
+        'analysis_engine.algo_result_store'))
+# algorithm config with the algo_path and indicator
+# module_path files to compile and load
+WORKER_WARMUP_ALGO_CONFIG = ev(
+    'WORKER_WARMUP_ALGO_CONFIG',
+    '/opt/sa/cfg/default_algo.json')
+# comma-separated extra algo or indicator files
+WORKER_WARMUP_FILES = ev(
+    'WORKER_WARMUP_FILES',
+    '')
+# build the pooled redis, S3 and HTTP clients
+WORKER_WARMUP_CLIENTS = ev(
+    'WORKER_WARMUP_CLIENTS',
+    '1') == '1'
+# comma-separated tickers to extract from redis (off by default)
+WORKER_WARMUP_TICKERS = ev(
+    'WORKER_WARMUP_TICKERS',
+    '')
+
+########################################
+#
+# Task Metrics Variables
+#
+########################################
+# record queue wait, run time, payload sizes and retries
+# for every CustomTask
+TASK_METRICS_ENABLED = ev(
+    'TASK_METRICS_ENABLED',
+    '1') == '1'
+# comma-separated exporters: file, redis and http
+TASK_METRICS_EXPORT = ev(
+    'TASK_METRICS_EXPORT',
+    'file')
+# prometheus text file where {pid} is the worker process id
+TASK_METRICS_FILE = ev(
+    'TASK_METRICS_FILE',
+    '/tmp/ae-task-metrics-{pid}.prom')
+# redis hash shared by all the workers
+TASK_METRICS_REDIS_KEY = ev(
+    'TASK_METRICS_REDIS_KEY',
+    'ae:taskmetrics')
+# first port for the /metrics endpoint in each worker process
+TASK_METRICS_HTTP_PORT = int(ev(
+    'TASK_METRICS_HTTP_PORT',
+    '9808'))
+# number of ports to try for the /metrics endpoint
+TASK_METRICS_HTTP_PORTS = int(ev(
+    'TASK_METRICS_HTTP_PORTS',
+    '16'))
+# seconds between exports to the file and redis
+TASK_METRICS_FLUSH_SECONDS = float(ev(
+    'TASK_METRICS_FLUSH_SECONDS',
+    '10'))
+# json-size the task args and return values
+TASK_METRICS_PAYLOAD_SIZES = ev(
+    'TASK_METRICS_PAYLOAD_SIZES',
+    '0') == '1'
+
+########################################
+#
+# Indicator Shard Variables
+#
+########################################
+# split run_algo indicator work into this many shards
+# before replaying the trades (0 turns sharding off)
+INDICATOR_SHARDS = int(ev(
+    'INDICATOR_SHARDS',
+    '0'))
+# local processes for the shards when celery is disabled
+INDICATOR_SHARD_MAX_WORKERS = int(ev(
+    'INDICATOR_SHARD_MAX_WORKERS',
+    '4'))
+# redis key prefix for the shard inputs and outputs
+INDICATOR_SHARD_KEY_PREFIX = ev(
+    'INDICATOR_SHARD_KEY_PREFIX',
+    'ae:indshard')
+# seconds before the shard inputs and outputs expire
+INDICATOR_SHARD_EXPIRE = int(ev(
+    'INDICATOR_SHARD_EXPIRE',
+    '3600'))
+# seconds to wait for a compute_indicator_shard task before
+# computing the shard locally
+INDICATOR_SHARD_TIMEOUT = float(ev(
+    'INDICATOR_SHARD_TIMEOUT',
+    '600'))
+
+########################################
+#
+# Universe Screener Variables
+#
+########################################
+# trading sessions of daily bars loaded per ticker
+SCREENER_NUM_DAYS = int(ev(
+    'SCREENER_NUM_DAYS',
+    '60'))
+# redis GETs per pipeline round trip
+SCREENER_BATCH_SIZE = int(ev(
+    'SCREENER_BATCH_SIZE',
+    '500'))
+# ranked tickers to return (0 returns every match)
+SCREENER_LIMIT = int(ev(
+    'SCREENER_LIMIT',
+    '25'))
+
+########################################
+#
+# Panel Extraction Variables
+#
+########################################
+# threads reading redis pipelines
+PANEL_MAX_WORKERS = int(ev(
+    'PANEL_MAX_WORKERS',
+    '8'))
+# redis GETs per pipeline round trip
+PANEL_BATCH_SIZE = int(ev(
+    'PANEL_BATCH_SIZE',
+    '100'))
+# dtype for float columns (float64 keeps full precision)
+PANEL_FLOAT_DTYPE = ev(
+    'PANEL_FLOAT_DTYPE',
+    'float32')
+
+########################################
+#
+# Ticker Pool Variables
+#
+########################################
+# processes for per-ticker backtests (0 uses every core)
+ALGO_TICKER_WORKERS = int(ev(
+    'ALGO_TICKER_WORKERS',
+    '0'))
+
+########################################
+#
+# Event Loop Variables
+#
+########################################
+# merge multi-ticker backtests into one time-ordered event loop
+ALGO_EVENT_LOOP = ev(
+    'ALGO_EVENT_LOOP',
+    '0') == '1'
+
 # copy these values over
 # when calling child tasks from a
 # parent where the engine is
@@ -1317,3 +2016,65 @@ def get_redis_host_and_port(
             redis_port))
     return redis_host, redis_port
 # end of get_redis_host_and_port
+
+
+def get_next_exp():
+    """get_next_exp
+
+    Get the next option expiration ``datetime.datetime``. It is
+    built on the first call and cached for the process so
+    importing the constants does not load the pandas holiday
+    calendar (keeps the command line tools fast to start)
+    """
+    if 'next_exp' not in NEXT_EXP_CACHE:
+        import analysis_engine.options_dates as opt_dates
+        NEXT_EXP_CACHE['next_exp'] = opt_dates.option_expiration()
+    return NEXT_EXP_CACHE['next_exp']
+# end of get_next_exp
+
+
+def get_next_exp_str():
+    """get_next_exp_str
+
+    Get the next option expiration as a ``YYYY-MM-DD`` string
+    (see ``get_next_exp``)
+    """
+    return get_next_exp().strftime(COMMON_DATE_FORMAT)
+# end of get_next_exp_str
+
+
+class ConstsModule(types.ModuleType):
+    """ConstsModule
+
+    Module type for ``analysis_engine.consts`` that keeps
+    ``NEXT_EXP`` and ``NEXT_EXP_STR`` readable as constants
+    while building them on first use (python 3.6 does not
+    support a module-level ``__getattr__``)
+    """
+
+    @property
+    def NEXT_EXP(
+            self):
+        """NEXT_EXP
+
+        Next option expiration ``datetime.datetime``
+        (see ``get_next_exp``)
+        """
+        return get_next_exp()
+    # end of NEXT_EXP
+
+    @property
+    def NEXT_EXP_STR(
+            self):
+        """NEXT_EXP_STR
+
+        Next option expiration ``YYYY-MM-DD`` string
+        (see ``get_next_exp_str``)
+        """
+        return get_next_exp_str()
+    # end of NEXT_EXP_STR
+
+# end of ConstsModule
+
+
+sys.modules[__name__].__class__ = ConstsModule
@@ -37,7 +37,6 @@ of the following data feed and returned as a
 
 """
 
-import datetime
 import pandas as pd
 import analysis_engine.consts as ae_consts
 import analysis_engine.utils as ae_utils
@@ -114,6 +113,39 @@ def debug_msg(
 # end of debug_msg
 
 
+def build_datetimes_from_df_col(
+        df,
+        use_date_str,
+        src_col='minute',
+        src_date_format=ae_consts.COMMON_TICK_DATE_FORMAT):
+    """build_datetimes_from_df_col
+
+    Converts a time of day string column (``09:30`` or
+    ``9 AM``) in a ``pandas.DataFrame`` to a ``datetime64``
+    ``pandas.Series`` on the ``use_date_str`` date with
+    vectorized string operations and one ``pd.to_datetime`` call
+
+    :param df: source ``pandas.DataFrame``
+    :param use_date_str: date string for today
+    :param src_col: source column name
+    :param src_date_format: format of the joined date and
+        ``df[src_col]`` strings
+    """
+    times = df[src_col].astype(str)
+    time_strs = times + ':00'
+    no_minutes = ~times.str.contains(':', regex=False)
+    if no_minutes.any():
+        # 9 AM
+        hour_parts = times[no_minutes].str.split(' ', n=1)
+        time_strs[no_minutes] = (
+            hour_parts.str[0] + ':00:00 ' + hour_parts.str[1])
+    date_strs = f'{use_date_str} ' + time_strs
+    return pd.to_datetime(
+        date_strs,
+        format=src_date_format)
+# end of build_datetimes_from_df_col
+
+
 def build_dates_from_df_col(
         df,
         use_date_str,
@@ -125,6 +157,9 @@ def build_dates_from_df_col(
     Converts a string date column series in a ``pandas.DataFrame``
     to a well-formed date string list.
 
+    Use ``build_datetimes_from_df_col`` to keep the dates as
+    ``datetime64`` values instead of strings.
+
     :param src_col: source column name
     :param use_date_str: date string for today
     :param src_date_format: format of the string in the
@@ -133,29 +168,12 @@ def build_dates_from_df_col(
                                in this format.
     :param df: source ``pandas.DataFrame``
     """
-    new_dates = []
-    for idx, i in enumerate(df[src_col]):
-        org_new_str = ''
-        if ':' not in i:
-            split_arr = i.split(' ')
-            org_new_str = (
-                f'{use_date_str} '
-                f'{split_arr[0]}'
-                f':00:00 '
-                f'{split_arr[1]}')
-        else:
-            org_new_str = (
-                f'{use_date_str} '
-                f'{i}:00')
-        new_date_val = datetime.datetime.strptime(
-            org_new_str,
-            src_date_format)
-        new_str = new_date_val.strftime(
-            output_date_format)
-        new_dates.append(new_str)
-    # for all rows
-
-    return new_dates
+    return build_datetimes_from_df_col(
+        df=df,
+        use_date_str=use_date_str,
+        src_col=src_col,
+        src_date_format=src_date_format).dt.strftime(
+            output_date_format).tolist()
 # end of build_dates_from_df_col
 
 
@@ -238,37 +256,25 @@ def ingress_scrub_dataset(
     try:
         if scrub_mode == 'sort-by-date':
             if datafeed_type == iex_consts.DATAFEED_DAILY:
-                new_dates = []
                 if 'label' in df:
-                    for idx, i in enumerate(out_df['label']):
-                        split_arr = i.split(' ')
-                        new_str = ''
-                        if ',' not in i:
-                            # Oct 3
-                            new_str = (
-                                f'{year_str}-{split_arr[0]}-{split_arr[1]}')
-                        else:
-                            # Aug 29, 18
-                            new_str = (
-                                f'20{split_arr[2]}-{split_arr[0]}-'
-                                f'{split_arr[1].replace(",", "")}')
-                        new_dates.append(new_str)
-                    # end for all rows
+                    # Oct 3 or Aug 29, 18
+                    labels = out_df['label'].astype(str)
+                    parts = labels.str.replace(
+                        ',', '', regex=False).str.split(' ')
+                    years = ('20' + parts.str[2]).where(
+                        labels.str.contains(',', regex=False),
+                        year_str)
                     out_df['date'] = pd.to_datetime(
-                        new_dates,
+                        years + '-' + parts.str[0] + '-' + parts.str[1],
                         format=daily_date_format)
                 # end if label is in df
             elif datafeed_type == iex_consts.DATAFEED_MINUTE:
-                new_dates = []
                 if 'label' in df:
-                    new_dates = build_dates_from_df_col(
+                    out_df['date'] = build_datetimes_from_df_col(
                         src_col='label',
                         src_date_format=minute_date_format,
                         use_date_str=use_date_str,
                         df=out_df)
-                    out_df['date'] = pd.to_datetime(
-                        new_dates,
-                        format='%Y-%m-%d %H:%M:%S')
                 # end if label is in df
             elif datafeed_type == iex_consts.DATAFEED_QUOTE:
                 columns_list = out_df.columns.values
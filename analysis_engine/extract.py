@@ -29,6 +29,21 @@ Extract historical data with the ``date`` argument formatted ``YYYY-MM-DD``:
         datasets=['minute', 'daily', 'financials', 'earnings', 'dividends'],
         date='2019-02-15'))
 
+**Extract Panels for Many Tickers**
+
+Extract datasets for many tickers and dates as one ``pandas.DataFrame``
+per dataset indexed by ``(ticker, timestamp)``:
+
+.. code-block:: python
+
+    import analysis_engine.extract_panel as extract_panel
+    panels = extract_panel.extract_panel(
+        tickers=['SPY', 'QQQ', 'AAPL'],
+        datasets=['daily', 'minute'],
+        start_date='2019-02-11',
+        end_date='2019-02-15')
+    print(panels['minute'])
+
 **Additional Extraction APIs**
 
 `IEX Cloud Extraction API Reference <https://stock-analysis-engine.
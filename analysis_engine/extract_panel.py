@@ -0,0 +1,383 @@
+"""
+Extract datasets for many tickers and dates as panels
+
+``analysis_engine.extract.extract`` builds a dictionary of
+``pandas.DataFrame`` objects for one ticker at a time. The panel
+extraction reads the ``<TICKER>_<DATE>_<DATASET>`` keys for every
+ticker, trading session and dataset with pipelined redis ``GET``
+calls spread over a thread pool. It returns one ``pandas.DataFrame``
+per dataset indexed by ``(ticker, timestamp)``:
+
+.. code-block:: python
+
+    import analysis_engine.extract_panel as extract_panel
+
+    panels = extract_panel.extract_panel(
+        tickers=['SPY', 'QQQ', 'AAPL'],
+        datasets=['daily', 'minute'],
+        start_date='2019-02-11',
+        end_date='2019-02-15')
+    minute_df = panels['minute']
+    # cross-sectional close for one minute
+    print(minute_df.xs('2019-02-15 15:59:00', level='timestamp')['close'])
+    # one ticker
+    print(minute_df.loc['SPY'])
+
+Rows are stamped with the dataset's ``date`` column, and only
+rows inside the date range are kept. Datasets without a ``date``
+column (``quote``, ``stats``, ``company`` ...) are stamped with
+the date of their key. When the keys of several dates hold the
+same rows (each ``daily`` key holds the history up to its date)
+the row from the newest key is kept.
+
+Columns are stored in compact dtypes: floats as
+``PANEL_FLOAT_DTYPE``, integers downcast to the smallest integer
+type that holds them and repeated strings as ``category``.
+
+**Supported environment variables**
+
+::
+
+    export PANEL_MAX_WORKERS=8
+    export PANEL_BATCH_SIZE=100
+    # use float64 to keep full precision
+    export PANEL_FLOAT_DTYPE=float32
+"""
+
+import json
+import zlib
+import concurrent.futures
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import analysis_engine.trading_calendar as trading_calendar
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+# nested keys the Tradier datasets may be cached under
+DATASET_ALIASES = {
+    'tdcalls': 'calls',
+    'tdputs': 'puts'
+}
+
+
+def decode_frame(
+        raw,
+        dataset,
+        encoding='utf-8'):
+    """decode_frame
+
+    Decode a cached dataset value (zlib compressed or plain json)
+    into a ``pandas.DataFrame`` the same way the extract tools
+    load it with ``pandas.read_json(orient='records')``
+
+    :param raw: value from redis
+    :param dataset: dataset name
+    :param encoding: optional - string encoding
+    """
+    if not raw:
+        return None
+    if isinstance(raw, bytes):
+        try:
+            raw = zlib.decompress(raw)
+        except zlib.error:
+            pass
+        raw = raw.decode(encoding)
+    data = json.loads(raw)
+    if isinstance(data, dict):
+        if dataset in data:
+            data = data[dataset]
+        elif DATASET_ALIASES.get(dataset, None) in data:
+            data = data[DATASET_ALIASES[dataset]]
+    if not data:
+        return None
+    if isinstance(data, str):
+        return pd.read_json(
+            data,
+            orient='records')
+    if isinstance(data, dict):
+        data = [data]
+    return pd.DataFrame(data)
+# end of decode_frame
+
+
+def build_timestamps(
+        df,
+        date):
+    """build_timestamps
+
+    Return a tuple of the row timestamps as a ``datetime64[ns]``
+    array and ``True`` when they came from the ``date`` column
+
+    :param df: ``pandas.DataFrame``
+    :param date: date of the key ``YYYY-MM-DD``
+    """
+    if 'date' not in df:
+        return np.full(
+            len(df.index),
+            np.datetime64(date, 'ns')), False
+    timestamps = df['date']
+    if timestamps.dtype.kind in 'iu':
+        timestamps = pd.to_datetime(
+            timestamps,
+            unit='ms',
+            errors='coerce')
+    else:
+        timestamps = pd.to_datetime(
+            timestamps,
+            errors='coerce')
+    if getattr(timestamps.dt, 'tz', None) is not None:
+        timestamps = timestamps.dt.tz_convert('UTC').dt.tz_localize(None)
+    return timestamps.values.astype('datetime64[ns]'), True
+# end of build_timestamps
+
+
+def compact_frame(
+        df,
+        float_dtype=ae_consts.PANEL_FLOAT_DTYPE):
+    """compact_frame
+
+    Convert the columns of ``df`` to compact dtypes in place
+    and return it
+
+    :param df: ``pandas.DataFrame``
+    :param float_dtype: optional - dtype for float columns
+        (default is ``PANEL_FLOAT_DTYPE``)
+    """
+    num_rows = len(df.index)
+    for column in df.columns:
+        kind = df[column].dtype.kind
+        if kind == 'f':
+            df[column] = df[column].astype(float_dtype)
+        elif kind == 'i':
+            df[column] = pd.to_numeric(
+                df[column],
+                downcast='integer')
+        elif kind == 'O':
+            try:
+                num_unique = df[column].nunique(dropna=True)
+            except TypeError:
+                # lists or dictionaries are not hashable
+                continue
+            if num_unique and num_unique <= num_rows // 2:
+                df[column] = df[column].astype('category')
+    # end of for all columns
+    return df
+# end of compact_frame
+
+
+def read_batch(
+        client,
+        batch,
+        start_day,
+        end_day,
+        label='panel'):
+    """read_batch
+
+    Read one pipelined batch of keys and return a list of
+    ``(ticker, date, dataset, df)`` tuples where ``df`` has a
+    ``timestamp`` column and only the rows in the date range
+    (``df`` is ``None`` for missing keys)
+
+    :param client: redis client
+    :param batch: list of ``(ticker, date, dataset)`` tuples
+    :param start_day: first ``numpy.datetime64`` day
+    :param end_day: last ``numpy.datetime64`` day
+    :param label: optional - log label
+    """
+    first_ns = start_day.astype('datetime64[ns]')
+    after_ns = (end_day + 1).astype('datetime64[ns]')
+    pipe = client.pipeline(transaction=False)
+    for ticker, date, dataset in batch:
+        pipe.get(f'{ticker}_{date}_{dataset}')
+    found = []
+    for (ticker, date, dataset), raw in zip(batch, pipe.execute()):
+        df = None
+        try:
+            df = decode_frame(
+                raw=raw,
+                dataset=dataset)
+        except Exception as e:
+            log.error(
+                f'{label} - failed decoding {ticker}_{date}_{dataset} '
+                f'ex={e}')
+        if df is not None and len(df.index):
+            timestamps, from_column = build_timestamps(
+                df=df,
+                date=date)
+            if from_column:
+                df = df.drop(columns=['date'])
+                in_range = (
+                    (timestamps >= first_ns) &
+                    (timestamps < after_ns))
+                df = df[in_range]
+                timestamps = timestamps[in_range]
+            df = df.assign(timestamp=timestamps)
+        found.append((ticker, date, dataset, df))
+    # end of for all keys in the batch
+    return found
+# end of read_batch
+
+
+def build_panel(
+        frames,
+        float_dtype=ae_consts.PANEL_FLOAT_DTYPE):
+    """build_panel
+
+    Stack the frames of one dataset into a ``pandas.DataFrame``
+    indexed by ``(ticker, timestamp)``. Rows from older keys
+    with a timestamp a newer key already has are dropped.
+
+    :param frames: list of ``(ticker, date, df)`` tuples
+    :param float_dtype: optional - dtype for float columns
+    """
+    parts = []
+    seen = {}
+    for ticker, date, df in sorted(
+            frames,
+            key=lambda f: (f[0], f[1]),
+            reverse=True):
+        timestamps = df['timestamp'].values.view('i8')
+        if ticker in seen:
+            df = df[~np.isin(timestamps, seen[ticker])]
+            seen[ticker] = np.concatenate([seen[ticker], timestamps])
+        else:
+            seen[ticker] = timestamps
+        if len(df.index):
+            parts.append(df.assign(ticker=ticker))
+    # end of for all frames newest first
+    if not parts:
+        return pd.DataFrame(
+            index=pd.MultiIndex.from_arrays(
+                [[], pd.DatetimeIndex([])],
+                names=['ticker', 'timestamp']))
+    panel_df = pd.concat(
+        parts,
+        ignore_index=True,
+        sort=False)
+    panel_df = panel_df.set_index(['ticker', 'timestamp']).sort_index(
+        kind='mergesort')
+    return compact_frame(
+        df=panel_df,
+        float_dtype=float_dtype)
+# end of build_panel
+
+
+def extract_panel(
+        tickers,
+        datasets=None,
+        start_date=None,
+        end_date=None,
+        client=None,
+        redis_address=ae_consts.REDIS_ADDRESS,
+        redis_db=ae_consts.REDIS_DB,
+        redis_password=ae_consts.REDIS_PASSWORD,
+        max_workers=ae_consts.PANEL_MAX_WORKERS,
+        batch_size=ae_consts.PANEL_BATCH_SIZE,
+        float_dtype=ae_consts.PANEL_FLOAT_DTYPE,
+        label='panel',
+        verbose=False):
+    """extract_panel
+
+    Extract the ``datasets`` for the ``tickers`` on each trading
+    session from ``start_date`` to ``end_date`` and return a
+    dictionary of dataset name to a ``pandas.DataFrame`` indexed
+    by ``(ticker, timestamp)``
+
+    :param tickers: list of tickers
+    :param datasets: optional - list of dataset names
+        (default is ``['daily', 'minute']``)
+    :param start_date: optional - first date ``YYYY-MM-DD``
+        (default is ``end_date``)
+    :param end_date: optional - last date ``YYYY-MM-DD``
+        (default is the last close)
+    :param client: optional - redis client
+    :param redis_address: optional - redis address ``host:port``
+    :param redis_db: optional - redis db
+    :param redis_password: optional - redis password
+    :param max_workers: optional - threads reading batches
+        (default is ``PANEL_MAX_WORKERS``)
+    :param batch_size: optional - GETs per pipeline round trip
+        (default is ``PANEL_BATCH_SIZE``)
+    :param float_dtype: optional - dtype for float columns
+        (default is ``PANEL_FLOAT_DTYPE``)
+    :param label: optional - log label
+    :param verbose: optional - log the keys that were not found
+    """
+    use_datasets = datasets or ['daily', 'minute']
+    use_end = end_date or ae_utils.get_last_close_str()
+    use_start = start_date or use_end
+    start_day = trading_calendar.to_day(use_start)
+    end_day = trading_calendar.to_day(use_end)
+    dates = trading_calendar.get_calendar().sessions_between(
+        start_date=start_day,
+        end_date=end_day,
+        fmt='%Y-%m-%d')
+    if not client:
+        import redis
+        redis_host, redis_port = ae_consts.get_redis_host_and_port(
+            addr=redis_address)
+        client = redis.Redis(
+            host=redis_host,
+            port=redis_port,
+            password=redis_password,
+            db=redis_db)
+
+    keys = [
+        (str(ticker).upper(), date, dataset)
+        for ticker in tickers
+        for date in dates
+        for dataset in use_datasets
+    ]
+    batch_size = max(1, int(batch_size))
+    batches = [
+        keys[first:first + batch_size]
+        for first in range(0, len(keys), batch_size)
+    ]
+    max_workers = max(1, min(int(max_workers), len(batches) or 1))
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers) as executor:
+        results = list(executor.map(
+            lambda batch: read_batch(
+                client=client,
+                batch=batch,
+                start_day=start_day,
+                end_day=end_day,
+                label=label),
+            batches))
+    # end of with executor
+
+    frames = {
+        dataset: []
+        for dataset in use_datasets
+    }
+    missing = []
+    for found in results:
+        for ticker, date, dataset, df in found:
+            if df is None:
+                missing.append(f'{ticker}_{date}_{dataset}')
+            elif len(df.index):
+                frames[dataset].append((ticker, date, df))
+    # end of for all batches
+
+    if missing:
+        log.info(
+            f'{label} - missing keys={len(missing)} of {len(keys)}')
+        if verbose:
+            log.info(f'{label} - missing keys: {missing}')
+    panels = {
+        dataset: build_panel(
+            frames=frames[dataset],
+            float_dtype=float_dtype)
+        for dataset in use_datasets
+    }
+    log.debug(
+        f'{label} - extracted tickers={len(tickers)} dates={len(dates)} '
+        'rows=' + ', '.join(
+            f'{dataset}:{len(df.index)}'
+            for dataset, df in panels.items()))
+    return panels
+# end of extract_panel
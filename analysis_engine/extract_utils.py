@@ -8,6 +8,11 @@ to ignore the source of the dataset (IEX vs Yahoo) and
 perform the extract and load operations without
 knowledge of the underlying dataset.
 
+If the key is not in Redis (for example after it was
+offloaded with ``analysis_engine.manage_redis_budget``)
+and S3 is enabled, the dataset is read from the same
+key in S3.
+
 Supported environment variables:
 
 ::
@@ -21,6 +26,11 @@ Supported environment variables:
     # verbose logging for just S3 operations in this module
     export DEBUG_S3_EXTRACT=1
 
+    # fall back to S3 when the key is not in Redis (needed for
+    # keys offloaded by analysis_engine.manage_redis_budget,
+    # default is off so a Redis miss does not call S3)
+    export ENABLED_S3_EXTRACT_FALLBACK=1
+
     # to show debug, trace logging please export ``SHARED_LOG_CFG``
     # to a debug logger json file. To turn on debugging for this
     # library, you can export this variable to the repo's
@@ -31,6 +41,7 @@ Supported environment variables:
 
 import analysis_engine.consts as ae_consts
 import analysis_engine.build_df_from_redis as build_df
+import analysis_engine.build_df_from_s3 as build_df_s3
 import analysis_engine.dataset_scrub_utils as scrub_utils
 import spylunking.log.setup_logging as log_utils
 
@@ -104,6 +115,9 @@ def perform_extract(
     redis_expire = work_dict.get(
         'redis_expire',
         ae_consts.REDIS_EXPIRE)
+    s3_fallback = work_dict.get(
+        's3_fallback',
+        ae_consts.ENABLED_S3_EXTRACT_FALLBACK)
 
     if verbose:
         log.info(
@@ -139,13 +153,36 @@ def perform_extract(
             f'redis={redis_address}@{redis_db} key={redis_key} ex={e}')
     # end of try/ex extract from redis
 
-    if not extract_res:
-        return status, None
-
     valid_df = (
-        extract_res['status'] == ae_consts.SUCCESS
+        extract_res
+        and extract_res['status'] == ae_consts.SUCCESS
         and extract_res['rec']['valid_df'])
 
+    if not valid_df and s3_enabled and s3_fallback:
+        if verbose or ae_consts.ev('DEBUG_S3_EXTRACT', '0') == '1':
+            log.info(
+                f'{label} - {df_str} - ds_id={ds_id} not in redis '
+                f'key={redis_key} checking s3={s3_bucket}/{s3_key}')
+        s3_res = build_df_s3.build_df_from_s3(
+            label=label,
+            key=s3_key,
+            s3_bucket=s3_bucket,
+            s3_address=s3_address,
+            s3_access_key=s3_access_key,
+            s3_secret_key=s3_secret_key,
+            s3_region_name=s3_region_name,
+            s3_secure=s3_secure,
+            verbose=verbose)
+        if (
+                s3_res['status'] == ae_consts.SUCCESS
+                and s3_res['rec']['valid_df']):
+            extract_res = s3_res
+            valid_df = True
+    # end of falling back to s3
+
+    if not extract_res:
+        return status, None
+
     if not valid_df:
         if verbose or ae_consts.ev('DEBUG_S3_EXTRACT', '0') == '1':
             log.error(
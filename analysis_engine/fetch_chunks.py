@@ -0,0 +1,398 @@
+"""
+Fetch many tickers in one task
+
+``get_new_pricing_data`` is one Celery task per ticker so a
+large universe pays one broker message, one task start and one
+result backend write with every dataset per ticker. The
+``get_new_pricing_data_chunk`` task runs ``run_chunk`` which
+fetches ``FETCH_CHUNK_SIZE`` tickers per task:
+
+- tickers are fetched ``FETCH_CHUNK_MAX_WORKERS`` at a time
+  on a thread pool (each ticker still fetches its datasets
+  concurrently with ``analysis_engine.fetch_pool``)
+- the pooled HTTP sessions and provider limits from
+  ``analysis_engine.http_sessions`` are shared by all tickers
+- publishes reuse one redis client and S3 resource with
+  ``analysis_engine.shared_clients``
+- the IEX datasets of every ticker in the chunk are fetched
+  with IEX Cloud batch requests (one per 100 tickers and chart
+  range) by ``fetch_iex_batch`` before the per-ticker fetches,
+  which only fetch the datasets missing from the batch
+- the task result is a per-ticker status summary instead of
+  every json-serialized dataset
+
+.. code-block:: python
+
+    import analysis_engine.fetch_chunks as fetch_chunks
+
+    for chunk_req in fetch_chunks.build_chunk_requests(
+            work_dict=work,
+            tickers=['SPY', 'AAPL', 'MSFT']):
+        res = fetch_chunks.run_chunk(
+            work_dict=chunk_req)
+
+**Supported Environment Variables**
+
+::
+
+    export FETCH_CHUNK_SIZE=50
+    export FETCH_CHUNK_MAX_WORKERS=4
+    # set to 0 to fetch the IEX datasets one ticker at a time
+    export FETCH_IEX_BATCH=1
+"""
+
+import copy
+import concurrent.futures
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import analysis_engine.iex.consts as iex_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.fetch_modes as fetch_modes
+import analysis_engine.shared_clients as shared_clients
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def build_ticker_chunks(
+        tickers,
+        chunk_size=None):
+    """build_ticker_chunks
+
+    Split a list of tickers into unique, upper-cased chunks
+
+    :param tickers: list of ticker symbols
+    :param chunk_size: optional - tickers per chunk
+        (default is ``FETCH_CHUNK_SIZE``)
+    """
+    if not chunk_size:
+        chunk_size = ae_consts.FETCH_CHUNK_SIZE
+    chunk_size = max(1, int(chunk_size))
+    unique_tickers = []
+    for ticker in tickers:
+        ticker = str(ticker).strip().upper()
+        if ticker and ticker not in unique_tickers:
+            unique_tickers.append(ticker)
+    return [
+        unique_tickers[idx:idx + chunk_size]
+        for idx in range(0, len(unique_tickers), chunk_size)
+    ]
+# end of build_ticker_chunks
+
+
+def build_chunk_requests(
+        work_dict,
+        tickers,
+        chunk_size=None):
+    """build_chunk_requests
+
+    Build one ``get_new_pricing_data_chunk`` request per chunk
+    of tickers from a ``get_new_pricing_data`` request
+
+    :param work_dict: ``build_get_new_pricing_request`` dictionary
+    :param tickers: list of ticker symbols
+    :param chunk_size: optional - tickers per chunk
+        (default is ``FETCH_CHUNK_SIZE``)
+    """
+    label = work_dict.get(
+        'label',
+        'fetch')
+    chunks = build_ticker_chunks(
+        tickers=tickers,
+        chunk_size=chunk_size)
+    chunk_reqs = []
+    for idx, chunk in enumerate(chunks):
+        chunk_req = copy.deepcopy(work_dict)
+        chunk_req.pop('ticker', None)
+        chunk_req['tickers'] = chunk
+        chunk_req['label'] = f'{label}-chunk-{idx}'
+        chunk_reqs.append(chunk_req)
+    return chunk_reqs
+# end of build_chunk_requests
+
+
+def build_ticker_request(
+        work_dict,
+        ticker,
+        date_str=None):
+    """build_ticker_request
+
+    Build the ``get_new_pricing_data`` request for one ticker
+    in a chunk with ``{TICKER}_{date}`` redis and S3 keys
+
+    :param work_dict: chunk request dictionary
+    :param ticker: ticker symbol
+    :param date_str: optional - date for the cache keys
+        (default is the last trading close date)
+    """
+    if not date_str:
+        date_str = ae_utils.get_last_close_str()
+    ticker_req = copy.deepcopy(work_dict)
+    ticker_req.pop('tickers', None)
+    ticker_req['ticker'] = ticker
+    ticker_req['label'] = f'{work_dict.get("label", "chunk")}-{ticker}'
+    ticker_req['s3_key'] = f'{ticker}_{date_str}'
+    ticker_req['redis_key'] = f'{ticker}_{date_str}'
+    ticker_req['celery_disabled'] = True
+    return ticker_req
+# end of build_ticker_request
+
+
+def fetch_iex_batch(
+        work_dict,
+        tickers,
+        date_str,
+        batch_func=None):
+    """fetch_iex_batch
+
+    Fetch and publish the IEX datasets for all ``tickers`` with
+    IEX Cloud batch requests and return a dictionary of
+    ``{ticker: {field: json-serialized DataFrame}}`` for the
+    per-ticker requests (``work_dict['iex_batch_data']``).
+    Returns an empty dictionary when the batch is disabled
+    (``FETCH_IEX_BATCH=0`` or ``work_dict['iex_batch'] = False``),
+    for backfills, without an IEX token or when the batch
+    request fails so the tickers fetch their own datasets.
+    The ``incremental`` ``daily`` and ``minute`` datasets are
+    left to the per-ticker fetches.
+
+    :param work_dict: chunk request dictionary
+    :param tickers: list of ticker symbols
+    :param date_str: date for the ``{TICKER}_{date}_{field}``
+        cache keys
+    :param batch_func: optional - function called with the batch
+        request (default is
+        ``analysis_engine.iex.get_data.get_batch_data_from_iex``)
+    """
+    label = work_dict.get(
+        'label',
+        'fetch_iex_batch')
+    if (
+            not tickers or
+            not work_dict.get('iex_batch', ae_consts.FETCH_IEX_BATCH) or
+            work_dict.get('backfill_date', None) or
+            not work_dict.get('iex_token', iex_consts.IEX_TOKEN)):
+        return {}
+    fetch_datasets = fetch_modes.get_fetch_datasets(
+        fetch_mode=work_dict.get(
+            'fetch_mode',
+            ae_consts.FETCH_MODE_ALL),
+        iex_datasets=work_dict.get(
+            'iex_datasets',
+            iex_consts.DEFAULT_FETCH_DATASETS),
+        label=label)
+    if not fetch_datasets['get_iex_data']:
+        return {}
+    fields = []
+    for ft_type in fetch_datasets['iex_datasets']:
+        field = iex_consts.get_ft_str(
+            ft_type=ft_type)
+        if work_dict.get('incremental', False) and field in [
+                'daily', 'minute']:
+            continue
+        if field not in fields:
+            fields.append(field)
+    if not fields:
+        return {}
+
+    if not batch_func:
+        # importing the publisher registers the celery tasks
+        # so only import it when fetching for real
+        import analysis_engine.iex.get_data as iex_data
+        batch_func = iex_data.get_batch_data_from_iex
+    batch_req = copy.deepcopy(work_dict)
+    batch_req['tickers'] = tickers
+    batch_req['fields'] = fields
+    batch_req['date'] = date_str
+    batch_req['label'] = f'{label}-iex-batch'
+    try:
+        batch_res = batch_func(
+            work_dict=batch_req)
+    except Exception as e:
+        batch_res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=f'failed batch with ex={e}',
+            rec={})
+    if batch_res['status'] != ae_consts.SUCCESS:
+        log.error(
+            f'{label} - IEX batch failed tickers={len(tickers)} '
+            f'fields={fields} - fetching per ticker '
+            f'err={batch_res["err"]}')
+        return {}
+    log.debug(
+        f'{label} - IEX batch tickers={len(tickers)} '
+        f'fields={fields}')
+    return batch_res['rec'].get('data', None) or {}
+# end of fetch_iex_batch
+
+
+def run_ticker(
+        fetch_func,
+        work_dict):
+    """run_ticker
+
+    Run the fetch for one ticker and convert any exception
+    into an ``ERR`` result
+
+    :param fetch_func: function called with ``work_dict``
+    :param work_dict: ticker request dictionary
+    """
+    try:
+        return fetch_func(
+            work_dict=work_dict)
+    except Exception as e:
+        return build_result.build_result(
+            status=ae_consts.ERR,
+            err=(
+                f'failed fetch ticker={work_dict["ticker"]} '
+                f'with ex={e}'),
+            rec={})
+# end of run_ticker
+
+
+def run_chunk(
+        work_dict,
+        fetch_func=None,
+        max_workers=None,
+        batch_func=None):
+    """run_chunk
+
+    Fetch and publish every ticker in ``work_dict['tickers']``
+    and return a summary result:
+
+    .. code-block:: python
+
+        {
+            'num_tickers': 50,
+            'num_success': 49,
+            'num_failed': 1,
+            'failed': ['XYZ'],
+            'tickers': {
+                'SPY': {
+                    'status': 'SUCCESS',
+                    'num_success': 13
+                }
+            }
+        }
+
+    :param work_dict: chunk request from ``build_chunk_requests``
+    :param fetch_func: optional - function called with each
+        ticker's ``work_dict`` (default is
+        ``get_new_pricing_data.run_get_new_pricing_data``)
+    :param max_workers: optional - tickers fetched at the same
+        time (default is ``work_dict['chunk_max_workers']``
+        or ``FETCH_CHUNK_MAX_WORKERS``)
+    :param batch_func: optional - IEX batch function passed to
+        ``fetch_iex_batch``
+    """
+    label = work_dict.get(
+        'label',
+        'run_chunk')
+    rec = {
+        'num_tickers': 0,
+        'num_success': 0,
+        'num_failed': 0,
+        'failed': [],
+        'tickers': {}
+    }
+
+    if not fetch_func:
+        # importing the task module registers the celery tasks
+        # so only import it when fetching for real
+        import analysis_engine.work_tasks.get_new_pricing_data as task_pricing
+        fetch_func = task_pricing.run_get_new_pricing_data
+    if not max_workers:
+        max_workers = work_dict.get(
+            'chunk_max_workers',
+            ae_consts.FETCH_CHUNK_MAX_WORKERS)
+
+    try:
+        tickers = work_dict.get('tickers', [])
+        date_str = work_dict.get(
+            'date',
+            None)
+        if not date_str:
+            date_str = ae_utils.get_last_close_str()
+        ticker_reqs = [
+            build_ticker_request(
+                work_dict=work_dict,
+                ticker=ticker,
+                date_str=date_str)
+            for ticker in tickers
+        ]
+        rec['num_tickers'] = len(ticker_reqs)
+        max_workers = max(1, min(int(max_workers), len(ticker_reqs) or 1))
+
+        log.debug(
+            f'{label} - fetching tickers={len(ticker_reqs)} '
+            f'max_workers={max_workers}')
+
+        with shared_clients.shared():
+            iex_batch_data = fetch_iex_batch(
+                work_dict=work_dict,
+                tickers=[t['ticker'] for t in ticker_reqs],
+                date_str=date_str,
+                batch_func=batch_func)
+            for ticker_req in ticker_reqs:
+                ticker_req['iex_batch_data'] = iex_batch_data.get(
+                    ticker_req['ticker'],
+                    None)
+            with concurrent.futures.ThreadPoolExecutor(
+                    max_workers=max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        run_ticker,
+                        fetch_func,
+                        ticker_req): ticker_req['ticker']
+                    for ticker_req in ticker_reqs
+                }
+                for future in concurrent.futures.as_completed(futures):
+                    ticker = futures[future]
+                    ticker_res = future.result()
+                    status = ticker_res.get(
+                        'status',
+                        ae_consts.NOT_SET)
+                    ticker_rec = ticker_res.get('rec', None) or {}
+                    rec['tickers'][ticker] = {
+                        'status': ae_consts.get_status(status=status),
+                        'num_success': ticker_rec.get('num_success', 0)
+                    }
+                    if status == ae_consts.SUCCESS:
+                        rec['num_success'] += 1
+                    else:
+                        rec['num_failed'] += 1
+                        rec['failed'].append(ticker)
+                        log.error(
+                            f'{label} - failed ticker={ticker} '
+                            f'err={ticker_res.get("err")}')
+                # end of for all tickers in completion order
+            # end of with executor
+        # end of with shared clients
+
+        rec['failed'] = sorted(rec['failed'])
+        status = ae_consts.SUCCESS
+        err = None
+        if rec['num_failed']:
+            status = ae_consts.ERR
+            err = (
+                f'failed tickers={len(rec["failed"])} '
+                f'{rec["failed"]}')
+        res = build_result.build_result(
+            status=status,
+            err=err,
+            rec=rec)
+    except Exception as e:
+        res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=(
+                f'failed - run_chunk '
+                f'label={label} with ex={e}'),
+            rec=rec)
+    # end of try/ex
+
+    log.debug(
+        f'{label} - done tickers={rec["num_tickers"]} '
+        f'success={rec["num_success"]} failed={rec["num_failed"]}')
+
+    return res
+# end of run_chunk
@@ -0,0 +1,179 @@
+"""
+Resolve a ``fetch_mode`` into the datafeeds and IEX datasets
+a ``get_new_pricing_data`` request fetches
+
+.. code-block:: python
+
+    import analysis_engine.fetch_modes as fetch_modes
+
+    fetch_datasets = fetch_modes.get_fetch_datasets(
+        fetch_mode='iex_day,iex_quote,td')
+    # {'get_iex_data': True, 'get_td_data': True,
+    #  'iex_datasets': ['daily', 'quote']}
+"""
+
+import analysis_engine.consts as ae_consts
+import analysis_engine.iex.consts as iex_consts
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def get_fetch_datasets(
+        fetch_mode,
+        iex_datasets=None,
+        label='get_fetch_datasets'):
+    """get_fetch_datasets
+
+    Return a dictionary with the ``get_iex_data`` and
+    ``get_td_data`` feed flags and the list of
+    ``iex_datasets`` to fetch for a ``fetch_mode``
+
+    :param fetch_mode: fetch mode enum or string like ``all``,
+        ``iex``, ``td`` or a comma-separated list of datasets
+        like ``iex_min,iex_news,td``
+    :param iex_datasets: optional - IEX datasets for fetch
+        modes that do not set their own (default is
+        ``DEFAULT_FETCH_DATASETS``)
+    :param label: optional - log label
+    """
+    if iex_datasets is None:
+        iex_datasets = iex_consts.DEFAULT_FETCH_DATASETS
+    str_fetch_mode = str(fetch_mode).lower()
+
+    # control flags to deal with feed issues:
+    get_iex_data = True
+    get_td_data = True
+
+    if (
+            fetch_mode == ae_consts.FETCH_MODE_ALL
+            or str_fetch_mode == 'initial'):
+        get_iex_data = True
+        get_td_data = True
+        iex_datasets = ae_consts.IEX_INITIAL_DATASETS
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_ALL
+            or str_fetch_mode == 'all'):
+        get_iex_data = True
+        get_td_data = True
+        iex_datasets = ae_consts.IEX_DATASETS_DEFAULT
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_YHO
+            or str_fetch_mode == 'yahoo'):
+        get_iex_data = False
+        get_td_data = False
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_IEX
+            or str_fetch_mode == 'iex-all'):
+        get_iex_data = True
+        get_td_data = False
+        iex_datasets = ae_consts.IEX_DATASETS_DEFAULT
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_IEX
+            or str_fetch_mode == 'iex'):
+        get_iex_data = True
+        get_td_data = False
+        iex_datasets = ae_consts.IEX_INTRADAY_DATASETS
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_INTRADAY
+            or str_fetch_mode == 'intra'):
+        get_iex_data = True
+        get_td_data = True
+        iex_datasets = ae_consts.IEX_INTRADAY_DATASETS
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_DAILY
+            or str_fetch_mode == 'daily'):
+        get_iex_data = True
+        get_td_data = False
+        iex_datasets = ae_consts.IEX_DAILY_DATASETS
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_WEEKLY
+            or str_fetch_mode == 'weekly'):
+        get_iex_data = True
+        get_td_data = False
+        iex_datasets = ae_consts.IEX_WEEKLY_DATASETS
+    elif (
+            fetch_mode == ae_consts.FETCH_MODE_TD
+            or str_fetch_mode == 'td'):
+        get_iex_data = False
+        get_td_data = True
+    else:
+        get_iex_data = False
+        get_td_data = False
+
+        fetch_arr = str_fetch_mode.split(',')
+        found_fetch = False
+        iex_datasets = []
+        for fetch_name in fetch_arr:
+            if fetch_name not in iex_datasets:
+                if fetch_name == 'iex_min':
+                    iex_datasets.append('minute')
+                elif fetch_name == 'min':
+                    iex_datasets.append('minute')
+                elif fetch_name == 'minute':
+                    iex_datasets.append('minute')
+                elif fetch_name == 'day':
+                    iex_datasets.append('daily')
+                elif fetch_name == 'daily':
+                    iex_datasets.append('daily')
+                elif fetch_name == 'iex_day':
+                    iex_datasets.append('daily')
+                elif fetch_name == 'quote':
+                    iex_datasets.append('quote')
+                elif fetch_name == 'iex_quote':
+                    iex_datasets.append('quote')
+                elif fetch_name == 'iex_stats':
+                    iex_datasets.append('stats')
+                elif fetch_name == 'stats':
+                    iex_datasets.append('stats')
+                elif fetch_name == 'peers':
+                    iex_datasets.append('peers')
+                elif fetch_name == 'iex_peers':
+                    iex_datasets.append('peers')
+                elif fetch_name == 'news':
+                    iex_datasets.append('news')
+                elif fetch_name == 'iex_news':
+                    iex_datasets.append('news')
+                elif fetch_name == 'fin':
+                    iex_datasets.append('financials')
+                elif fetch_name == 'iex_fin':
+                    iex_datasets.append('financials')
+                elif fetch_name == 'earn':
+                    iex_datasets.append('earnings')
+                elif fetch_name == 'iex_earn':
+                    iex_datasets.append('earnings')
+                elif fetch_name == 'div':
+                    iex_datasets.append('dividends')
+                elif fetch_name == 'iex_div':
+                    iex_datasets.append('dividends')
+                elif fetch_name == 'comp':
+                    iex_datasets.append('company')
+                elif fetch_name == 'iex_comp':
+                    iex_datasets.append('company')
+                elif fetch_name == 'td':
+                    get_td_data = True
+                else:
+                    log.warn(
+                        'unsupported IEX dataset '
+                        f'{fetch_name}')
+        found_fetch = (
+            len(iex_datasets) != 0)
+        if not found_fetch:
+            log.error(
+                f'{label} - unsupported '
+                f'fetch_mode={fetch_mode} value')
+        else:
+            get_iex_data = True
+            log.debug(
+                f'{label} - '
+                f'fetching={len(iex_datasets)} '
+                f'{iex_datasets} '
+                f'fetch_mode={fetch_mode}')
+    # end of screening custom fetch_mode settings
+
+    return {
+        'get_iex_data': get_iex_data,
+        'get_td_data': get_td_data,
+        'iex_datasets': iex_datasets
+    }
+# end of get_fetch_datasets
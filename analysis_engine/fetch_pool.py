@@ -0,0 +1,83 @@
+"""
+Run dataset fetches on a bounded thread pool and yield
+each result as soon as it finishes
+
+Each job is a dictionary with:
+
+.. code-block:: python
+
+    job = {
+        'provider': 'iex',
+        'func': iex_data.get_data_from_iex,
+        'work_dict': iex_req
+    }
+
+The ``func`` runs inside the provider's
+``analysis_engine.http_sessions.provider_slot`` so a slow
+or rate limited provider cannot starve the other feeds.
+"""
+
+import concurrent.futures
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.http_sessions as http_sessions
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def run_job(
+        job):
+    """run_job
+
+    Run one fetch job inside its provider's request slot and
+    convert any exception into an ``ERR`` result
+
+    :param job: job dictionary with ``provider``, ``func``
+        and ``work_dict`` keys
+    """
+    try:
+        with http_sessions.provider_slot(job['provider']):
+            return job['func'](
+                work_dict=job['work_dict'])
+    except Exception as e:
+        return build_result.build_result(
+            status=ae_consts.ERR,
+            err=(
+                f'failed fetch provider={job["provider"]} '
+                f'label={job["work_dict"].get("label")} with ex={e}'),
+            rec={})
+# end of run_job
+
+
+def run_fetch_jobs(
+        jobs,
+        max_workers=None):
+    """run_fetch_jobs
+
+    Generator that runs the ``jobs`` concurrently and yields
+    ``(job, result)`` tuples in completion order
+
+    :param jobs: list of job dictionaries
+    :param max_workers: optional - max threads
+        (default is ``FETCH_MAX_WORKERS``)
+    """
+    if not jobs:
+        return
+    if not max_workers:
+        max_workers = ae_consts.FETCH_MAX_WORKERS
+    max_workers = max(1, min(max_workers, len(jobs)))
+    if max_workers == 1:
+        for job in jobs:
+            yield job, run_job(job)
+        return
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(run_job, job): job
+            for job in jobs
+        }
+        for future in concurrent.futures.as_completed(futures):
+            yield futures[future], future.result()
+    # end of with executor
+# end of run_fetch_jobs
@@ -10,6 +10,7 @@ import requests
 import bs4
 import pandas as pd
 import analysis_engine.build_result as req_utils
+import analysis_engine.rate_limiter as rate_limiter
 from analysis_engine.utils import get_last_close_str
 from analysis_engine.consts import NOT_RUN
 from analysis_engine.consts import SUCCESS
@@ -77,7 +78,10 @@ def fetch_tickers_from_screener(
 
         log.info(f'{label} fetching url={url}')
 
-        response = requests.get(url)
+        response = rate_limiter.limited_get(
+            provider='finviz',
+            url=url,
+            session=requests)
 
         if response.status_code != requests.codes.ok:
             err = (
@@ -0,0 +1,130 @@
+"""
+Consume new minute bars and quote snapshots from the
+per-ticker `Redis Streams <https://redis.io/topics/streams-intro>`__
+written by ``analysis_engine.publish_to_stream``
+
+.. code-block:: python
+
+    import analysis_engine.get_bars_from_stream as stream_utils
+    for bar in stream_utils.get_bars_from_stream(
+            ticker='SPY',
+            dataset='minute'):
+        print(f'{bar["date"]} close={bar["close"]}')
+
+"""
+
+import json
+import redis
+import analysis_engine.consts as ae_consts
+import analysis_engine.publish_to_stream as publish_to_stream
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def get_bars_from_stream(
+        ticker,
+        dataset='minute',
+        client=None,
+        redis_address=None,
+        redis_db=None,
+        redis_password=None,
+        last_id='$',
+        block_ms=ae_consts.REDIS_STREAM_BLOCK_MS,
+        count=100,
+        max_bars=None,
+        max_empty_reads=None,
+        encoding='utf-8'):
+    """get_bars_from_stream
+
+    Generator that blocks on ``XREAD`` and yields each new
+    record dictionary from the ticker's dataset stream. Each
+    yielded record includes the stream entry id in the
+    ``stream_id`` key.
+
+    :param ticker: ticker symbol
+    :param dataset: optional - dataset stream name
+        (default is ``minute``)
+    :param client: optional - initialized redis client
+    :param redis_address: optional - redis address ``host:port``
+        (default is ``REDIS_ADDRESS``)
+    :param redis_db: optional - redis db (default is ``REDIS_DB``)
+    :param redis_password: optional - redis password
+        (default is ``REDIS_PASSWORD``)
+    :param last_id: optional - stream id to read after, use
+        ``0`` to replay the whole stream
+        (default is ``$`` for only new bars)
+    :param block_ms: optional - milliseconds to block per ``XREAD``
+        (default is ``REDIS_STREAM_BLOCK_MS``)
+    :param count: optional - max entries per ``XREAD``
+        (default is ``100``)
+    :param max_bars: optional - stop after yielding this many
+        records (default is ``None`` for no limit)
+    :param max_empty_reads: optional - stop after this many
+        consecutive ``XREAD`` calls returned nothing
+        (default is ``None`` for no limit)
+    :param encoding: optional - encoding for the stream fields
+    """
+    use_client = client
+    if not use_client:
+        use_address = redis_address
+        if not use_address:
+            use_address = ae_consts.REDIS_ADDRESS
+        use_db = redis_db
+        if use_db is None:
+            use_db = ae_consts.REDIS_DB
+        use_password = redis_password
+        if not use_password:
+            use_password = ae_consts.REDIS_PASSWORD
+        use_client = redis.Redis(
+            host=use_address.split(':')[0],
+            port=use_address.split(':')[-1],
+            password=use_password,
+            db=use_db)
+    # end of building a client
+
+    stream_key = publish_to_stream.build_stream_key(
+        ticker=ticker,
+        dataset=dataset)
+    cur_id = last_id
+    num_yielded = 0
+    num_empty = 0
+
+    while True:
+        response = use_client.xread(
+            {
+                stream_key: cur_id
+            },
+            count=count,
+            block=block_ms)
+        if not response:
+            num_empty += 1
+            if (
+                    max_empty_reads is not None and
+                    num_empty >= max_empty_reads):
+                return
+            continue
+        num_empty = 0
+
+        for stream_name, entries in response:
+            for entry_id, fields in entries:
+                cur_id = entry_id
+                data = fields.get(
+                    b'data',
+                    fields.get('data', None))
+                if hasattr(data, 'decode'):
+                    data = data.decode(encoding)
+                if hasattr(entry_id, 'decode'):
+                    entry_id = entry_id.decode(encoding)
+                record = json.loads(data)
+                record['stream_id'] = entry_id
+                yield record
+                num_yielded += 1
+                if (
+                        max_bars is not None and
+                        num_yielded >= max_bars):
+                    return
+            # end of for all entries
+        # end of for all streams
+    # end of while reading the stream
+# end of get_bars_from_stream
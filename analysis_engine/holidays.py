@@ -9,6 +9,10 @@ import datetime as dt
 import pandas.tseries.holiday as pd_holiday
 
 
+# formatted holiday strings by (year, fmt) for is_holiday
+HOLIDAY_STRS = {}
+
+
 class USTradingCalendar(
         pd_holiday.AbstractHolidayCalendar):
     """USTradingCalendar"""
@@ -56,6 +60,30 @@ def get_trading_close_holidays(
 # end of get_trading_close_holidays
 
 
+def get_holiday_strs(
+        year,
+        fmt='%Y-%m-%d'):
+    """get_holiday_strs
+
+    Get the cached set of the year's trading holidays formatted
+    with ``fmt``
+
+    :param year: year integer
+    :param fmt: optional - datetime.strftime formatter
+    """
+    key = (year, fmt)
+    holiday_strs = HOLIDAY_STRS.get(key, None)
+    if holiday_strs is None:
+        holiday_strs = {
+            d.strftime(fmt)
+            for d in get_trading_close_holidays(
+                year=year).to_list()
+        }
+        HOLIDAY_STRS[key] = holiday_strs
+    return holiday_strs
+# end of get_holiday_strs
+
+
 def is_holiday(
         date=None,
         date_str=None,
@@ -71,7 +99,6 @@ def is_holiday(
     :param date_str: optional - date string formatted with ``fmt``
     :param fmt: optional - datetime.strftime formatter
     """
-    cal_df = None
     use_date = dt.datetime.utcnow()
     if date:
         use_date = date
@@ -80,11 +107,7 @@ def is_holiday(
             use_date = dt.datetime.strptime(
                 date_str,
                 fmt)
-    cal_df = get_trading_close_holidays(
-        year=use_date.year)
-    use_date_str = use_date.strftime(fmt)
-    for d in cal_df.to_list():
-        if d.strftime(fmt) == use_date_str:
-            return True
-    return False
+    return use_date.strftime(fmt) in get_holiday_strs(
+        year=use_date.year,
+        fmt=fmt)
 # end of is_holiday
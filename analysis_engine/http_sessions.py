@@ -0,0 +1,153 @@
+"""
+Pooled keep-alive HTTP sessions and per-provider concurrency
+limits for the data feeds
+
+Each process builds one ``requests.Session`` per provider
+(``iex``, ``td``, ``finviz``) so repeated dataset fetches
+reuse TCP and TLS connections instead of opening a new
+connection per request. The
+``analysis_engine.url_helper.url_helper`` retry adapter
+is mounted on each session with a connection pool sized
+by ``HTTP_POOL_MAXSIZE``.
+
+Use ``provider_slot`` to bound the number of in-flight
+requests to a provider when fetching from multiple threads:
+
+.. code-block:: python
+
+    import analysis_engine.http_sessions as http_sessions
+
+    with http_sessions.provider_slot('iex'):
+        res = http_sessions.get_session('iex').get(url)
+
+**Supported Environment Variables**
+
+::
+
+    export FETCH_IEX_CONCURRENCY=4
+    export FETCH_TD_CONCURRENCY=2
+    export FETCH_FINVIZ_CONCURRENCY=1
+    export HTTP_POOL_MAXSIZE=10
+"""
+
+import contextlib
+import threading
+import analysis_engine.consts as ae_consts
+import analysis_engine.url_helper as url_helper
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+SESSIONS = {}
+PROVIDER_LIMITS = {}
+SESSION_LOCK = threading.Lock()
+
+
+def get_provider_concurrency(
+        provider):
+    """get_provider_concurrency
+
+    Get the max number of in-flight requests for a provider
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    """
+    return max(1, {
+        'iex': ae_consts.FETCH_IEX_CONCURRENCY,
+        'td': ae_consts.FETCH_TD_CONCURRENCY,
+        'finviz': ae_consts.FETCH_FINVIZ_CONCURRENCY
+    }.get(provider, ae_consts.FETCH_MAX_WORKERS))
+# end of get_provider_concurrency
+
+
+def get_session(
+        provider,
+        pool_maxsize=None):
+    """get_session
+
+    Get the pooled ``requests.Session`` for a provider
+    and build it on the first call
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    :param pool_maxsize: optional - max keep-alive
+        connections per host (default is ``HTTP_POOL_MAXSIZE``)
+    """
+    session = SESSIONS.get(provider)
+    if session:
+        return session
+    with SESSION_LOCK:
+        session = SESSIONS.get(provider)
+        if not session:
+            if not pool_maxsize:
+                pool_maxsize = max(
+                    ae_consts.HTTP_POOL_MAXSIZE,
+                    get_provider_concurrency(provider))
+            session = url_helper.url_helper(
+                pool_maxsize=pool_maxsize)
+            SESSIONS[provider] = session
+            log.debug(
+                f'built session provider={provider} '
+                f'pool_maxsize={pool_maxsize}')
+    return session
+# end of get_session
+
+
+def get_provider_limit(
+        provider):
+    """get_provider_limit
+
+    Get the ``threading.BoundedSemaphore`` that limits
+    concurrent requests to a provider
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    """
+    limit = PROVIDER_LIMITS.get(provider)
+    if limit:
+        return limit
+    with SESSION_LOCK:
+        limit = PROVIDER_LIMITS.get(provider)
+        if not limit:
+            limit = threading.BoundedSemaphore(
+                get_provider_concurrency(provider))
+            PROVIDER_LIMITS[provider] = limit
+    return limit
+# end of get_provider_limit
+
+
+@contextlib.contextmanager
+def provider_slot(
+        provider):
+    """provider_slot
+
+    Context manager that blocks until the ``provider``
+    has a free request slot
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    """
+    limit = get_provider_limit(provider)
+    limit.acquire()
+    try:
+        yield limit
+    finally:
+        limit.release()
+# end of provider_slot
+
+
+def close_sessions():
+    """close_sessions
+
+    Close all pooled sessions and reset the provider limits
+    """
+    with SESSION_LOCK:
+        for session in SESSIONS.values():
+            try:
+                session.close()
+            except Exception as e:
+                log.debug(f'failed closing session with ex={e}')
+        SESSIONS.clear()
+        PROVIDER_LIMITS.clear()
+# end of close_sessions
@@ -22,8 +22,9 @@ def build_auth_url(
         ``None``)
     """
     if token:
+        sep = '&' if '?' in url else '?'
         return (
-            f'{url}?token={token}')
+            f'{url}{sep}token={token}')
     else:
         return url
 # end of build_auth_url
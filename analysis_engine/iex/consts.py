@@ -20,6 +20,46 @@
         None)
     DEFAULT_FETCH_DATASETS="daily,minute,quote,stats,
     peers,news,financials,earnings,dividends,company"
+    IEX_BATCH_MAX_SYMBOLS = int(os.getenv(
+        'IEX_BATCH_MAX_SYMBOLS',
+        '100'))
+    IEX_INCREMENTAL_OVERLAP = int(os.getenv(
+        'IEX_INCREMENTAL_OVERLAP',
+        '1'))
+    IEX_INCREMENTAL_DAILY_KEY = os.getenv(
+        'IEX_INCREMENTAL_DAILY_KEY',
+        '{}_incremental_daily')
+    IEX_INCREMENTAL_STATE_SECONDS = int(os.getenv(
+        'IEX_INCREMENTAL_STATE_SECONDS',
+        '3888000'))
+
+**IEX Response Cache Environment Variables**
+
+.. code-block:: python
+
+    IEX_CACHE_ENABLED = os.getenv(
+        'IEX_CACHE_ENABLED',
+        '1') == '1'
+    IEX_CACHE_BACKEND = os.getenv(
+        'IEX_CACHE_BACKEND',
+        'disk')
+    IEX_CACHE_DIR = os.getenv(
+        'IEX_CACHE_DIR',
+        '/tmp/ae-iex-cache')
+    IEX_CACHE_KEY_PREFIX = os.getenv(
+        'IEX_CACHE_KEY_PREFIX',
+        'ae:iexcache')
+    # seconds to keep an entry for conditional requests
+    IEX_CACHE_ENTRY_SECONDS = int(os.getenv(
+        'IEX_CACHE_ENTRY_SECONDS',
+        '2592000'))
+    # freshness in seconds per endpoint
+    IEX_CACHE_TTL_FINANCIALS=86400
+    IEX_CACHE_TTL_EARNINGS=86400
+    IEX_CACHE_TTL_DIVIDENDS=86400
+    IEX_CACHE_TTL_COMPANY=604800
+    IEX_CACHE_TTL_PEERS=86400
+    IEX_CACHE_TTL_STATS=86400
 
 """
 
@@ -93,6 +133,72 @@ IEX_TOKEN = os.getenv(
 IEX_PROXIES = os.getenv(
     'IEX_PROXIES',
     None)
+# max symbols per /stock/market/batch request
+IEX_BATCH_MAX_SYMBOLS = int(os.getenv(
+    'IEX_BATCH_MAX_SYMBOLS',
+    '100'))
+# incremental fetches re-request this many of the last
+# cached bars to update a partial bar
+IEX_INCREMENTAL_OVERLAP = int(os.getenv(
+    'IEX_INCREMENTAL_OVERLAP',
+    '1'))
+# per-ticker redis key holding the merged daily bars so the
+# next day's incremental fetch only requests the new days
+IEX_INCREMENTAL_DAILY_KEY = os.getenv(
+    'IEX_INCREMENTAL_DAILY_KEY',
+    '{}_incremental_daily')
+# seconds to keep the per-ticker daily bars (45 days)
+IEX_INCREMENTAL_STATE_SECONDS = int(os.getenv(
+    'IEX_INCREMENTAL_STATE_SECONDS',
+    '3888000'))
+# response cache for the slow-changing fundamentals
+IEX_CACHE_ENABLED = os.getenv(
+    'IEX_CACHE_ENABLED',
+    '1') == '1'
+# disk or redis
+IEX_CACHE_BACKEND = os.getenv(
+    'IEX_CACHE_BACKEND',
+    'disk')
+IEX_CACHE_DIR = os.getenv(
+    'IEX_CACHE_DIR',
+    '/tmp/ae-iex-cache')
+IEX_CACHE_KEY_PREFIX = os.getenv(
+    'IEX_CACHE_KEY_PREFIX',
+    'ae:iexcache')
+# seconds to keep a cache entry for conditional requests (30 days)
+IEX_CACHE_ENTRY_SECONDS = int(os.getenv(
+    'IEX_CACHE_ENTRY_SECONDS',
+    '2592000'))
+IEX_CACHE_TTLS = {
+    'financials': int(os.getenv(
+        'IEX_CACHE_TTL_FINANCIALS',
+        '86400')),
+    'earnings': int(os.getenv(
+        'IEX_CACHE_TTL_EARNINGS',
+        '86400')),
+    'dividends': int(os.getenv(
+        'IEX_CACHE_TTL_DIVIDENDS',
+        '86400')),
+    'company': int(os.getenv(
+        'IEX_CACHE_TTL_COMPANY',
+        '604800')),
+    'peers': int(os.getenv(
+        'IEX_CACHE_TTL_PEERS',
+        '86400')),
+    'stats': int(os.getenv(
+        'IEX_CACHE_TTL_STATS',
+        '86400'))
+}
+# IEX Cloud message weights for each cached endpoint
+# used to report the credits saved by the cache
+IEX_CACHE_CREDITS = {
+    'financials': 5000,
+    'earnings': 1000,
+    'dividends': 10,
+    'company': 1,
+    'peers': 500,
+    'stats': 20
+}
 IEX_DATE_FIELDS = [
     'date',
     'EPSReportDate',
@@ -91,7 +91,6 @@ verbose logging. Here is an example:
 """
 
 import pandas as pd
-import analysis_engine.consts as ae_consts
 import analysis_engine.utils as ae_utils
 import analysis_engine.dataset_scrub_utils as dataset_utils
 import analysis_engine.iex.consts as iex_consts
@@ -105,6 +104,7 @@ def fetch_daily(
         ticker=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_daily
 
@@ -125,6 +125,9 @@ def fetch_daily(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -142,10 +145,11 @@ def fetch_daily(
             f'req={work_dict} '
             f'ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json)
 
@@ -188,6 +192,8 @@ def fetch_minute(
         backfill_date=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
+        format_dates=False,
         verbose=False):
     """fetch_minute
 
@@ -210,6 +216,12 @@ def fetch_minute(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
+    :param format_dates: optional - bool to return the
+        ``datetime64`` columns as the date strings stored
+        in the cache (default is ``False``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -250,10 +262,11 @@ def fetch_minute(
             f'last_close={last_close_to_use} '
             f'dates={dates}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json)
 
@@ -279,20 +292,16 @@ def fetch_minute(
     if not use_date:
         use_date = df['date'].iloc[-1].strftime('%Y-%m-%d')
 
-    new_minutes = dataset_utils.build_dates_from_df_col(
+    # dates stay datetime64 here and are converted to strings
+    # when the dataset is serialized for the cache with
+    # iex_helpers.format_datetime_columns
+    df['date'] = dataset_utils.build_datetimes_from_df_col(
         src_col='minute',
         use_date_str=use_date,
         df=df)
-    df['date'] = pd.to_datetime(
-        new_minutes,
-        format=ae_consts.COMMON_TICK_DATE_FORMAT)
-    # make sure dates are set as strings in the cache
-    df['date'] = df['date'].dt.strftime(
-        ae_consts.COMMON_TICK_DATE_FORMAT)
-    df.set_index(
-        [
-            'date'
-        ])
+    if format_dates:
+        return iex_helpers.format_datetime_columns(
+            df=df)
     return df
 # end of fetch_minute
 
@@ -301,6 +310,7 @@ def fetch_quote(
         ticker=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_quote
 
@@ -321,6 +331,9 @@ def fetch_quote(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -337,10 +350,11 @@ def fetch_quote(
             f'{label} - quote - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame([resp_json])
 
@@ -376,6 +390,7 @@ def fetch_stats(
         ticker=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_stats
 
@@ -396,6 +411,9 @@ def fetch_stats(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -412,10 +430,11 @@ def fetch_stats(
             f'{label} - stats - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame([resp_json])
 
@@ -451,6 +470,7 @@ def fetch_peers(
         ticker=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_peers
 
@@ -471,6 +491,9 @@ def fetch_peers(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -487,10 +510,11 @@ def fetch_peers(
             f'{label} - peers - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json)
 
@@ -527,6 +551,7 @@ def fetch_news(
         num_news=5,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_news
 
@@ -550,6 +575,9 @@ def fetch_news(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -568,10 +596,11 @@ def fetch_news(
             f'{label} - news - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json)
 
@@ -616,6 +645,7 @@ def fetch_financials(
         ticker=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_financials
 
@@ -636,6 +666,9 @@ def fetch_financials(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -652,10 +685,11 @@ def fetch_financials(
             f'{label} - fins - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json.get('financials', []))
 
@@ -691,6 +725,7 @@ def fetch_earnings(
         ticker=None,
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_earnings
 
@@ -711,6 +746,9 @@ def fetch_earnings(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -727,10 +765,11 @@ def fetch_earnings(
             f'{label} - earns - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json.get('earnings', []))
 
@@ -767,6 +806,7 @@ def fetch_dividends(
         timeframe='3m',
         work_dict=None,
         scrub_mode='sort-by-date',
+        resp_json=None,
         verbose=False):
     """fetch_dividends
 
@@ -790,6 +830,9 @@ def fetch_dividends(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -808,10 +851,11 @@ def fetch_dividends(
             f'{label} - divs - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame(resp_json)
 
@@ -847,6 +891,7 @@ def fetch_company(
         ticker=None,
         work_dict=None,
         scrub_mode='NO_SORT',
+        resp_json=None,
         verbose=False):
     """fetch_company
 
@@ -867,6 +912,9 @@ def fetch_company(
         used by the automation
     :param scrub_mode: optional - string
         type of scrubbing handler to run
+    :param resp_json: optional - already downloaded IEX
+        response to convert instead of calling the API
+        (used by ``fetch_batch``)
     :param verbose: optional - bool to log for debugging
     """
     label = None
@@ -883,10 +931,11 @@ def fetch_company(
             f'{label} - comp - url={use_url} '
             f'req={work_dict} ticker={ticker}')
 
-    resp_json = iex_helpers.get_from_iex(
-        url=use_url,
-        token=iex_consts.IEX_TOKEN,
-        verbose=verbose)
+    if resp_json is None:
+        resp_json = iex_helpers.get_from_iex(
+            url=use_url,
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
 
     df = pd.DataFrame([resp_json])
 
@@ -916,3 +965,199 @@ def fetch_company(
 
     return df
 # end of fetch_company
+
+
+def get_batch_type(
+        field,
+        timeframe='3m'):
+    """get_batch_type
+
+    Get the IEX batch ``types`` value, the ``range`` query
+    parameter and the fetch function that converts
+    the response for a dataset ``field``
+
+    :param field: dataset name like ``daily`` or ``quote``
+    :param timeframe: optional - dividend lookback period
+        (default is ``3m``)
+    """
+    batch_types = {
+        'daily': ('chart', '1m', fetch_daily),
+        'minute': ('chart', '1d', fetch_minute),
+        'quote': ('quote', None, fetch_quote),
+        'stats': ('stats', None, fetch_stats),
+        'peers': ('relevant', None, fetch_peers),
+        'news': ('news', None, fetch_news),
+        'financials': ('financials', None, fetch_financials),
+        'earnings': ('earnings', None, fetch_earnings),
+        'dividends': ('dividends', timeframe, fetch_dividends),
+        'company': ('company', None, fetch_company)
+    }
+    if field not in batch_types:
+        raise NotImplementedError(
+            f'unsupported IEX batch field={field}')
+    return batch_types[field]
+# end of get_batch_type
+
+
+def build_batch_urls(
+        tickers,
+        fields,
+        num_news=5,
+        timeframe='3m',
+        max_symbols=None):
+    """build_batch_urls
+
+    Build the ``/stock/market/batch`` urls for the
+    ``tickers`` and ``fields``. IEX applies one ``range``
+    per request so the daily chart, minute chart and
+    dividends each get their own request and the
+    remaining types ride along with the first one.
+    Returns a list of dictionaries with ``url``,
+    ``tickers`` and ``fields`` keys.
+
+    :param tickers: list of ticker strings
+    :param fields: list of dataset names
+    :param num_news: optional - int number of news
+        articles to fetch (default is ``5``)
+    :param timeframe: optional - dividend lookback period
+        (default is ``3m``)
+    :param max_symbols: optional - max symbols per request
+        (default is ``IEX_BATCH_MAX_SYMBOLS``)
+    """
+    if not max_symbols:
+        max_symbols = iex_consts.IEX_BATCH_MAX_SYMBOLS
+    groups = {}
+    for field in fields:
+        batch_type, batch_range, _ = get_batch_type(
+            field=field,
+            timeframe=timeframe)
+        groups.setdefault(batch_range, []).append(field)
+    ranged = [r for r in groups if r is not None]
+    if None in groups and ranged:
+        groups[ranged[0]] = groups[ranged[0]] + groups.pop(None)
+
+    batch_urls = []
+    symbols = [str(t).upper() for t in tickers]
+    for batch_range, group_fields in groups.items():
+        types = ','.join([
+            get_batch_type(
+                field=f,
+                timeframe=timeframe)[0]
+            for f in group_fields
+        ])
+        extra = ''
+        if batch_range:
+            extra += f'&range={batch_range}'
+        if 'news' in group_fields:
+            extra += f'&last={num_news}'
+        for idx in range(0, len(symbols), max_symbols):
+            chunk = symbols[idx:idx + max_symbols]
+            batch_urls.append({
+                'url': (
+                    f'/stock/market/batch?symbols={",".join(chunk)}'
+                    f'&types={types}{extra}'),
+                'tickers': chunk,
+                'fields': group_fields
+            })
+    # end of for all groups
+    return batch_urls
+# end of build_batch_urls
+
+
+def fetch_batch(
+        tickers,
+        fields,
+        work_dict=None,
+        num_news=5,
+        timeframe='3m',
+        max_symbols=None,
+        verbose=False):
+    """fetch_batch
+
+    Fetch multiple datasets for multiple tickers with the
+    IEX Cloud ``/stock/market/batch`` endpoint and split
+    the response into the same per-ticker
+    ``pandas.DataFrame`` objects the single-ticker
+    fetch functions return.
+
+    https://iexcloud.io/docs/api/#batch-requests
+
+    .. code-block:: python
+
+        import analysis_engine.iex.fetch_api as iex_fetch
+
+        dfs = iex_fetch.fetch_batch(
+            tickers=['SPY', 'AAPL'],
+            fields=['daily', 'quote', 'stats'])
+        print(dfs['SPY']['daily'])
+
+    Returns a dictionary of ``{ticker: {field: df}}``
+
+    .. note:: minute backfills (``backfill_date``) use
+        per-ticker date urls and are not supported
+        in batch mode
+
+    :param tickers: list of ticker strings
+    :param fields: list of dataset names
+    :param work_dict: dictionary of args
+        used by the automation
+    :param num_news: optional - int number of news
+        articles to fetch (default is ``5``)
+    :param timeframe: optional - dividend lookback period
+        (default is ``3m``)
+    :param max_symbols: optional - max symbols per request
+        (default is ``IEX_BATCH_MAX_SYMBOLS``)
+    :param verbose: optional - bool to log for debugging
+    """
+    label = None
+    if work_dict:
+        label = work_dict.get('label', None)
+
+    dfs = {
+        str(t).upper(): {}
+        for t in tickers
+    }
+    batch_urls = build_batch_urls(
+        tickers=tickers,
+        fields=fields,
+        num_news=num_news,
+        timeframe=timeframe,
+        max_symbols=max_symbols)
+    for batch in batch_urls:
+        if verbose:
+            log.info(
+                f'{label} - batch - url={batch["url"]} '
+                f'fields={batch["fields"]}')
+
+        resp_json = iex_helpers.get_from_iex(
+            url=batch['url'],
+            token=iex_consts.IEX_TOKEN,
+            verbose=verbose)
+
+        for ticker in batch['tickers']:
+            ticker_json = resp_json.get(ticker, {})
+            for field in batch['fields']:
+                batch_type, _, fetch_func = get_batch_type(
+                    field=field,
+                    timeframe=timeframe)
+                field_json = ticker_json.get(
+                    batch_type,
+                    None)
+                if field_json is None:
+                    dfs[ticker][field] = pd.DataFrame()
+                    continue
+                dfs[ticker][field] = fetch_func(
+                    ticker=ticker,
+                    resp_json=field_json,
+                    verbose=verbose)
+            # end of for all fields
+        # end of for all tickers in the response
+    # end of for all batch requests
+
+    if verbose:
+        log.info(
+            f'{label} - batch - requests={len(batch_urls)} '
+            f'tickers={len(dfs)} fields={fields}')
+
+    return dfs
+# end of fetch_batch
@@ -140,3 +140,50 @@ def fetch_data(
         raise NotImplementedError
     # end of supported fetchers
 # end of fetch_data
+
+
+def fetch_batch_data(
+        work_dict,
+        verbose=False):
+    """fetch_batch_data
+
+    Fetch multiple datasets for multiple tickers with one
+    IEX Cloud batch request per 100 tickers (and per chart
+    range). Returns a dictionary of
+    ``{ticker: {field: pandas.DataFrame}}``
+
+    Supported ``work_dict`` keys:
+
+    ::
+
+        work_dict['tickers'] = ['SPY', 'AAPL']
+        work_dict['fields'] = ['daily', 'quote', 'stats']
+        # enums work too
+        work_dict['fields'] = [iex_consts.FETCH_DAILY]
+
+    :param work_dict: dictionary of args for the IEX call
+    :param verbose: optional - boolean enable debug logging
+    """
+    tickers = work_dict.get(
+        'tickers',
+        [])
+    fields = [
+        iex_consts.get_ft_str(ft_type=f)
+        for f in work_dict.get(
+            'fields',
+            iex_consts.DEFAULT_FETCH_DATASETS)
+    ]
+
+    log.debug(
+        f'batch tickers={len(tickers)} fields={fields} '
+        f'label={work_dict.get("label", None)}')
+
+    return fetch_api.fetch_batch(
+        tickers=tickers,
+        fields=fields,
+        work_dict=work_dict,
+        num_news=int(work_dict.get('num_news', 5)),
+        timeframe=work_dict.get('timeframe', '3m'),
+        max_symbols=work_dict.get('max_symbols', None),
+        verbose=verbose)
+# end of fetch_batch_data
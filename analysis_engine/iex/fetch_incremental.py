@@ -0,0 +1,441 @@
+"""
+Incremental IEX daily and minute fetches that only request
+the bars newer than the last cached bar, merge them into
+the cached ``pandas.DataFrame`` and return the merged
+dataset for publishing
+
+.. code-block:: python
+
+    import analysis_engine.iex.fetch_incremental as iex_incremental
+
+    res = iex_incremental.fetch_incremental(
+        work_dict={
+            'ticker': 'SPY',
+            'field': 'minute',
+            'redis_address': 'localhost:6379',
+            'redis_db': 0,
+            'redis_key': 'SPY_2019-02-15_minute'
+        })
+    print(res['rec']['num_new'])
+    print(res['rec']['data'])
+
+How it works:
+
+#.  Load the cached dataset and find the last bar. Daily bars
+    are kept per ticker in ``IEX_INCREMENTAL_DAILY_KEY``
+    (``{TICKER}_incremental_daily``) so each day's fetch reuses
+    the previous day's bars even though the published
+    ``{TICKER}_{date}_daily`` key changes every day. Minute bars
+    are loaded from the ``redis_key``. Set
+    ``incremental_redis_key`` to use another key.
+#.  Request only the newer bars with ``chartLast``:
+
+    - minute - the minutes since the last cached bar on
+      the same trading day from ``/chart/1d``
+    - daily - the trading days since the last cached day
+      from ``/chart/5d`` or ``/chart/1m``
+
+    Without a cached dataset, a new trading day for
+    minute data or a gap larger than a month of daily
+    data, the full dataset is fetched
+#.  Merge the new bars into the cached bars, drop
+    duplicate dates keeping the newest bar and sort
+    by date
+#.  Store the merged daily bars in the per-ticker key for
+    ``IEX_INCREMENTAL_STATE_SECONDS``
+
+**Supported environment variables**
+
+::
+
+    # number of the last cached bars to fetch again
+    # to update a partial bar
+    export IEX_INCREMENTAL_OVERLAP=1
+    # per-ticker key format for the merged daily bars
+    export IEX_INCREMENTAL_DAILY_KEY={}_incremental_daily
+    # seconds to keep the per-ticker daily bars
+    export IEX_INCREMENTAL_STATE_SECONDS=3888000
+"""
+
+import json
+import zlib
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import analysis_engine.build_result as build_result
+import analysis_engine.build_df_from_redis as redis_df
+import analysis_engine.set_data_in_redis_key as redis_set
+import analysis_engine.shared_clients as shared_clients
+import analysis_engine.iex.consts as iex_consts
+import analysis_engine.iex.fetch_api as fetch_api
+import analysis_engine.iex.helpers_for_iex_api as iex_helpers
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+MINUTES_PER_SESSION = 390
+DAYS_PER_MONTH_CHART = 21
+
+
+def get_state_key(
+        work_dict,
+        field):
+    """get_state_key
+
+    Return the redis key an incremental fetch keeps its merged
+    bars in: the ``incremental_redis_key`` if it is set, the
+    per-ticker ``IEX_INCREMENTAL_DAILY_KEY`` for daily bars or
+    ``None`` for minute bars (they are only merged into the
+    ``redis_key`` of the same trading day)
+
+    :param work_dict: dictionary with the ``ticker``
+    :param field: ``minute`` or ``daily``
+    """
+    key = work_dict.get(
+        'incremental_redis_key',
+        None)
+    if key:
+        return key
+    ticker = work_dict.get('ticker', None)
+    if field == 'daily' and ticker:
+        return iex_consts.IEX_INCREMENTAL_DAILY_KEY.format(
+            str(ticker).upper())
+    return None
+# end of get_state_key
+
+
+def get_redis_client(
+        work_dict):
+    """get_redis_client
+
+    Get the shared redis client for the ``redis_address``,
+    ``redis_password`` and ``redis_db`` in ``work_dict``
+
+    :param work_dict: dictionary with the redis connection values
+    """
+    address = work_dict.get(
+        'redis_address',
+        ae_consts.REDIS_ADDRESS)
+    return shared_clients.get_redis_client(
+        host=address.split(':')[0],
+        port=int(address.split(':')[1]),
+        password=work_dict.get(
+            'redis_password',
+            ae_consts.REDIS_PASSWORD),
+        db=int(work_dict.get(
+            'redis_db',
+            ae_consts.REDIS_DB)))
+# end of get_redis_client
+
+
+def get_cached_bars(
+        work_dict,
+        client=None,
+        key=None,
+        verbose=False):
+    """get_cached_bars
+
+    Load the cached dataset for an incremental fetch from
+    redis and return it with a ``datetime64`` ``date`` column
+    or ``None`` if nothing is cached
+
+    :param work_dict: dictionary with ``redis_address``,
+        ``redis_db``, ``redis_password`` and
+        ``incremental_redis_key`` or ``redis_key``
+    :param client: optional - initialized redis client
+    :param key: optional - redis key to load (default is the
+        ``incremental_redis_key`` or the ``redis_key``)
+    :param verbose: optional - bool to log for debugging
+    """
+    if not key:
+        key = (
+            work_dict.get('incremental_redis_key', None) or
+            work_dict.get('redis_key', None))
+    if not key:
+        return None
+
+    res = redis_df.build_df_from_redis(
+        label=work_dict.get('label', 'incremental'),
+        client=client,
+        address=work_dict.get(
+            'redis_address',
+            ae_consts.REDIS_ADDRESS),
+        password=work_dict.get(
+            'redis_password',
+            ae_consts.REDIS_PASSWORD),
+        db=work_dict.get(
+            'redis_db',
+            ae_consts.REDIS_DB),
+        key=key,
+        verbose=verbose)
+    df = res['rec'].get('data', None)
+    if (
+            res['status'] != ae_consts.SUCCESS or
+            not hasattr(df, 'empty') or
+            df.empty or
+            'date' not in df):
+        return None
+
+    dates = pd.to_datetime(
+        df['date'],
+        errors='coerce')
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    return df.assign(date=dates).dropna(subset=['date'])
+# end of get_cached_bars
+
+
+def save_state_bars(
+        df,
+        key,
+        client,
+        expire=None,
+        label='incremental'):
+    """save_state_bars
+
+    Store the merged bars in the incremental state ``key``
+    with the same compressed json format as the published
+    datasets
+
+    :param df: merged ``pandas.DataFrame``
+    :param key: redis key
+    :param client: initialized redis client
+    :param expire: optional - seconds to keep the key (default
+        is ``IEX_INCREMENTAL_STATE_SECONDS``)
+    :param label: optional - log label
+    """
+    if expire is None:
+        expire = iex_consts.IEX_INCREMENTAL_STATE_SECONDS
+    data = iex_helpers.format_datetime_columns(
+        df=df).to_json(
+            orient='records',
+            date_format='iso')
+    return redis_set.set_data_in_redis_key(
+        label=label,
+        client=client,
+        key=key,
+        data=zlib.compress(json.dumps(data).encode('utf-8')),
+        expire=expire or None,
+        already_compressed=True)
+# end of save_state_bars
+
+
+def build_incremental_url(
+        ticker,
+        field,
+        last_date=None,
+        now=None,
+        overlap=None):
+    """build_incremental_url
+
+    Build the IEX url for the bars newer than ``last_date``
+    or return ``None`` when the full dataset needs
+    to be fetched
+
+    :param ticker: string ticker
+    :param field: ``minute`` or ``daily``
+    :param last_date: optional - date of the last cached bar
+    :param now: optional - current market time
+        (default is ``ae_utils.last_close()``)
+    :param overlap: optional - number of cached bars to
+        fetch again (default is
+        ``iex_consts.IEX_INCREMENTAL_OVERLAP``)
+    """
+    if last_date is None or pd.isnull(last_date):
+        return None
+    if overlap is None:
+        overlap = iex_consts.IEX_INCREMENTAL_OVERLAP
+    now = pd.Timestamp(now or ae_utils.last_close())
+    last_date = pd.Timestamp(last_date)
+
+    if field == 'minute':
+        if last_date.date() != now.date():
+            return None
+        num_bars = max(
+            int((now - last_date).total_seconds() // 60),
+            0) + overlap
+        if num_bars >= MINUTES_PER_SESSION:
+            return None
+        return f'/stock/{ticker}/chart/1d?chartLast={num_bars}'
+    elif field == 'daily':
+        num_bars = max(
+            int(np.busday_count(last_date.date(), now.date())),
+            0) + overlap
+        if num_bars > DAYS_PER_MONTH_CHART:
+            return None
+        chart_range = '5d' if num_bars <= 5 else '1m'
+        return (
+            f'/stock/{ticker}/chart/{chart_range}'
+            f'?chartLast={num_bars}')
+    else:
+        raise NotImplementedError(
+            f'incremental fetches do not support field={field}')
+# end of build_incremental_url
+
+
+def merge_bars(
+        cached_df,
+        new_df,
+        date_col='date'):
+    """merge_bars
+
+    Merge the newly fetched bars into the cached bars keeping
+    the newest bar for duplicate dates
+
+    :param cached_df: cached ``pandas.DataFrame`` or ``None``
+    :param new_df: newly fetched ``pandas.DataFrame``
+    :param date_col: optional - date column name
+        (default is ``date``)
+    """
+    if cached_df is None or cached_df.empty:
+        return new_df
+    if new_df is None or new_df.empty or date_col not in new_df:
+        return cached_df
+    merged_df = pd.concat(
+        [cached_df, new_df],
+        ignore_index=True,
+        sort=False)
+    return merged_df.drop_duplicates(
+        subset=[date_col],
+        keep='last').sort_values(
+            by=[date_col]).reset_index(drop=True)
+# end of merge_bars
+
+
+def fetch_incremental(
+        work_dict,
+        client=None,
+        now=None,
+        verbose=False):
+    """fetch_incremental
+
+    Fetch only the daily or minute bars newer than the cached
+    dataset and return the merged ``pandas.DataFrame`` in
+    a ``build_result`` dictionary:
+
+    .. code-block:: python
+
+        {
+            'data': merged_df,
+            'new_df': fetched_df,
+            'num_cached': 390,
+            'num_new': 2,
+            'cached_key': 'SPY_2019-02-15_minute',
+            'url': '/stock/SPY/chart/1d?chartLast=3'
+        }
+
+    :param work_dict: dictionary with the ``ticker``,
+        ``field`` (or ``ft_type``) and redis connection
+        values (see ``get_cached_bars``)
+    :param client: optional - initialized redis client
+    :param now: optional - current market time for testing
+    :param verbose: optional - bool to log for debugging
+    """
+    rec = {
+        'data': None,
+        'new_df': None,
+        'num_cached': 0,
+        'num_new': 0,
+        'cached_key': None,
+        'url': None
+    }
+    res = build_result.build_result(
+        status=ae_consts.NOT_RUN,
+        err=None,
+        rec=rec)
+
+    ticker = work_dict.get('ticker', None)
+    field = work_dict.get('field', None)
+    if field not in ['minute', 'daily']:
+        field = iex_consts.get_ft_str(
+            ft_type=work_dict.get('ft_type', None))
+    label = work_dict.get('label', f'incremental-{ticker}-{field}')
+
+    try:
+        fetch_func = fetch_api.fetch_minute
+        if field == 'daily':
+            fetch_func = fetch_api.fetch_daily
+        elif field != 'minute':
+            raise NotImplementedError(
+                f'incremental fetches do not support field={field}')
+
+        state_key = get_state_key(
+            work_dict=work_dict,
+            field=field)
+        if client is None:
+            client = get_redis_client(
+                work_dict=work_dict)
+        cached_df = None
+        for key in [state_key, work_dict.get('redis_key', None)]:
+            if key:
+                cached_df = get_cached_bars(
+                    work_dict=work_dict,
+                    client=client,
+                    key=key,
+                    verbose=verbose)
+            if cached_df is not None:
+                rec['cached_key'] = key
+                break
+        last_date = None
+        if cached_df is not None:
+            rec['num_cached'] = len(cached_df.index)
+            last_date = cached_df['date'].max()
+
+        rec['url'] = build_incremental_url(
+            ticker=ticker,
+            field=field,
+            last_date=last_date,
+            now=now)
+
+        if rec['url']:
+            resp_json = iex_helpers.get_from_iex(
+                url=rec['url'],
+                token=iex_consts.IEX_TOKEN,
+                verbose=verbose)
+            new_df = fetch_func(
+                ticker=ticker,
+                work_dict=work_dict,
+                resp_json=resp_json,
+                verbose=verbose)
+        else:
+            new_df = fetch_func(
+                ticker=ticker,
+                work_dict=work_dict,
+                verbose=verbose)
+        # end of fetching only the new bars or everything
+
+        rec['new_df'] = new_df
+        rec['data'] = merge_bars(
+            cached_df=cached_df,
+            new_df=new_df)
+        rec['num_new'] = len(rec['data'].index) - rec['num_cached']
+        if (
+                state_key and
+                state_key != work_dict.get('redis_key', None) and
+                not rec['data'].empty):
+            save_state_bars(
+                df=rec['data'],
+                key=state_key,
+                client=client,
+                label=label)
+
+        log.debug(
+            f'{label} - {ticker} {field} cached={rec["num_cached"]} '
+            f'last={last_date} new={rec["num_new"]} url={rec["url"]}')
+
+        res = build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+    except Exception as e:
+        res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=(
+                f'{label} - failed incremental fetch ticker={ticker} '
+                f'field={field} with ex={e}'),
+            rec=rec)
+    # end of try/ex
+
+    return res
+# end of fetch_incremental
@@ -14,10 +14,14 @@ import os
 import datetime
 import copy
 import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
 import analysis_engine.iex.consts as iex_consts
 import analysis_engine.build_result as build_result
 import analysis_engine.api_requests as api_requests
 import analysis_engine.iex.fetch_data as iex_fetch_data
+import analysis_engine.iex.fetch_incremental as iex_incremental
+import analysis_engine.iex.helpers_for_iex_api as iex_helpers
+import analysis_engine.iex.response_cache as iex_cache
 import analysis_engine.work_tasks.publish_pricing_update as publisher
 import spylunking.log.setup_logging as log_utils
 
@@ -30,6 +34,17 @@ def get_data_from_iex(
 
     Get data from IEX - this requires an account
 
+    Set ``work_dict['incremental'] = True`` to fetch only the
+    ``daily`` or ``minute`` bars newer than the cached dataset
+    with ``analysis_engine.iex.fetch_incremental`` and republish
+    the merged dataset. The publish is skipped when IEX returns
+    no new bars.
+
+    The slow-changing datasets are not published again when
+    ``analysis_engine.iex.response_cache`` returns the same
+    response that was already published to the same key and
+    ``rec['cache']`` is set to the cache status.
+
     :param work_dict: request dictionary
     """
     label = 'get_data_from_iex'
@@ -146,6 +161,11 @@ def get_data_from_iex(
                 f'orient={orient} fetch')
         # if invalid iex request
 
+        incremental = (
+            work_dict.get('incremental', False) and
+            not backfill_date and
+            iex_consts.get_ft_str(ft_type=ft_type) in ['daily', 'minute'])
+        skip_publish = False
         df = None
         try:
             if 'from' in work_dict:
@@ -166,10 +186,45 @@ def get_data_from_iex(
                 log.debug(
                     f'fetching IEX {field} req={iex_req}')
 
-            df = iex_fetch_data.fetch_data(
-                work_dict=iex_req,
-                fetch_type=ft_type,
-                verbose=verbose)
+            if incremental:
+                inc_req = copy.deepcopy(iex_req)
+                inc_req['field'] = iex_consts.get_ft_str(
+                    ft_type=ft_type)
+                if 'redis_key' in work_dict:
+                    inc_req['redis_key'] = (
+                        f'{work_dict["redis_key"]}_{inc_req["field"]}')
+                inc_req['incremental_redis_key'] = work_dict.get(
+                    'incremental_redis_key',
+                    None)
+                inc_res = iex_incremental.fetch_incremental(
+                    work_dict=inc_req,
+                    verbose=verbose)
+                if inc_res['status'] != ae_consts.SUCCESS:
+                    # keep the cached bars instead of publishing
+                    # an empty dataset over them
+                    skip_publish = True
+                    raise Exception(inc_res['err'])
+                df = inc_res['rec']['data']
+                rec['num_new'] = inc_res['rec']['num_new']
+                # the daily bars can come from the per-ticker
+                # state key so only skip publishing when the
+                # published key already has them
+                skip_publish = (
+                    inc_res['rec']['cached_key'] == inc_req.get(
+                        'redis_key', None) and
+                    len(inc_res['rec']['new_df'].index) == 0)
+            else:
+                iex_cache.set_last_state(None)
+                df = iex_fetch_data.fetch_data(
+                    work_dict=iex_req,
+                    fetch_type=ft_type,
+                    verbose=verbose)
+                cache_state = iex_cache.get_last_state()
+                if cache_state:
+                    rec['cache'] = cache_state['status']
+            if ft_type == iex_consts.FETCH_MINUTE or ft_str == 'minute':
+                df = iex_helpers.format_datetime_columns(
+                    df=df)
             rec['data'] = df.to_json(
                 orient=orient,
                 date_format='iso')
@@ -213,15 +268,36 @@ def get_data_from_iex(
                 f'{sk}_{use_field}')
 
         try:
-            update_res = publisher.run_publish_pricing_update(
-                work_dict=upload_and_cache_req)
-            update_status = update_res.get(
-                'status',
-                ae_consts.NOT_SET)
-            log.debug(
-                f'{label} publish update '
-                f'status={ae_consts.get_status(status=update_status)} '
-                f'data={update_res}')
+            cache_state = None
+            if rec['data'] and not incremental:
+                cache_state = iex_cache.get_last_state()
+            if cache_state and iex_cache.is_published(
+                    state=cache_state,
+                    publish_key=upload_and_cache_req.get('redis_key'),
+                    client=iex_incremental.get_redis_client(
+                        work_dict=upload_and_cache_req)):
+                log.debug(
+                    f'{label} - ticker={ticker} field={field} '
+                    f'unchanged {cache_state["status"]} - '
+                    f'skipping publish')
+            elif skip_publish:
+                log.debug(
+                    f'{label} - ticker={ticker} field={field} '
+                    f'no new bars - skipping publish')
+            else:
+                update_res = publisher.run_publish_pricing_update(
+                    work_dict=upload_and_cache_req)
+                update_status = update_res.get(
+                    'status',
+                    ae_consts.NOT_SET)
+                if update_status == ae_consts.SUCCESS:
+                    iex_cache.mark_published(
+                        state=cache_state,
+                        publish_key=upload_and_cache_req.get('redis_key'))
+                log.debug(
+                    f'{label} publish update '
+                    f'status={ae_consts.get_status(status=update_status)} '
+                    f'data={update_res}')
         except Exception:
             err = (
                 f'{label} - failed to upload iex '
@@ -259,3 +335,118 @@ def get_data_from_iex(
 
     return res
 # end of get_data_from_iex
+
+
+def get_batch_data_from_iex(
+        work_dict):
+    """get_batch_data_from_iex
+
+    Get multiple datasets for multiple tickers from the
+    IEX Cloud batch endpoint and publish each
+    ``{TICKER}_{date}_{field}`` dataset to the same
+    redis and S3 keys ``get_data_from_iex`` uses
+
+    Supported ``work_dict`` keys:
+
+    ::
+
+        work_dict['tickers'] = ['SPY', 'AAPL']
+        work_dict['fields'] = ['daily', 'quote', 'stats']
+        # optional - defaults to the last trading close date
+        work_dict['date'] = '2019-02-15'
+
+    Returns a result with ``rec['data']`` set to a dictionary
+    of ``{ticker: {field: json-serialized DataFrame}}``
+
+    :param work_dict: request dictionary
+    """
+    label = work_dict.get(
+        'label',
+        'get_batch_data_from_iex')
+    rec = {
+        'data': {},
+        'num_published': 0,
+        'updated': None
+    }
+    res = {
+        'status': ae_consts.NOT_RUN,
+        'err': None,
+        'rec': rec
+    }
+
+    try:
+        orient = work_dict.get('orient', 'records')
+        verbose = work_dict.get('verbose', False)
+        date_str = work_dict.get(
+            'date',
+            None)
+        if not date_str:
+            date_str = ae_utils.get_last_close_str()
+
+        dfs = iex_fetch_data.fetch_batch_data(
+            work_dict=work_dict,
+            verbose=verbose)
+        rec['updated'] = datetime.datetime.utcnow().strftime(
+            '%Y-%m-%d %H:%M:%S')
+
+        for ticker, ticker_dfs in dfs.items():
+            rec['data'][ticker] = {}
+            for field, df in ticker_dfs.items():
+                if field == 'minute':
+                    df = iex_helpers.format_datetime_columns(
+                        df=df)
+                data = df.to_json(
+                    orient=orient,
+                    date_format='iso')
+                rec['data'][ticker][field] = data
+                use_field = field
+                if use_field == 'news':
+                    use_field = 'news1'
+                publish_req = copy.deepcopy(work_dict)
+                publish_req.pop('tickers', None)
+                publish_req.pop('fields', None)
+                publish_req['ticker'] = ticker
+                publish_req['label'] = f'{label}-{ticker}-{field}'
+                publish_req['celery_disabled'] = True
+                publish_req['data'] = data or '{}'
+                publish_req['redis_key'] = (
+                    f'{ticker}_{date_str}_{use_field}')
+                publish_req['s3_key'] = (
+                    f'{ticker}_{date_str}_{use_field}')
+                try:
+                    update_res = publisher.run_publish_pricing_update(
+                        work_dict=publish_req)
+                    if update_res.get('status') == ae_consts.SUCCESS:
+                        rec['num_published'] += 1
+                except Exception as f:
+                    log.error(
+                        f'{label} - failed to publish '
+                        f'redis_key={publish_req["redis_key"]} '
+                        f'with ex={f}')
+                # end of try/ex to upload and cache
+            # end of for all fields
+        # end of for all tickers
+
+        res = build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+
+    except Exception as e:
+        res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=(
+                f'failed - get_batch_data_from_iex '
+                f'dict={work_dict} with ex={e}'),
+            rec=rec)
+    # end of try/ex
+
+    log.debug(
+        f'task - get_batch_data_from_iex done - '
+        f'{label} - '
+        f'status={ae_consts.get_status(res["status"])} '
+        f'published={rec["num_published"]} '
+        f'err={res["err"]}')
+
+    return res
+# end of get_batch_data_from_iex
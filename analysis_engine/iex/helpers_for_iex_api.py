@@ -16,6 +16,8 @@ import pandas as pd
 import analysis_engine.consts as ae_consts
 import analysis_engine.iex.consts as iex_consts
 import analysis_engine.iex.build_auth_url as iex_auth
+import analysis_engine.iex.response_cache as iex_cache
+import analysis_engine.rate_limiter as rate_limiter
 import spylunking.log.setup_logging as log_utils
 
 log = log_utils.build_colorized_logger(name=__name__)
@@ -47,36 +49,58 @@ def convert_datetime_columns(
     tcols = tcols or iex_consts.IEX_TIME_FIELDS
     ecols = ecols or iex_consts.IEX_EPOCH_FIELDS
 
-    for col in date_cols:
-        if col in df:
-            df[col] = pd.to_datetime(
-                df[col],
-                format=iex_consts.IEX_DATE_FORMAT,
-                errors='coerce')
+    conversions = [
+        (date_cols, {'format': iex_consts.IEX_DATE_FORMAT}),
+        (second_cols, {'format': iex_consts.IEX_TICK_FORMAT}),
+        (tcols, {'unit': 'ms'}),
+        (ecols, {'unit': 'ns'})
+    ]
 
-    for col in second_cols:
-        if col in df:
+    # a column can be listed in more than one group (``latestTime``
+    # and ``datetime``) - once it is a datetime64 column another
+    # ``pd.to_datetime`` pass returns the same values so skip it
+    for cols, convert_args in conversions:
+        for col in cols:
+            if col not in df:
+                continue
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                continue
             df[col] = pd.to_datetime(
                 df[col],
-                format=iex_consts.IEX_TICK_FORMAT,
-                errors='coerce')
-
-    for tcol in tcols:
-        if tcol in df:
-            df[tcol] = pd.to_datetime(
-                df[tcol],
-                unit='ms',
-                errors='coerce')
-
-    for ecol in ecols:
-        if ecol in df:
-            df[ecol] = pd.to_datetime(
-                df[ecol],
-                unit='ns',
-                errors='coerce')
+                errors='coerce',
+                **convert_args)
 # end of convert_datetime_columns
 
 
+def format_datetime_columns(
+        df,
+        cols=None,
+        date_format=ae_consts.COMMON_TICK_DATE_FORMAT):
+    """format_datetime_columns
+
+    Return a copy of the ``df`` with the ``datetime64`` columns
+    converted to date strings. The fetch functions keep dates as
+    ``datetime64`` and this is only called right before the
+    dataset is serialized for the cache.
+
+    :param df: ``pandas.DataFrame`` to format
+    :param cols: optional - list of columns to format
+        (default is ``['date']``)
+    :param date_format: optional - output date format
+        (default is ``ae_consts.COMMON_TICK_DATE_FORMAT``)
+    """
+    cols = cols or ['date']
+    formatted = {
+        col: df[col].dt.strftime(date_format)
+        for col in cols
+        if col in df and pd.api.types.is_datetime64_any_dtype(df[col])
+    }
+    if not formatted:
+        return df
+    return df.assign(**formatted)
+# end of format_datetime_columns
+
+
 def get_from_iex_v1(
         url,
         verbose=False):
@@ -90,8 +114,9 @@ def get_from_iex_v1(
     """
     url = (
         f'{iex_consts.IEX_URL_BASE_V1}{url}')
-    resp = requests.get(
-        urlparse(url).geturl(),
+    resp = rate_limiter.limited_get(
+        provider='iex',
+        url=urlparse.urlparse(url).geturl(),
         proxies=iex_consts.IEX_PROXIES)
     if resp.status_code == 200:
         res_data = resp.json()
@@ -130,8 +155,9 @@ def get_from_iex_cloud(
     """
     url = (
         f'{iex_consts.IEX_URL_BASE}{url}')
-    resp = requests.get(
-        url,
+    resp = rate_limiter.limited_get(
+        provider='iex',
+        url=url,
         proxies=iex_consts.IEX_PROXIES)
     if resp.status_code == requests.codes.OK:
         res_data = resp.json()
@@ -187,6 +213,38 @@ def handle_get_from_iex(
 # handle_get_from_iex
 
 
+def send_to_iex(
+        url,
+        token=None,
+        headers=None):
+    """send_to_iex
+
+    Send a rate limited request to the IEX Cloud (v2) or
+    the IEX Trading API (v1) depending on if the ``token``
+    argument is set and return the ``requests.Response``
+
+    :param url: IEX resource url
+    :param token: optional - string token for your user's
+        account
+    :param headers: optional - dictionary of request headers
+        like ``If-None-Match``
+    """
+    full_url = iex_auth.build_auth_url(
+        url=url,
+        token=token)
+    if token:
+        use_url = f'{iex_consts.IEX_URL_BASE}{full_url}'
+    else:
+        use_url = urlparse.urlparse(
+            f'{iex_consts.IEX_URL_BASE_V1}{full_url}').geturl()
+    return rate_limiter.limited_get(
+        provider='iex',
+        url=use_url,
+        headers=headers,
+        proxies=iex_consts.IEX_PROXIES)
+# end of send_to_iex
+
+
 def get_from_iex(
         url,
         token=None,
@@ -198,6 +256,12 @@ def get_from_iex(
     publishable API endpoint using a token
     as a query param on the http url.
 
+    The slow-changing ``financials``, ``earnings``,
+    ``dividends``, ``company``, ``peers`` and ``stats``
+    endpoints are served by
+    ``analysis_engine.iex.response_cache`` unless
+    ``IEX_CACHE_ENABLED=0``
+
     :param url: IEX resource url
     :param token: optional - string token for your user's
         account
@@ -205,6 +269,14 @@ def get_from_iex(
     :param verbose: optional - bool turn on logging
     """
 
+    if (iex_consts.IEX_CACHE_ENABLED and
+            iex_cache.get_endpoint(url=url)):
+        return iex_cache.get_with_cache(
+            url=url,
+            send_func=send_to_iex,
+            token=token,
+            verbose=verbose)
+
     full_url = iex_auth.build_auth_url(
         url=url,
         token=token)
@@ -0,0 +1,524 @@
+"""
+Conditional-request response cache for the slow-changing IEX
+datasets: ``financials``, ``earnings``, ``dividends``,
+``company``, ``peers`` and ``stats``
+
+``helpers_for_iex_api.get_from_iex`` sends these endpoints
+through ``get_with_cache`` which:
+
+1.  returns the cached response while it is younger than the
+    endpoint's ``IEX_CACHE_TTL_<ENDPOINT>`` without calling IEX
+2.  otherwise sends the request with ``If-None-Match`` and
+    ``If-Modified-Since`` headers when the last response had an
+    ``ETag`` or ``Last-Modified`` header and reuses the cached
+    response on a ``304 Not Modified``
+3.  stores a ``200`` response with its sha1 digest
+
+Entries are stored as json files in ``IEX_CACHE_DIR`` or in
+redis under ``IEX_CACHE_KEY_PREFIX`` with
+``IEX_CACHE_BACKEND=redis``. They expire
+``IEX_CACHE_ENTRY_SECONDS`` after the last response. The token
+is never part of the cache key.
+
+``get_data_from_iex`` uses ``get_last_state`` and
+``is_published`` to skip publishing a dataset that was already
+published to the same redis and S3 key with the same digest
+while that redis key still exists.
+
+.. code-block:: python
+
+    import analysis_engine.iex.response_cache as iex_cache
+    print(iex_cache.get_metrics())
+
+**Supported Environment Variables**
+
+::
+
+    export IEX_CACHE_ENABLED=1
+    export IEX_CACHE_BACKEND=disk
+    export IEX_CACHE_DIR=/tmp/ae-iex-cache
+    export IEX_CACHE_TTL_FINANCIALS=86400
+    export IEX_CACHE_ENTRY_SECONDS=2592000
+"""
+
+import os
+import json
+import time
+import hashlib
+import threading
+import redis
+import analysis_engine.consts as ae_consts
+import analysis_engine.iex.consts as iex_consts
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+METRICS = {}
+CACHE_LOCK = threading.Lock()
+CACHE_STATE = {
+    'client': None
+}
+LAST_STATE = threading.local()
+
+
+def get_endpoint(
+        url):
+    """get_endpoint
+
+    Return the cached endpoint name for an IEX resource url
+    like ``/stock/SPY/dividends/3m`` or ``None`` if the url
+    is not cached
+
+    :param url: IEX resource url
+    """
+    parts = url.split('?')[0].strip('/').split('/')
+    if len(parts) < 3 or parts[0] != 'stock':
+        return None
+    if parts[2] in iex_consts.IEX_CACHE_TTLS:
+        return parts[2]
+    return None
+# end of get_endpoint
+
+
+def get_cache_key(
+        url):
+    """get_cache_key
+
+    Build the cache key for an IEX resource url without
+    the ``token`` query parameter
+
+    :param url: IEX resource url
+    """
+    path, _, query = url.partition('?')
+    params = [
+        p for p in query.split('&')
+        if p and not p.startswith('token=')
+    ]
+    if params:
+        return f'{path}?{"&".join(params)}'
+    return path
+# end of get_cache_key
+
+
+def get_redis_client():
+    """get_redis_client
+
+    Get the shared redis client for ``IEX_CACHE_BACKEND=redis``
+    """
+    if not CACHE_STATE['client']:
+        host, port = ae_consts.REDIS_ADDRESS.split(':')
+        CACHE_STATE['client'] = redis.Redis(
+            host=host,
+            port=int(port),
+            password=ae_consts.REDIS_PASSWORD,
+            db=ae_consts.REDIS_DB)
+    return CACHE_STATE['client']
+# end of get_redis_client
+
+
+def get_storage_name(
+        key):
+    """get_storage_name
+
+    Hash a cache key into a file or redis key name
+
+    :param key: cache key from ``get_cache_key``
+    """
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+# end of get_storage_name
+
+
+def get_entry(
+        key,
+        backend=None,
+        now=None):
+    """get_entry
+
+    Load a cache entry dictionary or ``None``. Disk entries
+    older than ``IEX_CACHE_ENTRY_SECONDS`` are removed (redis
+    entries expire on their own).
+
+    :param key: cache key from ``get_cache_key``
+    :param backend: optional - ``disk`` or ``redis``
+        (default is ``IEX_CACHE_BACKEND``)
+    :param now: optional - epoch seconds for testing
+        (default is ``time.time()``)
+    """
+    backend = backend or iex_consts.IEX_CACHE_BACKEND
+    name = get_storage_name(key)
+    if backend == 'redis':
+        raw = get_redis_client().get(
+            f'{iex_consts.IEX_CACHE_KEY_PREFIX}:{name}')
+        if not raw:
+            return None
+        return json.loads(raw)
+    path = os.path.join(
+        iex_consts.IEX_CACHE_DIR,
+        f'{name}.json')
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r') as f:
+        entry = json.load(f)
+    max_age = iex_consts.IEX_CACHE_ENTRY_SECONDS
+    if max_age > 0 and (now or time.time()) - entry['fetched'] > max_age:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+    return entry
+# end of get_entry
+
+
+def set_entry(
+        key,
+        entry,
+        backend=None):
+    """set_entry
+
+    Store a cache entry dictionary. Disk entries are written
+    to a temp file and renamed so concurrent fetches never
+    read a partial entry.
+
+    :param key: cache key from ``get_cache_key``
+    :param entry: cache entry dictionary
+    :param backend: optional - ``disk`` or ``redis``
+        (default is ``IEX_CACHE_BACKEND``)
+    """
+    backend = backend or iex_consts.IEX_CACHE_BACKEND
+    name = get_storage_name(key)
+    if backend == 'redis':
+        get_redis_client().set(
+            f'{iex_consts.IEX_CACHE_KEY_PREFIX}:{name}',
+            json.dumps(entry),
+            ex=iex_consts.IEX_CACHE_ENTRY_SECONDS or None)
+        return
+    os.makedirs(
+        iex_consts.IEX_CACHE_DIR,
+        exist_ok=True)
+    path = os.path.join(
+        iex_consts.IEX_CACHE_DIR,
+        f'{name}.json')
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}'
+    with open(tmp_path, 'w') as f:
+        json.dump(entry, f)
+    os.replace(tmp_path, path)
+# end of set_entry
+
+
+def record_metric(
+        endpoint,
+        status,
+        bytes_saved=0):
+    """record_metric
+
+    Track the cache hits, ``304`` responses, misses and the
+    bytes and IEX credits saved for an endpoint
+
+    :param endpoint: cached endpoint name
+    :param status: ``hit``, ``not_modified`` or ``miss``
+    :param bytes_saved: optional - response bytes not downloaded
+    """
+    with CACHE_LOCK:
+        metric = METRICS.setdefault(endpoint, {
+            'requests': 0,
+            'hit': 0,
+            'not_modified': 0,
+            'miss': 0,
+            'bytes_saved': 0,
+            'credits_saved': 0
+        })
+        metric['requests'] += 1
+        metric[status] += 1
+        metric['bytes_saved'] += bytes_saved
+        if status == 'hit':
+            metric['credits_saved'] += iex_consts.IEX_CACHE_CREDITS.get(
+                endpoint,
+                0)
+# end of record_metric
+
+
+def get_metrics(
+        endpoint=None):
+    """get_metrics
+
+    Return the cache metrics for one endpoint or a
+    dictionary of all endpoints with a ``total`` entry:
+
+    .. code-block:: python
+
+        {
+            'requests': 6,
+            'hit': 4,
+            'not_modified': 1,
+            'miss': 1,
+            'bytes_saved': 51200,
+            'credits_saved': 6020
+        }
+
+    Only ``hit`` responses count as saved credits because a
+    conditional request still reaches IEX
+
+    :param endpoint: optional - cached endpoint name
+    """
+    with CACHE_LOCK:
+        if endpoint:
+            return dict(METRICS.get(endpoint, {}))
+        metrics = {
+            name: dict(metric)
+            for name, metric in METRICS.items()
+        }
+    total = {}
+    for metric in metrics.values():
+        for k, v in metric.items():
+            total[k] = total.get(k, 0) + v
+    metrics['total'] = total
+    return metrics
+# end of get_metrics
+
+
+def reset_metrics():
+    """reset_metrics
+
+    Clear the cache metrics
+    """
+    with CACHE_LOCK:
+        METRICS.clear()
+# end of reset_metrics
+
+
+def set_last_state(
+        state):
+    """set_last_state
+
+    Save the cache state of the last cached request made
+    by this thread
+
+    :param state: state dictionary or ``None``
+    """
+    LAST_STATE.state = state
+# end of set_last_state
+
+
+def get_last_state():
+    """get_last_state
+
+    Return the cache state of the last cached request made by
+    this thread or ``None``:
+
+    .. code-block:: python
+
+        {
+            'key': '/stock/SPY/financials',
+            'endpoint': 'financials',
+            'status': 'hit',
+            'digest': 'sha1 of the response body'
+        }
+    """
+    return getattr(LAST_STATE, 'state', None)
+# end of get_last_state
+
+
+def is_published(
+        state,
+        publish_key,
+        backend=None,
+        client=None):
+    """is_published
+
+    Return ``True`` if the response in ``state`` was already
+    published to ``publish_key`` and the ``publish_key`` still
+    exists in redis (it may have expired or been flushed since)
+
+    :param state: state from ``get_last_state``
+    :param publish_key: redis key the dataset is published to
+    :param backend: optional - ``disk`` or ``redis``
+        (default is ``IEX_CACHE_BACKEND``)
+    :param client: optional - redis client the dataset is
+        published with (default is the cache's redis client)
+    """
+    if not state or state['status'] == 'miss' or not publish_key:
+        return False
+    try:
+        entry = get_entry(
+            key=state['key'],
+            backend=backend)
+    except Exception as e:
+        log.error(
+            f'failed to load iex cache key={state["key"]} ex={e}')
+        return False
+    if not entry:
+        return False
+    if (
+            entry.get('published_key') != publish_key or
+            entry.get('published_digest') != state['digest']):
+        return False
+    try:
+        return bool((client or get_redis_client()).exists(publish_key))
+    except Exception as e:
+        log.error(
+            f'failed to check published key={publish_key} ex={e}')
+        return False
+# end of is_published
+
+
+def mark_published(
+        state,
+        publish_key,
+        backend=None):
+    """mark_published
+
+    Record that the response in ``state`` was published
+    to ``publish_key``
+
+    :param state: state from ``get_last_state``
+    :param publish_key: redis key the dataset was published to
+    :param backend: optional - ``disk`` or ``redis``
+        (default is ``IEX_CACHE_BACKEND``)
+    """
+    if not state:
+        return
+    try:
+        entry = get_entry(
+            key=state['key'],
+            backend=backend)
+        if not entry or entry['digest'] != state['digest']:
+            return
+        entry['published_key'] = publish_key
+        entry['published_digest'] = state['digest']
+        set_entry(
+            key=state['key'],
+            entry=entry,
+            backend=backend)
+    except Exception as e:
+        log.error(
+            f'failed to mark iex cache key={state["key"]} '
+            f'published ex={e}')
+# end of mark_published
+
+
+def get_with_cache(
+        url,
+        send_func,
+        token=None,
+        backend=None,
+        now=None,
+        verbose=False):
+    """get_with_cache
+
+    Return the json response for a cached IEX endpoint from
+    the cache while it is fresh or with a conditional request
+
+    :param url: IEX resource url
+    :param send_func: function called with ``url``, ``token``
+        and ``headers`` that returns a ``requests.Response``
+        (``helpers_for_iex_api.send_to_iex``)
+    :param token: optional - IEX token
+    :param backend: optional - ``disk`` or ``redis``
+        (default is ``IEX_CACHE_BACKEND``)
+    :param now: optional - epoch seconds for testing
+        (default is ``time.time()``)
+    :param verbose: optional - bool turn on logging
+    """
+    endpoint = get_endpoint(url=url)
+    key = get_cache_key(url=url)
+    now = now or time.time()
+    set_last_state(None)
+
+    entry = None
+    try:
+        entry = get_entry(
+            key=key,
+            backend=backend,
+            now=now)
+    except Exception as e:
+        log.error(
+            f'failed to load iex cache key={key} ex={e}')
+
+    state = {
+        'key': key,
+        'endpoint': endpoint,
+        'status': 'hit',
+        'digest': None
+    }
+    if entry:
+        state['digest'] = entry['digest']
+        age = now - entry['fetched']
+        if age < iex_consts.IEX_CACHE_TTLS[endpoint]:
+            if verbose:
+                log.info(
+                    f'iex cache hit key={key} age={int(age)}s')
+            record_metric(
+                endpoint=endpoint,
+                status='hit',
+                bytes_saved=entry['size'])
+            set_last_state(state)
+            return entry['data']
+    # end of fresh cache hit
+
+    headers = {}
+    if entry and entry.get('etag'):
+        headers['If-None-Match'] = entry['etag']
+    if entry and entry.get('last_modified'):
+        headers['If-Modified-Since'] = entry['last_modified']
+
+    resp = send_func(
+        url=url,
+        token=token,
+        headers=headers or None)
+
+    if entry and resp.status_code == 304:
+        state['status'] = 'not_modified'
+        entry['fetched'] = now
+        record_metric(
+            endpoint=endpoint,
+            status='not_modified',
+            bytes_saved=entry['size'])
+    elif resp.status_code == 200:
+        body = resp.content
+        digest = hashlib.sha1(body).hexdigest()
+        if entry and entry['digest'] == digest:
+            # same response without a 304 - keep the
+            # published markers so the publish is skipped
+            state['status'] = 'not_modified'
+            entry['fetched'] = now
+        else:
+            state['status'] = 'miss'
+            entry = {
+                'url': key,
+                'fetched': now,
+                'digest': digest,
+                'size': len(body),
+                'data': resp.json()
+            }
+        entry['etag'] = resp.headers.get('ETag', None)
+        entry['last_modified'] = resp.headers.get('Last-Modified', None)
+        record_metric(
+            endpoint=endpoint,
+            status=state['status'])
+        state['digest'] = digest
+    else:
+        raise Exception(
+            f'Failed to get data from IEX with '
+            f'function=get_with_cache '
+            f'url={key} which sent '
+            f'response {resp.status_code} - {resp.text}')
+    # end of handling the response
+
+    if verbose:
+        log.info(
+            f'iex cache {state["status"]} key={key} '
+            f'status_code={resp.status_code}')
+
+    try:
+        set_entry(
+            key=key,
+            entry=entry,
+            backend=backend)
+    except Exception as e:
+        log.error(
+            f'failed to save iex cache key={key} ex={e}')
+    set_last_state(state)
+    return entry['data']
+# end of get_with_cache
@@ -0,0 +1,989 @@
+"""
+Sharded indicator precomputation with a sequential trade replay
+
+Trading state is sequential, but the indicators (the dominant
+cost of a minute backtest) only depend on the price history
+each step sees. ``run_sharded_backtest`` splits a backtest into
+two passes:
+
+1. **Precompute** - every indicator step is assigned to one of
+   ``num_shards`` contiguous shards. Each shard only carries
+   the rows it needs plus a warm-up overlap equal to the
+   largest indicator lookback (``lookback`` or ``num_points``
+   in the indicator config) before its first step. The shards
+   run on a local process pool or as
+   ``analysis_engine.work_tasks.compute_indicator_shard`` Celery
+   tasks and store each step's indicator reports and buy/sell
+   actions as compact column arrays (the
+   ``analysis_engine.algo_result_store`` ``npz`` format).
+2. **Replay** - the algorithm runs ``handle_data`` as usual
+   with a ``ReplayIndicatorProcessor`` that returns the
+   precomputed report for each step instead of running the
+   indicators, so the buys, sells, positions, balance and
+   ``Trading History`` match a single-process ``BaseAlgo`` run.
+
+.. code-block:: python
+
+    import analysis_engine.indicator_shards as indicator_shards
+    algo = indicator_shards.run_sharded_backtest(
+        algo=algo,
+        data=data,
+        num_shards=8,
+        max_workers=4)
+    print(algo.get_result())
+
+.. note:: a step that was not precomputed (for example a
+    custom dataset loaded during the run) runs the indicators
+    in the replay pass. Indicators without a ``lookback`` or
+    ``num_points`` get the full history before each shard.
+    ``process()`` methods that read the indicator objects
+    instead of ``self.latest_ind_report`` are not supported
+    in the replay pass.
+
+**Supported environment variables**
+
+::
+
+    # number of shards for run_algo (0 turns sharding off)
+    export INDICATOR_SHARDS=0
+    # local processes for the shards when celery is disabled
+    export INDICATOR_SHARD_MAX_WORKERS=4
+    export INDICATOR_SHARD_KEY_PREFIX=ae:indshard
+    # seconds before shard inputs and outputs expire in redis
+    export INDICATOR_SHARD_EXPIRE=3600
+    # seconds to wait for a compute_indicator_shard task before
+    # computing the shard locally
+    export INDICATOR_SHARD_TIMEOUT=600
+"""
+
+import json
+import time
+import uuid
+import concurrent.futures
+import celery.exceptions
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.algo_result_store as algo_result_store
+import analysis_engine.indicators.indicator_processor as ind_processor
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+ACTION_CODES = {
+    ae_consts.INDICATOR_BUY: 1,
+    ae_consts.INDICATOR_SELL: 2
+}
+DAILY_STEP = -1
+INDEX_COLUMN = '__index__'
+
+
+def get_lookback(
+        config_dict):
+    """get_lookback
+
+    Get the largest indicator lookback in rows from the
+    ``lookback`` or ``num_points`` of each indicator. Returns
+    ``None`` if any indicator has neither (full history).
+
+    :param config_dict: algorithm config dictionary
+    """
+    lookback = 0
+    for node in config_dict.get('indicators', []):
+        value = node.get(
+            'lookback',
+            node.get('num_points', None))
+        if value is None:
+            return None
+        lookback = max(lookback, int(value))
+    return lookback
+# end of get_lookback
+
+
+def get_step_key(
+        ticker,
+        dataset,
+        timeseries_value):
+    """get_step_key
+
+    Build the key for one indicator step: the ticker, the dataset
+    node id and the number of minute rows the step sees
+    (``-1`` for daily steps)
+
+    :param ticker: ticker symbol
+    :param dataset: dataset node passed to the indicators
+    :param timeseries_value: ``ALGO_TIMESERIES_DAY`` or
+        ``ALGO_TIMESERIES_MINUTE``
+    """
+    num_rows = DAILY_STEP
+    if timeseries_value != ae_consts.ALGO_TIMESERIES_DAY:
+        df = dataset['data'].get('minute', None)
+        num_rows = len(df.index) if hasattr(df, 'index') else 0
+    return (ticker, str(dataset.get('id', None)), num_rows)
+# end of get_step_key
+
+
+def build_steps(
+        data,
+        tickers,
+        timeseries_value):
+    """build_steps
+
+    List every indicator step ``BaseAlgo.handle_data`` runs for
+    the ``data`` in order. Minute steps follow
+    ``handle_minute_dataset``: one step per minute row from the
+    node's ``start_row`` with the rows up to that minute.
+
+    :param data: algorithm dataset dictionary keyed by ticker
+    :param tickers: tickers the algorithm supports
+    :param timeseries_value: ``ALGO_TIMESERIES_DAY`` or
+        ``ALGO_TIMESERIES_MINUTE``
+    """
+    steps = []
+    for ticker in tickers:
+        if ticker not in data:
+            continue
+        for node_idx, node in enumerate(data[ticker]):
+            node_id = str(node.get('id', None))
+            if timeseries_value == ae_consts.ALGO_TIMESERIES_DAY:
+                steps.append((ticker, node_idx, node_id, DAILY_STEP))
+                continue
+            df = node['data'].get('minute', None)
+            if not hasattr(df, 'index') or 'date' not in df:
+                continue
+            num_rows = len(df.index)
+            start_row = node.get('start_row', 0)
+            for minute_idx, minute_date in zip(
+                    df.index[start_row:],
+                    df['date'].iloc[start_row:].tolist()):
+                if not minute_date:
+                    break
+                steps.append((
+                    ticker,
+                    node_idx,
+                    node_id,
+                    min(max(minute_idx + 1, 0), num_rows)))
+        # end of for all nodes
+    # end of for all tickers
+    return steps
+# end of build_steps
+
+
+def build_shards(
+        steps,
+        num_shards,
+        lookback):
+    """build_shards
+
+    Split the steps into contiguous shards. Each shard has one
+    segment per dataset node with the minute rows to ship:
+    ``start_row`` is the first step's row minus the ``lookback``
+    warm-up overlap.
+
+    :param steps: list from ``build_steps``
+    :param num_shards: number of shards
+    :param lookback: rows of warm-up from ``get_lookback``
+    """
+    num_shards = max(1, min(int(num_shards), len(steps)))
+    if not steps:
+        return []
+    shard_size = -(-len(steps) // num_shards)
+    shards = []
+    for shard_idx, first in enumerate(range(0, len(steps), shard_size)):
+        segments = []
+        for ticker, node_idx, node_id, num_rows in steps[
+                first:first + shard_size]:
+            if (not segments or
+                    segments[-1]['ticker'] != ticker or
+                    segments[-1]['node_idx'] != node_idx):
+                segments.append({
+                    'ticker': ticker,
+                    'node_idx': node_idx,
+                    'id': node_id,
+                    'rows': []
+                })
+            segments[-1]['rows'].append(num_rows)
+        for segment in segments:
+            first_row = min(segment['rows'])
+            segment['start_row'] = 0
+            if first_row > 0 and lookback is not None:
+                segment['start_row'] = max(0, first_row - 1 - lookback)
+            segment['end_row'] = max(segment['rows'])
+        shards.append({
+            'shard': shard_idx,
+            'num_steps': len(steps[first:first + shard_size]),
+            'segments': segments
+        })
+    # end of for all shards
+    return shards
+# end of build_shards
+
+
+def trim_df(
+        df,
+        start_row,
+        end_row):
+    """trim_df
+
+    Slice rows ``start_row`` to ``end_row`` of a
+    ``pandas.DataFrame`` (any other value is returned as is)
+
+    :param df: dataset value
+    :param start_row: first row
+    :param end_row: end row (``None`` for the last row)
+    """
+    if not hasattr(df, 'iloc'):
+        return df
+    return df.iloc[start_row:end_row]
+# end of trim_df
+
+
+def build_shard_input(
+        data,
+        shard,
+        lookback):
+    """build_shard_input
+
+    Build the dataset nodes a shard needs. The ``minute`` rows
+    are trimmed to the segment rows with the warm-up overlap and
+    the ``daily`` rows to the last ``lookback + 1`` rows.
+
+    :param data: algorithm dataset dictionary keyed by ticker
+    :param shard: shard from ``build_shards``
+    :param lookback: rows of warm-up from ``get_lookback``
+    """
+    nodes = []
+    for segment in shard['segments']:
+        node = data[segment['ticker']][segment['node_idx']]
+        node_data = dict(node['data'])
+        minute_df = node_data.get('minute', None)
+        if segment['end_row'] == DAILY_STEP:
+            if lookback is not None and hasattr(minute_df, 'iloc'):
+                node_data['minute'] = minute_df.iloc[-(lookback + 1):]
+        else:
+            node_data['minute'] = trim_df(
+                df=minute_df,
+                start_row=segment['start_row'],
+                end_row=segment['end_row'])
+        if lookback is not None:
+            daily_df = node_data.get('daily', None)
+            if hasattr(daily_df, 'iloc'):
+                node_data['daily'] = daily_df.iloc[-(lookback + 1):]
+        nodes.append({
+            'id': node.get('id', None),
+            'date': node.get('date', None),
+            'data': node_data
+        })
+    # end of for all segments
+    return nodes
+# end of build_shard_input
+
+
+def build_column(
+        values):
+    """build_column
+
+    Build a column that keeps the python types of the report
+    values through ``algo_result_store.encode_frame``
+
+    :param values: list of report values
+    """
+    types = set(type(v) for v in values)
+    if types == {float}:
+        return np.array(values, dtype=np.float64)
+    if types == {int}:
+        return np.array(values, dtype=np.int64)
+    if types == {bool}:
+        return np.array(values, dtype=bool)
+    return pd.Series(values, dtype=object)
+# end of build_column
+
+
+def compute_shard(
+        config_dict,
+        shard,
+        nodes,
+        lookback,
+        label='shard'):
+    """compute_shard
+
+    Run the indicators for every step in a shard and return the
+    encoded reports
+
+    :param config_dict: algorithm config dictionary
+    :param shard: shard from ``build_shards``
+    :param nodes: dataset nodes from ``build_shard_input``
+    :param lookback: rows of warm-up from ``get_lookback``
+    :param label: optional - log label
+    """
+    start_time = time.time()
+    iproc = ind_processor.IndicatorProcessor(
+        config_dict=config_dict,
+        label=f'{label}-{shard["shard"]}')
+    ind_ids = list(iproc.get_indicators())
+    num_cells = len(ind_ids)
+    step_tickers = []
+    step_ids = []
+    step_rows = []
+    actions = [[] for _ in range(num_cells)]
+    cell_keys = [{} for _ in range(num_cells)]
+    cell_values = [[] for _ in range(num_cells)]
+    for segment, node in zip(shard['segments'], nodes):
+        minute_df = node['data'].get('minute', None)
+        for num_rows in segment['rows']:
+            step_node = node
+            if num_rows != DAILY_STEP:
+                window_start = 0
+                if lookback is not None:
+                    window_start = max(0, num_rows - 1 - lookback)
+                step_data = dict(node['data'])
+                step_data['minute'] = minute_df.iloc[
+                    window_start - segment['start_row']:
+                    num_rows - segment['start_row']]
+                step_node = {
+                    'id': node['id'],
+                    'date': node['date'],
+                    'data': step_data
+                }
+            algo_id = f'{segment["ticker"]} {node["date"]} {num_rows}'
+            for idx, ind_id in enumerate(ind_ids):
+                new_report, action = iproc.process_indicator(
+                    idx=idx,
+                    ind_id=ind_id,
+                    algo_id=algo_id,
+                    ticker=segment['ticker'],
+                    dataset=step_node)
+                actions[idx].append(ACTION_CODES.get(action, 0))
+                for key in new_report:
+                    cell_keys[idx].setdefault(key, None)
+                cell_values[idx].append(new_report)
+            step_tickers.append(segment['ticker'])
+            step_ids.append(segment['id'])
+            step_rows.append(num_rows)
+        # end of for all steps in the segment
+    # end of for all segments
+
+    columns = {
+        'ticker': pd.Series(step_tickers, dtype=object),
+        'id': pd.Series(step_ids, dtype=object),
+        'rows': np.array(step_rows, dtype=np.int64)
+    }
+    cells = []
+    for idx in range(num_cells):
+        columns[f'{idx}|action'] = np.array(actions[idx], dtype=np.int8)
+        keys = []
+        for key in cell_keys[idx]:
+            present = [key in r for r in cell_values[idx]]
+            columns[f'{idx}|{key}'] = build_column([
+                r.get(key, None)
+                for r in cell_values[idx]
+            ])
+            if not all(present):
+                columns[f'{idx}|{key}|present'] = np.array(
+                    present,
+                    dtype=bool)
+            keys.append([key, not all(present)])
+        cells.append({
+            'id': ind_ids[idx],
+            'keys': keys
+        })
+    # end of for all indicators
+    summary = {
+        'shard': shard['shard'],
+        'num_steps': len(step_rows),
+        'cells': cells,
+        'compute_seconds': round(time.time() - start_time, 3)
+    }
+    return algo_result_store.encode_result(
+        frames={
+            'reports': pd.DataFrame(columns)
+        },
+        summary=summary)
+# end of compute_shard
+
+
+def build_index_frame(
+        df):
+    """build_index_frame
+
+    Copy a ``pandas.DataFrame`` with its index as the first
+    column so the index survives ``encode_frame``
+
+    :param df: ``pandas.DataFrame``
+    """
+    frame = df.copy()
+    frame.insert(0, INDEX_COLUMN, df.index)
+    return frame
+# end of build_index_frame
+
+
+def restore_index_frame(
+        frame):
+    """restore_index_frame
+
+    Undo ``build_index_frame``
+
+    :param frame: decoded ``pandas.DataFrame``
+    """
+    df = frame.set_index(INDEX_COLUMN)
+    df.index.name = None
+    return df
+# end of restore_index_frame
+
+
+def encode_shard_input(
+        nodes):
+    """encode_shard_input
+
+    Encode shard dataset nodes for the Celery shard task. Each
+    ``pandas.DataFrame`` (and each one in a dictionary of frames
+    like ``custom``) is stored as a frame with its index and the
+    other values are stored as json.
+
+    :param nodes: dataset nodes from ``build_shard_input``
+    """
+    frames = {}
+    node_meta = []
+    for node_idx, node in enumerate(nodes):
+        meta = {
+            'id': node.get('id', None),
+            'date': node.get('date', None),
+            'frames': {},
+            'values': {}
+        }
+        for key, value in node['data'].items():
+            if hasattr(value, 'index'):
+                name = f'n{node_idx}_{len(frames)}'
+                frames[name] = build_index_frame(value)
+                meta['frames'][key] = name
+            elif (isinstance(value, dict) and value and
+                    all(hasattr(v, 'index') for v in value.values())):
+                sub_frames = {}
+                for sub_key, sub_df in value.items():
+                    name = f'n{node_idx}_{len(frames)}'
+                    frames[name] = build_index_frame(sub_df)
+                    sub_frames[sub_key] = name
+                meta['values'][key] = {
+                    '__frames__': sub_frames
+                }
+            else:
+                meta['values'][key] = value
+        node_meta.append(meta)
+    # end of for all nodes
+    return algo_result_store.encode_result(
+        frames=frames,
+        summary=json.loads(json.dumps(
+            {
+                'nodes': node_meta
+            },
+            default=str)))
+# end of encode_shard_input
+
+
+def decode_shard_input(
+        decoded):
+    """decode_shard_input
+
+    Rebuild the shard dataset nodes from a decoded
+    ``encode_shard_input`` payload
+
+    :param decoded: dictionary from ``algo_result_store.decode_result``
+    """
+    nodes = []
+    for meta in decoded['summary']['nodes']:
+        node_data = {}
+        for key, name in meta['frames'].items():
+            node_data[key] = restore_index_frame(decoded[name])
+        for key, value in meta['values'].items():
+            if isinstance(value, dict) and '__frames__' in value:
+                node_data[key] = {
+                    sub_key: restore_index_frame(decoded[name])
+                    for sub_key, name in value['__frames__'].items()
+                }
+            else:
+                node_data[key] = value
+        nodes.append({
+            'id': meta['id'],
+            'date': meta['date'],
+            'data': node_data
+        })
+    return nodes
+# end of decode_shard_input
+
+
+def store_shard_data(
+        data,
+        client,
+        key=None,
+        redis_address=ae_consts.REDIS_ADDRESS,
+        redis_db=ae_consts.REDIS_DB,
+        expire=ae_consts.INDICATOR_SHARD_EXPIRE):
+    """store_shard_data
+
+    Write an encoded shard input or output to redis and return
+    an ``algo_result_store`` reference for ``load_result``
+
+    :param data: encoded payload bytes
+    :param client: redis client
+    :param key: optional - redis key (default is a new key
+        under ``INDICATOR_SHARD_KEY_PREFIX``)
+    :param redis_address: optional - redis address in the reference
+    :param redis_db: optional - redis db in the reference
+    :param expire: optional - seconds before the key expires
+    """
+    if not key:
+        key = (
+            f'{ae_consts.INDICATOR_SHARD_KEY_PREFIX}:'
+            f'{uuid.uuid4().hex}')
+    client.set(
+        name=key,
+        value=data,
+        ex=expire if expire else None)
+    return {
+        'version': algo_result_store.RESULT_VERSION,
+        'format': algo_result_store.RESULT_FORMAT,
+        'store': 'redis',
+        'key': key,
+        'redis_address': redis_address,
+        'redis_db': redis_db,
+        's3_address': None,
+        's3_bucket': None,
+        'size_bytes': len(data)
+    }
+# end of store_shard_data
+
+
+def run_shard_request(
+        work_dict,
+        client=None):
+    """run_shard_request
+
+    Load a shard input from redis, compute it and store the
+    output. This is the body of the ``compute_indicator_shard``
+    task and returns the output reference.
+
+    :param work_dict: shard request from ``run_sharded_backtest``
+    :param client: optional - redis client
+    """
+    input_ref = work_dict['input_ref']
+    if not client:
+        client = algo_result_store.get_redis_client(
+            address=input_ref['redis_address'],
+            db=input_ref['redis_db'],
+            password=work_dict.get(
+                'redis_password',
+                ae_consts.REDIS_PASSWORD))
+    nodes = decode_shard_input(
+        decoded=algo_result_store.load_result(
+            ref=input_ref,
+            client=client))
+    data = compute_shard(
+        config_dict=work_dict['config_dict'],
+        shard=work_dict['shard'],
+        nodes=nodes,
+        lookback=work_dict['lookback'],
+        label=work_dict.get('label', 'shard'))
+    return store_shard_data(
+        data=data,
+        client=client,
+        key=f'{input_ref["key"]}:out',
+        redis_address=input_ref['redis_address'],
+        redis_db=input_ref['redis_db'],
+        expire=work_dict.get(
+            'expire',
+            ae_consts.INDICATOR_SHARD_EXPIRE))
+# end of run_shard_request
+
+
+def compute_shard_in_process(
+        config_dict,
+        shard,
+        nodes,
+        lookback,
+        label):
+    """compute_shard_in_process
+
+    Process pool entry point for ``compute_shard``
+
+    :param config_dict: algorithm config dictionary
+    :param shard: shard from ``build_shards``
+    :param nodes: dataset nodes from ``build_shard_input``
+    :param lookback: rows of warm-up from ``get_lookback``
+    :param label: log label
+    """
+    return compute_shard(
+        config_dict=config_dict,
+        shard=shard,
+        nodes=nodes,
+        lookback=lookback,
+        label=label)
+# end of compute_shard_in_process
+
+
+class ReplayIndicatorProcessor(ind_processor.IndicatorProcessor):
+    """ReplayIndicatorProcessor"""
+
+    def __init__(
+            self,
+            config_dict,
+            shard_results,
+            timeseries_value,
+            **kwargs):
+        """__init__
+
+        ``IndicatorProcessor`` that returns the precomputed
+        reports from the shards and runs the indicators for any
+        step that was not precomputed
+
+        :param config_dict: algorithm config dictionary
+        :param shard_results: list of decoded shard outputs
+        :param timeseries_value: ``ALGO_TIMESERIES_DAY`` or
+            ``ALGO_TIMESERIES_MINUTE``
+        :param kwargs: ``IndicatorProcessor`` keyword arguments
+        """
+        super().__init__(
+            config_dict=config_dict,
+            **kwargs)
+        self.timeseries_value = timeseries_value
+        self.num_replayed = 0
+        self.num_computed = 0
+        self.shards = []
+        self.step_index = {}
+        ind_ids = list(self.ind_dict)
+        for shard_idx, decoded in enumerate(shard_results):
+            cells = decoded['summary']['cells']
+            if [c['id'] for c in cells] != ind_ids:
+                log.error(
+                    f'{self.label} - ignoring shard '
+                    f'{decoded["summary"].get("shard")} built for other '
+                    f'indicators={[c["id"] for c in cells]}')
+                continue
+            df = decoded['reports']
+            columns = {
+                name: df[name].tolist()
+                for name in df.columns
+            }
+            self.shards.append({
+                'cells': cells,
+                'columns': columns
+            })
+            for row, key in enumerate(zip(
+                    columns['ticker'],
+                    columns['id'],
+                    columns['rows'])):
+                self.step_index[key] = (len(self.shards) - 1, row)
+        # end of for all shards
+    # end of __init__
+
+    def get_name(
+            self):
+        """get_name"""
+        return self.label
+    # end of get_name
+
+    def build_cell_report(
+            self,
+            shard,
+            cell,
+            row):
+        """build_cell_report
+
+        Rebuild one indicator's report for a step
+
+        :param shard: loaded shard
+        :param cell: indicator cell index
+        :param row: step row in the shard
+        """
+        columns = shard['columns']
+        report = {}
+        for key, has_presence in shard['cells'][cell]['keys']:
+            if has_presence and not columns[f'{cell}|{key}|present'][row]:
+                continue
+            report[key] = columns[f'{cell}|{key}'][row]
+        return report
+    # end of build_cell_report
+
+    def process(
+            self,
+            algo_id,
+            ticker,
+            dataset):
+        """process
+
+        Return the precomputed report for this step
+
+        :param algo_id: string - algo identifier label for debugging datasets
+            during specific dates
+        :param ticker: string - ticker
+        :param dataset: dataset node for this step
+        """
+        found = self.step_index.get(get_step_key(
+            ticker=ticker,
+            dataset=dataset,
+            timeseries_value=self.timeseries_value))
+        if not found:
+            self.num_computed += 1
+            return super().process(
+                algo_id=algo_id,
+                ticker=ticker,
+                dataset=dataset)
+
+        self.num_replayed += 1
+        shard_idx, row = found
+        shard = self.shards[shard_idx]
+        self.latest_report = {
+            'id': algo_id,
+            'ticker': ticker,
+            'buys': [],
+            'sells': [],
+            'num_indicators': self.num_indicators,
+            'date': dataset.get('date', None)
+        }
+        for idx, ind_id in enumerate(self.ind_dict):
+            new_report = self.build_cell_report(
+                shard=shard,
+                cell=idx,
+                row=row)
+            self.latest_report.update(new_report)
+            action = shard['columns'][f'{idx}|action'][row]
+            if action == ACTION_CODES[ae_consts.INDICATOR_BUY]:
+                self.latest_report['buys'].append({
+                    'cell': idx,
+                    'name': self.ind_dict[ind_id]['obj'].get_name(),
+                    'id': ind_id,
+                    'report': new_report})
+            elif action == ACTION_CODES[ae_consts.INDICATOR_SELL]:
+                self.latest_report['sells'].append({
+                    'cell': idx,
+                    'name': self.ind_dict[ind_id]['obj'].get_name(),
+                    'id': ind_id,
+                    'report': new_report})
+        # end of for all indicators
+
+        self.reports.append(self.latest_report)
+
+        return self.get_latest_report(
+            algo_id=algo_id,
+            ticker=ticker,
+            dataset=dataset)
+    # end of process
+
+# end of ReplayIndicatorProcessor
+
+
+def get_shard_result(
+        shard_task,
+        config_dict,
+        shard,
+        data,
+        lookback,
+        client,
+        timeout=ae_consts.INDICATOR_SHARD_TIMEOUT,
+        label='shards'):
+    """get_shard_result
+
+    Wait for a ``compute_indicator_shard`` task and load its
+    result from redis. A shard that does not finish within
+    ``timeout`` seconds (for example when no worker consumes
+    the ``compute_indicator_shard`` queue) is revoked and
+    computed in this process. Raises an ``Exception`` if the
+    task failed.
+
+    :param shard_task: ``celery.result.AsyncResult`` for the shard
+    :param config_dict: algorithm config with the indicators
+    :param shard: shard dictionary from ``build_shards``
+    :param data: algorithm dataset dictionary keyed by ticker
+    :param lookback: warm-up rows from ``get_lookback``
+    :param client: redis client holding the shard result
+    :param timeout: optional - seconds to wait for the task
+        (default is ``analysis_engine.consts.INDICATOR_SHARD_TIMEOUT``)
+    :param label: optional - log label
+    """
+    try:
+        # backtests can run inside a task_run_algo worker
+        res = shard_task.get(
+            timeout=timeout,
+            disable_sync_subtasks=False)
+    except celery.exceptions.TimeoutError:
+        log.error(
+            f'{label} - shard={shard["shard"]} timed out after '
+            f'{timeout}s - computing it locally')
+        try:
+            shard_task.revoke()
+        except Exception as e:
+            log.error(
+                f'{label} - failed revoking shard={shard["shard"]} '
+                f'ex={e}')
+        return algo_result_store.decode_result(
+            data=compute_shard(
+                config_dict=config_dict,
+                shard=shard,
+                nodes=build_shard_input(
+                    data=data,
+                    shard=shard,
+                    lookback=lookback),
+                lookback=lookback,
+                label=label))
+    if res['status'] != ae_consts.SUCCESS:
+        raise Exception(
+            f'{label} - failed computing shard err={res["err"]}')
+    return algo_result_store.load_result(
+        ref=res['rec']['result_ref'],
+        client=client)
+# end of get_shard_result
+
+
+def run_sharded_backtest(
+        algo,
+        data,
+        num_shards=ae_consts.INDICATOR_SHARDS,
+        max_workers=ae_consts.INDICATOR_SHARD_MAX_WORKERS,
+        celery_disabled=True,
+        client=None,
+        redis_address=ae_consts.REDIS_ADDRESS,
+        redis_db=ae_consts.REDIS_DB,
+        redis_password=ae_consts.REDIS_PASSWORD,
+        shard_timeout=ae_consts.INDICATOR_SHARD_TIMEOUT,
+        label='shards'):
+    """run_sharded_backtest
+
+    Precompute the indicators in shards and replay the trades
+    with ``algo.handle_data``. Returns the ``algo``.
+
+    :param algo: ``analysis_engine.algo.BaseAlgo`` with a config
+    :param data: algorithm dataset dictionary keyed by ticker
+    :param num_shards: optional - number of shards (default is
+        ``analysis_engine.consts.INDICATOR_SHARDS``)
+    :param max_workers: optional - local processes when
+        ``celery_disabled`` is ``True`` (``1`` runs the shards in
+        this process, default is
+        ``analysis_engine.consts.INDICATOR_SHARD_MAX_WORKERS``)
+    :param celery_disabled: optional - bool to compute the shards
+        locally instead of with ``compute_indicator_shard`` tasks
+        (default is ``True``)
+    :param client: optional - redis client for the Celery shards
+    :param redis_address: optional - redis address for the
+        Celery shards
+    :param redis_db: optional - redis db for the Celery shards
+    :param redis_password: optional - redis password for the
+        Celery shards
+    :param shard_timeout: optional - seconds to wait for each
+        Celery shard before computing it locally (default is
+        ``analysis_engine.consts.INDICATOR_SHARD_TIMEOUT``)
+    :param label: optional - log label
+    """
+    start_time = time.time()
+    if algo.loaded_dataset:
+        data = algo.loaded_dataset
+    config_dict = algo.config_dict
+    if not config_dict or not config_dict.get('indicators', []):
+        algo.handle_data(
+            data=data)
+        return algo
+
+    for ticker in algo.get_supported_tickers_in_data(data=data):
+        for node in data[ticker]:
+            node['data']['custom'] = algo.include_custom
+
+    lookback = get_lookback(
+        config_dict=config_dict)
+    steps = build_steps(
+        data=data,
+        tickers=algo.get_supported_tickers_in_data(data=data),
+        timeseries_value=algo.timeseries_value)
+    shards = build_shards(
+        steps=steps,
+        num_shards=num_shards,
+        lookback=lookback)
+    log.info(
+        f'{label} - computing steps={len(steps)} shards={len(shards)} '
+        f'lookback={lookback} celery_disabled={celery_disabled}')
+
+    results = []
+    if not celery_disabled:
+        import analysis_engine.work_tasks.compute_indicator_shard as task
+        if not client:
+            client = algo_result_store.get_redis_client(
+                address=redis_address,
+                db=redis_db,
+                password=redis_password)
+        tasks = []
+        for shard in shards:
+            input_ref = store_shard_data(
+                data=encode_shard_input(
+                    nodes=build_shard_input(
+                        data=data,
+                        shard=shard,
+                        lookback=lookback)),
+                client=client,
+                redis_address=redis_address,
+                redis_db=redis_db)
+            tasks.append(task.compute_indicator_shard.delay(
+                work_dict={
+                    'label': f'{label}-{shard["shard"]}',
+                    'config_dict': config_dict,
+                    'shard': shard,
+                    'lookback': lookback,
+                    'input_ref': input_ref
+                }))
+        for shard, shard_task in zip(shards, tasks):
+            results.append(get_shard_result(
+                shard_task=shard_task,
+                config_dict=config_dict,
+                shard=shard,
+                data=data,
+                lookback=lookback,
+                client=client,
+                timeout=shard_timeout,
+                label=label))
+    elif int(max_workers) > 1 and len(shards) > 1:
+        with concurrent.futures.ProcessPoolExecutor(
+                max_workers=int(max_workers)) as pool:
+            futures = [
+                pool.submit(
+                    compute_shard_in_process,
+                    config_dict,
+                    shard,
+                    build_shard_input(
+                        data=data,
+                        shard=shard,
+                        lookback=lookback),
+                    lookback,
+                    label)
+                for shard in shards
+            ]
+            for future in futures:
+                results.append(algo_result_store.decode_result(
+                    data=future.result()))
+    else:
+        for shard in shards:
+            results.append(algo_result_store.decode_result(
+                data=compute_shard(
+                    config_dict=config_dict,
+                    shard=shard,
+                    nodes=build_shard_input(
+                        data=data,
+                        shard=shard,
+                        lookback=lookback),
+                    lookback=lookback,
+                    label=label)))
+    # end of computing the shards
+    compute_seconds = time.time() - start_time
+
+    replay = ReplayIndicatorProcessor(
+        config_dict=config_dict,
+        shard_results=results,
+        timeseries_value=algo.timeseries_value,
+        label=f'{algo.name}-replay',
+        verbose=algo.verbose_processor)
+    algo.get_indicator_processor(
+        existing_processor=replay)
+    algo.handle_data(
+        data=data)
+    log.info(
+        f'{label} - done steps={len(steps)} '
+        f'replayed={replay.num_replayed} computed={replay.num_computed} '
+        f'compute={compute_seconds:.2f}s '
+        f'replay={time.time() - start_time - compute_seconds:.2f}s')
+    return algo
+# end of run_sharded_backtest
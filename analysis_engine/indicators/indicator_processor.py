@@ -240,6 +240,76 @@ class IndicatorProcessor:
                 f'from indicators={self.num_indicators}')
     # end of build_indicators_for_config
 
+    def process_indicator(
+            self,
+            idx,
+            ind_id,
+            algo_id,
+            ticker,
+            dataset):
+        """process_indicator
+
+        Run one indicator on the ``dataset`` and return a tuple
+        of its report and ``INDICATOR_BUY``, ``INDICATOR_SELL``
+        or ``None``
+
+        :param idx: indicator cell index
+        :param ind_id: indicator key name
+        :param algo_id: string - algo identifier label for debugging datasets
+            during specific dates
+        :param ticker: string - ticker
+        :param dataset: dictionary of ``pd.DataFrame(s)`` to process
+        """
+        ind_node = self.ind_dict[ind_id]
+        ind_obj = ind_node['obj']
+        percent_done = ae_consts.get_percent_done(
+            progress=(idx + 1),
+            total=self.num_indicators)
+        percent_label = (
+            f'ticker={self.ticker} {percent_done} '
+            f'{idx+1}/{self.num_indicators}')
+        ind_obj.reset_internals()
+        if self.verbose:
+            log.info(
+                f'{self.label} - {ind_obj.get_name()} '
+                f'start {percent_label}')
+        # this will throw on errors to help with debugging
+        self.last_ind_obj = ind_obj
+        ind_obj.handle_subscribed_dataset(
+            algo_id=algo_id,
+            ticker=ticker,
+            dataset=dataset)
+        new_report = ind_obj.get_report()
+        if self.verbose:
+            log.info(
+                f'{self.label} - {ind_obj.get_name()} '
+                f'end {percent_label} '
+                f'report: {ae_consts.ppj(new_report)}')
+
+        is_buy_value = ind_obj.is_buy
+        is_sell_value = ind_obj.is_sell
+
+        """"
+        v1 indicator type: supported
+        binary decision support on buys and sells
+        (like an alert threshold that is on or off)
+
+        v2 indicator type: not supported
+        support for buy/sell value range
+        (like an alert threshold between a lower and upper bound)
+        """
+        if (hasattr(ind_obj, 'is_buy') and
+                hasattr(ind_obj, 'is_sell')):
+            is_buy_value = ind_obj.is_buy
+            is_sell_value = ind_obj.is_sell
+
+        if is_buy_value == ae_consts.INDICATOR_BUY:
+            return new_report, ae_consts.INDICATOR_BUY
+        elif is_sell_value == ae_consts.INDICATOR_SELL:
+            return new_report, ae_consts.INDICATOR_SELL
+        return new_report, None
+    # end of process_indicator
+
     def process(
             self,
             algo_id,
@@ -265,60 +335,23 @@ class IndicatorProcessor:
             'date': dataset.get('date', None)
         }
         for idx, ind_id in enumerate(self.ind_dict):
-            ind_node = self.ind_dict[ind_id]
-            ind_obj = ind_node['obj']
-            percent_done = ae_consts.get_percent_done(
-                progress=(idx + 1),
-                total=self.num_indicators)
-            percent_label = (
-                f'ticker={self.ticker} {percent_done} '
-                f'{idx+1}/{self.num_indicators}')
-            ind_obj.reset_internals()
-            if self.verbose:
-                log.info(
-                    f'{self.label} - {ind_obj.get_name()} '
-                    f'start {percent_label}')
-            # this will throw on errors to help with debugging
-            self.last_ind_obj = ind_obj
-            ind_obj.handle_subscribed_dataset(
+            new_report, action = self.process_indicator(
+                idx=idx,
+                ind_id=ind_id,
                 algo_id=algo_id,
                 ticker=ticker,
                 dataset=dataset)
-            new_report = ind_obj.get_report()
-            if self.verbose:
-                log.info(
-                    f'{self.label} - {ind_obj.get_name()} '
-                    f'end {percent_label} '
-                    f'report: {ae_consts.ppj(new_report)}')
             self.latest_report.update(new_report)
-
-            is_buy_value = ind_obj.is_buy
-            is_sell_value = ind_obj.is_sell
-
-            """"
-            v1 indicator type: supported
-            binary decision support on buys and sells
-            (like an alert threshold that is on or off)
-
-            v2 indicator type: not supported
-            support for buy/sell value range
-            (like an alert threshold between a lower and upper bound)
-            """
-            if (hasattr(ind_obj, 'is_buy') and
-                    hasattr(ind_obj, 'is_sell')):
-                is_buy_value = ind_obj.is_buy
-                is_sell_value = ind_obj.is_sell
-
-            if is_buy_value == ae_consts.INDICATOR_BUY:
+            if action == ae_consts.INDICATOR_BUY:
                 self.latest_report['buys'].append({
                     'cell': idx,
-                    'name': ind_obj.get_name(),
+                    'name': self.ind_dict[ind_id]['obj'].get_name(),
                     'id': ind_id,
                     'report': new_report})
-            elif is_sell_value == ae_consts.INDICATOR_SELL:
+            elif action == ae_consts.INDICATOR_SELL:
                 self.latest_report['sells'].append({
                     'cell': idx,
-                    'name': ind_obj.get_name(),
+                    'name': self.ind_dict[ind_id]['obj'].get_name(),
                     'id': ind_id,
                     'report': new_report})
         # end of for all indicators
@@ -0,0 +1,307 @@
+"""
+Redis keyspace budget manager
+
+Minute and options datasets for hundreds of tickers grow
+without bound in redis unless ``REDIS_EXPIRE`` is set. This
+module samples the memory used by each dataset key
+(``MEMORY USAGE`` with a ``STRLEN`` fallback), reports the
+usage by ticker and dataset and applies a tiering policy:
+
+1. keep the last ``hot_days`` trading sessions of the
+   managed ``datasets`` in redis
+2. offload older keys to S3 using the same key name
+   (``<TICKER>_<YYYY-MM-DD>_<dataset>``) and delete them
+   from redis
+3. if ``max_mb`` is set, keep offloading the oldest
+   remaining managed keys until redis is under budget
+
+Extraction reads offloaded keys from S3 transparently once
+``ENABLED_S3_EXTRACT_FALLBACK=1`` is exported (it is off by
+default, see ``analysis_engine.extract_utils``).
+
+Dry-run mode (the default) only builds the report.
+
+**Supported environment variables**
+
+::
+
+    # trading days to keep in redis
+    export REDIS_BUDGET_HOT_DAYS=5
+    # optional - max MB for the managed datasets in redis
+    export REDIS_BUDGET_MAX_MB=2048
+    # comma-delimited datasets the policy applies to
+    export REDIS_BUDGET_DATASETS=minute,tdcalls,tdputs
+    # read the offloaded keys from s3 during extraction
+    export ENABLED_S3_EXTRACT_FALLBACK=1
+"""
+
+import re
+import zlib
+import datetime
+import redis
+import boto3
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.holidays as ae_holidays
+import analysis_engine.s3_transfer as s3_transfer
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+DATASET_KEY_REGEX = re.compile(
+    r'^(?P<ticker>[^_]+)_(?P<date>\d{4}-\d{2}-\d{2})_(?P<dataset>\w+)$')
+
+
+def parse_dataset_key(
+        key):
+    """parse_dataset_key
+
+    Parse a ``<TICKER>_<YYYY-MM-DD>_<dataset>`` key and
+    return a dictionary with ``ticker``, ``date`` and
+    ``dataset`` or ``None`` if the key does not match
+
+    :param key: redis key as ``str`` or ``bytes``
+    """
+    if isinstance(key, bytes):
+        key = key.decode('utf-8')
+    match = DATASET_KEY_REGEX.match(key)
+    if not match:
+        return None
+    return match.groupdict()
+# end of parse_dataset_key
+
+
+def get_key_size(
+        client,
+        key):
+    """get_key_size
+
+    Get the bytes used by a key with ``MEMORY USAGE`` and
+    fall back to ``STRLEN`` for servers that do not support it
+
+    :param client: redis client
+    :param key: key name
+    """
+    try:
+        num_bytes = client.memory_usage(key)
+        if num_bytes is not None:
+            return int(num_bytes)
+    except Exception as e:
+        log.debug(f'memory usage not supported for key={key} ex={e}')
+    return int(client.strlen(key) or 0)
+# end of get_key_size
+
+
+def get_hot_cutoff_date(
+        hot_days,
+        today=None):
+    """get_hot_cutoff_date
+
+    Get the oldest ``YYYY-MM-DD`` trading session that stays
+    in redis when keeping ``hot_days`` trading sessions
+
+    :param hot_days: number of trading sessions to keep
+    :param today: optional - ``datetime`` for the newest session
+        (default is today)
+    """
+    use_today = today
+    if not use_today:
+        use_today = datetime.datetime.utcnow()
+    sessions = pd.date_range(
+        end=pd.Timestamp(use_today).normalize(),
+        periods=max(int(hot_days), 1),
+        freq=pd.offsets.CustomBusinessDay(
+            calendar=ae_holidays.USTradingCalendar()))
+    return sessions[0].strftime(ae_consts.COMMON_DATE_FORMAT)
+# end of get_hot_cutoff_date
+
+
+def manage_redis_budget(
+        client=None,
+        redis_address=ae_consts.REDIS_ADDRESS,
+        redis_db=ae_consts.REDIS_DB,
+        redis_password=ae_consts.REDIS_PASSWORD,
+        s3=None,
+        s3_bucket=ae_consts.S3_BUCKET,
+        s3_address=ae_consts.S3_ADDRESS,
+        s3_access_key=ae_consts.S3_ACCESS_KEY,
+        s3_secret_key=ae_consts.S3_SECRET_KEY,
+        s3_region_name=ae_consts.S3_REGION_NAME,
+        s3_secure=ae_consts.S3_SECURE,
+        hot_days=ae_consts.REDIS_BUDGET_HOT_DAYS,
+        datasets=ae_consts.REDIS_BUDGET_DATASETS,
+        max_mb=ae_consts.REDIS_BUDGET_MAX_MB,
+        match='*_*_*',
+        today=None,
+        dry_run=True,
+        label='redis-budget'):
+    """manage_redis_budget
+
+    Build a memory usage report for the dataset keys in redis
+    and offload cold keys to S3. Returns a dictionary from
+    ``build_result`` with a ``rec`` containing:
+
+    - ``usage`` - bytes by ticker then dataset
+    - ``total_bytes`` - bytes for all dataset keys
+    - ``offload`` - list of keys that are (or would be)
+      offloaded with the ``reason`` (``age`` or ``budget``)
+    - ``num_offloaded`` and ``bytes_freed``
+    - ``cutoff_date`` and ``dry_run``
+
+    :param client: optional - initialized redis client
+    :param redis_address: redis address ``<host:port>``
+    :param redis_db: redis db
+    :param redis_password: redis password
+    :param s3: optional - initialized ``boto3.resource('s3')``
+    :param s3_bucket: S3 bucket for offloaded keys
+        (default is ``S3_BUCKET``)
+    :param s3_address: S3 address
+    :param s3_access_key: S3 access key
+    :param s3_secret_key: S3 secret key
+    :param s3_region_name: S3 region name
+    :param s3_secure: transmit using tls encryption
+    :param hot_days: optional - trading sessions to keep in redis
+        (default is ``REDIS_BUDGET_HOT_DAYS``)
+    :param datasets: optional - list of datasets the policy
+        applies to (default is ``REDIS_BUDGET_DATASETS``)
+    :param max_mb: optional - max MB for the managed datasets
+        after offloading by age (default is ``REDIS_BUDGET_MAX_MB``)
+    :param match: optional - ``SCAN`` match pattern
+        (default is ``*_*_*``)
+    :param today: optional - ``datetime`` for the newest
+        trading session (default is today)
+    :param dry_run: optional - only report and do not offload
+        (default is ``True``)
+    :param label: optional - log label
+    """
+    rec = {
+        'usage': {},
+        'total_bytes': 0,
+        'num_keys': 0,
+        'offload': [],
+        'num_offloaded': 0,
+        'bytes_freed': 0,
+        'cutoff_date': None,
+        'dry_run': dry_run
+    }
+
+    try:
+        use_client = client
+        if not use_client:
+            use_client = redis.Redis(
+                host=redis_address.split(':')[0],
+                port=int(redis_address.split(':')[1]),
+                password=redis_password,
+                db=redis_db)
+
+        cutoff_date = get_hot_cutoff_date(
+            hot_days=hot_days,
+            today=today)
+        rec['cutoff_date'] = cutoff_date
+
+        managed = []
+        for key in use_client.scan_iter(match=match, count=1000):
+            node = parse_dataset_key(key)
+            if not node:
+                continue
+            if isinstance(key, bytes):
+                key = key.decode('utf-8')
+            num_bytes = get_key_size(
+                client=use_client,
+                key=key)
+            ticker_usage = rec['usage'].setdefault(node['ticker'], {})
+            ticker_usage[node['dataset']] = (
+                ticker_usage.get(node['dataset'], 0) + num_bytes)
+            rec['total_bytes'] += num_bytes
+            rec['num_keys'] += 1
+            if node['dataset'] in datasets:
+                node['key'] = key
+                node['bytes'] = num_bytes
+                managed.append(node)
+        # end of sampling keys
+
+        managed.sort(key=lambda node: (node['date'], node['key']))
+        managed_bytes = sum(node['bytes'] for node in managed)
+        max_bytes = None
+        if max_mb is not None:
+            max_bytes = int(float(max_mb) * 1024 * 1024)
+
+        for node in managed:
+            if node['date'] < cutoff_date:
+                node['reason'] = 'age'
+            elif max_bytes is not None and managed_bytes > max_bytes:
+                node['reason'] = 'budget'
+            else:
+                break
+            managed_bytes -= node['bytes']
+            rec['offload'].append(node)
+        # end of applying the policy
+
+        log.info(
+            f'{label} - keys={rec["num_keys"]} '
+            f'total={ae_consts.get_mb(rec["total_bytes"])}MB '
+            f'cutoff={cutoff_date} offload={len(rec["offload"])} '
+            f'dry_run={dry_run}')
+
+        if dry_run or not rec['offload']:
+            return build_result.build_result(
+                status=ae_consts.SUCCESS,
+                err=None,
+                rec=rec)
+
+        use_s3 = s3
+        if not use_s3:
+            endpoint_url = (
+                f'http{"s" if s3_secure else ""}://{s3_address}')
+            use_s3 = boto3.resource(
+                's3',
+                endpoint_url=endpoint_url,
+                aws_access_key_id=s3_access_key,
+                aws_secret_access_key=s3_secret_key,
+                region_name=s3_region_name,
+                config=boto3.session.Config(signature_version='s3v4'))
+        if use_s3.Bucket(s3_bucket) not in use_s3.buckets.all():
+            use_s3.create_bucket(
+                Bucket=s3_bucket)
+
+        for node in rec['offload']:
+            key = node['key']
+            value = use_client.get(key)
+            if value is None:
+                continue
+            # redis holds zlib-compressed copies of the s3 contents
+            try:
+                body = zlib.decompress(value)
+            except zlib.error:
+                body = value
+            s3_transfer.upload_data(
+                s3=use_s3,
+                s3_bucket=s3_bucket,
+                s3_key=key,
+                data=body)
+            use_client.delete(key)
+            rec['num_offloaded'] += 1
+            rec['bytes_freed'] += node['bytes']
+        # end of offloading
+
+        log.info(
+            f'{label} - offloaded={rec["num_offloaded"]} '
+            f'freed={ae_consts.get_mb(rec["bytes_freed"])}MB '
+            f's3_bucket={s3_bucket}')
+
+        return build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+    except Exception as e:
+        err = (
+            f'{label} - failed managing redis budget '
+            f'offloaded={rec["num_offloaded"]} ex={e}')
+        log.error(err)
+        return build_result.build_result(
+            status=ae_consts.ERR,
+            err=err,
+            rec=rec)
+    # end of try/ex
+# end of manage_redis_budget
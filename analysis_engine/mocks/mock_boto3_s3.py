@@ -2,8 +2,10 @@
 Mock boto3 s3 objects
 """
 
+import io
 import os
 import json
+import hashlib
 import analysis_engine.consts as ae_consts
 import spylunking.log.setup_logging as log_utils
 
@@ -142,6 +144,7 @@ class MockBotoS3Bucket:
         self.name = name
         self.datas = []  # payloads uploaded to s3
         self.keys = []   # keys uploaded to s3
+        self.part_lens = {}  # key to multipart upload part sizes
     # end of __init__
 
     def put_object(
@@ -160,11 +163,261 @@ class MockBotoS3Bucket:
 
         self.keys.append(Key)
         self.datas.append(Body)
+        self.part_lens.pop(Key, None)
     # end of put_object
 
+    def get_data(
+            self,
+            Key):
+        """get_data
+
+        get the latest payload uploaded to ``Key``
+
+        :param Key: key name
+        """
+        for idx in range(len(self.keys) - 1, -1, -1):
+            if self.keys[idx] == Key:
+                return self.datas[idx]
+        return None
+    # end of get_data
+
 # end of MockBotoS3Bucket
 
 
+class MockBotoS3Client:
+    """MockBotoS3Client"""
+
+    def __init__(
+            self,
+            resource):
+        """__init__
+
+        build a mock ``s3.meta.client`` supporting multipart uploads
+
+        :param resource: parent ``MockBotoS3`` object
+        """
+        self.resource = resource
+        self.uploads = {}  # upload id to dictionary of parts
+    # end of __init__
+
+    def create_multipart_upload(
+            self,
+            Bucket=None,
+            Key=None):
+        """create_multipart_upload
+
+        :param Bucket: bucket name
+        :param Key: key name
+        """
+        upload_id = f'mock-upload-{len(self.uploads) + 1}'
+        self.uploads[upload_id] = {}
+        log.info(
+            f'mock - MockBotoS3Client.create_multipart_upload('
+            f'Bucket={Bucket}, Key={Key}) upload_id={upload_id}')
+        return {
+            'UploadId': upload_id
+        }
+    # end of create_multipart_upload
+
+    def upload_part(
+            self,
+            Bucket=None,
+            Key=None,
+            UploadId=None,
+            PartNumber=None,
+            Body=None):
+        """upload_part
+
+        :param Bucket: bucket name
+        :param Key: key name
+        :param UploadId: upload id
+        :param PartNumber: part number starting at 1
+        :param Body: part payload
+        """
+        self.uploads[UploadId][PartNumber] = Body
+        return {
+            'ETag': f'"{hashlib.md5(Body).hexdigest()}"'
+        }
+    # end of upload_part
+
+    def complete_multipart_upload(
+            self,
+            Bucket=None,
+            Key=None,
+            UploadId=None,
+            MultipartUpload=None):
+        """complete_multipart_upload
+
+        :param Bucket: bucket name
+        :param Key: key name
+        :param UploadId: upload id
+        :param MultipartUpload: dictionary with the ``Parts`` list
+        """
+        parts = self.uploads.pop(UploadId)
+        ordered_parts = [
+            parts[p['PartNumber']] for p in MultipartUpload['Parts']
+        ]
+        bucket = self.resource.Bucket(Bucket)
+        bucket.put_object(
+            Key=Key,
+            Body=b''.join(ordered_parts))
+        bucket.part_lens[Key] = [
+            len(p) for p in ordered_parts
+        ]
+        return {
+            'Bucket': Bucket,
+            'Key': Key
+        }
+    # end of complete_multipart_upload
+
+    def head_object(
+            self,
+            Bucket=None,
+            Key=None):
+        """head_object
+
+        returns the ``ContentLength`` and an ``ETag`` built
+        like s3 for regular and multipart uploads
+
+        :param Bucket: bucket name
+        :param Key: key name
+        """
+        bucket = self.resource.Bucket(Bucket)
+        body = bucket.get_data(Key=Key)
+        if body is None:
+            raise Exception(
+                'An error occurred (404) when calling the '
+                f'HeadObject operation: Not Found {Bucket}/{Key}')
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        part_lens = bucket.part_lens.get(Key, None)
+        if part_lens:
+            digests = []
+            start = 0
+            for part_len in part_lens:
+                digests.append(
+                    hashlib.md5(body[start:start + part_len]).digest())
+                start += part_len
+            etag = (
+                f'{hashlib.md5(b"".join(digests)).hexdigest()}-'
+                f'{len(part_lens)}')
+        else:
+            etag = hashlib.md5(body).hexdigest()
+        return {
+            'ContentLength': len(body),
+            'ETag': f'"{etag}"'
+        }
+    # end of head_object
+
+    def get_object(
+            self,
+            Bucket=None,
+            Key=None,
+            Range=None,
+            PartNumber=None):
+        """get_object
+
+        supports ``Range='bytes=start-end'`` and multipart
+        ``PartNumber`` requests
+
+        :param Bucket: bucket name
+        :param Key: key name
+        :param Range: optional - http byte range
+        :param PartNumber: optional - multipart part number
+        """
+        bucket = self.resource.Bucket(Bucket)
+        body = bucket.get_data(Key=Key)
+        if body is None:
+            raise Exception(
+                'An error occurred (NoSuchKey) when calling the '
+                f'GetObject operation: {Bucket}/{Key}')
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if Range:
+            start, end = Range.replace('bytes=', '').split('-')
+            body = body[int(start):int(end) + 1]
+        elif PartNumber:
+            part_lens = bucket.part_lens.get(Key, [len(body)])
+            start = sum(part_lens[0:PartNumber - 1])
+            body = body[start:start + part_lens[PartNumber - 1]]
+        return {
+            'ContentLength': len(body),
+            'Body': io.BytesIO(body)
+        }
+    # end of get_object
+
+    def list_objects_v2(
+            self,
+            Bucket=None,
+            Prefix='',
+            ContinuationToken=None,
+            MaxKeys=1000):
+        """list_objects_v2
+
+        list the sorted keys starting with ``Prefix`` one
+        page of ``MaxKeys`` at a time
+
+        :param Bucket: bucket name
+        :param Prefix: optional - key prefix
+        :param ContinuationToken: optional - index of the
+            first key on the page
+        :param MaxKeys: optional - keys per page
+        """
+        bucket = self.resource.Bucket(Bucket)
+        keys = sorted(
+            k for k in set(bucket.keys)
+            if k.startswith(Prefix))
+        start = int(ContinuationToken or 0)
+        page = keys[start:start + MaxKeys]
+        res = {
+            'KeyCount': len(page),
+            'Contents': [
+                {
+                    'Key': k
+                }
+                for k in page
+            ],
+            'IsTruncated': start + MaxKeys < len(keys)
+        }
+        if res['IsTruncated']:
+            res['NextContinuationToken'] = str(start + MaxKeys)
+        return res
+    # end of list_objects_v2
+
+    def abort_multipart_upload(
+            self,
+            Bucket=None,
+            Key=None,
+            UploadId=None):
+        """abort_multipart_upload
+
+        :param Bucket: bucket name
+        :param Key: key name
+        :param UploadId: upload id
+        """
+        self.uploads.pop(UploadId, None)
+    # end of abort_multipart_upload
+
+# end of MockBotoS3Client
+
+
+class MockBotoS3Meta:
+    """MockBotoS3Meta"""
+
+    def __init__(
+            self,
+            resource):
+        """__init__
+
+        :param resource: parent ``MockBotoS3`` object
+        """
+        self.client = MockBotoS3Client(
+            resource=resource)
+    # end of __init__
+
+# end of MockBotoS3Meta
+
+
 class MockBotoS3AllBuckets:
     """MockBotoS3AllBuckets"""
 
@@ -230,6 +483,8 @@ class MockBotoS3:
         self.config = config
         self.buckets = MockBotoS3AllBuckets()
         self.keys = []
+        self.meta = MockBotoS3Meta(
+            resource=self)
     # end of __init__
 
     def Bucket(
@@ -279,3 +279,41 @@ def mock_company(
     }
     return val
 # end of mock_company
+
+
+def build_minute_chart(
+        date_str,
+        num_minutes=390,
+        start_price=280.0):
+    """build_minute_chart
+
+    Build an IEX Cloud ``/stock/{ticker}/chart/1d`` response
+    list with one record per minute starting at ``09:30``
+
+    :param date_str: date string formatted ``YYYY-MM-DD``
+    :param num_minutes: optional - number of minutes
+        (default is ``390``)
+    :param start_price: optional - price for the first minute
+        (default is ``280.0``)
+    """
+    records = []
+    for idx in range(num_minutes):
+        hour, minute = divmod(570 + idx, 60)
+        price = round(start_price + (idx % 20) * 0.05, 2)
+        records.append({
+            'date': date_str,
+            'minute': f'{hour:02d}:{minute:02d}',
+            'label': (
+                f'{(hour - 1) % 12 + 1}:{minute:02d} '
+                f'{"AM" if hour < 12 else "PM"}'),
+            'high': price + 0.1,
+            'low': price - 0.1,
+            'open': price,
+            'close': price + 0.05,
+            'average': price,
+            'volume': 1000 + idx,
+            'notional': price * (1000 + idx),
+            'numberOfTrades': 10 + idx % 7
+        })
+    return records
+# end of build_minute_chart
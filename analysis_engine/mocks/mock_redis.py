@@ -2,6 +2,7 @@
 Mock redis objects
 """
 
+import fnmatch
 import analysis_engine.consts as ae_consts
 import spylunking.log.setup_logging as log_utils
 
@@ -58,6 +59,8 @@ class MockRedis:
         self.db = db
         self.cache_dict = {}  # cache dictionary replicating redis
         self.keys = []        # cache redis keys
+        self.streams = {}     # stream key to list of (id, fields)
+        self.stream_seq = 0   # monotonic counter for stream ids
     # end of __init__
 
     def set(
@@ -130,4 +133,395 @@ class MockRedis:
         # end of get data from dict vs in the env
     # end of get
 
+    def append(
+            self,
+            key,
+            value):
+        """append
+
+        mock redis append
+
+        :param key: cache key name
+        :param value: bytes to append
+        """
+        cur_value = self.cache_dict.get(key, b'')
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        self.cache_dict[key] = cur_value + value
+        if key not in self.keys:
+            self.keys.append(key)
+        return len(self.cache_dict[key])
+    # end of append
+
+    def rename(
+            self,
+            src,
+            dst):
+        """rename
+
+        mock redis rename
+
+        :param src: source key name
+        :param dst: destination key name
+        """
+        if src not in self.cache_dict:
+            raise Exception(
+                f'mock - MockRedis.rename({src}, {dst}) - no such key')
+        self.cache_dict[dst] = self.cache_dict.pop(src)
+        if dst not in self.keys:
+            self.keys.append(dst)
+        return True
+    # end of rename
+
+    def delete(
+            self,
+            *names):
+        """delete
+
+        mock redis delete
+
+        :param names: key names to delete
+        """
+        num_deleted = 0
+        for name in names:
+            if name in self.cache_dict:
+                self.cache_dict.pop(name)
+                num_deleted += 1
+            if name in self.streams:
+                self.streams.pop(name)
+                num_deleted += 1
+        return num_deleted
+    # end of delete
+
+    def expire(
+            self,
+            name,
+            time):
+        """expire
+
+        mock redis expire - keys do not expire in the mock
+
+        :param name: key name
+        :param time: seconds until the key expires
+        """
+        log.info(
+            f'mock - MockRedis.expire(name={name}, time={time})')
+        return name in self.cache_dict
+    # end of expire
+
+    def exists(
+            self,
+            *names):
+        """exists
+
+        mock redis exists - returns the number of
+        ``names`` that are cached
+
+        :param names: key names to check
+        """
+        return sum(
+            1 for name in names
+            if name in self.cache_dict)
+    # end of exists
+
+    def scan_iter(
+            self,
+            match=None,
+            count=None):
+        """scan_iter
+
+        mock redis scan_iter - supports ``*`` wildcards
+
+        :param match: optional - glob-style key pattern
+        :param count: not used - keys per scan batch
+        """
+        for name in list(self.cache_dict.keys()):
+            if not match or fnmatch.fnmatchcase(name, match):
+                yield name.encode('utf-8')
+    # end of scan_iter
+
+    def strlen(
+            self,
+            name):
+        """strlen
+
+        mock redis strlen
+
+        :param name: key name
+        """
+        value = self.cache_dict.get(
+            name,
+            None)
+        if value is None:
+            return 0
+        return len(value)
+    # end of strlen
+
+    def memory_usage(
+            self,
+            key,
+            samples=None):
+        """memory_usage
+
+        mock redis memory usage - value length plus
+        a fixed overhead per key
+
+        :param key: key name
+        :param samples: not used - number of sampled elements
+        """
+        if key not in self.cache_dict:
+            return None
+        return self.strlen(key) + 56
+    # end of memory_usage
+
+    def getrange(
+            self,
+            key,
+            start,
+            end):
+        """getrange
+
+        mock redis getrange - ``end`` is inclusive like redis
+
+        :param key: key name
+        :param start: start offset (negative counts from the end)
+        :param end: end offset (negative counts from the end)
+        """
+        value = self.cache_dict.get(
+            key,
+            b'')
+        if isinstance(value, str):
+            value = value.encode('utf-8')
+        num_bytes = len(value)
+        if start < 0:
+            start = max(num_bytes + start, 0)
+        if end < 0:
+            end = num_bytes + end
+        return value[start:end + 1]
+    # end of getrange
+
+    def hincrby(
+            self,
+            name,
+            key,
+            amount=1):
+        """hincrby
+
+        mock redis hincrby - hashes are stored as dictionaries
+        in the ``cache_dict``
+
+        :param name: hash key name
+        :param key: field name
+        :param amount: amount to add
+        """
+        hash_dict = self.cache_dict.setdefault(name, {})
+        field = key.encode('utf-8') if isinstance(key, str) else key
+        hash_dict[field] = int(hash_dict.get(field, 0)) + int(amount)
+        return hash_dict[field]
+    # end of hincrby
+
+    def hincrbyfloat(
+            self,
+            name,
+            key,
+            amount=1.0):
+        """hincrbyfloat
+
+        mock redis hincrbyfloat
+
+        :param name: hash key name
+        :param key: field name
+        :param amount: amount to add
+        """
+        hash_dict = self.cache_dict.setdefault(name, {})
+        field = key.encode('utf-8') if isinstance(key, str) else key
+        hash_dict[field] = float(hash_dict.get(field, 0)) + float(amount)
+        return hash_dict[field]
+    # end of hincrbyfloat
+
+    def hgetall(
+            self,
+            name):
+        """hgetall
+
+        mock redis hgetall
+
+        :param name: hash key name
+        """
+        return {
+            k: str(v).encode('utf-8')
+            for k, v in self.cache_dict.get(name, {}).items()
+        }
+    # end of hgetall
+
+    def pipeline(
+            self,
+            transaction=True):
+        """pipeline
+
+        mock redis pipeline
+
+        :param transaction: not used - redis transaction flag
+        """
+        return MockRedisPipeline(
+            client=self)
+    # end of pipeline
+
+    def xadd(
+            self,
+            name,
+            fields,
+            id='*',
+            maxlen=None,
+            approximate=True):
+        """xadd
+
+        mock redis xadd - stores encoded fields like redis-py
+        returns them and trims the stream to ``maxlen``
+
+        :param name: stream key name
+        :param fields: dictionary of fields to add
+        :param id: stream id (only ``*`` is supported)
+        :param maxlen: optional - max entries to keep
+        :param approximate: not used - redis trimming flag
+        """
+        self.stream_seq += 1
+        entry_id = f'0-{self.stream_seq}'.encode('utf-8')
+        encoded_fields = {}
+        for k, v in fields.items():
+            encoded_fields[str(k).encode('utf-8')] = str(v).encode('utf-8')
+        entries = self.streams.setdefault(name, [])
+        entries.append((entry_id, encoded_fields))
+        if maxlen is not None and len(entries) > maxlen:
+            self.streams[name] = entries[-maxlen:]
+        log.info(
+            f'mock - MockRedis.xadd(name={name}, id={entry_id}, '
+            f'maxlen={maxlen})')
+        return entry_id
+    # end of xadd
+
+    def xlen(
+            self,
+            name):
+        """xlen
+
+        mock redis xlen
+
+        :param name: stream key name
+        """
+        return len(self.streams.get(name, []))
+    # end of xlen
+
+    def xrevrange(
+            self,
+            name,
+            max='+',
+            min='-',
+            count=None):
+        """xrevrange
+
+        mock redis xrevrange - ``max`` and ``min`` are not used
+
+        :param name: stream key name
+        :param max: not used - max stream id
+        :param min: not used - min stream id
+        :param count: optional - number of entries to return
+        """
+        entries = list(reversed(self.streams.get(name, [])))
+        if count is not None:
+            entries = entries[0:count]
+        return entries
+    # end of xrevrange
+
+    def xread(
+            self,
+            streams,
+            count=None,
+            block=None):
+        """xread
+
+        mock redis xread - does not block and returns an
+        empty list if there are no new entries
+
+        :param streams: dictionary of stream key to last seen id
+        :param count: optional - max entries per stream
+        :param block: not used - milliseconds to block
+        """
+        response = []
+        for name, last_id in streams.items():
+            entries = self.streams.get(name, [])
+            if hasattr(last_id, 'decode'):
+                last_id = last_id.decode('utf-8')
+            last_id = str(last_id)
+            if last_id == '$':
+                continue
+            last_seq = int(last_id.split('-')[-1])
+            new_entries = [
+                e for e in entries
+                if int(e[0].decode('utf-8').split('-')[-1]) > last_seq
+            ]
+            if count is not None:
+                new_entries = new_entries[0:count]
+            if new_entries:
+                response.append([
+                    name.encode('utf-8'),
+                    new_entries
+                ])
+        # end of for all streams
+        return response
+    # end of xread
+
 # end of MockRedis
+
+
+class MockRedisPipeline:
+    """MockRedisPipeline"""
+
+    def __init__(
+            self,
+            client):
+        """__init__
+
+        build a mock redis pipeline that queues calls
+        to the ``client`` until ``execute`` is called
+
+        :param client: ``MockRedis`` client
+        """
+        self.client = client
+        self.commands = []
+    # end of __init__
+
+    def __getattr__(
+            self,
+            name):
+        """__getattr__
+
+        queue any supported ``MockRedis`` method
+
+        :param name: method name
+        """
+        method = getattr(self.client, name)
+
+        def queue_command(
+                *args,
+                **kwargs):
+            self.commands.append((method, args, kwargs))
+            return self
+        return queue_command
+    # end of __getattr__
+
+    def execute(
+            self):
+        """execute
+
+        run the queued commands and return the list of results
+        """
+        results = [
+            method(*args, **kwargs)
+            for method, args, kwargs in self.commands
+        ]
+        self.commands = []
+        return results
+    # end of execute
+
+# end of MockRedisPipeline
@@ -0,0 +1,145 @@
+"""
+Mock Tradier option chain responses and a session that
+records the requested urls
+"""
+
+import json
+
+
+def build_option_chain(
+        ticker='SPY',
+        exp_date='2019-02-15',
+        close=280.0,
+        num_strikes=50,
+        strike_step=1.0,
+        epoch_ms=1550250000000):
+    """build_option_chain
+
+    Build a Tradier ``/v1/markets/options/chains`` response
+    dictionary with a call and a put for each strike plus
+    a weekly contract and a zero-bid contract that
+    the fetches filter out
+
+    :param ticker: ticker symbol
+    :param exp_date: expiration date string
+    :param close: center strike
+    :param num_strikes: number of strikes
+    :param strike_step: dollars between strikes
+    :param epoch_ms: epoch milliseconds for the quote dates
+    """
+    options = []
+    first_strike = close - (num_strikes / 2) * strike_step
+    for idx in range(num_strikes):
+        strike = round(first_strike + idx * strike_step, 2)
+        for option_type in ['call', 'put']:
+            options.append({
+                'symbol': f'{ticker}{exp_date}{option_type[0]}{strike}',
+                'underlying': ticker,
+                'strike': strike,
+                'option_type': option_type,
+                'expiration_date': exp_date,
+                'expiration_type': 'standard',
+                'bid': 1.0 + idx * 0.01,
+                'ask': 1.1 + idx * 0.01,
+                'last': 1.05 + idx * 0.01,
+                'bidsize': 10,
+                'asksize': 12,
+                'volume': 100 + idx,
+                'last_volume': 1,
+                'open_interest': 1000 + idx,
+                'bid_date': epoch_ms + idx * 1000,
+                'ask_date': epoch_ms + idx * 1000,
+                'trade_date': 0 if idx % 10 == 0 else epoch_ms
+            })
+    # end of for all strikes
+    options.append(dict(
+        options[0],
+        expiration_type='weeklys'))
+    options.append(dict(
+        options[1],
+        bid=0.0))
+    return {
+        'options': {
+            'option': options
+        }
+    }
+# end of build_option_chain
+
+
+class MockTradierResponse:
+    """MockTradierResponse"""
+
+    def __init__(
+            self,
+            status_code=200,
+            data=None):
+        """__init__
+
+        :param status_code: HTTP status code
+        :param data: dictionary to serialize as the body
+        """
+        self.status_code = status_code
+        self.text = json.dumps(data or {})
+    # end of __init__
+
+# end of MockTradierResponse
+
+
+class MockTradierSession:
+    """MockTradierSession"""
+
+    def __init__(
+            self,
+            close=280.0,
+            num_strikes=50,
+            expirations=None):
+        """__init__
+
+        build a mock ``requests.Session`` that returns option
+        chains and expirations and records each url
+
+        :param close: center strike for the chains
+        :param num_strikes: number of strikes per chain
+        :param expirations: optional - list of expiration
+            date strings
+        """
+        self.close = close
+        self.num_strikes = num_strikes
+        self.expirations = expirations or [
+            '2019-02-15',
+            '2019-02-22',
+            '2019-03-15'
+        ]
+        self.urls = []
+    # end of __init__
+
+    def get(
+            self,
+            url,
+            headers=None,
+            **kwargs):
+        """get
+
+        :param url: requested url
+        :param headers: not used - request headers
+        :param kwargs: not used - keyword args
+        """
+        self.urls.append(url)
+        if '/expirations' in url:
+            return MockTradierResponse(
+                data={
+                    'expirations': {
+                        'date': self.expirations
+                    }
+                })
+        exp_date = url.split('expiration=')[-1]
+        ticker = url.split('symbol=')[-1].split('&')[0]
+        return MockTradierResponse(
+            data=build_option_chain(
+                ticker=ticker,
+                exp_date=exp_date,
+                close=self.close,
+                num_strikes=self.num_strikes))
+    # end of get
+
+# end of MockTradierSession
@@ -18,12 +18,16 @@ and for calculating historical option expiration dates.
 
 import datetime
 import pandas.tseries.offsets as pd_bday
-import analysis_engine.holidays as hdays
+import analysis_engine.trading_calendar as trading_calendar
 import spylunking.log.setup_logging as log_utils
 
 log = log_utils.build_colorized_logger(name=__name__)
 
 
+# historical_options lists by years
+HISTORICAL_OPTIONS = {}
+
+
 def get_options_for_years(
         years=[
             '2014',
@@ -137,6 +141,10 @@ def historical_options(
     :param years: years to build
     """
 
+    cached = HISTORICAL_OPTIONS.get(tuple(years), None)
+    if cached is not None:
+        return list(cached)
+
     entities = []
     months = [
         '01',
@@ -189,6 +197,7 @@ def historical_options(
             num_done += 1
     # end of processing
 
+    HISTORICAL_OPTIONS[tuple(years)] = list(entities)
     return entities
 # end of historical_options
 
@@ -218,29 +227,22 @@ def option_expiration(
         date=None):
     """option_expiration
 
+    Find the third Friday on or after ``date`` (moved back when
+    it is a market holiday) with the
+    ``analysis_engine.trading_calendar`` expirations
+
     :param date: date to find the current expiration
     """
     cur_date = date
     if not cur_date:
         cur_date = datetime.datetime.now()
-    while (not (cur_date.weekday() == 4 and 14 < cur_date.day < 22)):
-        cur_date = cur_date + datetime.timedelta(days=1)
-
-    if hdays.is_holiday(
-            date=cur_date):
-        test_date = cur_date - datetime.timedelta(days=1)
-        if cur_date.weekday() == 0:
-            test_date = cur_date - datetime.timedelta(days=3)
-        if hdays.is_holiday(
-                date=test_date):
-            test_date = cur_date - datetime.timedelta(days=4)
-            if hdays.is_holiday(
-                    date=test_date):
-                test_date = cur_date - datetime.timedelta(days=5)
-        cur_date = test_date
-    # end of if this date is a holiday and go back
-
-    return cur_date
+    cur_day = cur_date
+    if isinstance(cur_date, datetime.datetime):
+        cur_day = cur_date.date()
+    exp_date = trading_calendar.get_calendar().expiration_for(
+        cur_day)
+    # keep the time of day from the date like the day-by-day walk
+    return cur_date + (exp_date.date() - cur_day)
 # end of option_expiration
 
 
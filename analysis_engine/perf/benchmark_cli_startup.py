@@ -0,0 +1,211 @@
+"""
+Benchmark the import time of the ``sa``, ``fetch`` and ``ae``
+command line tools against a per-tool budget
+
+Each trial runs the tool's script with ``-h`` in a new
+``python -X importtime`` process and sums the cumulative time of
+the top-level imports that a bare interpreter does not already
+load. The tools should only import celery, pandas, matplotlib
+and the task modules inside the mode that needs them, so the
+help output (and cron or k8s job start up) stays fast.
+
+::
+
+    python -m analysis_engine.perf.benchmark_cli_startup
+
+**Supported environment variables**
+
+::
+
+    export BENCH_TRIALS=5
+    # override every tool's budget in seconds
+    export BENCH_CLI_BUDGET=0.5
+"""
+
+import os
+import sys
+import subprocess
+
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(
+    PACKAGE_DIR,
+    'scripts')
+
+# seconds of imports allowed for ``<tool> -h``
+CLI_BUDGETS = {
+    'sa': 0.5,
+    'fetch_new_stock_datasets': 0.5,
+    'start_algo': 0.5
+}
+
+# modules that must not load until a mode needs them
+HEAVY_MODULES = [
+    'boto3',
+    'celery',
+    'kombu',
+    'matplotlib',
+    'numpy',
+    'pandas',
+    'redis',
+    'seaborn'
+]
+
+
+def build_env():
+    """build_env
+
+    Environment for the child processes with the repository
+    on the ``PYTHONPATH``
+    """
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.path.dirname(PACKAGE_DIR)] + [
+            p for p in env.get('PYTHONPATH', '').split(os.pathsep) if p])
+    return env
+# end of build_env
+
+
+def parse_import_times(
+        output):
+    """parse_import_times
+
+    Parse ``python -X importtime`` output into a list of
+    ``(name, depth, self_us, cumulative_us)`` tuples
+
+    :param output: stderr text from ``python -X importtime``
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        stripped = name.lstrip()
+        rows.append((
+            stripped,
+            (len(name) - len(stripped) - 1) // 2,
+            int(fields[0]),
+            int(fields[1])))
+    return rows
+# end of parse_import_times
+
+
+def run_importtime(
+        args,
+        env=None):
+    """run_importtime
+
+    Run ``python -X importtime <args>`` and return the parsed
+    import rows
+
+    :param args: list of arguments after ``-X importtime``
+    :param env: optional - environment for the process
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime'] + args,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE)
+    return parse_import_times(
+        output=proc.stderr.decode('utf-8', 'replace'))
+# end of run_importtime
+
+
+def measure_cli(
+        name,
+        env=None,
+        baseline=None):
+    """measure_cli
+
+    Measure one ``<tool> -h`` run and return a dictionary with
+    the ``import_seconds``, the ``heavy_modules`` it loaded and
+    its ``slowest`` top-level imports
+
+    :param name: script name in ``analysis_engine/scripts``
+    :param env: optional - environment for the process
+    :param baseline: optional - set of modules a bare interpreter
+        imports (measured when not set)
+    """
+    if not env:
+        env = build_env()
+    if baseline is None:
+        baseline = {
+            row[0]
+            for row in run_importtime(
+                args=['-c', 'pass'],
+                env=env)
+        }
+    rows = run_importtime(
+        args=[os.path.join(SCRIPTS_DIR, f'{name}.py'), '-h'],
+        env=env)
+    top_level = [
+        row for row in rows
+        if row[1] == 0 and row[0] not in baseline
+    ]
+    heavy_modules = sorted({
+        row[0] for row in rows
+        if row[0] in HEAVY_MODULES
+    })
+    return {
+        'name': name,
+        'import_seconds': sum(row[3] for row in top_level) / 1e6,
+        'heavy_modules': heavy_modules,
+        'slowest': [
+            (row[0], row[3] / 1e6)
+            for row in sorted(top_level, key=lambda r: -r[3])[0:3]
+        ]
+    }
+# end of measure_cli
+
+
+def start():
+    """start"""
+
+    num_trials = int(os.getenv('BENCH_TRIALS', '5'))
+    budget_override = os.getenv('BENCH_CLI_BUDGET', None)
+    env = build_env()
+    baseline = {
+        row[0]
+        for row in run_importtime(
+            args=['-c', 'pass'],
+            env=env)
+    }
+
+    over_budget = []
+    for name, budget in CLI_BUDGETS.items():
+        if budget_override:
+            budget = float(budget_override)
+        trials = [
+            measure_cli(
+                name=name,
+                env=env,
+                baseline=baseline)
+            for _ in range(num_trials)
+        ]
+        trials.sort(key=lambda t: t['import_seconds'])
+        median = trials[len(trials) // 2]
+        status = 'ok'
+        if (median['import_seconds'] > budget or
+                median['heavy_modules']):
+            status = 'OVER BUDGET'
+            over_budget.append(name)
+        slowest = ', '.join(
+            f'{mod}={seconds:.3f}s'
+            for mod, seconds in median['slowest'])
+        print(
+            f'{name} -h median of {num_trials}: '
+            f'imports={median["import_seconds"]:.3f}s '
+            f'budget={budget:.3f}s {status} '
+            f'heavy={median["heavy_modules"]} slowest: {slowest}')
+    # end of for all tools
+
+    if over_budget:
+        sys.exit(1)
+# end of start
+
+
+if __name__ == '__main__':
+    start()
@@ -0,0 +1,268 @@
+"""
+Benchmark refreshing a synthetic ticker universe with one
+``get_new_pricing_data`` task per ticker against the chunked
+``get_new_pricing_data_chunk`` task
+
+Nothing is sent over the network. The Celery task overhead,
+provider HTTP latency and redis/S3 round trips are local
+``time.sleep`` stand-ins while the redis client and
+``boto3.resource('s3')`` construction is real. Each mode runs
+on one worker process and reports the total refresh time, the
+broker messages sent and the bytes written to the result
+backend.
+
+::
+
+    python -m analysis_engine.perf.benchmark_fetch_chunks
+
+**Supported environment variables**
+
+::
+
+    export BENCH_TICKERS=1000
+    # datasets published per ticker
+    export BENCH_DATASETS=2
+    # bytes in each json-serialized dataset
+    export BENCH_DATASET_BYTES=20000
+    # seconds of broker, ack and result backend overhead per task
+    export BENCH_TASK_OVERHEAD=0.005
+    # seconds for a ticker's concurrent dataset fetches
+    export BENCH_HTTP_LATENCY=0.01
+    # seconds per redis or S3 round trip
+    export BENCH_STORE_LATENCY=0.002
+    export FETCH_CHUNK_SIZE=50
+    export FETCH_CHUNK_MAX_WORKERS=4
+"""
+
+import json
+import time
+import boto3
+import redis
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.fetch_chunks as fetch_chunks
+import analysis_engine.shared_clients as shared_clients
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(
+    name='bench-fetch-chunks')
+
+
+BENCH = {
+    'datasets': int(ae_consts.ev('BENCH_DATASETS', '2')),
+    'dataset_bytes': int(ae_consts.ev('BENCH_DATASET_BYTES', '20000')),
+    'task_overhead': float(ae_consts.ev('BENCH_TASK_OVERHEAD', '0.005')),
+    'http_latency': float(ae_consts.ev('BENCH_HTTP_LATENCY', '0.01')),
+    'store_latency': float(ae_consts.ev('BENCH_STORE_LATENCY', '0.002'))
+}
+
+
+def publish_dataset(
+        work_dict):
+    """publish_dataset
+
+    Stand-in for ``publish_pricing_update`` that builds or
+    reuses the clients the same way and sleeps for the bucket
+    check and the S3 and redis writes
+
+    :param work_dict: ticker request dictionary
+    """
+    redis_host, redis_port = work_dict['redis_address'].split(':')
+    bucket_key = (work_dict['s3_address'], work_dict['s3_bucket'])
+    check_bucket = True
+    if shared_clients.is_shared():
+        shared_clients.get_s3_resource(
+            address=work_dict['s3_address'],
+            access_key=work_dict['s3_access_key'],
+            secret_key=work_dict['s3_secret_key'],
+            region_name=work_dict['s3_region_name'])
+        shared_clients.get_redis_client(
+            host=redis_host,
+            port=redis_port)
+        check_bucket = bucket_key not in shared_clients.CHECKED_BUCKETS
+        shared_clients.CHECKED_BUCKETS.add(bucket_key)
+    else:
+        boto3.resource(
+            's3',
+            endpoint_url=f'http://{work_dict["s3_address"]}',
+            aws_access_key_id=work_dict['s3_access_key'],
+            aws_secret_access_key=work_dict['s3_secret_key'],
+            region_name=work_dict['s3_region_name'],
+            config=boto3.session.Config(
+                signature_version='s3v4'))
+        redis.Redis(
+            host=redis_host,
+            port=redis_port)
+    if check_bucket:
+        time.sleep(BENCH['store_latency'])
+    time.sleep(2 * BENCH['store_latency'])
+# end of publish_dataset
+
+
+def fetch_ticker(
+        work_dict):
+    """fetch_ticker
+
+    Stand-in for ``run_get_new_pricing_data`` returning a
+    result with every json-serialized dataset like the task
+
+    :param work_dict: ticker request dictionary
+    """
+    time.sleep(BENCH['http_latency'])
+    rec = {
+        'num_success': BENCH['datasets']
+    }
+    for idx in range(BENCH['datasets']):
+        publish_dataset(work_dict)
+        rec[f'dataset_{idx}'] = 'x' * BENCH['dataset_bytes']
+    return build_result.build_result(
+        status=ae_consts.SUCCESS,
+        err=None,
+        rec=rec)
+# end of fetch_ticker
+
+
+def run_task(
+        func,
+        work_dict):
+    """run_task
+
+    Run one stand-in task and return the broker message and
+    result backend bytes
+
+    :param func: task function
+    :param work_dict: task request dictionary
+    """
+    message_bytes = len(json.dumps(work_dict))
+    time.sleep(BENCH['task_overhead'])
+    res = func(work_dict=work_dict)
+    return message_bytes, len(json.dumps(res))
+# end of run_task
+
+
+def run_per_ticker(
+        work,
+        tickers):
+    """run_per_ticker
+
+    One task per ticker
+
+    :param work: ``build_get_new_pricing_request`` dictionary
+    :param tickers: list of tickers
+    """
+    totals = {
+        'messages': 0,
+        'message_bytes': 0,
+        'result_bytes': 0
+    }
+    for ticker in tickers:
+        ticker_req = fetch_chunks.build_ticker_request(
+            work_dict=work,
+            ticker=ticker,
+            date_str='2019-02-15')
+        message_bytes, result_bytes = run_task(
+            func=fetch_ticker,
+            work_dict=ticker_req)
+        totals['messages'] += 1
+        totals['message_bytes'] += message_bytes
+        totals['result_bytes'] += result_bytes
+    return totals
+# end of run_per_ticker
+
+
+def run_chunk_task(
+        work_dict):
+    """run_chunk_task
+
+    Stand-in for the ``get_new_pricing_data_chunk`` task
+
+    :param work_dict: chunk request dictionary
+    """
+    return fetch_chunks.run_chunk(
+        work_dict=work_dict,
+        fetch_func=fetch_ticker)
+# end of run_chunk_task
+
+
+def run_chunked(
+        work,
+        tickers):
+    """run_chunked
+
+    One task per ``FETCH_CHUNK_SIZE`` tickers
+
+    :param work: ``build_get_new_pricing_request`` dictionary
+    :param tickers: list of tickers
+    """
+    totals = {
+        'messages': 0,
+        'message_bytes': 0,
+        'result_bytes': 0
+    }
+    work = dict(work)
+    work['date'] = '2019-02-15'
+    for chunk_req in fetch_chunks.build_chunk_requests(
+            work_dict=work,
+            tickers=tickers):
+        message_bytes, result_bytes = run_task(
+            func=run_chunk_task,
+            work_dict=chunk_req)
+        totals['messages'] += 1
+        totals['message_bytes'] += message_bytes
+        totals['result_bytes'] += result_bytes
+    return totals
+# end of run_chunked
+
+
+def start():
+    """start"""
+
+    num_tickers = int(ae_consts.ev('BENCH_TICKERS', '1000'))
+    tickers = [
+        f'T{idx:04d}'
+        for idx in range(num_tickers)
+    ]
+    work = {
+        'label': 'bench',
+        's3_bucket': 'pricing',
+        's3_address': ae_consts.S3_ADDRESS,
+        's3_access_key': ae_consts.S3_ACCESS_KEY,
+        's3_secret_key': ae_consts.S3_SECRET_KEY,
+        's3_region_name': ae_consts.S3_REGION_NAME,
+        'redis_address': ae_consts.REDIS_ADDRESS,
+        'fetch_mode': 'daily'
+    }
+    log.info(
+        f'benchmark tickers={num_tickers} '
+        f'chunk_size={ae_consts.FETCH_CHUNK_SIZE} '
+        f'chunk_workers={ae_consts.FETCH_CHUNK_MAX_WORKERS} '
+        f'settings={BENCH}')
+
+    results = {}
+    for name, func in [
+            ('per-ticker', run_per_ticker),
+            ('chunked', run_chunked)]:
+        shared_clients.close_clients()
+        start_time = time.time()
+        totals = func(
+            work=work,
+            tickers=tickers)
+        totals['seconds'] = time.time() - start_time
+        results[name] = totals
+        log.info(
+            f'{name} seconds={totals["seconds"]:.2f} '
+            f'broker_messages={totals["messages"]} '
+            f'message_bytes={totals["message_bytes"]} '
+            f'result_bytes={totals["result_bytes"]}')
+    # end of for all modes
+
+    per_ticker = results['per-ticker']
+    chunked = results['chunked']
+    log.info(
+        f'speedup={per_ticker["seconds"] / max(chunked["seconds"], 1e-9):.1f}x '
+        f'messages={per_ticker["messages"]}->{chunked["messages"]}')
+# end of start
+
+
+if __name__ == '__main__':
+    start()
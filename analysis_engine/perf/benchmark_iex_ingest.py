@@ -0,0 +1,170 @@
+"""
+Benchmark normalizing a year of IEX minute payloads
+comparing the previous per-row date building and
+``strftime`` round-trip against the vectorized
+``analysis_engine.iex.fetch_api.fetch_minute`` which keeps
+the dates as ``datetime64`` until serialization
+
+::
+
+    python -m analysis_engine.perf.benchmark_iex_ingest
+
+**Supported environment variables**
+
+::
+
+    # trading days of minute payloads to normalize
+    export BENCH_IEX_DAYS=252
+    # minutes per payload
+    export BENCH_IEX_MINUTES=390
+"""
+
+import datetime
+import time
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.iex.fetch_api as iex_fetch
+import analysis_engine.iex.helpers_for_iex_api as iex_helpers
+import analysis_engine.mocks.mock_iex as mock_iex
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(
+    name='bench-iex-ingest')
+
+
+def build_date_rows(
+        df,
+        use_date_str,
+        src_col='minute',
+        src_date_format=ae_consts.COMMON_TICK_DATE_FORMAT,
+        output_date_format=ae_consts.COMMON_TICK_DATE_FORMAT):
+    """build_date_rows
+
+    Previous per-row ``build_dates_from_df_col`` kept as the
+    benchmark baseline
+
+    :param df: source ``pandas.DataFrame``
+    :param use_date_str: date string for today
+    :param src_col: source column name
+    :param src_date_format: format of the joined strings
+    :param output_date_format: format of the returned strings
+    """
+    new_dates = []
+    for i in df[src_col]:
+        if ':' not in i:
+            split_arr = i.split(' ')
+            org_new_str = (
+                f'{use_date_str} '
+                f'{split_arr[0]}'
+                f':00:00 '
+                f'{split_arr[1]}')
+        else:
+            org_new_str = (
+                f'{use_date_str} '
+                f'{i}:00')
+        new_dates.append(datetime.datetime.strptime(
+            org_new_str,
+            src_date_format).strftime(
+                output_date_format))
+    return new_dates
+# end of build_date_rows
+
+
+def normalize_minute_rows(
+        resp_json):
+    """normalize_minute_rows
+
+    Previous ``fetch_minute`` normalization kept as the
+    benchmark baseline
+
+    :param resp_json: IEX minute chart response list
+    """
+    df = pd.DataFrame(resp_json)
+    iex_helpers.convert_datetime_columns(
+        df=df)
+    use_date = df['date'].iloc[-1].strftime('%Y-%m-%d')
+    new_minutes = build_date_rows(
+        df=df,
+        use_date_str=use_date)
+    df['date'] = pd.to_datetime(
+        new_minutes,
+        format=ae_consts.COMMON_TICK_DATE_FORMAT)
+    df['date'] = df['date'].dt.strftime(
+        ae_consts.COMMON_TICK_DATE_FORMAT)
+    return df
+# end of normalize_minute_rows
+
+
+def normalize_minute_columns(
+        resp_json):
+    """normalize_minute_columns
+
+    Vectorized ``fetch_minute`` normalization and the
+    ``datetime64`` to string conversion done before
+    the dataset is serialized
+
+    :param resp_json: IEX minute chart response list
+    """
+    df = iex_fetch.fetch_minute(
+        ticker='SPY',
+        resp_json=resp_json)
+    return iex_helpers.format_datetime_columns(
+        df=df)
+# end of normalize_minute_columns
+
+
+def time_payloads(
+        func,
+        payloads):
+    """time_payloads
+
+    Return the seconds to normalize all ``payloads`` and
+    the last result
+
+    :param func: normalization function
+    :param payloads: list of IEX minute chart responses
+    """
+    res = None
+    start_time = time.time()
+    for resp_json in payloads:
+        res = func(resp_json)
+    return time.time() - start_time, res
+# end of time_payloads
+
+
+def start():
+    """start"""
+
+    num_days = int(ae_consts.ev('BENCH_IEX_DAYS', '252'))
+    num_minutes = int(ae_consts.ev('BENCH_IEX_MINUTES', '390'))
+    days = pd.bdate_range(
+        end='2019-02-15',
+        periods=num_days).strftime('%Y-%m-%d')
+    payloads = [
+        mock_iex.build_minute_chart(
+            date_str=date_str,
+            num_minutes=num_minutes)
+        for date_str in days
+    ]
+    log.info(
+        f'benchmark days={num_days} minutes={num_minutes} '
+        f'rows={num_days * num_minutes}')
+
+    row_time, row_df = time_payloads(
+        func=normalize_minute_rows,
+        payloads=payloads)
+    col_time, col_df = time_payloads(
+        func=normalize_minute_columns,
+        payloads=payloads)
+    if not row_df.equals(col_df):
+        log.critical('vectorized minute dates do not match the rows')
+
+    log.info(
+        f'normalize rows={row_time:.2f}s '
+        f'vectorized={col_time:.2f}s '
+        f'speedup={row_time / max(col_time, 1e-9):.1f}x')
+# end of start
+
+
+if __name__ == '__main__':
+    start()
@@ -0,0 +1,110 @@
+"""
+Benchmark single-stream vs parallel S3 transfers against
+a local S3-compatible service (like the minio container
+in the ``compose`` directory)
+
+::
+
+    export S3_ADDRESS=localhost:9000
+    export BENCH_S3_MB=256
+    python -m analysis_engine.perf.benchmark_s3_transfer
+
+**Supported environment variables**
+
+::
+
+    # payload size in MB (default is 128)
+    export BENCH_S3_MB=128
+    # bucket for the benchmark keys (default is perftests)
+    export BENCH_S3_BUCKET=perftests
+    # bytes per part and concurrency for the parallel runs
+    export S3_TRANSFER_PART_SIZE=8388608
+    export S3_TRANSFER_MAX_WORKERS=8
+"""
+
+import os
+import time
+import boto3
+import analysis_engine.consts as ae_consts
+import analysis_engine.s3_transfer as s3_transfer
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(
+    name='bench-s3-transfer')
+
+
+def start():
+    """start"""
+
+    num_mb = int(ae_consts.ev('BENCH_S3_MB', '128'))
+    s3_bucket = ae_consts.ev('BENCH_S3_BUCKET', 'perftests')
+    s3_key = f'bench_s3_transfer_{num_mb}mb'
+    part_size = ae_consts.S3_TRANSFER_PART_SIZE
+    max_workers = ae_consts.S3_TRANSFER_MAX_WORKERS
+    secure = ae_consts.S3_SECURE == '1'
+    endpoint_url = f'http{"s" if secure else ""}://{ae_consts.S3_ADDRESS}'
+
+    s3 = boto3.resource(
+        's3',
+        endpoint_url=endpoint_url,
+        aws_access_key_id=ae_consts.S3_ACCESS_KEY,
+        aws_secret_access_key=ae_consts.S3_SECRET_KEY,
+        region_name=ae_consts.S3_REGION_NAME,
+        config=boto3.session.Config(
+            signature_version='s3v4'))
+    if s3.Bucket(s3_bucket) not in s3.buckets.all():
+        s3.create_bucket(
+            Bucket=s3_bucket)
+
+    data = os.urandom(num_mb * 1024 * 1024)
+    log.info(
+        f'benchmark {num_mb}MB endpoint={endpoint_url} '
+        f'part_size={part_size} workers={max_workers}')
+
+    start_time = time.time()
+    s3.Bucket(s3_bucket).put_object(
+        Key=f'{s3_key}_single',
+        Body=data)
+    single_upload = time.time() - start_time
+
+    start_time = time.time()
+    s3_transfer.upload_data(
+        s3=s3,
+        s3_bucket=s3_bucket,
+        s3_key=s3_key,
+        data=data,
+        part_size=part_size,
+        max_workers=max_workers)
+    parallel_upload = time.time() - start_time
+
+    start_time = time.time()
+    single_data = s3.Object(
+        s3_bucket,
+        f'{s3_key}_single').get()['Body'].read()
+    single_download = time.time() - start_time
+
+    start_time = time.time()
+    parallel_data = s3_transfer.download_key(
+        s3=s3,
+        s3_bucket=s3_bucket,
+        s3_key=s3_key,
+        part_size=part_size,
+        max_workers=max_workers)
+    parallel_download = time.time() - start_time
+
+    if single_data != data or parallel_data != data:
+        log.critical('downloaded data does not match the upload')
+
+    log.info(
+        f'upload   single={single_upload:.2f}s '
+        f'parallel={parallel_upload:.2f}s '
+        f'({num_mb / max(parallel_upload, 1e-6):.1f} MB/s)')
+    log.info(
+        f'download single={single_download:.2f}s '
+        f'parallel={parallel_download:.2f}s '
+        f'({num_mb / max(parallel_download, 1e-6):.1f} MB/s)')
+# end of start
+
+
+if __name__ == '__main__':
+    start()
@@ -0,0 +1,159 @@
+"""
+Benchmark the Tradier option chain normalization on a
+large chain (SPY-sized with thousands of contracts)
+comparing the previous per-row loop against the columnar
+``analysis_engine.td.fetch_api.normalize_option_records``
+
+::
+
+    python -m analysis_engine.perf.benchmark_td_options
+
+**Supported environment variables**
+
+::
+
+    # strikes in the chain - each strike has a call and a put
+    export BENCH_TD_STRIKES=2500
+    # timed runs per implementation
+    export BENCH_TD_RUNS=5
+"""
+
+import time
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import analysis_engine.td.consts as td_consts
+import analysis_engine.td.fetch_api as td_fetch
+import analysis_engine.mocks.mock_tradier as mock_tradier
+import pandas as pd
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(
+    name='bench-td-options')
+
+
+def normalize_option_rows(
+        records,
+        option_type,
+        ticker,
+        last_close_date,
+        created_minute):
+    """normalize_option_rows
+
+    Previous per-row normalization kept as the
+    benchmark baseline
+
+    :param records: list of option records
+    :param option_type: ``call`` or ``put``
+    :param ticker: string ticker
+    :param last_close_date: string for the ``date`` column
+    :param created_minute: string for the ``created`` column
+    """
+    opt_type = int(ae_consts.OPTION_PUT)
+    if option_type == 'call':
+        opt_type = int(ae_consts.OPTION_CALL)
+    options_list = []
+    for org_node in records:
+        if (
+                org_node['option_type'] == option_type and
+                org_node['expiration_type'] == 'standard' and
+                float(org_node['bid']) > 0.01):
+            node = dict(org_node)
+            node['date'] = last_close_date
+            node['created'] = created_minute
+            node['ticker'] = ticker
+            node['opt_type'] = opt_type
+            node['exp_date'] = node['expiration_date']
+            new_node = {}
+            for col in td_consts.TD_OPTION_COLUMNS:
+                if col in node:
+                    if col in td_consts.TD_EPOCH_COLUMNS:
+                        if node[col] == 0:
+                            new_node[col] = None
+                        else:
+                            new_node[col] = ae_utils.epoch_to_dt(
+                                epoch=node[col]/1000,
+                                use_utc=False,
+                                convert_to_est=True).strftime(
+                                    ae_consts.COMMON_TICK_DATE_FORMAT)
+                    else:
+                        new_node[col] = node[col]
+            options_list.append(new_node)
+    return pd.DataFrame(options_list)
+# end of normalize_option_rows
+
+
+def time_runs(
+        func,
+        num_runs,
+        **kwargs):
+    """time_runs
+
+    Return the best run time in seconds and the last result
+
+    :param func: function to time
+    :param num_runs: number of runs
+    :param kwargs: keyword arguments for ``func``
+    """
+    best = None
+    res = None
+    for _ in range(num_runs):
+        start_time = time.time()
+        res = func(**kwargs)
+        elapsed = time.time() - start_time
+        if best is None or elapsed < best:
+            best = elapsed
+    return best, res
+# end of time_runs
+
+
+def start():
+    """start"""
+
+    num_strikes = int(ae_consts.ev('BENCH_TD_STRIKES', '2500'))
+    num_runs = int(ae_consts.ev('BENCH_TD_RUNS', '5'))
+    records = mock_tradier.build_option_chain(
+        ticker='SPY',
+        close=280.0,
+        num_strikes=num_strikes,
+        strike_step=0.5)['options']['option']
+    norm_args = {
+        'records': records,
+        'option_type': 'call',
+        'ticker': 'SPY',
+        'last_close_date': '2019-02-15 16:00:00',
+        'created_minute': '2019-02-15 16:00:00'
+    }
+    log.info(
+        f'benchmark contracts={len(records)} runs={num_runs}')
+
+    row_time, row_df = time_runs(
+        func=normalize_option_rows,
+        num_runs=num_runs,
+        **norm_args)
+    col_time, col_df = time_runs(
+        func=td_fetch.normalize_option_records,
+        num_runs=num_runs,
+        **norm_args)
+    if not row_df.equals(col_df):
+        log.critical('columnar normalization does not match the rows')
+
+    chain_time, _ = time_runs(
+        func=td_fetch.build_option_df,
+        num_runs=num_runs,
+        records=records,
+        option_type='call',
+        ticker='SPY',
+        exp_date='2019-02-15',
+        latest_close=280.0)
+
+    log.info(
+        f'normalize rows={row_time * 1000:.1f}ms '
+        f'columnar={col_time * 1000:.1f}ms '
+        f'speedup={row_time / max(col_time, 1e-9):.1f}x')
+    log.info(
+        f'build_option_df with scrubbing={chain_time * 1000:.1f}ms')
+# end of start
+
+
+if __name__ == '__main__':
+    start()
@@ -0,0 +1,247 @@
+"""
+Benchmark the time-to-first-task of a new worker process with
+and without ``analysis_engine.worker_warmup``
+
+Each trial starts a new python process like a prefork worker
+child. The process imports ``analysis_engine.algo`` first (the
+worker parent imports the task modules before forking) and then
+runs two backtest tasks on ``tests/datasets/spy-daily.json``
+with the bundled indicators. The ``warm`` mode runs
+``warm_worker`` before the first task. Each task builds a
+``BaseAlgo``, runs ``handle_data`` and gets the pooled redis
+client and S3 resource used for publishing (nothing is sent
+over the network).
+
+::
+
+    python -m analysis_engine.perf.benchmark_worker_warmup
+
+When TA-Lib is not installed the indicators use the
+``analysis_engine.mocks.mock_talib`` Williams %R stand-in.
+
+**Supported environment variables**
+
+::
+
+    export BENCH_TRIALS=5
+    # comma-separated indicator files
+    export BENCH_INDICATORS=analysis_engine/indicators/williamsr.py
+"""
+
+import os
+import sys
+import json
+import time
+import subprocess
+
+
+DEFAULT_INDICATORS = (
+    'analysis_engine/indicators/williamsr.py,'
+    'analysis_engine/indicators/williamsr_open.py')
+
+
+def get_indicator_files():
+    """get_indicator_files
+
+    Get the indicator files used by the backtest task
+    """
+    return [
+        os.path.abspath(path.strip())
+        for path in os.getenv(
+            'BENCH_INDICATORS',
+            DEFAULT_INDICATORS).split(',')
+        if path.strip()
+    ]
+# end of get_indicator_files
+
+
+def build_config_dict(
+        indicator_files):
+    """build_config_dict
+
+    Build an algorithm config with one indicator per file
+
+    :param indicator_files: list of indicator files
+    """
+    return {
+        'name': 'bench-warmup',
+        'ticker': 'SPY',
+        'timeseries': 'day',
+        'trade_strategy': 'count',
+        'balance': 10000,
+        'buy_shares': 10,
+        'positions': {},
+        'buy_rules': {
+            'min_indicators': 1
+        },
+        'sell_rules': {
+            'min_indicators': 1
+        },
+        'indicators': [
+            {
+                'name': f'ind_{idx}',
+                'module_path': path,
+                'category': 'technical',
+                'type': 'momentum',
+                'uses_data': 'daily',
+                'num_points': 20,
+                'buy_below': -80,
+                'sell_above': -20
+            }
+            for idx, path in enumerate(indicator_files)
+        ]
+    }
+# end of build_config_dict
+
+
+def run_backtest_task(
+        config_dict):
+    """run_backtest_task
+
+    Stand-in for the ``task_run_algo`` task body
+
+    :param config_dict: algorithm config
+    """
+    import pandas as pd
+    import analysis_engine.algo as base_algo
+    import analysis_engine.ae_talib as ae_talib
+    import analysis_engine.consts as ae_consts
+    import analysis_engine.shared_clients as shared_clients
+    import analysis_engine.mocks.mock_talib as mock_talib
+
+    if ae_talib.ta is mock_talib:
+        ae_talib.WILLR = mock_talib.MockWILLRIgnore
+
+    redis_host, redis_port = ae_consts.REDIS_ADDRESS.split(':')
+    shared_clients.get_redis_client(
+        host=redis_host,
+        port=redis_port)
+    shared_clients.get_s3_resource(
+        address=ae_consts.S3_ADDRESS,
+        access_key=ae_consts.S3_ACCESS_KEY,
+        secret_key=ae_consts.S3_SECRET_KEY,
+        region_name=ae_consts.S3_REGION_NAME)
+
+    with open('tests/datasets/spy-daily.json', 'r') as cur_file:
+        daily_df = pd.DataFrame(json.loads(cur_file.read()))
+    daily_df['date'] = pd.to_datetime(daily_df['date'])
+    algo = base_algo.BaseAlgo(
+        ticker='SPY',
+        balance=10000.0,
+        config_dict=config_dict)
+    algo.handle_data(
+        data={
+            'SPY': [
+                {
+                    'id': 'SPY_2018-11-05',
+                    'date': '2018-11-05',
+                    'data': {
+                        'daily': daily_df,
+                        'minute': pd.DataFrame([]),
+                        'options': pd.DataFrame([])
+                    }
+                }
+            ]
+        })
+    return len(algo.order_history)
+# end of run_backtest_task
+
+
+def run_child(
+        mode):
+    """run_child
+
+    Run one worker process trial and print the timings as json
+
+    :param mode: ``cold`` or ``warm``
+    """
+    import logging
+    # the worker parent imports the task modules before forking
+    import analysis_engine.algo  # noqa: F401
+    logging.disable(logging.CRITICAL)
+
+    indicator_files = get_indicator_files()
+    config_dict = build_config_dict(
+        indicator_files=indicator_files)
+    start_time = time.time()
+    warmup_seconds = 0.0
+    if mode == 'warm':
+        import analysis_engine.worker_warmup as worker_warmup
+        state = worker_warmup.warm_worker(
+            files=indicator_files,
+            algo_config='',
+            tickers='')
+        warmup_seconds = state['warmup_seconds']
+    task_start = time.time()
+    run_backtest_task(
+        config_dict=config_dict)
+    first_done = time.time()
+    run_backtest_task(
+        config_dict=config_dict)
+    second_done = time.time()
+    print(json.dumps({
+        'warmup_seconds': warmup_seconds,
+        'first_task_seconds': first_done - task_start,
+        'second_task_seconds': second_done - first_done,
+        'time_to_first_task': first_done - start_time
+    }))
+# end of run_child
+
+
+def start():
+    """start"""
+
+    num_trials = int(os.getenv('BENCH_TRIALS', '5'))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(
+        [os.getcwd()] + [
+            p for p in env.get('PYTHONPATH', '').split(os.pathsep) if p])
+    env['WORKER_WARMUP_MODULES'] = (
+        'pandas,numpy,boto3,botocore.session,'
+        'analysis_engine.ae_talib,'
+        'analysis_engine.indicators.base_indicator,'
+        'analysis_engine.indicators.indicator_processor,'
+        'analysis_engine.indicators.load_indicator_from_module,'
+        'analysis_engine.algo_result_store')
+
+    results = {}
+    for mode in ['cold', 'warm']:
+        trials = []
+        for _ in range(num_trials):
+            output = subprocess.check_output(
+                [
+                    sys.executable,
+                    '-m',
+                    'analysis_engine.perf.benchmark_worker_warmup',
+                    mode
+                ],
+                env=env,
+                stderr=subprocess.DEVNULL)
+            trials.append(json.loads(output.decode('utf-8').splitlines()[-1]))
+        results[mode] = {
+            k: sorted(t[k] for t in trials)[len(trials) // 2]
+            for k in trials[0]
+        }
+        print(
+            f'{mode} median of {num_trials} processes: '
+            f'warmup={results[mode]["warmup_seconds"]:.3f}s '
+            f'first_task={results[mode]["first_task_seconds"]:.3f}s '
+            f'second_task={results[mode]["second_task_seconds"]:.3f}s '
+            f'time_to_first_task={results[mode]["time_to_first_task"]:.3f}s')
+    # end of for all modes
+
+    cold = results['cold']
+    warm = results['warm']
+    print(
+        'first task slowdown vs steady state: '
+        f'cold={cold["first_task_seconds"] / cold["second_task_seconds"]:.1f}x '
+        f'warm={warm["first_task_seconds"] / warm["second_task_seconds"]:.1f}x')
+# end of start
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        run_child(
+            mode=sys.argv[1])
+    else:
+        start()
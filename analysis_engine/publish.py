@@ -8,6 +8,8 @@ import redis
 import zlib
 import analysis_engine.consts as ae_consts
 import analysis_engine.compress_data as compress_data
+import analysis_engine.chunked_publish as chunked_publish
+import analysis_engine.s3_transfer as s3_transfer
 import analysis_engine.set_data_in_redis_key as redis_utils
 import analysis_engine.send_to_slack as slack_utils
 import analysis_engine.write_to_file as file_utils
@@ -45,6 +47,8 @@ def publish(
         slack_full_width=False,
         verbose=False,
         silent=False,
+        chunked=ae_consts.ENABLED_CHUNKED_PUBLISH,
+        part_size=ae_consts.S3_TRANSFER_PART_SIZE,
         **kwargs):
     """publish
 
@@ -74,6 +78,15 @@ def publish(
         (default is ``False``)
     :param silent: optional - boolean no log output
         (default is ``False``)
+    :param chunked: optional - boolean to stream the
+        serialized and compressed data in parts of ``part_size``
+        bytes using ``analysis_engine.chunked_publish``
+        instead of building the full payload in memory. This
+        is skipped if ``slack_enabled`` is set
+        (default is ``ENABLED_CHUNKED_PUBLISH``)
+    :param part_size: optional - bytes per uploaded s3 part
+        (and per streamed part when ``chunked`` is enabled)
+        (default is ``S3_TRANSFER_PART_SIZE``)
     :param kwargs: optional - future argument support
 
     **(Optional) Redis connectivity arguments**
@@ -135,6 +148,37 @@ def publish(
         log.info('missing data')
         return ae_consts.INVALID
 
+    if chunked and not slack_enabled:
+        return chunked_publish.chunked_publish(
+            data=data,
+            label=label,
+            convert_to_json=convert_to_json,
+            is_df=is_df,
+            output_file=output_file,
+            df_compress=df_compress,
+            compress=compress,
+            part_size=part_size,
+            chunk_rows=kwargs.get(
+                'chunk_rows',
+                ae_consts.PUBLISH_CHUNK_ROWS),
+            redis_enabled=redis_enabled,
+            redis_key=redis_key,
+            redis_address=redis_address,
+            redis_db=redis_db,
+            redis_password=redis_password,
+            redis_expire=redis_expire,
+            redis_encoding=redis_encoding,
+            s3_enabled=s3_enabled,
+            s3_key=s3_key,
+            s3_address=s3_address,
+            s3_bucket=s3_bucket,
+            s3_access_key=s3_access_key,
+            s3_secret_key=s3_secret_key,
+            s3_region_name=s3_region_name,
+            s3_secure=s3_secure,
+            verbose=verbose)
+    # end of streaming publish
+
     if convert_to_json and not is_df:
         if verbose:
             log.debug('start convert to json')
@@ -203,10 +247,12 @@ def publish(
                 f's3 upload start - bytes={num_mb} to '
                 f'{s3_bucket}:{s3_key} {label}')
 
-        s3.Bucket(
-            s3_bucket).put_object(
-                Key=s3_key,
-                Body=use_data)
+        s3_transfer.upload_data(
+            s3=s3,
+            s3_bucket=s3_bucket,
+            s3_key=s3_key,
+            data=use_data,
+            part_size=part_size)
 
         if verbose:
             log.debug(
@@ -0,0 +1,194 @@
+"""
+Publish new minute bars and quote snapshots to a per-ticker
+`Redis Stream <https://redis.io/topics/streams-intro>`__
+
+Each record is added with ``XADD`` to a capped stream so live
+consumers only receive the newest bar instead of polling and
+decoding the whole day's cached ``minute`` dataset.
+
+Stream key format:
+
+::
+
+    stream:<TICKER>:<dataset>
+
+Enable stream publishing from the
+``publish_pricing_update`` task with:
+
+::
+
+    export ENABLED_REDIS_STREAM=1
+    # optional - cap the stream length (default is 1440 minutes)
+    export REDIS_STREAM_MAXLEN=1440
+
+Debug redis calls with:
+
+::
+
+    export DEBUG_REDIS=1
+"""
+
+import json
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def build_stream_key(
+        ticker,
+        dataset):
+    """build_stream_key
+
+    Build the redis stream key for a ticker's dataset
+
+    :param ticker: ticker symbol
+    :param dataset: dataset name like ``minute`` or ``quote``
+    """
+    return f'stream:{str(ticker).upper()}:{dataset}'
+# end of build_stream_key
+
+
+def get_last_stream_date(
+        client,
+        stream_key,
+        encoding='utf-8'):
+    """get_last_stream_date
+
+    Get the ``date`` field of the newest entry in a stream
+    or ``None`` if the stream is empty
+
+    :param client: initialized redis client
+    :param stream_key: redis stream key
+    :param encoding: encoding for the stream fields
+    """
+    entries = client.xrevrange(
+        stream_key,
+        count=1)
+    if not entries:
+        return None
+    fields = entries[0][1]
+    last_date = fields.get(
+        b'date',
+        fields.get('date', None))
+    if hasattr(last_date, 'decode'):
+        last_date = last_date.decode(encoding)
+    return last_date
+# end of get_last_stream_date
+
+
+def publish_to_stream(
+        client,
+        ticker,
+        dataset,
+        data,
+        maxlen=ae_consts.REDIS_STREAM_MAXLEN,
+        approximate=True,
+        only_new=True,
+        label=None,
+        encoding='utf-8'):
+    """publish_to_stream
+
+    ``XADD`` each record in ``data`` to the ticker's
+    dataset stream and cap the stream at ``maxlen`` entries
+
+    :param client: initialized redis client
+    :param ticker: ticker symbol
+    :param dataset: dataset name like ``minute`` or ``quote``
+    :param data: list of record dictionaries or a json
+        string created with ``df.to_json(orient='records')``
+    :param maxlen: optional - cap the stream to this many entries
+        (default is ``REDIS_STREAM_MAXLEN``)
+    :param approximate: optional - let redis trim the stream
+        with ``MAXLEN ~`` for faster trimming
+        (default is ``True``)
+    :param only_new: optional - skip records with a ``date``
+        that is not newer than the last entry in the stream
+        (default is ``True``)
+    :param label: optional - log tracking label
+    :param encoding: optional - encoding for the stream fields
+    """
+
+    log_id = label if label else 'publish-stream'
+    stream_key = build_stream_key(
+        ticker=ticker,
+        dataset=dataset)
+    rec = {
+        'stream_key': stream_key,
+        'num_added': 0,
+        'last_id': None
+    }
+    res = build_result.build_result(
+        status=ae_consts.NOT_RUN,
+        err=None,
+        rec=rec)
+
+    try:
+        records = data
+        if hasattr(records, 'decode'):
+            records = records.decode(encoding)
+        if isinstance(records, str):
+            records = json.loads(records)
+        if isinstance(records, dict):
+            records = [
+                records
+            ]
+        if not records:
+            res = build_result.build_result(
+                status=ae_consts.EMPTY,
+                err=None,
+                rec=rec)
+            return res
+
+        last_date = None
+        if only_new:
+            last_date = get_last_stream_date(
+                client=client,
+                stream_key=stream_key,
+                encoding=encoding)
+        if last_date:
+            last_date = pd.Timestamp(last_date)
+
+        for node in records:
+            node_date = node.get('date', None)
+            if (
+                    last_date is not None and
+                    node_date is not None and
+                    pd.Timestamp(node_date) <= last_date):
+                continue
+            fields = {
+                'date': str(node_date),
+                'data': json.dumps(node)
+            }
+            rec['last_id'] = client.xadd(
+                stream_key,
+                fields,
+                maxlen=maxlen,
+                approximate=approximate)
+            rec['num_added'] += 1
+        # end of for all records to add
+
+        if ae_consts.ev('DEBUG_REDIS', '0') == '1':
+            log.info(
+                f'{log_id} xadd stream={stream_key} '
+                f'added={rec["num_added"]} last_id={rec["last_id"]}')
+
+        res = build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+    except Exception as e:
+        err = (
+            f'{log_id} failed - publish_to_stream '
+            f'stream={stream_key} with ex={e}')
+        log.error(err)
+        res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=err,
+            rec=rec)
+    # end of try/ex
+
+    return res
+# end of publish_to_stream
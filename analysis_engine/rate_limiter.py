@@ -0,0 +1,517 @@
+"""
+Provider token-bucket rate limits shared by all fetch
+workers
+
+Each provider (``iex``, ``td``, ``finviz``) has one token
+bucket refilled at ``RATE_LIMIT_<PROVIDER>_PER_SECOND``
+holding up to ``RATE_LIMIT_BURST_SECONDS`` of tokens. With the
+``redis`` backend the bucket lives in a redis hash updated by
+an atomic Lua script so every Celery worker draws from the
+same budget. When redis is not reachable the limiter falls back
+to an in-process bucket for ``RATE_LIMIT_FALLBACK_SECONDS``
+before trying redis again.
+
+The HTTP helpers call ``limited_get`` which takes a token
+before each request and retries ``429 Too Many Requests``
+responses with full-jitter exponential backoff:
+
+.. code-block:: python
+
+    import analysis_engine.rate_limiter as rate_limiter
+
+    res = rate_limiter.limited_get(
+        provider='iex',
+        url=url)
+    print(rate_limiter.get_metrics('iex'))
+
+**Supported Environment Variables**
+
+::
+
+    export RATE_LIMIT_ENABLED=1
+    export RATE_LIMIT_BACKEND=redis
+    export RATE_LIMIT_IEX_PER_SECOND=50
+    export RATE_LIMIT_TD_PER_SECOND=2
+    export RATE_LIMIT_FINVIZ_PER_SECOND=1
+    export RATE_LIMIT_BURST_SECONDS=5
+    export RATE_LIMIT_MAX_RETRIES=3
+    export RATE_LIMIT_BACKOFF_BASE=0.5
+    export RATE_LIMIT_BACKOFF_MAX=30
+    export RATE_LIMIT_FALLBACK_SECONDS=30
+"""
+
+import math
+import time
+import random
+import threading
+import redis
+import analysis_engine.consts as ae_consts
+import analysis_engine.http_sessions as http_sessions
+import spylunking.log.setup_logging as log_utils
+
+try:
+    # redis-py 4+ retries failed connections by default which
+    # would stall every request while redis is down
+    import redis.retry as redis_retry
+    import redis.backoff as redis_backoff
+except ImportError:  # pragma: no cover
+    redis_retry = None
+    redis_backoff = None
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+# KEYS[1] = bucket key
+# ARGV = rate per second, capacity, tokens requested
+# returns 0 when the tokens were taken or the milliseconds
+# to wait before the bucket has enough tokens
+TOKEN_BUCKET_LUA = """
+redis.replicate_commands()
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local wait_ms = 0
+if tokens >= requested then
+    tokens = tokens - requested
+else
+    wait_ms = math.ceil((requested - tokens) * 1000 / rate)
+end
+redis.call('HMSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+return wait_ms
+"""
+
+LIMITERS = {}
+METRICS = {}
+LIMITER_LOCK = threading.Lock()
+REDIS_STATE = {
+    'client': None,
+    'script': None,
+    'disabled_until': 0.0
+}
+
+
+def get_provider_rate(
+        provider):
+    """get_provider_rate
+
+    Get the requests per second for a provider
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    """
+    return {
+        'iex': ae_consts.RATE_LIMIT_IEX_PER_SECOND,
+        'td': ae_consts.RATE_LIMIT_TD_PER_SECOND,
+        'finviz': ae_consts.RATE_LIMIT_FINVIZ_PER_SECOND
+    }.get(provider, 0.0)
+# end of get_provider_rate
+
+
+def get_redis_script():
+    """get_redis_script
+
+    Get the registered token bucket script on the shared
+    redis client or ``None`` while the local fallback is active
+    """
+    if time.time() < REDIS_STATE['disabled_until']:
+        return None
+    if REDIS_STATE['script']:
+        return REDIS_STATE['script']
+    with LIMITER_LOCK:
+        if not REDIS_STATE['script']:
+            host, port = ae_consts.REDIS_ADDRESS.split(':')
+            client_args = {
+                'host': host,
+                'port': int(port),
+                'password': ae_consts.REDIS_PASSWORD,
+                'db': ae_consts.REDIS_DB,
+                'socket_connect_timeout': 1,
+                'socket_timeout': 1
+            }
+            if redis_retry:
+                client_args['retry'] = redis_retry.Retry(
+                    redis_backoff.NoBackoff(),
+                    0)
+            REDIS_STATE['client'] = redis.Redis(**client_args)
+            REDIS_STATE['script'] = REDIS_STATE['client'].register_script(
+                TOKEN_BUCKET_LUA)
+    return REDIS_STATE['script']
+# end of get_redis_script
+
+
+def disable_redis(
+        err):
+    """disable_redis
+
+    Switch to the local token buckets for
+    ``RATE_LIMIT_FALLBACK_SECONDS``
+
+    :param err: exception from redis
+    """
+    log.error(
+        f'rate limiter falling back to local buckets for '
+        f'{ae_consts.RATE_LIMIT_FALLBACK_SECONDS}s - redis ex={err}')
+    REDIS_STATE['disabled_until'] = (
+        time.time() + ae_consts.RATE_LIMIT_FALLBACK_SECONDS)
+    REDIS_STATE['script'] = None
+    REDIS_STATE['client'] = None
+# end of disable_redis
+
+
+class LocalTokenBucket:
+    """LocalTokenBucket
+
+    In-process token bucket used with ``RATE_LIMIT_BACKEND=local``
+    and while redis is not reachable
+    """
+
+    def __init__(
+            self,
+            rate,
+            capacity):
+        """__init__
+
+        :param rate: tokens added per second
+        :param capacity: max tokens in the bucket
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last_time = time.monotonic()
+        self.lock = threading.Lock()
+    # end of __init__
+
+    def try_acquire(
+            self,
+            tokens=1):
+        """try_acquire
+
+        Take ``tokens`` and return ``0`` or return the
+        seconds to wait until there are enough tokens
+
+        :param tokens: optional - tokens to take
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.capacity,
+                self.tokens + (now - self.last_time) * self.rate)
+            self.last_time = now
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return 0.0
+            return (tokens - self.tokens) / self.rate
+    # end of try_acquire
+
+# end of LocalTokenBucket
+
+
+class TokenBucketLimiter:
+    """TokenBucketLimiter
+
+    Provider token bucket stored in redis with a local fallback
+    """
+
+    def __init__(
+            self,
+            provider,
+            rate=None,
+            capacity=None,
+            backend=None,
+            script=None):
+        """__init__
+
+        :param provider: provider name used in the redis key
+        :param rate: optional - tokens per second - ``0``
+            disables the limit (default is
+            ``get_provider_rate(provider)``)
+        :param capacity: optional - max tokens (default is
+            ``rate * RATE_LIMIT_BURST_SECONDS``)
+        :param backend: optional - ``redis`` or ``local``
+            (default is ``RATE_LIMIT_BACKEND``)
+        :param script: optional - registered redis script
+            for testing (default is the shared redis client)
+        """
+        self.provider = provider
+        self.rate = float(
+            get_provider_rate(provider) if rate is None else rate)
+        if capacity is None:
+            capacity = max(
+                1.0,
+                self.rate * ae_consts.RATE_LIMIT_BURST_SECONDS)
+        self.capacity = float(capacity)
+        self.backend = backend or ae_consts.RATE_LIMIT_BACKEND
+        self.script = script
+        self.key = f'{ae_consts.RATE_LIMIT_KEY_PREFIX}:{provider}'
+        self.local = None
+        if self.rate > 0:
+            self.local = LocalTokenBucket(
+                rate=self.rate,
+                capacity=self.capacity)
+    # end of __init__
+
+    def try_acquire(
+            self,
+            tokens=1):
+        """try_acquire
+
+        Take ``tokens`` and return ``0`` or return the seconds
+        to wait until the bucket has enough tokens
+
+        :param tokens: optional - tokens to take
+        """
+        if self.rate <= 0:
+            return 0.0
+        if self.backend == 'redis':
+            script = self.script
+            try:
+                if not script:
+                    script = get_redis_script()
+                if script:
+                    wait_ms = script(
+                        keys=[self.key],
+                        args=[self.rate, self.capacity, tokens])
+                    return int(wait_ms) / 1000.0
+            except Exception as e:
+                if self.script:
+                    raise
+                disable_redis(e)
+        # end of redis bucket
+        return self.local.try_acquire(tokens=tokens)
+    # end of try_acquire
+
+    def acquire(
+            self,
+            tokens=1):
+        """acquire
+
+        Block until ``tokens`` are taken and return the
+        seconds spent waiting
+
+        :param tokens: optional - tokens to take
+        """
+        waited = 0.0
+        while True:
+            wait = self.try_acquire(tokens=tokens)
+            if wait <= 0:
+                return waited
+            time.sleep(wait)
+            waited += wait
+    # end of acquire
+
+# end of TokenBucketLimiter
+
+
+def get_limiter(
+        provider):
+    """get_limiter
+
+    Get the shared ``TokenBucketLimiter`` for a provider
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    """
+    limiter = LIMITERS.get(provider)
+    if limiter:
+        return limiter
+    with LIMITER_LOCK:
+        limiter = LIMITERS.get(provider)
+        if not limiter:
+            limiter = TokenBucketLimiter(
+                provider=provider)
+            LIMITERS[provider] = limiter
+    return limiter
+# end of get_limiter
+
+
+def record_metric(
+        provider,
+        waited=0.0,
+        throttled=False):
+    """record_metric
+
+    Track the requests, token wait time and 429 responses
+    for a provider
+
+    :param provider: provider name
+    :param waited: optional - seconds spent waiting for a token
+    :param throttled: optional - bool for a 429 response
+    """
+    now = time.time()
+    with LIMITER_LOCK:
+        metric = METRICS.setdefault(provider, {
+            'requests': 0,
+            'throttled': 0,
+            'wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'first_time': now,
+            'last_time': now
+        })
+        if throttled:
+            metric['throttled'] += 1
+            return
+        metric['requests'] += 1
+        metric['wait_seconds'] += waited
+        metric['max_wait_seconds'] = max(
+            metric['max_wait_seconds'],
+            waited)
+        metric['last_time'] = now
+# end of record_metric
+
+
+def get_metrics(
+        provider=None):
+    """get_metrics
+
+    Return the rate limiter metrics for one provider or a
+    dictionary of all providers:
+
+    .. code-block:: python
+
+        {
+            'requests': 120,
+            'throttled': 0,
+            'wait_seconds': 41.2,
+            'max_wait_seconds': 0.5,
+            'avg_wait_seconds': 0.34,
+            'requests_per_second': 2.0
+        }
+
+    :param provider: optional - provider name
+    """
+    if not provider:
+        return {
+            name: get_metrics(name)
+            for name in list(METRICS.keys())
+        }
+    metric = dict(METRICS.get(provider, {}))
+    if not metric:
+        return metric
+    elapsed = metric.pop('last_time') - metric.pop('first_time')
+    metric['avg_wait_seconds'] = (
+        metric['wait_seconds'] / max(metric['requests'], 1))
+    metric['requests_per_second'] = 0.0
+    if metric['requests'] > 1 and elapsed > 0:
+        metric['requests_per_second'] = (
+            (metric['requests'] - 1) / elapsed)
+    return metric
+# end of get_metrics
+
+
+def reset_metrics():
+    """reset_metrics
+
+    Clear the metrics and the cached limiters
+    """
+    with LIMITER_LOCK:
+        METRICS.clear()
+        LIMITERS.clear()
+# end of reset_metrics
+
+
+def acquire(
+        provider):
+    """acquire
+
+    Block until the provider has a token and return the
+    seconds spent waiting
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    """
+    waited = 0.0
+    if ae_consts.RATE_LIMIT_ENABLED:
+        waited = get_limiter(provider).acquire()
+    record_metric(
+        provider=provider,
+        waited=waited)
+    return waited
+# end of acquire
+
+
+def get_backoff_seconds(
+        attempt,
+        base=None,
+        max_seconds=None):
+    """get_backoff_seconds
+
+    Full-jitter exponential backoff:
+    ``random(0, min(max_seconds, base * 2 ** attempt))``
+
+    :param attempt: retry number starting at ``0``
+    :param base: optional - seconds (default is
+        ``RATE_LIMIT_BACKOFF_BASE``)
+    :param max_seconds: optional - cap (default is
+        ``RATE_LIMIT_BACKOFF_MAX``)
+    """
+    if base is None:
+        base = ae_consts.RATE_LIMIT_BACKOFF_BASE
+    if max_seconds is None:
+        max_seconds = ae_consts.RATE_LIMIT_BACKOFF_MAX
+    return random.uniform(
+        0,
+        min(max_seconds, base * math.pow(2, attempt)))
+# end of get_backoff_seconds
+
+
+def limited_get(
+        provider,
+        url,
+        session=None,
+        max_retries=None,
+        **kwargs):
+    """limited_get
+
+    Take a provider token and send a ``GET`` request. Retries
+    ``429`` responses after a jittered backoff and returns
+    the last response.
+
+    :param provider: provider name like ``iex``, ``td``
+        or ``finviz``
+    :param url: request url
+    :param session: optional - object with a ``get`` method
+        (default is the pooled provider session)
+    :param max_retries: optional - retries after a ``429``
+        (default is ``RATE_LIMIT_MAX_RETRIES``)
+    :param kwargs: keyword arguments for ``session.get``
+    """
+    if session is None:
+        session = http_sessions.get_session(provider)
+    if max_retries is None:
+        max_retries = ae_consts.RATE_LIMIT_MAX_RETRIES
+    attempt = 0
+    while True:
+        acquire(provider)
+        res = session.get(url, **kwargs)
+        if res.status_code != 429 or attempt >= max_retries:
+            return res
+        record_metric(
+            provider=provider,
+            throttled=True)
+        retry_after = None
+        headers = getattr(res, 'headers', None) or {}
+        try:
+            retry_after = float(headers.get('Retry-After'))
+        except (TypeError, ValueError):
+            retry_after = None
+        backoff = get_backoff_seconds(attempt=attempt)
+        if retry_after:
+            backoff = max(backoff, retry_after)
+        log.info(
+            f'{provider} returned 429 - retry={attempt + 1}/'
+            f'{max_retries} in {backoff:.2f}s')
+        time.sleep(backoff)
+        attempt += 1
+    # end of retrying throttled requests
+# end of limited_get
@@ -38,6 +38,40 @@ import spylunking.log.setup_logging as log_utils
 log = log_utils.build_colorized_logger(name=__name__)
 
 
+def extract_ticker_nodes(
+        extract_nodes,
+        service_dict,
+        datasets,
+        label=None,
+        verbose=False):
+    """extract_ticker_nodes
+
+    Generator extracting one ticker's dataset nodes from the
+    cache as they are needed by
+    ``analysis_engine.algo_event_loop``
+
+    :param extract_nodes: list of the ticker's extract requests
+        in ascending date order
+    :param service_dict: dictionary for the redis and s3 settings
+    :param datasets: list of dataset names to extract
+    :param label: optional - log label
+    :param verbose: optional - log the extracts
+    """
+    for extract_node in extract_nodes:
+        yield {
+            'id': extract_node['id'],
+            'date': extract_node['date'],
+            'data': build_ds_node.build_dataset_node(
+                ticker=extract_node['ticker'],
+                date=extract_node['date'],
+                service_dict=service_dict,
+                datasets=datasets,
+                log_label=label,
+                verbose=verbose)
+        }
+# end of extract_ticker_nodes
+
+
 def run_algo(
         ticker=None,
         tickers=None,
@@ -87,6 +121,8 @@ def run_algo(
         config_dict=None,
         version=1,
         raise_on_err=True,
+        indicator_shards=ae_consts.INDICATOR_SHARDS,
+        event_loop=ae_consts.ALGO_EVENT_LOOP,
         **kwargs):
     """run_algo
 
@@ -246,6 +282,27 @@ def run_algo(
         When set to ``True`` exceptions will
         are raised to the calling functions
 
+    **(Optional) Sharded Indicators**
+
+    :param indicator_shards: optional - number of shards for
+        precomputing the indicators before replaying the trades
+        with ``analysis_engine.indicator_shards`` (``0`` runs
+        ``handle_data`` directly, default is
+        ``analysis_engine.consts.INDICATOR_SHARDS``). The shards
+        run as ``compute_indicator_shard`` tasks when
+        ``celery_disabled`` is ``False``.
+
+    **(Optional) Multi-Ticker Event Loop**
+
+    :param event_loop: optional - run the ``tickers`` in one
+        time-ordered event loop with
+        ``analysis_engine.algo_event_loop`` instead of
+        ``handle_data`` (which runs every date of one ticker
+        before the next ticker). Each ticker's datasets are
+        extracted when the event loop reaches them. The
+        ``indicator_shards`` replay is used when both are set
+        (default is ``analysis_engine.consts.ALGO_EVENT_LOOP``)
+
     :param kwargs: keyword arguments dictionary
     """
 
@@ -504,6 +561,32 @@ def run_algo(
     first_extract_date = None
     last_extract_date = None
     total_extract_requests = len(extract_requests)
+    percent_label = (
+        f'{label} '
+        f'tickers={use_tickers} '
+        f'{indicator_datasets}')
+    if event_loop and not int(indicator_shards or 0) and extract_requests:
+        # stream each ticker's datasets into the event loop
+        # instead of extracting every date up front
+        ticker_requests = {}
+        for extract_node in extract_requests:
+            if extract_node['ticker'] not in ticker_requests:
+                ticker_requests[extract_node['ticker']] = []
+            ticker_requests[extract_node['ticker']].append(extract_node)
+        for extract_ticker, ticker_nodes in ticker_requests.items():
+            algo_data_req[extract_ticker] = extract_ticker_nodes(
+                extract_nodes=ticker_nodes,
+                service_dict=common_vals,
+                datasets=indicator_datasets,
+                label=label,
+                verbose=verbose_extract)
+        first_extract_date = min(
+            node['date'] for node in extract_requests)
+        last_extract_date = max(
+            node['date'] for node in extract_requests)
+        extract_requests = []
+    # end of streaming the extracts
+
     cur_idx = 1
     for idx, extract_node in enumerate(extract_requests):
 
@@ -536,10 +619,10 @@ def run_algo(
             log_label=label,
             verbose=verbose_extract)
 
-        if ticker not in algo_data_req:
-            algo_data_req[ticker] = []
+        if extract_ticker not in algo_data_req:
+            algo_data_req[extract_ticker] = []
 
-        algo_data_req[ticker].append({
+        algo_data_req[extract_ticker].append({
             'id': ds_node_id,  # id is currently the cache key in redis
             'date': extract_date,  # used to confirm dates in asc order
             'data': ticker_bt_data
@@ -548,7 +631,7 @@ def run_algo(
         if verbose:
             log.info(
                 f'extract - {percent_label} '
-                f'dataset={len(algo_data_req[ticker])}')
+                f'dataset={len(algo_data_req[extract_ticker])}')
         cur_idx += 1
     # end of for service_dict in extract_requests
 
@@ -571,8 +654,28 @@ def run_algo(
             log.info(
                 f'handle_data START - {percent_label} from '
                 f'{first_extract_date} to {last_extract_date}')
-        algo.handle_data(
-            data=algo_data_req)
+        if indicator_shards and int(indicator_shards) > 0:
+            import analysis_engine.indicator_shards as shard_utils
+            shard_utils.run_sharded_backtest(
+                algo=algo,
+                data=algo_data_req,
+                num_shards=indicator_shards,
+                celery_disabled=celery_disabled,
+                redis_address=redis_address or ae_consts.REDIS_ADDRESS,
+                redis_db=(
+                    redis_db if redis_db is not None
+                    else ae_consts.REDIS_DB),
+                redis_password=redis_password,
+                label=label)
+        elif event_loop:
+            import analysis_engine.algo_event_loop as algo_event_loop
+            algo_event_loop.run_event_loop(
+                algo=algo,
+                data=algo_data_req,
+                label=label)
+        else:
+            algo.handle_data(
+                data=algo_data_req)
         if verbose:
             log.info(
                 f'handle_data END - {percent_label} from '
@@ -15,12 +15,16 @@ Example with the command line tool:
 """
 
 import os
+import time
 import inspect
 import types
 import importlib.machinery
 import datetime
 import json
+import redis
+import boto3
 import analysis_engine.consts as ae_consts
+import analysis_engine.backtest_cache as backtest_cache
 import analysis_engine.build_algo_request as build_algo_request
 import analysis_engine.build_publish_request as build_publish_request
 import analysis_engine.build_result as build_result
@@ -35,6 +39,8 @@ log = log_utils.build_colorized_logger(name=__name__)
 def run_custom_algo(
         mod_path,
         ticker='SPY',
+        tickers=None,
+        ticker_workers=ae_consts.ALGO_TICKER_WORKERS,
         balance=50000,
         commission=6.0,
         start_date=None,
@@ -112,6 +118,9 @@ def run_custom_algo(
         ssl_options=ae_consts.SSL_OPTIONS,
         transport_options=ae_consts.TRANSPORT_OPTIONS,
         path_to_config_module=ae_consts.WORKER_CELERY_CONFIG_MODULE,
+        result_by_reference=ae_consts.ALGO_RESULT_BY_REFERENCE,
+        use_cache=ae_consts.ENABLED_BACKTEST_CACHE,
+        cache_store=ae_consts.BACKTEST_CACHE_STORE,
         raise_on_err=True):
     """run_custom_algo
 
@@ -127,6 +136,15 @@ def run_custom_algo(
     :param mod_path: file path to custom
         algorithm class module
     :param ticker: ticker symbol
+    :param tickers: optional - list of tickers to backtest
+        with one algorithm object per ticker in a process pool
+        (each ticker starts with ``balance`` and the histories
+        and reports are merged with
+        ``analysis_engine.algo_ticker_pool``, the
+        algorithm-ready dataset is not published in this mode)
+    :param ticker_workers: optional - processes for ``tickers``
+        (``0`` uses every core, default is
+        ``ALGO_TICKER_WORKERS``)
     :param balance: float - starting balance capital
         for creating buys and sells
     :param commission: float - cost pet buy or sell
@@ -189,6 +207,11 @@ def run_custom_algo(
         Celery worker connectivity requirements
         (default is ``analysis_engine.work_tasks.celery_config``
         or ``analysis_engine.consts.WORKER_CELERY_CONFIG_MODULE``)
+    :param result_by_reference: optional - bool for the worker
+        to store the trading history and report with
+        ``analysis_engine.algo_result_store`` and only return
+        a ``result_ref`` pointer and a ``summary``
+        (default is ``ALGO_RESULT_BY_REFERENCE``)
 
     **Load Algorithm-Ready Dataset From Source**
 
@@ -393,6 +416,16 @@ def run_custom_algo(
         publishing as a to slack using the full
         width allowed
 
+    **Backtest Result Cache**
+
+    :param use_cache: optional - boolean for returning the
+        cached trading history and report from a previous
+        backtest with the same algorithm source, indicator
+        sources, ``config_dict``, dates and datasets
+        (default is ``ENABLED_BACKTEST_CACHE``)
+    :param cache_store: optional - ``file``, ``redis`` or ``s3``
+        (default is ``BACKTEST_CACHE_STORE``)
+
     **Debugging arguments**
 
     :param debug: optional - bool for debug tracking
@@ -727,6 +760,7 @@ def run_custom_algo(
         rec=None)
 
     if run_on_engine:
+        algo_req['result_by_reference'] = result_by_reference
         rec = {
             'algo_req': algo_req,
             'task_id': None
@@ -771,7 +805,59 @@ def run_custom_algo(
         return algo_res
     # end of run_on_engine
 
-    if use_custom_algo:
+    if tickers:
+        import analysis_engine.algo_ticker_pool as ticker_pool
+        algo_res = ticker_pool.run_ticker_pool(
+            tickers=tickers,
+            algo_kwargs={
+                'mod_path': mod_path,
+                'balance': balance,
+                'commission': commission,
+                'start_date': use_start_date,
+                'end_date': use_end_date,
+                'name': name,
+                'auto_fill': auto_fill,
+                'config_file': use_config_file,
+                'config_dict': use_config_dict,
+                'load_from_s3_bucket': load_from_s3_bucket,
+                'load_from_s3_key': load_from_s3_key,
+                'load_from_redis_key': load_from_redis_key,
+                'load_from_file': load_from_file,
+                'load_compress': load_compress,
+                'dataset_type': dataset_type,
+                'serialize_datasets': serialize_datasets,
+                'compress': compress,
+                'encoding': encoding,
+                'redis_enabled': redis_enabled,
+                'redis_address': redis_address,
+                'redis_db': redis_db,
+                'redis_password': redis_password,
+                'redis_expire': redis_expire,
+                'redis_serializer': redis_serializer,
+                'redis_encoding': redis_encoding,
+                's3_enabled': s3_enabled,
+                's3_address': s3_address,
+                's3_bucket': s3_bucket,
+                's3_access_key': s3_access_key,
+                's3_secret_key': s3_secret_key,
+                's3_region_name': s3_region_name,
+                's3_secure': s3_secure,
+                'publish_to_s3': publish_to_s3,
+                'publish_to_redis': publish_to_redis,
+                'publish_to_slack': publish_to_slack,
+                'timeseries': timeseries,
+                'trade_strategy': trade_strategy,
+                'use_cache': use_cache,
+                'cache_store': cache_store,
+                'verbose': verbose,
+                'debug': debug
+            },
+            max_workers=ticker_workers,
+            raise_on_err=raise_on_err,
+            label=name)
+        if algo_res['status'] != ae_consts.SUCCESS:
+            return algo_res
+    elif use_custom_algo:
         if verbose:
             log.info(
                 f'inspecting {custom_algo_module} for class {module_name}')
@@ -814,11 +900,103 @@ def run_custom_algo(
             log.info(
                 f'{name} - run ticker={ticker} from {use_start_date} '
                 f'to {use_end_date}')
-        algo_res = run_algo.run_algo(
-            algo=new_algo_object,
-            raise_on_err=raise_on_err,
-            **algo_req)
+        cache_key = None
+        cache_client = None
+        cache_s3 = None
+        cached = None
+        if use_cache:
+            try:
+                use_redis_address = (
+                    redis_address if redis_address
+                    else ae_consts.REDIS_ADDRESS)
+                cache_client = redis.Redis(
+                    host=use_redis_address.split(':')[0],
+                    port=int(use_redis_address.split(':')[1]),
+                    password=redis_password,
+                    db=redis_db if redis_db else ae_consts.REDIS_DB)
+                if cache_store == 's3' or (
+                        s3_enabled
+                        and ae_consts.ENABLED_S3_EXTRACT_FALLBACK):
+                    use_s3_address = (
+                        s3_address if s3_address
+                        else ae_consts.S3_ADDRESS)
+                    cache_s3 = boto3.resource(
+                        's3',
+                        endpoint_url=(
+                            f'http{"s" if s3_secure else ""}://'
+                            f'{use_s3_address}'),
+                        aws_access_key_id=(
+                            s3_access_key if s3_access_key
+                            else ae_consts.S3_ACCESS_KEY),
+                        aws_secret_access_key=(
+                            s3_secret_key if s3_secret_key
+                            else ae_consts.S3_SECRET_KEY),
+                        region_name=(
+                            s3_region_name if s3_region_name
+                            else ae_consts.S3_REGION_NAME),
+                        config=boto3.session.Config(
+                            signature_version='s3v4'))
+                cache_key = backtest_cache.build_backtest_cache_key(
+                    algo=new_algo_object,
+                    algo_req=algo_req,
+                    mod_path=mod_path,
+                    client=cache_client,
+                    s3=cache_s3,
+                    s3_bucket=(
+                        s3_bucket if s3_bucket else ae_consts.S3_BUCKET),
+                    files=[load_from_file] if load_from_file else None,
+                    extra={
+                        'balance': balance,
+                        'commission': commission,
+                        'auto_fill': auto_fill,
+                        'timeseries': timeseries,
+                        'trade_strategy': trade_strategy,
+                        'load_from_redis_key': load_from_redis_key,
+                        'load_from_s3_bucket': load_from_s3_bucket,
+                        'load_from_s3_key': load_from_s3_key
+                    })
+                cached = backtest_cache.get_cached_result(
+                    cache_key=cache_key,
+                    store=cache_store,
+                    client=cache_client,
+                    s3=cache_s3)
+            except Exception as e:
+                log.error(
+                    f'{name} - disabling the backtest cache for '
+                    f'ticker={ticker} ex={e}')
+                cache_key = None
+                cached = None
+        # end of checking the backtest cache
+
+        if cached:
+            backtest_cache.restore_algo_from_cache(
+                algo=new_algo_object,
+                cached=cached)
+            algo_res = build_result.build_result(
+                status=ae_consts.SUCCESS,
+                err=None,
+                rec=cached['result'])
+        else:
+            start_time = time.time()
+            algo_res = run_algo.run_algo(
+                algo=new_algo_object,
+                raise_on_err=raise_on_err,
+                **algo_req)
+            if cache_key and algo_res['status'] == ae_consts.SUCCESS:
+                backtest_cache.set_cached_result(
+                    cache_key=cache_key,
+                    cached=backtest_cache.build_cached_result(
+                        cache_key=cache_key,
+                        algo=new_algo_object,
+                        result=algo_res['rec'],
+                        elapsed_seconds=time.time() - start_time),
+                    store=cache_store,
+                    client=cache_client,
+                    s3=cache_s3)
+        # end of running the backtest or using the cached result
         algo_res['algo'] = new_algo_object
+        algo_res['cache_key'] = cache_key
+        algo_res['cache_hit'] = cached is not None
         if verbose:
             log.info(
                 f'{name} - run ticker={ticker} from {use_start_date} '
@@ -835,7 +1013,7 @@ def run_custom_algo(
                 log.info(
                     f'{name} - done run_algo BaseAlgo ticker={ticker} '
                     f'from {use_start_date} to {use_end_date}')
-    else:
+    elif not tickers:
         err = (
             'missing a derived analysis_engine.algo.BaseAlgo '
             f'class in the module file={mod_path} for ticker={ticker} '
@@ -863,7 +1041,14 @@ def run_custom_algo(
             err=err,
             rec=None)
 
-    if should_publish_extract_dataset or dataset_publish_extract:
+    if (tickers or not algo.has_input_datasets()) and (
+            should_publish_extract_dataset or dataset_publish_extract):
+        # cache hits and ticker pools do not keep the datasets
+        log.info(
+            f'{name} - not publishing the algorithm-ready dataset '
+            f'for tickers={algo.get_tickers()} '
+            f'cache_hit={algo_res.get("cache_hit", False)}')
+    elif should_publish_extract_dataset or dataset_publish_extract:
         s3_log = ''
         redis_log = ''
         file_log = ''
@@ -906,7 +1091,7 @@ def run_custom_algo(
             log.error(msg)
             return build_result.build_result(
                 status=ae_consts.ERR,
-                err=err,
+                err=msg,
                 rec=None)
 
         if verbose:
@@ -4,6 +4,8 @@ Wrapper for downloading an S3 key as a string
 
 import json
 import zlib
+import analysis_engine.consts as ae_consts
+import analysis_engine.s3_transfer as s3_transfer
 import spylunking.log.setup_logging as log_utils
 
 log = log_utils.build_colorized_logger(name=__name__)
@@ -15,10 +17,14 @@ def s3_read_contents_from_key(
         s3_key,
         encoding='utf-8',
         convert_as_json=True,
-        compress=False):
+        compress=False,
+        part_size=ae_consts.S3_TRANSFER_PART_SIZE,
+        max_workers=ae_consts.S3_TRANSFER_MAX_WORKERS):
     """s3_read_contents_from_key
 
-    Download the S3 key contents as a string. This
+    Download the S3 key contents as a string. Large objects
+    are downloaded with concurrent ranged requests using
+    ``analysis_engine.s3_transfer.download_key``. This
     will raise exceptions.
 
     :param s3: existing S3 object
@@ -27,25 +33,31 @@ def s3_read_contents_from_key(
     :param encoding: utf-8 by default
     :param convert_to_json: auto-convert to a dict
     :param compress: decompress using ``zlib``
+    :param part_size: optional - bytes per ranged request
+        (default is ``S3_TRANSFER_PART_SIZE``)
+    :param max_workers: optional - concurrent ranged requests
+        (default is ``S3_TRANSFER_MAX_WORKERS``)
     """
 
     log.debug(
         f'getting s3.Object({s3_bucket_name}, {s3_key})')
-    s3_obj = s3.Object(s3_bucket_name, s3_key)
+    s3_contents = s3_transfer.download_key(
+        s3=s3,
+        s3_bucket=s3_bucket_name,
+        s3_key=s3_key,
+        part_size=part_size,
+        max_workers=max_workers)
 
     raw_contents = None
     if compress:
         log.debug(
-            f'zlib.decompress('
-            f's3_obj.get()["Body"].read()'
-            f'.decode({encoding})')
+            f'zlib.decompress(contents).decode({encoding})')
         raw_contents = zlib.decompress(
-            s3_obj.get()['Body'].read()).decode(
+            s3_contents).decode(
                 encoding)
     else:
         log.debug(
-            f's3_obj.get()["Body"].read().decode({encoding})')
-        s3_contents = s3_obj.get()['Body'].read()
+            f'contents.decode({encoding})')
         raw_contents = s3_contents.decode(encoding)
     # if compressed or not
 
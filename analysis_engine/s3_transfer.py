@@ -0,0 +1,353 @@
+"""
+Parallel S3 transfer helpers for large datasets
+
+Algorithm-ready datasets and ``Trading History`` archives can
+reach hundreds of MB. These helpers split transfers into parts
+of ``part_size`` bytes that run on a pool of ``max_workers``
+threads:
+
+- ``upload_data`` - multipart upload with per-part checksum
+  verification (falls back to ``put_object`` for small payloads)
+- ``upload_part`` - upload and verify one multipart upload part
+  with retries (shared with ``analysis_engine.chunked_publish``)
+- ``download_key`` - parallel ranged (or per-part) ``GetObject``
+  calls reassembled in order and verified against the object's
+  ``ETag`` and ``ContentLength``
+
+**Supported environment variables**
+
+::
+
+    # bytes per part (default is 8 MB, s3 requires >= 5 MB)
+    export S3_TRANSFER_PART_SIZE=8388608
+    # number of concurrent part transfers
+    export S3_TRANSFER_MAX_WORKERS=8
+    # verify checksums after transfers (default is on)
+    export S3_TRANSFER_VERIFY=1
+    # retries for each failed multipart upload part
+    export S3_TRANSFER_RETRIES=2
+"""
+
+import hashlib
+import concurrent.futures
+import analysis_engine.consts as ae_consts
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+def is_md5_etag(
+        etag):
+    """is_md5_etag
+
+    Check if an ``ETag`` is a plain or multipart md5 checksum
+    (some S3-compatible services and encrypted objects use
+    other formats that cannot be verified)
+
+    :param etag: ``ETag`` without quotes
+    """
+    md5_hex = etag.split('-')[0]
+    if len(md5_hex) != 32:
+        return False
+    try:
+        int(md5_hex, 16)
+    except ValueError:
+        return False
+    return True
+# end of is_md5_etag
+
+
+def build_multipart_etag(
+        part_digests):
+    """build_multipart_etag
+
+    Build the S3 multipart ``ETag`` from the list of binary
+    md5 digests for each part
+
+    :param part_digests: list of ``hashlib.md5().digest()`` values
+    """
+    combined = hashlib.md5(b''.join(part_digests)).hexdigest()
+    return f'{combined}-{len(part_digests)}'
+# end of build_multipart_etag
+
+
+def validate_part_size(
+        part_size):
+    """validate_part_size
+
+    Raise an exception if ``part_size`` is smaller than the
+    ``S3_MIN_PART_SIZE`` that s3 requires for every multipart
+    upload part except the last one
+
+    :param part_size: bytes per part
+    """
+    if part_size < ae_consts.S3_MIN_PART_SIZE:
+        raise Exception(
+            f'invalid part_size={part_size} - s3 multipart uploads '
+            f'require parts of at least {ae_consts.S3_MIN_PART_SIZE} '
+            f'bytes')
+# end of validate_part_size
+
+
+def upload_part(
+        client,
+        s3_bucket,
+        s3_key,
+        upload_id,
+        part_number,
+        part,
+        verify=ae_consts.S3_TRANSFER_VERIFY,
+        retries=ae_consts.S3_TRANSFER_RETRIES):
+    """upload_part
+
+    Upload one part of a multipart upload and verify its
+    ``ETag``. Failed attempts are retried ``retries`` times
+    before the last exception is raised.
+
+    :param client: ``boto3`` s3 client
+    :param s3_bucket: bucket name
+    :param s3_key: key
+    :param upload_id: multipart ``UploadId``
+    :param part_number: part number starting at ``1``
+    :param part: ``bytes`` for the part
+    :param verify: optional - verify the ``ETag`` for the part
+        (default is ``S3_TRANSFER_VERIFY``)
+    :param retries: optional - retries for a failed part
+        (default is ``S3_TRANSFER_RETRIES``)
+    """
+    for attempt in range(retries + 1):
+        try:
+            res = client.upload_part(
+                Bucket=s3_bucket,
+                Key=s3_key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=part)
+            etag = res['ETag'].strip('"')
+            if verify and is_md5_etag(etag):
+                expected = hashlib.md5(part).hexdigest()
+                if etag != expected:
+                    raise Exception(
+                        f'checksum mismatch for part={part_number} '
+                        f's3://{s3_bucket}/{s3_key} etag={etag} '
+                        f'expected={expected}')
+            return {
+                'ETag': res['ETag'],
+                'PartNumber': part_number
+            }
+        except Exception as e:
+            if attempt >= retries:
+                raise e
+            log.error(
+                f'retrying part={part_number} '
+                f's3://{s3_bucket}/{s3_key} '
+                f'attempt={attempt + 1}/{retries} ex={e}')
+    # end of for all attempts
+# end of upload_part
+
+
+def upload_data(
+        s3,
+        s3_bucket,
+        s3_key,
+        data,
+        part_size=ae_consts.S3_TRANSFER_PART_SIZE,
+        max_workers=ae_consts.S3_TRANSFER_MAX_WORKERS,
+        verify=ae_consts.S3_TRANSFER_VERIFY):
+    """upload_data
+
+    Upload ``data`` to S3 using concurrent multipart uploads
+    if it is larger than ``part_size``. This will raise
+    exceptions (including for a multipart ``part_size`` below
+    ``S3_MIN_PART_SIZE``) and aborts the multipart upload on
+    failure.
+
+    :param s3: ``boto3.resource('s3')`` object
+    :param s3_bucket: bucket name
+    :param s3_key: key
+    :param data: ``bytes`` or ``str`` payload
+    :param part_size: optional - bytes per part
+        (default is ``S3_TRANSFER_PART_SIZE``)
+    :param max_workers: optional - concurrent part uploads
+        (default is ``S3_TRANSFER_MAX_WORKERS``)
+    :param verify: optional - verify the ``ETag`` for each part
+        (default is ``S3_TRANSFER_VERIFY``)
+    """
+    body = data
+    if isinstance(body, str):
+        body = body.encode('utf-8')
+    num_bytes = len(body)
+
+    if num_bytes <= part_size:
+        s3.Bucket(s3_bucket).put_object(
+            Key=s3_key,
+            Body=body)
+        return
+    # end of single part upload
+
+    validate_part_size(
+        part_size=part_size)
+    client = s3.meta.client
+    mpu = client.create_multipart_upload(
+        Bucket=s3_bucket,
+        Key=s3_key)
+    upload_id = mpu['UploadId']
+    view = memoryview(body)
+    offsets = list(range(0, num_bytes, part_size))
+
+    def upload_offset(
+            part_idx):
+        start = offsets[part_idx]
+        return upload_part(
+            client=client,
+            s3_bucket=s3_bucket,
+            s3_key=s3_key,
+            upload_id=upload_id,
+            part_number=part_idx + 1,
+            part=bytes(view[start:start + part_size]),
+            verify=verify)
+    # end of upload_offset
+
+    try:
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers) as executor:
+            parts = list(executor.map(
+                upload_offset,
+                range(len(offsets))))
+        client.complete_multipart_upload(
+            Bucket=s3_bucket,
+            Key=s3_key,
+            UploadId=upload_id,
+            MultipartUpload={
+                'Parts': parts
+            })
+    except Exception as e:
+        log.error(
+            f'failed multipart upload s3://{s3_bucket}/{s3_key} '
+            f'parts={len(offsets)} ex={e}')
+        client.abort_multipart_upload(
+            Bucket=s3_bucket,
+            Key=s3_key,
+            UploadId=upload_id)
+        raise e
+    # end of try/ex
+
+    log.debug(
+        f'uploaded s3://{s3_bucket}/{s3_key} '
+        f'size={ae_consts.get_mb(num_bytes)}MB parts={len(offsets)} '
+        f'workers={max_workers}')
+# end of upload_data
+
+
+def download_key(
+        s3,
+        s3_bucket,
+        s3_key,
+        part_size=ae_consts.S3_TRANSFER_PART_SIZE,
+        max_workers=ae_consts.S3_TRANSFER_MAX_WORKERS,
+        verify=ae_consts.S3_TRANSFER_VERIFY):
+    """download_key
+
+    Download the S3 key contents as ``bytes`` using concurrent
+    ``GetObject`` calls. Objects uploaded with multipart are
+    downloaded part by part so the multipart ``ETag`` can be
+    verified, other objects use byte ranges of ``part_size``.
+    This will raise exceptions.
+
+    :param s3: ``boto3.resource('s3')`` object
+    :param s3_bucket: bucket name
+    :param s3_key: key
+    :param part_size: optional - bytes per ranged request
+        (default is ``S3_TRANSFER_PART_SIZE``)
+    :param max_workers: optional - concurrent requests
+        (default is ``S3_TRANSFER_MAX_WORKERS``)
+    :param verify: optional - verify the reassembled payload
+        against the ``ETag`` and ``ContentLength``
+        (default is ``S3_TRANSFER_VERIFY``)
+    """
+    client = s3.meta.client
+    head = client.head_object(
+        Bucket=s3_bucket,
+        Key=s3_key)
+    num_bytes = int(head['ContentLength'])
+    etag = head.get('ETag', '').strip('"')
+    num_parts = 0
+    if '-' in etag:
+        num_parts = int(etag.split('-')[-1])
+
+    if num_parts > 1:
+        part_requests = [
+            {
+                'PartNumber': part_num
+            }
+            for part_num in range(1, num_parts + 1)
+        ]
+    elif num_bytes > part_size:
+        part_requests = [
+            {
+                'Range': (
+                    f'bytes={start}-'
+                    f'{min(start + part_size, num_bytes) - 1}')
+            }
+            for start in range(0, num_bytes, part_size)
+        ]
+    else:
+        part_requests = [
+            {}
+        ]
+    # end of building the part requests
+
+    def download_part(
+            req):
+        res = client.get_object(
+            Bucket=s3_bucket,
+            Key=s3_key,
+            **req)
+        return res['Body'].read()
+    # end of download_part
+
+    if len(part_requests) == 1:
+        parts = [
+            download_part(part_requests[0])
+        ]
+    else:
+        with concurrent.futures.ThreadPoolExecutor(
+                max_workers=max_workers) as executor:
+            parts = list(executor.map(
+                download_part,
+                part_requests))
+    contents = b''.join(parts)
+
+    if verify:
+        if len(contents) != num_bytes:
+            raise Exception(
+                f'size mismatch for s3://{s3_bucket}/{s3_key} '
+                f'downloaded={len(contents)} expected={num_bytes}')
+        if is_md5_etag(etag):
+            if num_parts > 1:
+                found_etag = build_multipart_etag([
+                    hashlib.md5(p).digest() for p in parts
+                ])
+            elif num_parts == 1:
+                found_etag = build_multipart_etag([
+                    hashlib.md5(contents).digest()
+                ])
+            else:
+                found_etag = hashlib.md5(contents).hexdigest()
+            if found_etag != etag:
+                raise Exception(
+                    f'checksum mismatch for s3://{s3_bucket}/{s3_key} '
+                    f'etag={etag} downloaded={found_etag}')
+        else:
+            log.debug(
+                f'skip checksum for s3://{s3_bucket}/{s3_key} '
+                f'etag={etag}')
+    # end of verify
+
+    log.debug(
+        f'downloaded s3://{s3_bucket}/{s3_key} '
+        f'size={ae_consts.get_mb(num_bytes)}MB requests={len(part_requests)} '
+        f'workers={max_workers}')
+
+    return contents
+# end of download_key
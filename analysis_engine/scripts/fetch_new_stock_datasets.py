@@ -17,6 +17,26 @@ Tradier (https://tradier.com/) and FinViz (https://finviz.com/)
 
     fetch -t QQQ -g min
 
+**Fetch Only the New Intraday Minute Bars**
+
+Append the minutes since the last cached bar to the cached
+minute dataset instead of fetching the whole day again:
+
+::
+
+    fetch -t QQQ -g min -I
+
+**Backfill Minute Data for Many Tickers**
+
+Fetch the IEX Cloud minute data for every trading session
+from ``-F`` to ``-E`` (default is the last close) that is
+not already cached in Redis or S3. An interrupted backfill
+resumes from its progress file:
+
+::
+
+    fetch -t SPY,QQQ -g backfill -F 2019-01-02 -E 2019-02-15
+
 **Fetch Intraday Option Chains for Calls and Puts**
 
 ::
@@ -41,20 +61,14 @@ Turn on verbose debugging with the ``-d`` argument:
 
 import os
 import argparse
-import celery
-import analysis_engine.work_tasks.get_celery_app as get_celery_app
 import analysis_engine.consts as ae_consts
 import analysis_engine.iex.consts as iex_consts
-import analysis_engine.api_requests as api_requests
-import analysis_engine.work_tasks.get_new_pricing_data as task_pricing
-import analysis_engine.work_tasks.task_screener_analysis as screener_utils
-import analysis_engine.utils as ae_utils
 import spylunking.log.setup_logging as log_utils
 
+# celery, pandas and the task modules are imported inside the
+# fetch mode that needs them so ``fetch -h`` starts fast
+
 
-# Disable celery log hijacking
-# https://github.com/celery/celery/issues/2509
-@celery.signals.setup_logging.connect
 def setup_celery_logging(**kwargs):
     pass
 
@@ -64,6 +78,18 @@ log = log_utils.build_colorized_logger(
     log_config_path=ae_consts.LOG_CONFIG_PATH)
 
 
+def disable_celery_log_hijacking():
+    """disable_celery_log_hijacking
+
+    Disable celery log hijacking before any mode uses celery
+    https://github.com/celery/celery/issues/2509
+    """
+    import celery.signals
+    celery.signals.setup_logging.connect(
+        setup_celery_logging)
+# end of disable_celery_log_hijacking
+
+
 def start_screener_analysis(
         req):
     """start_screener_analysis
@@ -85,6 +111,8 @@ def start_screener_analysis(
         'screener')
     log.info(f'{label} - start screener analysis')
     req['celery_disabled'] = True
+    import analysis_engine.work_tasks.task_screener_analysis \
+        as screener_utils
     analysis_res = screener_utils.run_screener_analysis(
         work_dict=req)
     log.info(f'{label} - done screener analysis result={analysis_res}')
@@ -114,6 +142,17 @@ def fetch_new_stock_datasets():
 
         fetch -t TICKER
 
+    **Pull Data for Many Tickers**
+
+    A comma-separated ``-t`` list is split into
+    ``FETCH_CHUNK_SIZE`` ticker chunks and each chunk is fetched
+    by one ``get_new_pricing_data_chunk`` task which fetches the
+    chunk's IEX datasets with IEX Cloud batch requests
+
+    ::
+
+        fetch -t SPY,AAPL,MSFT,AMZN
+
     **Pull from All Supported IEX Feeds**
 
     ::
@@ -230,7 +269,8 @@ def fetch_new_stock_datasets():
     parser.add_argument(
         '-t',
         help=(
-            'ticker'),
+            'ticker or a comma-separated list of tickers '
+            'fetched in chunks'),
         required=False,
         dest='ticker')
     parser.add_argument(
@@ -265,7 +305,9 @@ def fetch_new_stock_datasets():
             'div or iex_div = fetch from just IEX Cloud dividends feed'
             'https://iexcloud.io/docs/api/#dividends, '
             'iex_comp = fetch from just IEX Cloud company feed '
-            'https://iexcloud.io/docs/api/#company'),
+            'https://iexcloud.io/docs/api/#company, '
+            'backfill = fetch the IEX Cloud minute feed for '
+            'each uncached trading session from -F to -E'),
         required=False,
         dest='fetch_mode')
     parser.add_argument(
@@ -438,6 +480,23 @@ def fetch_new_stock_datasets():
             'format is YYYY-MM-DD'),
         required=False,
         dest='backfill_date')
+    parser.add_argument(
+        '-E',
+        help=(
+            'optional - last date for the backfill fetch mode '
+            'format is YYYY-MM-DD (default is the last close)'),
+        required=False,
+        dest='backfill_end_date')
+    parser.add_argument(
+        '-I',
+        help=(
+            'optional - incremental fetch that only requests '
+            'the IEX Cloud daily and minute bars newer than '
+            'the cached datasets and republishes the merged '
+            'datasets'),
+        required=False,
+        dest='incremental',
+        action='store_true')
     parser.add_argument(
         '-d',
         help=(
@@ -451,7 +510,7 @@ def fetch_new_stock_datasets():
     ticker = ae_consts.TICKER
     ticker_id = ae_consts.TICKER_ID
     fetch_mode = 'initial'
-    exp_date_str = ae_consts.NEXT_EXP_STR
+    exp_date_str = None
     ssl_options = ae_consts.SSL_OPTIONS
     transport_options = ae_consts.TRANSPORT_OPTIONS
     broker_url = ae_consts.WORKER_BROKER_URL
@@ -479,6 +538,7 @@ def fetch_new_stock_datasets():
     redis_enabled = True
     analysis_type = None
     backfill_date = None
+    incremental = False
     debug = False
 
     if args.ticker:
@@ -486,7 +546,9 @@ def fetch_new_stock_datasets():
     if args.ticker_id:
         ticker_id = args.ticker_id
     if args.exp_date_str:
-        exp_date_str = ae_consts.NEXT_EXP_STR
+        exp_date_str = args.exp_date_str
+    else:
+        exp_date_str = ae_consts.get_next_exp_str()
     if args.broker_url:
         broker_url = args.broker_url
     if args.backend_url:
@@ -536,9 +598,13 @@ def fetch_new_stock_datasets():
         run_offline = False
     if args.backfill_date:
         backfill_date = args.backfill_date
+    if args.incremental:
+        incremental = True
     if args.debug:
         debug = True
 
+    disable_celery_log_hijacking()
+    import analysis_engine.api_requests as api_requests
     work = api_requests.build_get_new_pricing_request()
 
     work['ticker'] = ticker
@@ -567,6 +633,7 @@ def fetch_new_stock_datasets():
     work['analysis_type'] = analysis_type
     work['iex_datasets'] = iex_consts.DEFAULT_FETCH_DATASETS
     work['backfill_date'] = backfill_date
+    work['incremental'] = incremental
     work['debug'] = debug
     work['label'] = f'ticker={ticker}'
 
@@ -585,7 +652,72 @@ def fetch_new_stock_datasets():
         start_screener_analysis(
             req=work)
     # end of analysis_type
+    elif fetch_mode == 'backfill':
+        if not backfill_date:
+            log.error(
+                'please set the first backfill date with: '
+                '-F YYYY-MM-DD')
+            return
+        work['label'] = f'backfill={ticker}'
+        import analysis_engine.backfill as backfill
+        backfill_res = backfill.run_backfill(
+            tickers=ticker.split(','),
+            start_date=backfill_date,
+            end_date=args.backfill_end_date,
+            work_dict=work)
+        log.info(
+            f'done backfill tickers={ticker} '
+            f'status={ae_consts.get_status(backfill_res["status"])} '
+            f'err={backfill_res["err"]} rec={backfill_res["rec"]}')
+    # end of backfill
+    elif ',' in ticker:
+        work['label'] = 'fetch'
+        work.pop('ticker', None)
+        import analysis_engine.fetch_chunks as fetch_chunks
+        chunk_reqs = fetch_chunks.build_chunk_requests(
+            work_dict=work,
+            tickers=ticker.split(','))
+        chunk_task_name = (
+            'analysis_engine.work_tasks'
+            '.get_new_pricing_data_chunk.get_new_pricing_data_chunk')
+        if ae_consts.is_celery_disabled() or run_offline:
+            for chunk_req in chunk_reqs:
+                chunk_req['celery_disabled'] = True
+                chunk_req['verbose'] = debug
+                import analysis_engine.work_tasks.get_new_pricing_data_chunk \
+                    as task_chunk
+                chunk_res = task_chunk.run_get_new_pricing_data_chunk(
+                    chunk_req)
+                log.info(
+                    f'done fetching chunk={chunk_req["label"]} '
+                    f'tickers={len(chunk_req["tickers"])} '
+                    f'status={ae_consts.get_status(chunk_res["status"])} '
+                    f'err={chunk_res["err"]}')
+        else:
+            import analysis_engine.work_tasks.get_celery_app \
+                as get_celery_app
+            app = get_celery_app.get_celery_app(
+                name=__name__,
+                auth_url=broker_url,
+                backend_url=backend_url,
+                path_to_config_module=celery_config_module,
+                ssl_options=ssl_options,
+                transport_options=transport_options,
+                include_tasks=include_tasks)
+            for chunk_req in chunk_reqs:
+                job_id = app.send_task(
+                    chunk_task_name,
+                    (chunk_req,))
+                log.debug(
+                    f'task={chunk_task_name} - job_id={job_id} '
+                    f'tickers={chunk_req["tickers"]}')
+            log.info(
+                f'sent tasks={len(chunk_reqs)} '
+                f'for tickers={len(ticker.split(","))}')
+        # end of if/else celery
+    # end of chunked multi-ticker fetch
     else:
+        import analysis_engine.utils as ae_utils
         last_close_date = ae_utils.last_close()
         last_close_str = last_close_date.strftime(
             ae_consts.COMMON_DATE_FORMAT)
@@ -605,6 +737,8 @@ def fetch_new_stock_datasets():
             log.debug(
                 f'starting without celery work={ae_consts.ppj(work)} '
                 f'offline={run_offline}')
+            import analysis_engine.work_tasks.get_new_pricing_data \
+                as task_pricing
             task_res = task_pricing.get_new_pricing_data(
                 work)
             status_str = ae_consts.get_status(status=task_res['status'])
@@ -652,6 +786,8 @@ def fetch_new_stock_datasets():
                 f'backend={backend_url}')
 
             # Get the Celery app
+            import analysis_engine.work_tasks.get_celery_app \
+                as get_celery_app
             app = get_celery_app.get_celery_app(
                 name=__name__,
                 auth_url=broker_url,
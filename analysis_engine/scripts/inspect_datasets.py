@@ -63,6 +63,7 @@ import argparse
 import analysis_engine.consts as ae_consts
 import analysis_engine.utils as ae_utils
 import analysis_engine.extract as ae_extract
+import analysis_engine.trading_calendar as trading_calendar
 import spylunking.log.setup_logging as log_utils
 
 log = log_utils.build_colorized_logger(
@@ -114,10 +115,13 @@ def inspect_datasets(
 
     fix_suggestions = []
     last_close = ae_utils.last_close()
+    calendar = trading_calendar.get_calendar()
     for ticker in tickers:
 
         not_done = True
         cur_date = start_date
+        if not calendar.is_trading_day(cur_date):
+            cur_date = calendar.next_trading_day(cur_date)
         while not_done:
             cur_date_str = cur_date.strftime(ae_consts.COMMON_DATE_FORMAT)
 
@@ -199,17 +203,8 @@ def inspect_datasets(
             if cur_date > last_close:
                 not_done = False
             else:
-                cur_date += datetime.timedelta(days=1)
-                not_a_weekday = True
-                while not_a_weekday:
-                    weekday = cur_date.date().weekday()
-                    if weekday > 4:
-                        log.debug(
-                            'SKIP weekend day: '
-                            f'{cur_date.strftime("%A on %Y-%m-%d")}')
-                        cur_date += datetime.timedelta(days=1)
-                    else:
-                        not_a_weekday = False
+                # skip weekends and market holidays
+                cur_date = calendar.next_trading_day(cur_date)
         # end for all dates
     # end of for all tickers
 
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+
+"""
+Tool for reporting redis memory usage by ticker and dataset
+and offloading older minute and options datasets to S3.
+Offloaded keys keep the same name in S3 and the
+`Extraction API <https://stock-analysis-engine.
+readthedocs.io/en/latest/extract.html>`__ reads them
+from S3 when they are not in redis.
+
+**Examples**
+
+**Dry-run Report**
+
+::
+
+    manage_redis_budget.py
+
+**Keep the Last 10 Trading Days of Minute Data in Redis**
+
+::
+
+    manage_redis_budget.py -n 10 -g minute -x
+
+**Keep Redis Under 2 GB for Minute and Options Data**
+
+::
+
+    manage_redis_budget.py -m 2048 -x
+
+**Usage**
+
+::
+
+    manage_redis_budget.py -h
+    usage: manage_redis_budget.py [-h] [-n HOT_DAYS] [-g DATASETS]
+                                  [-m MAX_MB] [-b S3_BUCKET] [-x]
+
+    Report redis memory usage and offload older datasets to S3
+
+    optional arguments:
+    -h, --help    show this help message and exit
+    -n HOT_DAYS   trading days to keep in redis (default is 5)
+    -g DATASETS   comma delimited datasets to manage
+                  (default is minute,tdcalls,tdputs)
+    -m MAX_MB     optional - max MB for the managed datasets in redis
+    -b S3_BUCKET  S3 bucket for offloaded keys (default is pricing)
+    -x            offload and delete keys (default is a dry-run report)
+"""
+
+import argparse
+import analysis_engine.consts as ae_consts
+import analysis_engine.manage_redis_budget as budget
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(
+    name='manage-redis-budget')
+
+
+def print_report(
+        rec):
+    """print_report
+
+    Print the usage by ticker and dataset and the
+    offload plan
+
+    :param rec: ``rec`` from ``manage_redis_budget``
+    """
+    print('ticker     dataset           MB')
+    for ticker in sorted(rec['usage']):
+        for dataset, num_bytes in sorted(rec['usage'][ticker].items()):
+            print(
+                f'{ticker:10s} {dataset:12s} '
+                f'{ae_consts.get_mb(num_bytes):>8}')
+    print('-------------------------------')
+    print(
+        f'keys={rec["num_keys"]} '
+        f'total={ae_consts.get_mb(rec["total_bytes"])}MB '
+        f'hot cutoff={rec["cutoff_date"]}')
+    offload_bytes = sum(node['bytes'] for node in rec['offload'])
+    print(
+        f'offload keys={len(rec["offload"])} '
+        f'size={ae_consts.get_mb(offload_bytes)}MB')
+    for node in rec['offload']:
+        print(f' - {node["key"]} reason={node["reason"]}')
+    if rec['dry_run']:
+        print('dry-run - use -x to offload these keys')
+    else:
+        print(
+            f'offloaded={rec["num_offloaded"]} '
+            f'freed={ae_consts.get_mb(rec["bytes_freed"])}MB')
+# end of print_report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(
+        description=(
+            'Report redis memory usage and offload older '
+            'datasets to S3'))
+    parser.add_argument(
+        '-n',
+        help=(
+            'trading days to keep in redis '
+            f'(default is {ae_consts.REDIS_BUDGET_HOT_DAYS})'),
+        required=False,
+        dest='hot_days')
+    parser.add_argument(
+        '-g',
+        help=(
+            'comma delimited datasets to manage (default is '
+            f'{",".join(ae_consts.REDIS_BUDGET_DATASETS)})'),
+        required=False,
+        dest='datasets')
+    parser.add_argument(
+        '-m',
+        help=(
+            'optional - max MB for the managed datasets in redis'),
+        required=False,
+        dest='max_mb')
+    parser.add_argument(
+        '-b',
+        help=(
+            f'S3 bucket for offloaded keys '
+            f'(default is {ae_consts.S3_BUCKET})'),
+        required=False,
+        dest='s3_bucket')
+    parser.add_argument(
+        '-x',
+        help=(
+            'offload and delete keys (default is a dry-run report)'),
+        required=False,
+        dest='offload',
+        action='store_true')
+    args = parser.parse_args()
+
+    hot_days = ae_consts.REDIS_BUDGET_HOT_DAYS
+    datasets = ae_consts.REDIS_BUDGET_DATASETS
+    max_mb = ae_consts.REDIS_BUDGET_MAX_MB
+    s3_bucket = ae_consts.S3_BUCKET
+
+    if args.hot_days:
+        hot_days = int(args.hot_days)
+    if args.datasets:
+        datasets = args.datasets.split(',')
+    if args.max_mb:
+        max_mb = float(args.max_mb)
+    if args.s3_bucket:
+        s3_bucket = args.s3_bucket
+
+    res = budget.manage_redis_budget(
+        s3_bucket=s3_bucket,
+        hot_days=hot_days,
+        datasets=datasets,
+        max_mb=max_mb,
+        dry_run=not args.offload)
+
+    if res['status'] != ae_consts.SUCCESS:
+        log.error(res['err'])
+    print_report(rec=res['rec'])
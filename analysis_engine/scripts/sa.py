@@ -71,25 +71,13 @@ import os
 import sys
 import datetime
 import argparse
-import celery
 import analysis_engine.consts as ae_consts
-import analysis_engine.run_custom_algo as run_custom_algo
-import analysis_engine.work_tasks.get_celery_app as get_celery_app
-import analysis_engine.plot_trading_history as plot_trading_history
-import analysis_engine.charts as ae_charts
-import analysis_engine.iex.extract_df_from_redis as extract_utils
-import analysis_engine.show_dataset as show_dataset
-import analysis_engine.load_history_dataset_from_file as load_history
-import analysis_engine.load_report_dataset_from_file as load_report
-import analysis_engine.restore_dataset as restore_dataset
-import analysis_engine.work_tasks.prepare_pricing_dataset as prep_dataset
-import analysis_engine.api_requests as api_requests
 import spylunking.log.setup_logging as log_utils
 
+# celery, pandas, matplotlib and the task modules are imported inside
+# the mode that needs them so ``sa -h`` and the show modes start fast
+
 
-# Disable celery log hijacking
-# https://github.com/celery/celery/issues/2509
-@celery.signals.setup_logging.connect
 def setup_celery_logging(**kwargs):
     pass
 
@@ -99,6 +87,18 @@ log = log_utils.build_colorized_logger(
     log_config_path=ae_consts.LOG_CONFIG_PATH)
 
 
+def disable_celery_log_hijacking():
+    """disable_celery_log_hijacking
+
+    Disable celery log hijacking before any mode uses celery
+    https://github.com/celery/celery/issues/2509
+    """
+    import celery.signals
+    celery.signals.setup_logging.connect(
+        setup_celery_logging)
+# end of disable_celery_log_hijacking
+
+
 def restore_missing_dataset_values_from_algo_ready_file(
         ticker,
         path_to_file,
@@ -151,6 +151,7 @@ def restore_missing_dataset_values_from_algo_ready_file(
     if not output_redis_db:
         output_redis_db = redis_db
 
+    import analysis_engine.restore_dataset as restore_dataset
     restore_dataset.restore_dataset(
         show_summary=show_summary,
         path_to_file=path_to_file,
@@ -193,6 +194,7 @@ def examine_dataset_in_file(
     """
     if dataset_type == ae_consts.SA_DATASET_TYPE_ALGO_READY:
         log.info(f'show start - load dataset from file={path_to_file}')
+        import analysis_engine.show_dataset as show_dataset
         show_dataset.show_dataset(
             path_to_file=path_to_file,
             compress=compress,
@@ -204,6 +206,8 @@ def examine_dataset_in_file(
         log.info(
             'load trading history dataset '
             f'from file={path_to_file}')
+        import analysis_engine.load_history_dataset_from_file as load_history
+        import analysis_engine.plot_trading_history as plot_trading_history
         trading_history_dict = load_history.load_history_dataset_from_file(
             path_to_file=path_to_file,
             compress=compress,
@@ -250,6 +254,7 @@ def examine_dataset_in_file(
         log.info(
             'load trading performance report dataset '
             f'from file={path_to_file}')
+        import analysis_engine.load_report_dataset_from_file as load_report
         trading_report_dict = load_report.load_report_dataset_from_file(
             path_to_file=path_to_file,
             compress=compress,
@@ -717,6 +722,7 @@ def run_sa_tool():
         task_name = (
             f'{path_to_tasks}.'
             'prepare_pricing_dataset.prepare_pricing_dataset')
+        import analysis_engine.api_requests as api_requests
         work = api_requests.build_prepare_dataset_request()
         if output_s3_key:
             work['prepared_s3_key'] = output_s3_key
@@ -899,6 +905,8 @@ def run_sa_tool():
         else:
             log.info('starting algo')
 
+        disable_celery_log_hijacking()
+        import analysis_engine.run_custom_algo as run_custom_algo
         algo_res = run_custom_algo.run_custom_algo(
             mod_path=args.run_algo_in_file,
             ticker=ticker,
@@ -1063,6 +1071,8 @@ def run_sa_tool():
         work['celery_disabled'] = True
         log.debug(f'starting without celery work={ae_consts.ppj(work)}')
         if mode == ae_consts.SA_MODE_PREPARE:
+            import analysis_engine.work_tasks.prepare_pricing_dataset \
+                as prep_dataset
             task_res = prep_dataset.prepare_pricing_dataset(
                 work)
 
@@ -1107,6 +1117,9 @@ def run_sa_tool():
                     '%Y-%m-%d')
                 extract_req = work
                 extract_req['redis_key'] = f'{work["redis_key"]}_minute'
+                import analysis_engine.iex.extract_df_from_redis \
+                    as extract_utils
+                import analysis_engine.charts as ae_charts
                 extract_status, minute_df = \
                     extract_utils.extract_minute_dataset(
                         work_dict=work)
@@ -1173,6 +1186,8 @@ def run_sa_tool():
         log.info(f'connecting to broker={broker_url} backend={backend_url}')
 
         # Get the Celery app
+        disable_celery_log_hijacking()
+        import analysis_engine.work_tasks.get_celery_app as get_celery_app
         app = get_celery_app.get_celery_app(
             name=__name__,
             auth_url=broker_url,
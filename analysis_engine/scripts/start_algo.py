@@ -5,13 +5,12 @@ import sys
 import datetime
 import json
 import argparse
-import pandas as pd
 import analysis_engine.consts as ae_consts
-import analysis_engine.plot_trading_history as plot_trading_history
-import analysis_engine.load_history_dataset as load_history_utils
-import analysis_engine.run_custom_algo as run_custom_algo
 import spylunking.log.setup_logging as log_utils
 
+# pandas, matplotlib and the algo runner are imported after the
+# arguments are parsed so ``ae -h`` starts fast
+
 
 log = log_utils.build_colorized_logger(
     name='ae',
@@ -596,6 +595,7 @@ def start_algo():
             'trade_strategy',
             trade_strategy)
 
+        import analysis_engine.run_custom_algo as run_custom_algo
         algo_res = run_custom_algo.run_custom_algo(
             mod_path=algo_mod_path,
             ticker=config_dict['ticker'],
@@ -694,6 +694,10 @@ def start_algo():
                     'history_config', None)
             s3_bucket = history_config.get('s3_bucket', None)
             s3_key = history_config.get('s3_key', None)
+            import pandas as pd
+            import analysis_engine.load_history_dataset as load_history_utils
+            import analysis_engine.plot_trading_history \
+                as plot_trading_history
             load_res = load_history_utils.load_history_dataset(
                 s3_bucket=s3_bucket,
                 s3_key=s3_key)
@@ -843,6 +847,7 @@ def start_algo():
             for i, r in history_df.iterrows():
                 log.info(f'{r["minute"]} - {r["close"]}')
 
+        import analysis_engine.plot_trading_history as plot_trading_history
         plot_trading_history.plot_trading_history(
             title=title,
             df=history_df,
@@ -0,0 +1,177 @@
+"""
+Redis and S3 clients shared by the publishes inside one
+process
+
+``publish_pricing_update`` builds a new ``redis.Redis`` client,
+a new ``boto3.resource('s3')`` and lists the buckets for every
+dataset it publishes. The chunked fetch task publishes hundreds
+of datasets per task so it enables the shared clients for the
+duration of the chunk:
+
+.. code-block:: python
+
+    import analysis_engine.shared_clients as shared_clients
+
+    with shared_clients.shared():
+        s3 = shared_clients.get_s3_resource(
+            address='0.0.0.0:9000',
+            access_key='trexaccesskey',
+            secret_key='trex123321',
+            region_name='us-east-1')
+
+``redis.Redis`` clients are thread safe and shared by all
+threads. ``boto3`` resources are not thread safe so each
+thread gets its own resource.
+"""
+
+import contextlib
+import threading
+import boto3
+import redis
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+CLIENT_LOCK = threading.Lock()
+REDIS_CLIENTS = {}
+CHECKED_BUCKETS = set()
+THREAD_STATE = threading.local()
+SHARED_STATE = {
+    'depth': 0
+}
+
+
+def is_shared():
+    """is_shared
+
+    Return ``True`` while a ``shared()`` block is active
+    """
+    return SHARED_STATE['depth'] > 0
+# end of is_shared
+
+
+@contextlib.contextmanager
+def shared():
+    """shared
+
+    Context manager that turns on the shared clients for
+    the publishes made inside the block
+    """
+    with CLIENT_LOCK:
+        SHARED_STATE['depth'] += 1
+    try:
+        yield
+    finally:
+        with CLIENT_LOCK:
+            SHARED_STATE['depth'] -= 1
+# end of shared
+
+
+def get_redis_client(
+        host,
+        port,
+        password=None,
+        db=0):
+    """get_redis_client
+
+    Get the shared ``redis.Redis`` client for a redis address
+
+    :param host: redis host
+    :param port: redis port
+    :param password: optional - redis password
+    :param db: optional - redis db
+    """
+    key = (host, str(port), password, int(db))
+    client = REDIS_CLIENTS.get(key)
+    if client:
+        return client
+    with CLIENT_LOCK:
+        client = REDIS_CLIENTS.get(key)
+        if not client:
+            client = redis.Redis(
+                host=host,
+                port=port,
+                password=password,
+                db=db)
+            REDIS_CLIENTS[key] = client
+    return client
+# end of get_redis_client
+
+
+def get_s3_resource(
+        address,
+        access_key,
+        secret_key,
+        region_name,
+        secure=False):
+    """get_s3_resource
+
+    Get this thread's ``boto3.resource('s3')`` for an S3 address
+
+    :param address: S3 ``host:port`` address
+    :param access_key: S3 access key
+    :param secret_key: S3 secret key
+    :param region_name: S3 region
+    :param secure: optional - bool to use https
+    """
+    resources = getattr(THREAD_STATE, 'resources', None)
+    if resources is None:
+        resources = {}
+        THREAD_STATE.resources = resources
+    key = (address, access_key, secret_key, region_name, secure)
+    s3 = resources.get(key)
+    if not s3:
+        endpoint_url = f'http{"s" if secure else ""}://{address}'
+        s3 = boto3.resource(
+            's3',
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region_name,
+            config=boto3.session.Config(
+                signature_version='s3v4'))
+        resources[key] = s3
+    return s3
+# end of get_s3_resource
+
+
+def ensure_bucket(
+        s3,
+        bucket_name,
+        address=None):
+    """ensure_bucket
+
+    Create the S3 bucket if it does not exist. Each bucket
+    is only checked once per process.
+
+    :param s3: ``boto3.resource('s3')``
+    :param bucket_name: bucket name
+    :param address: optional - S3 address for the check cache
+    """
+    key = (address, bucket_name)
+    if key in CHECKED_BUCKETS:
+        return
+    if s3.Bucket(bucket_name) not in s3.buckets.all():
+        s3.create_bucket(
+            Bucket=bucket_name)
+    with CLIENT_LOCK:
+        CHECKED_BUCKETS.add(key)
+# end of ensure_bucket
+
+
+def close_clients():
+    """close_clients
+
+    Drop the shared clients and the checked buckets
+    """
+    with CLIENT_LOCK:
+        for client in REDIS_CLIENTS.values():
+            try:
+                client.close()
+            except Exception as e:
+                log.debug(f'failed closing redis client ex={e}')
+        REDIS_CLIENTS.clear()
+        CHECKED_BUCKETS.clear()
+    THREAD_STATE.resources = {}
+# end of close_clients
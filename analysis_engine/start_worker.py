@@ -30,7 +30,8 @@ app = get_celery_app.get_celery_app(
     path_to_config_module=consts.WORKER_CELERY_CONFIG_MODULE,
     auth_url=consts.WORKER_BROKER_URL,
     backend_url=consts.WORKER_BACKEND_URL,
-    include_tasks=consts.INCLUDE_TASKS)
+    include_tasks=consts.INCLUDE_TASKS,
+    warmup=consts.WORKER_WARMUP_ENABLED)
 
 log.info('starting celery')
 app.start()
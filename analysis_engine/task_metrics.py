@@ -0,0 +1,954 @@
+"""
+Task-level performance metrics for every Celery task
+
+``analysis_engine.work_tasks.custom_task.CustomTask`` records
+these metrics for each task it runs. They are aggregated per
+task name in fixed-bucket histograms inside each worker process:
+
+- ``queue_wait_seconds`` - time from the publish timestamp
+  (the ``ae_published`` message header set from the
+  ``before_task_publish`` signal) until the task starts (tasks
+  with an ``eta`` or ``countdown`` are measured from the eta)
+- ``run_seconds`` - task run time
+- ``payload_in_bytes`` - json size of the task args and kwargs
+- ``payload_out_bytes`` - json size of the task return value
+
+with counters for ``success``, ``failure`` and ``retries``.
+
+Each Celery worker process flushes its metrics every
+``TASK_METRICS_FLUSH_SECONDS`` to the ``TASK_METRICS_EXPORT``
+targets (other processes like the ``fetch`` and ``sa`` tools
+running tasks with celery disabled only keep the metrics in
+memory):
+
+- ``file`` - a Prometheus text-format file (one per process)
+  for the node exporter textfile collector which is removed
+  when the process exits
+- ``redis`` - increments to the ``TASK_METRICS_REDIS_KEY`` redis
+  hash shared by all the workers (see ``get_redis_metrics``)
+- ``http`` - a Prometheus ``/metrics`` endpoint on the first
+  free port from ``TASK_METRICS_HTTP_PORT``
+
+Find the slowest tasks with:
+
+.. code-block:: python
+
+    import analysis_engine.task_metrics as task_metrics
+    task_metrics.get_slowest_tasks(
+        metric='run_seconds',
+        quantile=0.99,
+        metrics=task_metrics.get_redis_metrics(client=client))
+
+**Supported environment variables**
+
+::
+
+    export TASK_METRICS_ENABLED=1
+    # comma-separated exporters: file, redis and http
+    export TASK_METRICS_EXPORT=file
+    # {pid} is replaced with the worker process id
+    export TASK_METRICS_FILE=/tmp/ae-task-metrics-{pid}.prom
+    export TASK_METRICS_REDIS_KEY=ae:taskmetrics
+    export TASK_METRICS_HTTP_PORT=9808
+    export TASK_METRICS_HTTP_PORTS=16
+    export TASK_METRICS_FLUSH_SECONDS=10
+    # json-size the task args and return values
+    export TASK_METRICS_PAYLOAD_SIZES=0
+"""
+
+import os
+import json
+import time
+import atexit
+import socket
+import threading
+import socketserver
+import http.server
+import celery
+import celery.concurrency
+import dateutil.parser
+import analysis_engine.consts as ae_consts
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+PUBLISHED_HEADER = 'ae_published'
+METRIC_PREFIX = 'ae_task'
+
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0,
+    float('inf'))
+BYTES_BUCKETS = (
+    256, 1024, 4096, 16384, 65536, 262144,
+    1048576, 4194304, 16777216, 67108864,
+    float('inf'))
+
+HISTOGRAMS = {
+    'queue_wait_seconds': SECONDS_BUCKETS,
+    'run_seconds': SECONDS_BUCKETS,
+    'payload_in_bytes': BYTES_BUCKETS,
+    'payload_out_bytes': BYTES_BUCKETS
+}
+COUNTERS = [
+    'success',
+    'failure',
+    'retries'
+]
+
+METRICS_LOCK = threading.Lock()
+# per task name: histogram dicts and counters for this process
+METRICS = {}
+# increments since the last redis export
+PENDING = {}
+EXPORT_STATE = {
+    'last_flush': None,
+    'http_server': None,
+    'http_port': None,
+    'http_pid': None,
+    'worker': False,
+    'files': []
+}
+SIGNAL_STATE = {
+    'connected': False
+}
+
+
+def build_histogram(
+        buckets):
+    """build_histogram
+
+    Build an empty histogram with a count for each bucket
+    upper bound
+
+    :param buckets: sorted bucket upper bounds ending with ``inf``
+    """
+    return {
+        'buckets': list(buckets),
+        'counts': [0] * len(buckets),
+        'sum': 0.0,
+        'count': 0
+    }
+# end of build_histogram
+
+
+def build_task_metrics():
+    """build_task_metrics
+
+    Build the empty metrics for one task name
+    """
+    rec = {
+        name: build_histogram(buckets)
+        for name, buckets in HISTOGRAMS.items()
+    }
+    for name in COUNTERS:
+        rec[name] = 0
+    return rec
+# end of build_task_metrics
+
+
+def observe(
+        metrics,
+        task_name,
+        metric,
+        value):
+    """observe
+
+    Add a value to a task's histogram (call with the
+    ``METRICS_LOCK`` held)
+
+    :param metrics: metrics dictionary keyed by task name
+    :param task_name: task name
+    :param metric: histogram name
+    :param value: observed value
+    """
+    rec = metrics.setdefault(task_name, build_task_metrics())
+    hist = rec[metric]
+    for idx, upper in enumerate(hist['buckets']):
+        if value <= upper:
+            hist['counts'][idx] += 1
+            break
+    hist['sum'] += value
+    hist['count'] += 1
+# end of observe
+
+
+def increment(
+        metrics,
+        task_name,
+        counter,
+        amount=1):
+    """increment
+
+    Increment a task's counter (call with the ``METRICS_LOCK``
+    held)
+
+    :param metrics: metrics dictionary keyed by task name
+    :param task_name: task name
+    :param counter: counter name
+    :param amount: optional - amount to add (default is ``1``)
+    """
+    rec = metrics.setdefault(task_name, build_task_metrics())
+    rec[counter] += amount
+# end of increment
+
+
+def get_payload_size(
+        value):
+    """get_payload_size
+
+    Get the json-serialized size in bytes of a task payload
+    (the same serializer as ``celery_config.task_serializer``)
+
+    :param value: task args, kwargs or return value
+    """
+    if value is None:
+        return 0
+    try:
+        return len(json.dumps(value, default=str).encode('utf-8'))
+    except Exception:
+        return 0
+# end of get_payload_size
+
+
+def get_queue_wait(
+        request,
+        start_time):
+    """get_queue_wait
+
+    Get the seconds a task waited in the queue from its
+    ``ae_published`` header (or its ``eta`` if it is later).
+    Returns ``None`` for tasks without a publish timestamp
+    like direct function calls.
+
+    :param request: celery task request
+    :param start_time: ``time.time()`` when the task started
+    """
+    if request is None:
+        return None
+    published = getattr(request, PUBLISHED_HEADER, None)
+    if published is None:
+        headers = getattr(request, 'headers', None) or {}
+        published = headers.get(PUBLISHED_HEADER)
+    if published is None:
+        return None
+    try:
+        published = float(published)
+    except Exception:
+        return None
+    eta = getattr(request, 'eta', None)
+    if eta:
+        try:
+            if isinstance(eta, str):
+                eta = dateutil.parser.parse(eta)
+            published = max(published, eta.timestamp())
+        except Exception:
+            pass
+    return max(start_time - published, 0.0)
+# end of get_queue_wait
+
+
+def record_task(
+        task_name,
+        run_seconds,
+        queue_wait_seconds=None,
+        args=None,
+        kwargs=None,
+        retval=None,
+        status='success',
+        payload_sizes=None,
+        flush=True):
+    """record_task
+
+    Record one task run in this process's metrics
+
+    :param task_name: task name
+    :param run_seconds: task run time in seconds
+    :param queue_wait_seconds: optional - queue wait time in
+        seconds (``None`` is not recorded)
+    :param args: optional - task args
+    :param kwargs: optional - task kwargs
+    :param retval: optional - task return value
+    :param status: optional - ``success``, ``failure`` or
+        ``retry`` (default is ``success``)
+    :param payload_sizes: optional - bool to json-serialize the
+        args and return value to record the payload sizes
+        (default is
+        ``analysis_engine.consts.TASK_METRICS_PAYLOAD_SIZES``)
+    :param flush: optional - bool to export the metrics when
+        the flush interval has passed (default is ``True``)
+    """
+    values = {
+        'run_seconds': run_seconds
+    }
+    if queue_wait_seconds is not None:
+        values['queue_wait_seconds'] = queue_wait_seconds
+    if payload_sizes is None:
+        payload_sizes = ae_consts.TASK_METRICS_PAYLOAD_SIZES
+    if payload_sizes:
+        payload_in = get_payload_size(args)
+        if kwargs:
+            payload_in += get_payload_size(kwargs)
+        values['payload_in_bytes'] = payload_in
+        if status == 'success':
+            values['payload_out_bytes'] = get_payload_size(retval)
+    with METRICS_LOCK:
+        for metric, value in values.items():
+            for metrics in [METRICS, PENDING]:
+                observe(
+                    metrics=metrics,
+                    task_name=task_name,
+                    metric=metric,
+                    value=value)
+        if status in ['success', 'failure']:
+            for metrics in [METRICS, PENDING]:
+                increment(
+                    metrics=metrics,
+                    task_name=task_name,
+                    counter=status)
+    if flush:
+        flush_metrics()
+# end of record_task
+
+
+def record_retry(
+        task_name):
+    """record_retry
+
+    Count a task retry
+
+    :param task_name: task name
+    """
+    with METRICS_LOCK:
+        for metrics in [METRICS, PENDING]:
+            increment(
+                metrics=metrics,
+                task_name=task_name,
+                counter='retries')
+# end of record_retry
+
+
+def get_metrics():
+    """get_metrics
+
+    Get a copy of this process's metrics keyed by task name
+    """
+    with METRICS_LOCK:
+        return json.loads(json.dumps(METRICS))
+# end of get_metrics
+
+
+def reset_metrics():
+    """reset_metrics
+
+    Clear this process's metrics
+    """
+    with METRICS_LOCK:
+        METRICS.clear()
+        PENDING.clear()
+        EXPORT_STATE['last_flush'] = None
+# end of reset_metrics
+
+
+def get_quantile(
+        hist,
+        quantile):
+    """get_quantile
+
+    Estimate a quantile from a histogram with linear
+    interpolation inside the bucket (the same estimate as
+    Prometheus ``histogram_quantile``). Returns ``None`` for an
+    empty histogram.
+
+    :param hist: histogram dictionary
+    :param quantile: quantile between ``0.0`` and ``1.0``
+    """
+    if not hist or not hist['count']:
+        return None
+    rank = quantile * hist['count']
+    seen = 0
+    lower = 0.0
+    for upper, count in zip(hist['buckets'], hist['counts']):
+        if count and seen + count >= rank:
+            if upper == float('inf'):
+                return lower
+            return lower + (upper - lower) * (rank - seen) / count
+        seen += count
+        if upper != float('inf'):
+            lower = upper
+    return lower
+# end of get_quantile
+
+
+def get_slowest_tasks(
+        metric='run_seconds',
+        quantile=0.99,
+        metrics=None):
+    """get_slowest_tasks
+
+    Get the task names sorted by a histogram quantile with
+    the largest first as a list of dictionaries
+
+    :param metric: optional - histogram name
+        (default is ``run_seconds``)
+    :param quantile: optional - quantile (default is ``0.99``)
+    :param metrics: optional - metrics keyed by task name
+        (default is this process's ``get_metrics()``)
+    """
+    if metrics is None:
+        metrics = get_metrics()
+    rows = []
+    for task_name, rec in metrics.items():
+        value = get_quantile(
+            hist=rec.get(metric),
+            quantile=quantile)
+        if value is None:
+            continue
+        rows.append({
+            'task': task_name,
+            'metric': metric,
+            'quantile': quantile,
+            'value': value,
+            'count': rec[metric]['count']
+        })
+    return sorted(rows, key=lambda r: r['value'], reverse=True)
+# end of get_slowest_tasks
+
+
+def format_bound(
+        upper):
+    """format_bound
+
+    Format a bucket upper bound for the ``le`` label
+
+    :param upper: bucket upper bound
+    """
+    if upper == float('inf'):
+        return '+Inf'
+    return repr(float(upper))
+# end of format_bound
+
+
+def build_prometheus_text(
+        metrics=None,
+        worker=None):
+    """build_prometheus_text
+
+    Build the Prometheus text exposition format for the metrics
+
+    :param metrics: optional - metrics keyed by task name
+        (default is this process's ``get_metrics()``)
+    :param worker: optional - ``worker`` label value (default
+        is ``<hostname>-<pid>`` so the files from each process
+        do not collide)
+    """
+    if metrics is None:
+        metrics = get_metrics()
+    if worker is None:
+        worker = f'{socket.gethostname()}-{os.getpid()}'
+    lines = []
+    for metric in HISTOGRAMS:
+        name = f'{METRIC_PREFIX}_{metric}'
+        lines.append(f'# TYPE {name} histogram')
+        for task_name in sorted(metrics):
+            hist = metrics[task_name][metric]
+            labels = f'task="{task_name}",worker="{worker}"'
+            cumulative = 0
+            for upper, count in zip(hist['buckets'], hist['counts']):
+                cumulative += count
+                lines.append(
+                    f'{name}_bucket{{{labels},'
+                    f'le="{format_bound(upper)}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {hist["sum"]}')
+            lines.append(f'{name}_count{{{labels}}} {hist["count"]}')
+    for counter in COUNTERS:
+        name = f'{METRIC_PREFIX}_{counter}_total'
+        lines.append(f'# TYPE {name} counter')
+        for task_name in sorted(metrics):
+            lines.append(
+                f'{name}{{task="{task_name}",worker="{worker}"}} '
+                f'{metrics[task_name][counter]}')
+    return '\n'.join(lines) + '\n'
+# end of build_prometheus_text
+
+
+def write_prometheus_file(
+        path=None,
+        metrics=None):
+    """write_prometheus_file
+
+    Atomically write the Prometheus text file so the textfile
+    collector never reads a partial file
+
+    :param path: optional - file path where ``{pid}`` is the
+        process id (default is
+        ``analysis_engine.consts.TASK_METRICS_FILE``)
+    :param metrics: optional - metrics keyed by task name
+    """
+    if not path:
+        path = ae_consts.TASK_METRICS_FILE
+    path = path.replace('{pid}', str(os.getpid()))
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as cur_file:
+        cur_file.write(build_prometheus_text(metrics=metrics))
+    os.replace(tmp_path, path)
+    with METRICS_LOCK:
+        if path not in EXPORT_STATE['files']:
+            if not EXPORT_STATE['files']:
+                atexit.register(remove_prometheus_files)
+            EXPORT_STATE['files'].append(path)
+    return path
+# end of write_prometheus_file
+
+
+def remove_prometheus_files():
+    """remove_prometheus_files
+
+    Remove the Prometheus text files this process wrote so the
+    textfile collector does not keep exporting a stopped
+    process (runs on exit and on ``worker_process_shutdown``)
+    """
+    with METRICS_LOCK:
+        paths = list(EXPORT_STATE['files'])
+        EXPORT_STATE['files'] = []
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+    return paths
+# end of remove_prometheus_files
+
+
+def build_redis_field(
+        task_name,
+        metric,
+        suffix):
+    """build_redis_field
+
+    Build a redis hash field name
+
+    :param task_name: task name
+    :param metric: histogram or counter name
+    :param suffix: bucket bound, ``sum``, ``count`` or ``total``
+    """
+    return f'{task_name}|{metric}|{suffix}'
+# end of build_redis_field
+
+
+def publish_to_redis(
+        client,
+        key=ae_consts.TASK_METRICS_REDIS_KEY):
+    """publish_to_redis
+
+    Add the increments since the last export to the shared
+    redis hash with one pipeline so every worker process
+    aggregates into the same histograms
+
+    :param client: ``redis.Redis`` client
+    :param key: optional - redis hash key (default is
+        ``analysis_engine.consts.TASK_METRICS_REDIS_KEY``)
+    """
+    with METRICS_LOCK:
+        pending = dict(PENDING)
+        PENDING.clear()
+    if not pending:
+        return 0
+    pipe = client.pipeline(transaction=False)
+    num_fields = 0
+    for task_name, rec in pending.items():
+        for metric in HISTOGRAMS:
+            hist = rec[metric]
+            if not hist['count']:
+                continue
+            for upper, count in zip(hist['buckets'], hist['counts']):
+                if count:
+                    pipe.hincrby(
+                        key,
+                        build_redis_field(
+                            task_name, metric, format_bound(upper)),
+                        count)
+                    num_fields += 1
+            pipe.hincrbyfloat(
+                key,
+                build_redis_field(task_name, metric, 'sum'),
+                hist['sum'])
+            pipe.hincrby(
+                key,
+                build_redis_field(task_name, metric, 'count'),
+                hist['count'])
+            num_fields += 2
+        for counter in COUNTERS:
+            if rec[counter]:
+                pipe.hincrby(
+                    key,
+                    build_redis_field(task_name, counter, 'total'),
+                    rec[counter])
+                num_fields += 1
+    try:
+        pipe.execute()
+    except Exception:
+        # keep the increments for the next export
+        with METRICS_LOCK:
+            for task_name, rec in pending.items():
+                cur = PENDING.setdefault(task_name, build_task_metrics())
+                for metric in HISTOGRAMS:
+                    for idx, count in enumerate(rec[metric]['counts']):
+                        cur[metric]['counts'][idx] += count
+                    cur[metric]['sum'] += rec[metric]['sum']
+                    cur[metric]['count'] += rec[metric]['count']
+                for counter in COUNTERS:
+                    cur[counter] += rec[counter]
+        raise
+    return num_fields
+# end of publish_to_redis
+
+
+def get_redis_metrics(
+        client,
+        key=ae_consts.TASK_METRICS_REDIS_KEY):
+    """get_redis_metrics
+
+    Get the metrics for all the workers from the redis hash
+    in the same format as ``get_metrics()``
+
+    :param client: ``redis.Redis`` client
+    :param key: optional - redis hash key (default is
+        ``analysis_engine.consts.TASK_METRICS_REDIS_KEY``)
+    """
+    metrics = {}
+    for field, value in (client.hgetall(key) or {}).items():
+        if isinstance(field, bytes):
+            field = field.decode('utf-8')
+        if isinstance(value, bytes):
+            value = value.decode('utf-8')
+        task_name, metric, suffix = field.rsplit('|', 2)
+        rec = metrics.setdefault(task_name, build_task_metrics())
+        if metric in COUNTERS:
+            rec[metric] = int(float(value))
+        elif metric not in HISTOGRAMS:
+            continue
+        elif suffix == 'sum':
+            rec[metric]['sum'] = float(value)
+        elif suffix == 'count':
+            rec[metric]['count'] = int(float(value))
+        else:
+            hist = rec[metric]
+            upper = float('inf') if suffix == '+Inf' else float(suffix)
+            if upper in hist['buckets']:
+                hist['counts'][hist['buckets'].index(upper)] = int(
+                    float(value))
+    return metrics
+# end of get_redis_metrics
+
+
+class ThreadingHTTPServer(
+        socketserver.ThreadingMixIn,
+        http.server.HTTPServer):
+    """ThreadingHTTPServer
+
+    HTTP server handling each scrape on its own thread
+    (``http.server.ThreadingHTTPServer`` needs python 3.7)
+    """
+
+    daemon_threads = True
+
+# end of ThreadingHTTPServer
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    """MetricsHandler"""
+
+    def do_GET(
+            self):
+        """do_GET
+
+        Serve this process's metrics in the Prometheus text format
+        """
+        if self.path.split('?')[0] not in ['/', '/metrics']:
+            self.send_error(404)
+            return
+        body = build_prometheus_text().encode('utf-8')
+        self.send_response(200)
+        self.send_header(
+            'Content-Type',
+            'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    # end of do_GET
+
+    def log_message(
+            self,
+            format,
+            *args):
+        """log_message
+
+        Do not log every scrape
+        """
+        return
+    # end of log_message
+
+# end of MetricsHandler
+
+
+def start_http_server(
+        port=ae_consts.TASK_METRICS_HTTP_PORT,
+        num_ports=ae_consts.TASK_METRICS_HTTP_PORTS,
+        host='0.0.0.0'):
+    """start_http_server
+
+    Serve ``/metrics`` from a daemon thread on the first free
+    port in ``port`` to ``port + num_ports - 1`` (each prefork
+    worker process gets its own port). Returns the port or
+    ``None`` if no port is free.
+
+    :param port: optional - first port (default is
+        ``analysis_engine.consts.TASK_METRICS_HTTP_PORT``)
+    :param num_ports: optional - number of ports to try
+        (default is ``analysis_engine.consts.TASK_METRICS_HTTP_PORTS``)
+    :param host: optional - listen address (default is ``0.0.0.0``)
+    """
+    if EXPORT_STATE['http_server']:
+        if EXPORT_STATE['http_pid'] == os.getpid():
+            return EXPORT_STATE['http_port']
+        # inherited from the parent process by a fork
+        stop_http_server()
+    for cur_port in range(int(port), int(port) + int(num_ports)):
+        try:
+            server = ThreadingHTTPServer(
+                (host, cur_port),
+                MetricsHandler)
+        except OSError:
+            continue
+        thread = threading.Thread(
+            target=server.serve_forever,
+            name='ae-task-metrics',
+            daemon=True)
+        thread.start()
+        EXPORT_STATE['http_server'] = server
+        EXPORT_STATE['http_port'] = server.server_address[1]
+        EXPORT_STATE['http_pid'] = os.getpid()
+        log.info(
+            f'serving task metrics pid={os.getpid()} '
+            f'port={EXPORT_STATE["http_port"]}')
+        return EXPORT_STATE['http_port']
+    log.error(
+        f'no free task metrics port from {port} '
+        f'num_ports={num_ports}')
+    return None
+# end of start_http_server
+
+
+def stop_http_server():
+    """stop_http_server
+
+    Stop the ``/metrics`` server for this process. A server
+    inherited from the parent process by a fork has no
+    ``serve_forever`` thread in this process, so only its
+    copy of the listening socket is closed.
+    """
+    server = EXPORT_STATE['http_server']
+    if server:
+        if EXPORT_STATE['http_pid'] == os.getpid():
+            server.shutdown()
+            server.server_close()
+        else:
+            server.socket.close()
+    EXPORT_STATE['http_server'] = None
+    EXPORT_STATE['http_port'] = None
+    EXPORT_STATE['http_pid'] = None
+# end of stop_http_server
+
+
+def get_exporters(
+        export=None):
+    """get_exporters
+
+    Get the list of exporters from a comma-separated string
+
+    :param export: optional - exporters (default is
+        ``analysis_engine.consts.TASK_METRICS_EXPORT``)
+    """
+    if export is None:
+        export = ae_consts.TASK_METRICS_EXPORT
+    return [
+        e.strip().lower()
+        for e in (export or '').split(',')
+        if e.strip()
+    ]
+# end of get_exporters
+
+
+def flush_metrics(
+        force=False,
+        export=None,
+        client=None,
+        now=None):
+    """flush_metrics
+
+    Export the metrics to the ``file`` and ``redis`` exporters
+    at most once every ``TASK_METRICS_FLUSH_SECONDS`` from
+    Celery worker processes (see ``on_worker_process_init``).
+    Export errors are logged and never fail the task.
+
+    :param force: optional - bool to export now even outside
+        a worker process
+    :param export: optional - comma-separated exporters
+        (default is ``analysis_engine.consts.TASK_METRICS_EXPORT``)
+    :param client: optional - ``redis.Redis`` client (default
+        is the shared client for ``REDIS_ADDRESS``)
+    :param now: optional - ``time.time()`` for testing
+    """
+    if not force and not EXPORT_STATE['worker']:
+        return False
+    now = now if now is not None else time.time()
+    last_flush = EXPORT_STATE['last_flush']
+    if (not force and last_flush is not None and
+            now - last_flush < ae_consts.TASK_METRICS_FLUSH_SECONDS):
+        return False
+    EXPORT_STATE['last_flush'] = now
+    exporters = get_exporters(export=export)
+    if 'file' in exporters:
+        try:
+            write_prometheus_file()
+        except Exception as e:
+            log.error(
+                f'failed writing task metrics '
+                f'file={ae_consts.TASK_METRICS_FILE} ex={e}')
+    if 'redis' in exporters:
+        try:
+            if not client:
+                import analysis_engine.shared_clients as shared_clients
+                redis_host, redis_port = (
+                    ae_consts.REDIS_ADDRESS.split(':'))
+                client = shared_clients.get_redis_client(
+                    host=redis_host,
+                    port=redis_port,
+                    password=ae_consts.REDIS_PASSWORD,
+                    db=ae_consts.REDIS_DB)
+            publish_to_redis(
+                client=client)
+        except Exception as e:
+            log.error(
+                f'failed publishing task metrics '
+                f'key={ae_consts.TASK_METRICS_REDIS_KEY} ex={e}')
+    return True
+# end of flush_metrics
+
+
+def on_before_task_publish(
+        headers=None,
+        **kwargs):
+    """on_before_task_publish
+
+    ``before_task_publish`` signal handler that stamps the
+    publish time on each task message (retries get a new stamp)
+
+    :param headers: task message headers
+    :param kwargs: signal keyword arguments
+    """
+    if headers is not None:
+        headers[PUBLISHED_HEADER] = time.time()
+# end of on_before_task_publish
+
+
+def on_worker_process_init(
+        **kwargs):
+    """on_worker_process_init
+
+    ``worker_process_init`` signal handler (and ``worker_init``
+    for pools without child processes) that turns on the
+    exporters for this worker process and starts the
+    ``/metrics`` endpoint for the ``http`` exporter. Exporter
+    state inherited from the parent by a fork is dropped first.
+
+    :param kwargs: signal keyword arguments
+    """
+    if EXPORT_STATE['http_pid'] != os.getpid():
+        stop_http_server()
+    with METRICS_LOCK:
+        EXPORT_STATE['files'] = []
+    EXPORT_STATE['last_flush'] = None
+    EXPORT_STATE['worker'] = True
+    if 'http' in get_exporters():
+        start_http_server()
+# end of on_worker_process_init
+
+
+def on_worker_init(
+        sender=None,
+        **kwargs):
+    """on_worker_init
+
+    ``worker_init`` signal handler that runs
+    ``on_worker_process_init`` for the solo, threads, eventlet
+    and gevent pools where tasks run in the worker process.
+    The prefork parent process never exports because its
+    tasks run in the child processes (see
+    ``worker_process_init``).
+
+    :param sender: ``celery.worker.WorkController``
+    :param kwargs: signal keyword arguments
+    """
+    try:
+        pool_cls = celery.concurrency.get_implementation(
+            getattr(sender, 'pool_cls', None) or 'prefork')
+    except Exception as e:
+        log.error(
+            f'failed finding the worker pool for task metrics ex={e}')
+        return
+    if getattr(pool_cls, '__module__', '').endswith('.prefork'):
+        return
+    on_worker_process_init(**kwargs)
+# end of on_worker_init
+
+
+def on_worker_process_shutdown(
+        **kwargs):
+    """on_worker_process_shutdown
+
+    ``worker_process_shutdown`` and ``worker_shutdown`` signal
+    handler that exports the last metrics to redis, stops the
+    ``/metrics`` endpoint and removes the Prometheus text file
+
+    :param kwargs: signal keyword arguments
+    """
+    if not EXPORT_STATE['worker']:
+        return
+    flush_metrics(
+        force=True,
+        export=','.join(
+            e for e in get_exporters()
+            if e != 'file'))
+    stop_http_server()
+    remove_prometheus_files()
+    EXPORT_STATE['worker'] = False
+# end of on_worker_process_shutdown
+
+
+def connect_signals():
+    """connect_signals
+
+    Connect the publish timestamp and exporter handlers to the
+    Celery signals once per process
+    """
+    if SIGNAL_STATE['connected']:
+        return
+    celery.signals.before_task_publish.connect(
+        on_before_task_publish,
+        weak=False)
+    celery.signals.worker_process_init.connect(
+        on_worker_process_init,
+        weak=False)
+    celery.signals.worker_init.connect(
+        on_worker_init,
+        weak=False)
+    celery.signals.worker_process_shutdown.connect(
+        on_worker_process_shutdown,
+        weak=False)
+    celery.signals.worker_shutdown.connect(
+        on_worker_process_shutdown,
+        weak=False)
+    SIGNAL_STATE['connected'] = True
+# end of connect_signals
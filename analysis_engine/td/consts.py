@@ -27,8 +27,21 @@ TD_URLS = {
     'options': (
         f'https://{TD_ENDPOINT_DATA}'
         '/v1/markets/options/chains'
-        f'?symbol={"{}"}&expiration={"{}"}')
+        f'?symbol={"{}"}&expiration={"{}"}'),
+    'expirations': (
+        f'https://{TD_ENDPOINT_DATA}'
+        '/v1/markets/options/expirations'
+        f'?symbol={"{}"}')
 }
+# seconds to share one downloaded option chain between
+# the calls and puts fetches (0 disables sharing)
+TD_CHAIN_CACHE_SECONDS = int(os.getenv(
+    'TD_CHAIN_CACHE_SECONDS',
+    '30'))
+# max option chains kept in memory for sharing
+TD_CHAIN_CACHE_MAX_ENTRIES = int(os.getenv(
+    'TD_CHAIN_CACHE_MAX_ENTRIES',
+    '64'))
 
 FETCH_TD_CALLS = 10000
 FETCH_TD_PUTS = 10001
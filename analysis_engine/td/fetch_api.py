@@ -1,6 +1,18 @@
 """
 Fetch API calls wrapping Tradier
 
+The calls and puts for a ticker come from the same option
+chain response. ``fetch_chain`` downloads the chain once per
+ticker and expiration, and shares it for
+``TD_CHAIN_CACHE_SECONDS`` so concurrent ``fetch_calls``
+and ``fetch_puts`` calls only make one request.
+Use ``fetch_calls_and_puts`` to build both
+``pandas.DataFrame`` objects from one request and
+``fetch_chains`` to fetch multiple expirations over one
+pooled session. Expired chains and their locks are evicted
+before each fetch and at most ``TD_CHAIN_CACHE_MAX_ENTRIES``
+chains are kept so long-running workers do not grow.
+
 Supported environment variables:
 
 ::
@@ -8,16 +20,26 @@ Supported environment variables:
     # verbose logging in this module
     export DEBUG_FETCH=1
 
+    # seconds to share a downloaded chain (0 disables it)
+    export TD_CHAIN_CACHE_SECONDS=30
+    # max chains kept in memory
+    export TD_CHAIN_CACHE_MAX_ENTRIES=64
+
 """
 
 import json
+import time
 import datetime
+import threading
 import requests
+import numpy as np
 import pandas as pd
+import dateutil.tz as dateutil_tz
 import analysis_engine.consts as ae_consts
 import analysis_engine.utils as ae_utils
 import analysis_engine.options_dates as opt_dates
-import analysis_engine.url_helper as url_helper
+import analysis_engine.http_sessions as http_sessions
+import analysis_engine.rate_limiter as rate_limiter
 import analysis_engine.dataset_scrub_utils as scrub_utils
 import analysis_engine.td.consts as td_consts
 import spylunking.log.setup_logging as log_utils
@@ -25,98 +47,330 @@ import spylunking.log.setup_logging as log_utils
 log = log_utils.build_colorized_logger(name=__name__)
 
 
-def fetch_calls(
-        ticker=None,
-        work_dict=None,
-        scrub_mode='sort-by-date',
-        verbose=False):
-    """fetch_calls
+CHAIN_CACHE = {}
+CHAIN_LOCKS = {}
+CHAIN_LOCK = threading.Lock()
 
-    Fetch Tradier option calls for a ticker and
-    return a tuple: (status, ``pandas.DataFrame``)
+
+def get_chain_lock(
+        cache_key):
+    """get_chain_lock
+
+    Get the lock that makes concurrent fetches for the
+    same chain wait on a single request
+
+    :param cache_key: tuple of ``(ticker, exp_date)``
+    """
+    with CHAIN_LOCK:
+        lock = CHAIN_LOCKS.get(cache_key)
+        if not lock:
+            lock = threading.Lock()
+            CHAIN_LOCKS[cache_key] = lock
+    return lock
+# end of get_chain_lock
+
+
+def evict_chains(
+        cache_seconds=None,
+        max_entries=None):
+    """evict_chains
+
+    Drop the cached chains older than ``cache_seconds`` and the
+    oldest chains over ``max_entries``, then drop the locks
+    without a cached chain that no fetch is holding. Returns
+    the number of evicted chains.
+
+    :param cache_seconds: optional - seconds a chain is shared
+        (default is ``TD_CHAIN_CACHE_SECONDS``)
+    :param max_entries: optional - max cached chains
+        (default is ``TD_CHAIN_CACHE_MAX_ENTRIES``)
+    """
+    if cache_seconds is None:
+        cache_seconds = td_consts.TD_CHAIN_CACHE_SECONDS
+    if max_entries is None:
+        max_entries = td_consts.TD_CHAIN_CACHE_MAX_ENTRIES
+    num_evicted = 0
+    now = time.time()
+    with CHAIN_LOCK:
+        by_age = sorted(
+            CHAIN_CACHE.items(),
+            key=lambda item: item[1][0])
+        num_over = len(by_age) - max(0, max_entries)
+        for idx, (cache_key, cached) in enumerate(by_age):
+            if idx < num_over or (now - cached[0]) >= cache_seconds:
+                CHAIN_CACHE.pop(cache_key, None)
+                num_evicted += 1
+        for cache_key, lock in list(CHAIN_LOCKS.items()):
+            if cache_key not in CHAIN_CACHE and not lock.locked():
+                CHAIN_LOCKS.pop(cache_key, None)
+    return num_evicted
+# end of evict_chains
+
+
+def fetch_chain(
+        ticker,
+        exp_date=None,
+        session=None,
+        label='fetch_chain',
+        cache_seconds=None):
+    """fetch_chain
+
+    Fetch the Tradier option chain records for a ticker
+    and expiration date and return a tuple:
+    (status, ``list`` of option records)
 
     .. code-block:: python
 
         import analysis_engine.td.fetch_api as td_fetch
 
-        # Please set the TD_TOKEN environment variable to your token
-        calls_status, calls_df = td_fetch.fetch_calls(
+        status, records = td_fetch.fetch_chain(
             ticker='SPY')
 
-        print(f'Fetched SPY Option Calls from Tradier status={calls_status}:')
-        print(calls_df)
-
     :param ticker: string ticker to fetch
-    :param work_dict: dictionary of args
-        used by the automation
-    :param scrub_mode: optional - string type of
-        scrubbing handler to run
-    :param verbose: optional - bool for debugging
+    :param exp_date: optional - expiration date string
+        formatted ``YYYY-MM-DD`` (default is the next
+        monthly expiration)
+    :param session: optional - ``requests.Session``
+        (default is the pooled ``td`` session)
+    :param label: optional - log label
+    :param cache_seconds: optional - seconds to reuse
+        a chain downloaded by another fetch
+        (default is ``TD_CHAIN_CACHE_SECONDS``)
     """
-    label = 'fetch_calls'
-    datafeed_type = td_consts.DATAFEED_TD_CALLS
-    exp_date = None
-    latest_pricing = {}
-    latest_close = None
-
-    if work_dict:
-        ticker = work_dict.get(
-            'ticker',
-            ticker)
-        label = work_dict.get(
-            'label',
-            label)
-        exp_date = work_dict.get(
-            'exp_date',
+    if not exp_date:
+        exp_date = opt_dates.option_expiration().strftime(
+            ae_consts.COMMON_DATE_FORMAT)
+    if cache_seconds is None:
+        cache_seconds = td_consts.TD_CHAIN_CACHE_SECONDS
+    if not session:
+        session = http_sessions.get_session('td')
+
+    cache_key = (
+        str(ticker).upper(),
+        exp_date)
+    evict_chains(
+        cache_seconds=cache_seconds)
+    with get_chain_lock(cache_key):
+        cached = CHAIN_CACHE.get(cache_key)
+        if (
+                cached and
+                cache_seconds > 0 and
+                (time.time() - cached[0]) < cache_seconds):
+            log.debug(
+                f'{label} - reusing chain ticker={ticker} '
+                f'exp_date={exp_date}')
+            return ae_consts.SUCCESS, cached[1]
+
+        use_url = td_consts.TD_URLS['options'].format(
+            ticker,
             exp_date)
-        latest_pricing = work_dict.get(
-            'latest_pricing',
-            latest_pricing)
-        latest_close = latest_pricing.get(
-            'close',
-            latest_close)
+        res = rate_limiter.limited_get(
+            provider='td',
+            url=use_url,
+            session=session,
+            headers=td_consts.get_auth_headers())
+
+        if res.status_code != requests.codes.OK:
+            if res.status_code in [401, 403]:
+                log.critical(
+                    'Please check the TD_TOKEN is correct '
+                    f'received {res.status_code} during '
+                    f'fetch for: {label}')
+            else:
+                log.info(
+                    f'{label} - failed to get chain with response={res} '
+                    f'code={res.status_code} '
+                    f'text={res.text}')
+            return ae_consts.EMPTY, []
+
+        records = (json.loads(res.text).get(
+            'options', None) or {}).get(
+                'option', [])
+        if isinstance(records, dict):
+            records = [records]
+        if len(records) == 0:
+            log.info(
+                f'{label} - failed to get chain records '
+                f'text={res.text}')
+            return ae_consts.EMPTY, []
 
-    log.debug(
-        f'{label} - calls - close={latest_close} '
-        f'ticker={ticker}')
+        if cache_seconds > 0:
+            CHAIN_CACHE[cache_key] = (
+                time.time(),
+                records)
+    # end of single request per chain
 
-    exp_date = opt_dates.option_expiration().strftime(
-        ae_consts.COMMON_DATE_FORMAT)
-    use_url = td_consts.TD_URLS['options'].format(
+    return ae_consts.SUCCESS, records
+# end of fetch_chain
+
+
+def fetch_expirations(
         ticker,
-        exp_date)
-    headers = td_consts.get_auth_headers()
-    session = requests.Session()
-    session.headers = headers
-    res = url_helper.url_helper(sess=session).get(
-        use_url
-    )
+        session=None):
+    """fetch_expirations
 
-    if res.status_code != requests.codes.OK:
-        if res.status_code in [401, 403]:
-            log.critical(
-                'Please check the TD_TOKEN is correct '
-                f'received {res.status_code} during '
-                'fetch for: calls')
-        else:
-            log.info(
-                f'failed to get call with response={res} '
-                f'code={res.status_code} '
-                f'text={res.text}')
-        return ae_consts.EMPTY, pd.DataFrame([{}])
-    records = json.loads(res.text)
-    org_records = records.get(
-        'options', {}).get(
-            'option', [])
+    Fetch the list of option expiration date strings
+    for a ticker
 
-    if len(org_records) == 0:
+    :param ticker: string ticker to fetch
+    :param session: optional - ``requests.Session``
+        (default is the pooled ``td`` session)
+    """
+    if not session:
+        session = http_sessions.get_session('td')
+    res = rate_limiter.limited_get(
+        provider='td',
+        url=td_consts.TD_URLS['expirations'].format(ticker),
+        session=session,
+        headers=td_consts.get_auth_headers())
+    if res.status_code != requests.codes.OK:
         log.info(
-            'failed to get call records '
-            'text={}'.format(
-                res.text))
-        return ae_consts.EMPTY, pd.DataFrame([{}])
-
-    options_list = []
+            f'failed to get expirations for {ticker} '
+            f'code={res.status_code} text={res.text}')
+        return []
+    dates = (json.loads(res.text).get(
+        'expirations', None) or {}).get(
+            'date', [])
+    if isinstance(dates, str):
+        dates = [dates]
+    return dates
+# end of fetch_expirations
+
+
+def convert_epoch_column(
+        epochs):
+    """convert_epoch_column
+
+    Convert a column of epoch milliseconds to the
+    ``COMMON_TICK_DATE_FORMAT`` strings ``fetch_calls`` and
+    ``fetch_puts`` store with one vectorized conversion.
+    Matches ``ae_utils.epoch_to_dt(epoch=ms/1000,
+    use_utc=False, convert_to_est=True)`` and sets ``0`` or
+    missing values to ``None``.
+
+    :param epochs: ``pandas.Series`` of epoch milliseconds
+    """
+    epoch_ms = pd.to_numeric(
+        epochs,
+        errors='coerce')
+    valid = epoch_ms.fillna(0) != 0
+    date_strs = np.full(
+        len(epoch_ms.index),
+        None,
+        dtype=object)
+    if valid.any():
+        # chains share a handful of quote times so only
+        # convert and format the unique values
+        codes, uniques = pd.factorize(
+            epoch_ms[valid].astype('int64'))
+        converted = pd.to_datetime(
+            uniques,
+            unit='ms')
+        if time.daylight:
+            # the system zone has dst so use the zone rules
+            converted = converted.tz_localize('UTC').tz_convert(
+                dateutil_tz.tzlocal()).tz_localize(None)
+        else:
+            converted = converted - pd.Timedelta(seconds=time.timezone)
+        converted = converted - pd.Timedelta(
+            hours=ae_consts.EST_OFFSET_HOURS)
+        date_strs[valid.values] = converted.strftime(
+            ae_consts.COMMON_TICK_DATE_FORMAT).values[codes]
+    return pd.Series(
+        date_strs,
+        index=epochs.index)
+# end of convert_epoch_column
+
+
+def normalize_option_records(
+        records,
+        option_type,
+        ticker,
+        last_close_date,
+        created_minute):
+    """normalize_option_records
+
+    Columnar normalization of Tradier chain records. Keeps the
+    standard-expiration contracts for the ``option_type``
+    with a bid over ``0.01``, adds the ``date``, ``created``,
+    ``ticker``, ``opt_type`` and ``exp_date`` columns,
+    converts the ``TD_EPOCH_COLUMNS`` and returns the
+    ``TD_OPTION_COLUMNS`` as a ``pandas.DataFrame``
+
+    :param records: list of option records from
+        ``fetch_chain`` or a ``pandas.DataFrame``
+        built from them
+    :param option_type: ``call`` or ``put``
+    :param ticker: string ticker
+    :param last_close_date: string for the ``date`` column
+    :param created_minute: string for the ``created`` column
+    """
+    chain_df = records
+    if not isinstance(chain_df, pd.DataFrame):
+        chain_df = pd.DataFrame(records)
+    if len(chain_df.index) == 0:
+        return pd.DataFrame()
+
+    opt_type = int(ae_consts.OPTION_PUT)
+    if option_type == 'call':
+        opt_type = int(ae_consts.OPTION_CALL)
+
+    df_filter = (
+        (chain_df['option_type'] == option_type) &
+        (chain_df['expiration_type'] == 'standard') &
+        (pd.to_numeric(chain_df['bid'], errors='coerce') > 0.01))
+    df = chain_df[df_filter].reset_index(drop=True)
+    if len(df.index) == 0:
+        return pd.DataFrame()
+
+    df = df.assign(
+        date=last_close_date,
+        created=created_minute,
+        ticker=ticker,
+        opt_type=opt_type,
+        exp_date=df['expiration_date'])
+    for col in td_consts.TD_EPOCH_COLUMNS:
+        if col in df:
+            df[col] = convert_epoch_column(
+                epochs=df[col])
+    # convert all epoch millisecond columns
+
+    return df[[
+        col for col in td_consts.TD_OPTION_COLUMNS
+        if col in df
+    ]]
+# end of normalize_option_records
+
+
+def build_option_df(
+        records,
+        option_type,
+        ticker,
+        exp_date,
+        latest_close=None,
+        label='build_option_df',
+        scrub_mode='sort-by-date'):
+    """build_option_df
+
+    Convert Tradier chain records into the calls or puts
+    ``pandas.DataFrame`` and return a tuple:
+    (status, ``pandas.DataFrame``)
+
+    :param records: list of option records from
+        ``fetch_chain`` or a ``pandas.DataFrame``
+        built from them
+    :param option_type: ``call`` or ``put``
+    :param ticker: string ticker
+    :param exp_date: expiration date string
+    :param latest_close: optional - float last close used
+        to keep strikes near the money
+    :param label: optional - log label
+    :param scrub_mode: optional - string type of
+        scrubbing handler to run
+    """
+    datafeed_type = td_consts.DATAFEED_TD_PUTS
+    if option_type == 'call':
+        datafeed_type = td_consts.DATAFEED_TD_CALLS
 
     # assumes UTC conversion will work with the system clock
     created_minute = (
@@ -129,51 +383,20 @@ def fetch_calls(
     if not last_close_date:
         last_close_date = created_minute
 
-    for node in org_records:
-        node['date'] = last_close_date
-        node['created'] = created_minute
-        node['ticker'] = ticker
-        if (
-                node['option_type'] == 'call' and
-                node['expiration_type'] == 'standard' and
-                float(node['bid']) > 0.01):
-            node['opt_type'] = int(ae_consts.OPTION_CALL)
-            node['exp_date'] = node['expiration_date']
-
-            new_node = {}
-            for col in td_consts.TD_OPTION_COLUMNS:
-                if col in node:
-                    if col in td_consts.TD_EPOCH_COLUMNS:
-                        # trade_date can be None
-                        if node[col] == 0:
-                            new_node[col] = None
-                        else:
-                            new_node[col] = ae_utils.epoch_to_dt(
-                                epoch=node[col]/1000,
-                                use_utc=False,
-                                convert_to_est=True).strftime(
-                                    ae_consts.COMMON_TICK_DATE_FORMAT)
-                            """
-                            Debug epoch ms converter:
-                            """
-                            """
-                            print('-----------')
-                            print(col)
-                            print(node[col])
-                            print(new_node[col])
-                            print('===========')
-                            """
-                        # if/else valid date
-                    else:
-                        new_node[col] = node[col]
-                    # if date column to convert
-                # if column is in the row
-            # convert all columns
-
-            options_list.append(new_node)
-    # end of records
-
-    full_df = pd.DataFrame(options_list).sort_values(
+    df = normalize_option_records(
+        records=records,
+        option_type=option_type,
+        ticker=ticker,
+        last_close_date=last_close_date,
+        created_minute=created_minute)
+
+    if len(df.index) == 0:
+        log.info(
+            f'{label} - no standard {option_type} records '
+            f'for ticker={ticker}')
+        return ae_consts.EMPTY, pd.DataFrame([{}])
+
+    full_df = df.sort_values(
         by=[
             'strike'
         ],
@@ -219,6 +442,95 @@ def fetch_calls(
         df=df)
 
     return ae_consts.SUCCESS, scrubbed_df
+# end of build_option_df
+
+
+def get_fetch_args(
+        ticker=None,
+        work_dict=None,
+        label=None):
+    """get_fetch_args
+
+    Get the ``ticker``, ``label`` and ``latest_close``
+    for a fetch from the ``work_dict``
+
+    :param ticker: string ticker to fetch
+    :param work_dict: dictionary of args
+        used by the automation
+    :param label: default log label
+    """
+    latest_close = None
+    if work_dict:
+        ticker = work_dict.get(
+            'ticker',
+            ticker)
+        label = work_dict.get(
+            'label',
+            label)
+        latest_pricing = work_dict.get(
+            'latest_pricing',
+            None) or {}
+        latest_close = latest_pricing.get(
+            'close',
+            latest_close)
+    return ticker, label, latest_close
+# end of get_fetch_args
+
+
+def fetch_calls(
+        ticker=None,
+        work_dict=None,
+        scrub_mode='sort-by-date',
+        verbose=False):
+    """fetch_calls
+
+    Fetch Tradier option calls for a ticker and
+    return a tuple: (status, ``pandas.DataFrame``)
+
+    .. code-block:: python
+
+        import analysis_engine.td.fetch_api as td_fetch
+
+        # Please set the TD_TOKEN environment variable to your token
+        calls_status, calls_df = td_fetch.fetch_calls(
+            ticker='SPY')
+
+        print(f'Fetched SPY Option Calls from Tradier status={calls_status}:')
+        print(calls_df)
+
+    :param ticker: string ticker to fetch
+    :param work_dict: dictionary of args
+        used by the automation
+    :param scrub_mode: optional - string type of
+        scrubbing handler to run
+    :param verbose: optional - bool for debugging
+    """
+    ticker, label, latest_close = get_fetch_args(
+        ticker=ticker,
+        work_dict=work_dict,
+        label='fetch_calls')
+
+    log.debug(
+        f'{label} - calls - close={latest_close} '
+        f'ticker={ticker}')
+
+    exp_date = opt_dates.option_expiration().strftime(
+        ae_consts.COMMON_DATE_FORMAT)
+    status, records = fetch_chain(
+        ticker=ticker,
+        exp_date=exp_date,
+        label=f'{label} - calls')
+    if status != ae_consts.SUCCESS:
+        return ae_consts.EMPTY, pd.DataFrame([{}])
+
+    return build_option_df(
+        records=records,
+        option_type='call',
+        ticker=ticker,
+        exp_date=exp_date,
+        latest_close=latest_close,
+        label=label,
+        scrub_mode=scrub_mode)
 # end of fetch_calls
 
 
@@ -249,28 +561,10 @@ def fetch_puts(
         scrubbing handler to run
     :param verbose: optional - bool for debugging
     """
-    label = 'fetch_calls'
-    datafeed_type = td_consts.DATAFEED_TD_PUTS
-    exp_date = None
-    latest_pricing = {}
-    latest_close = None
-
-    if work_dict:
-        ticker = work_dict.get(
-            'ticker',
-            ticker)
-        label = work_dict.get(
-            'label',
-            label)
-        exp_date = work_dict.get(
-            'exp_date',
-            exp_date)
-        latest_pricing = work_dict.get(
-            'latest_pricing',
-            latest_pricing)
-        latest_close = latest_pricing.get(
-            'close',
-            latest_close)
+    ticker, label, latest_close = get_fetch_args(
+        ticker=ticker,
+        work_dict=work_dict,
+        label='fetch_puts')
 
     if verbose:
         log.info(
@@ -279,141 +573,176 @@ def fetch_puts(
 
     exp_date = opt_dates.option_expiration().strftime(
         ae_consts.COMMON_DATE_FORMAT)
-    use_url = td_consts.TD_URLS['options'].format(
-        ticker,
-        exp_date)
-    headers = td_consts.get_auth_headers()
-    session = requests.Session()
-    session.headers = headers
-    res = url_helper.url_helper(sess=session).get(
-        use_url
-    )
-
-    if res.status_code != requests.codes.OK:
-        if res.status_code in [401, 403]:
-            log.critical(
-                'Please check the TD_TOKEN is correct '
-                f'received {res.status_code} during '
-                'fetch for: puts')
-        else:
-            log.info(
-                f'failed to get put with response={res} '
-                f'code={res.status_code} '
-                f'text={res.text}')
+    status, records = fetch_chain(
+        ticker=ticker,
+        exp_date=exp_date,
+        label=f'{label} - puts')
+    if status != ae_consts.SUCCESS:
         return ae_consts.EMPTY, pd.DataFrame([{}])
-    records = json.loads(res.text)
-    org_records = records.get(
-        'options', {}).get(
-            'option', [])
 
-    if len(org_records) == 0:
-        log.info(
-            'failed to get put records '
-            'text={}'.format(
-                res.text))
-        return ae_consts.EMPTY, pd.DataFrame([{}])
+    return build_option_df(
+        records=records,
+        option_type='put',
+        ticker=ticker,
+        exp_date=exp_date,
+        latest_close=latest_close,
+        label=label,
+        scrub_mode=scrub_mode)
+# end of fetch_puts
 
-    options_list = []
 
-    # assumes UTC conversion will work with the system clock
-    created_minute = (
-        datetime.datetime.utcnow() - datetime.timedelta(hours=5)).strftime(
-            '%Y-%m-%d %H:%M:00')
-    last_close_date = ae_utils.get_last_close_str(
-        fmt='%Y-%m-%d %H:%M:00')
+def fetch_calls_and_puts(
+        ticker=None,
+        work_dict=None,
+        exp_date=None,
+        session=None,
+        scrub_mode='sort-by-date',
+        verbose=False):
+    """fetch_calls_and_puts
 
-    # hit bug where dates were None
-    if not last_close_date:
-        last_close_date = created_minute
+    Fetch the Tradier option chain once and return a tuple:
+    (status, calls ``pandas.DataFrame``,
+    puts ``pandas.DataFrame``)
 
-    for node in org_records:
-        node['date'] = last_close_date
-        node['created'] = created_minute
-        node['ticker'] = ticker
-        if (
-                node['option_type'] == 'put' and
-                node['expiration_type'] == 'standard' and
-                float(node['bid']) > 0.01):
-            node['opt_type'] = int(ae_consts.OPTION_PUT)
-            node['exp_date'] = node['expiration_date']
-
-            new_node = {}
-            for col in td_consts.TD_OPTION_COLUMNS:
-                if col in node:
-                    if col in td_consts.TD_EPOCH_COLUMNS:
-                        # trade_date can be None
-                        if node[col] == 0:
-                            new_node[col] = None
-                        else:
-                            new_node[col] = ae_utils.epoch_to_dt(
-                                epoch=node[col]/1000,
-                                use_utc=False,
-                                convert_to_est=True).strftime(
-                                    ae_consts.COMMON_TICK_DATE_FORMAT)
-                            """
-                            Debug epoch ms converter:
-                            """
-                            """
-                            print('-----------')
-                            print(col)
-                            print(node[col])
-                            print(new_node[col])
-                            print('===========')
-                            """
-                        # if/else valid date
-                    else:
-                        new_node[col] = node[col]
-                    # if date column to convert
-                # if column is in the row
-            # convert all columns
-
-            options_list.append(new_node)
-    # end of records
-
-    full_df = pd.DataFrame(options_list).sort_values(
-        by=[
-            'strike'
-        ],
-        ascending=True)
+    .. code-block:: python
 
-    num_chains = len(full_df.index)
+        import analysis_engine.td.fetch_api as td_fetch
 
-    df = None
-    if latest_close:
-        df_filter = (
-            (full_df['strike'] >=
-                (latest_close - ae_consts.OPTIONS_LOWER_STRIKE)) &
-            (full_df['strike'] <=
-                (latest_close + ae_consts.OPTIONS_UPPER_STRIKE)))
-        df = full_df[df_filter].copy().sort_values(
-            by=[
-                'date',
-                'strike'
-            ]).reset_index()
-    else:
-        mid_chain_idx = int(num_chains / 2)
-        low_idx = int(
-            mid_chain_idx - ae_consts.MAX_OPTIONS_LOWER_STRIKE)
-        high_idx = int(
-            mid_chain_idx + ae_consts.MAX_OPTIONS_UPPER_STRIKE)
-        if low_idx < 0:
-            low_idx = 0
-        if high_idx > num_chains:
-            high_idx = num_chains
-        df = full_df[low_idx:high_idx].copy().sort_values(
-            by=[
-                'date',
-                'strike'
-            ]).reset_index()
+        status, calls_df, puts_df = td_fetch.fetch_calls_and_puts(
+            ticker='SPY')
 
-    scrubbed_df = scrub_utils.ingress_scrub_dataset(
+    :param ticker: string ticker to fetch
+    :param work_dict: dictionary of args
+        used by the automation
+    :param exp_date: optional - expiration date string
+        formatted ``YYYY-MM-DD`` (default is the next
+        monthly expiration)
+    :param session: optional - ``requests.Session``
+        (default is the pooled ``td`` session)
+    :param scrub_mode: optional - string type of
+        scrubbing handler to run
+    :param verbose: optional - bool for debugging
+    """
+    ticker, label, latest_close = get_fetch_args(
+        ticker=ticker,
+        work_dict=work_dict,
+        label='fetch_calls_and_puts')
+
+    if not exp_date:
+        exp_date = opt_dates.option_expiration().strftime(
+            ae_consts.COMMON_DATE_FORMAT)
+
+    if verbose:
+        log.info(
+            f'{label} - chain - close={latest_close} '
+            f'ticker={ticker} exp_date={exp_date}')
+
+    status, records = fetch_chain(
+        ticker=ticker,
+        exp_date=exp_date,
+        session=session,
+        label=label)
+    if status != ae_consts.SUCCESS:
+        return (
+            ae_consts.EMPTY,
+            pd.DataFrame([{}]),
+            pd.DataFrame([{}]))
+
+    chain_df = pd.DataFrame(records)
+    calls_status, calls_df = build_option_df(
+        records=chain_df,
+        option_type='call',
+        ticker=ticker,
+        exp_date=exp_date,
+        latest_close=latest_close,
         label=label,
-        scrub_mode=scrub_mode,
-        datafeed_type=datafeed_type,
-        msg_format='df={} date_str={}',
-        ds_id=ticker,
-        date_str=exp_date,
-        df=df)
+        scrub_mode=scrub_mode)
+    puts_status, puts_df = build_option_df(
+        records=chain_df,
+        option_type='put',
+        ticker=ticker,
+        exp_date=exp_date,
+        latest_close=latest_close,
+        label=label,
+        scrub_mode=scrub_mode)
 
-    return ae_consts.SUCCESS, scrubbed_df
-# end of fetch_puts
+    status = ae_consts.EMPTY
+    if (
+            calls_status == ae_consts.SUCCESS or
+            puts_status == ae_consts.SUCCESS):
+        status = ae_consts.SUCCESS
+    return status, calls_df, puts_df
+# end of fetch_calls_and_puts
+
+
+def fetch_chains(
+        ticker=None,
+        work_dict=None,
+        exp_dates=None,
+        num_expirations=None,
+        scrub_mode='sort-by-date',
+        verbose=False):
+    """fetch_chains
+
+    Fetch the calls and puts for multiple expiration
+    dates over one session and return a dictionary of
+    ``{exp_date: (status, calls_df, puts_df)}``
+
+    .. code-block:: python
+
+        import analysis_engine.td.fetch_api as td_fetch
+
+        # next 3 expirations
+        chains = td_fetch.fetch_chains(
+            ticker='SPY',
+            num_expirations=3)
+
+    :param ticker: string ticker to fetch
+    :param work_dict: dictionary of args
+        used by the automation
+    :param exp_dates: optional - list of expiration
+        date strings
+    :param num_expirations: optional - fetch the next
+        ``num_expirations`` listed expirations when
+        ``exp_dates`` is not set (default is only the
+        next monthly expiration)
+    :param scrub_mode: optional - string type of
+        scrubbing handler to run
+    :param verbose: optional - bool for debugging
+    """
+    ticker, label, latest_close = get_fetch_args(
+        ticker=ticker,
+        work_dict=work_dict,
+        label='fetch_chains')
+    session = http_sessions.get_session('td')
+
+    if not exp_dates:
+        if num_expirations:
+            exp_dates = fetch_expirations(
+                ticker=ticker,
+                session=session)[0:num_expirations]
+        else:
+            exp_dates = [
+                opt_dates.option_expiration().strftime(
+                    ae_consts.COMMON_DATE_FORMAT)
+            ]
+    # end of finding expiration dates
+
+    chains = {}
+    for exp_date in exp_dates:
+        chains[exp_date] = fetch_calls_and_puts(
+            ticker=ticker,
+            work_dict=work_dict,
+            exp_date=exp_date,
+            session=session,
+            scrub_mode=scrub_mode,
+            verbose=verbose)
+    # end of for all expiration dates
+
+    if verbose:
+        log.info(
+            f'{label} - fetched chains ticker={ticker} '
+            f'exp_dates={exp_dates}')
+
+    return chains
+# end of fetch_chains
@@ -0,0 +1,348 @@
+"""
+Cached US market trading calendar
+
+``analysis_engine.holidays.is_holiday`` builds the year's
+holidays for every date it checks and
+``analysis_engine.options_dates.option_expiration`` walks one day
+at a time. The trading calendar builds sorted ``numpy``
+``datetime64[D]`` arrays of trading sessions and option
+expirations once per process, so each query is an array lookup
+or a ``numpy.searchsorted`` call:
+
+.. code-block:: python
+
+    import analysis_engine.trading_calendar as trading_calendar
+
+    cal = trading_calendar.get_calendar()
+    cal.is_trading_day('2019-01-01')
+    # False
+    cal.next_trading_day('2018-12-24')
+    # datetime.datetime(2018, 12, 26, 0, 0)
+    cal.prev_trading_day('2019-01-02')
+    # datetime.datetime(2018, 12, 31, 0, 0)
+    cal.sessions_between(
+        start_date='2018-12-20',
+        end_date='2019-01-04',
+        fmt='%Y-%m-%d')
+    # ['2018-12-20', '2018-12-21', '2018-12-24', ...]
+    cal.expiration_for('2019-04-01')
+    # datetime.datetime(2019, 4, 18, 0, 0) - Good Friday moves
+    # the expiration to Thursday
+
+Sessions are weekdays that are not in
+``analysis_engine.holidays.USTradingCalendar``. Expirations are
+the third Friday of each month moved back to the previous
+trading day when the Friday is a market holiday (the same rules
+as ``option_expiration``). The calendar covers ``2000`` through
+next year and grows when a query falls outside the range.
+"""
+
+import datetime
+import threading
+import numpy as np
+import analysis_engine.holidays as ae_holidays
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+DEFAULT_START_YEAR = 2000
+CALENDAR_LOCK = threading.Lock()
+CALENDAR = {
+    'calendar': None
+}
+
+
+def to_day(
+        value):
+    """to_day
+
+    Convert a date string (``YYYY-MM-DD`` with an optional time),
+    ``datetime``, ``date``, ``pandas.Timestamp`` or
+    ``numpy.datetime64`` to a ``numpy.datetime64`` day
+
+    :param value: date value
+    """
+    if isinstance(value, np.datetime64):
+        return value.astype('datetime64[D]')
+    if isinstance(value, datetime.datetime):
+        return np.datetime64(value.date(), 'D')
+    if isinstance(value, datetime.date):
+        return np.datetime64(value, 'D')
+    return np.datetime64(str(value)[0:10], 'D')
+# end of to_day
+
+
+def to_datetime(
+        day):
+    """to_datetime
+
+    Convert a ``numpy.datetime64`` day to a ``datetime.datetime``
+    at midnight
+
+    :param day: ``numpy.datetime64`` day
+    """
+    return datetime.datetime.combine(
+        day.astype('datetime64[D]').astype(datetime.date),
+        datetime.time())
+# end of to_datetime
+
+
+def build_expirations(
+        first_month,
+        last_month,
+        holidays):
+    """build_expirations
+
+    Return a tuple of ``datetime64[D]`` arrays with the third
+    Friday of each month and the option expiration for that
+    month (moved back when the Friday is a market holiday)
+
+    :param first_month: first ``numpy.datetime64`` month
+    :param last_month: last ``numpy.datetime64`` month
+    :param holidays: ``datetime64[D]`` array of market holidays
+    """
+    months = np.arange(
+        first_month,
+        last_month + 1,
+        dtype='datetime64[M]').astype('datetime64[D]')
+    third_fridays = np.busday_offset(
+        months,
+        2,
+        roll='forward',
+        weekmask='Fri')
+    expirations = third_fridays.copy()
+    # same order as option_expiration: Thursday, then Monday,
+    # then the day before
+    moved = np.isin(expirations, holidays)
+    for days_back in [1, 4, 5]:
+        expirations[moved] = third_fridays[moved] - np.timedelta64(
+            days_back,
+            'D')
+        moved = moved & np.isin(expirations, holidays)
+    return third_fridays, expirations
+# end of build_expirations
+
+
+class TradingCalendar:
+    """TradingCalendar
+
+    Precomputed trading sessions and option expirations
+
+    :param start_year: optional - first year
+        (default is ``2000``)
+    :param end_year: optional - last year
+        (default is next year)
+    """
+
+    def __init__(
+            self,
+            start_year=None,
+            end_year=None):
+        """__init__
+
+        :param start_year: optional - first year
+        :param end_year: optional - last year
+        """
+        self.lock = threading.Lock()
+        self.build(
+            start_year=start_year or DEFAULT_START_YEAR,
+            end_year=end_year or datetime.datetime.utcnow().year + 1)
+    # end of __init__
+
+    def build(
+            self,
+            start_year,
+            end_year):
+        """build
+
+        Build the session and expiration arrays for the years
+
+        :param start_year: first year
+        :param end_year: last year
+        """
+        first_day = np.datetime64(f'{start_year:04d}-01-01', 'D')
+        last_day = np.datetime64(f'{end_year:04d}-12-31', 'D')
+        holidays = ae_holidays.USTradingCalendar().holidays(
+            start=datetime.datetime(start_year - 1, 12, 1),
+            end=datetime.datetime(end_year + 1, 1, 31)).values.astype(
+                'datetime64[D]')
+        days = np.arange(
+            first_day,
+            last_day + 1,
+            dtype='datetime64[D]')
+        flags = np.is_busday(
+            days,
+            holidays=holidays)
+        third_fridays, expirations = build_expirations(
+            first_month=first_day.astype('datetime64[M]'),
+            last_month=last_day.astype('datetime64[M]'),
+            holidays=holidays)
+        # swap in the new arrays together for concurrent readers
+        self.state = {
+            'start_year': start_year,
+            'end_year': end_year,
+            'first_day': first_day,
+            'last_day': last_day,
+            'holidays': holidays,
+            'flags': flags,
+            'sessions': days[flags],
+            'third_fridays': third_fridays,
+            'expirations': expirations
+        }
+        log.debug(
+            f'built trading calendar years={start_year}-{end_year} '
+            f'sessions={len(self.state["sessions"])}')
+    # end of build
+
+    def ensure(
+            self,
+            day):
+        """ensure
+
+        Grow the calendar to cover the year before and after
+        ``day`` and return the current arrays
+
+        :param day: ``numpy.datetime64`` day
+        """
+        state = self.state
+        if (state['first_day'] + 366 <= day and
+                day <= state['last_day'] - 366):
+            return state
+        year = int(str(day)[0:4])
+        with self.lock:
+            state = self.state
+            if (year - 1 < state['start_year'] or
+                    year + 1 > state['end_year']):
+                self.build(
+                    start_year=min(state['start_year'], year - 1),
+                    end_year=max(state['end_year'], year + 1))
+        return self.state
+    # end of ensure
+
+    def is_trading_day(
+            self,
+            date):
+        """is_trading_day
+
+        Return ``True`` if ``date`` is a trading session
+
+        :param date: date string, ``datetime``, ``date`` or
+            ``numpy.datetime64``
+        """
+        day = to_day(date)
+        state = self.ensure(day)
+        return bool(state['flags'][
+            (day - state['first_day']).astype(int)])
+    # end of is_trading_day
+
+    def next_trading_day(
+            self,
+            date):
+        """next_trading_day
+
+        Return the first trading session after ``date`` as a
+        ``datetime.datetime``
+
+        :param date: date string, ``datetime``, ``date`` or
+            ``numpy.datetime64``
+        """
+        day = to_day(date)
+        state = self.ensure(day)
+        sessions = state['sessions']
+        return to_datetime(sessions[np.searchsorted(
+            sessions,
+            day,
+            side='right')])
+    # end of next_trading_day
+
+    def prev_trading_day(
+            self,
+            date):
+        """prev_trading_day
+
+        Return the last trading session before ``date`` as a
+        ``datetime.datetime``
+
+        :param date: date string, ``datetime``, ``date`` or
+            ``numpy.datetime64``
+        """
+        day = to_day(date)
+        state = self.ensure(day)
+        sessions = state['sessions']
+        return to_datetime(sessions[np.searchsorted(
+            sessions,
+            day,
+            side='left') - 1])
+    # end of prev_trading_day
+
+    def sessions_between(
+            self,
+            start_date,
+            end_date,
+            fmt=None):
+        """sessions_between
+
+        Return the trading sessions from ``start_date`` to
+        ``end_date`` (inclusive) as a ``datetime64[D]`` array
+        or as a list of strings when ``fmt`` is set
+
+        :param start_date: first date
+        :param end_date: last date
+        :param fmt: optional - ``strftime`` format for a list
+            of strings (default is ``None``)
+        """
+        start_day = to_day(start_date)
+        end_day = to_day(end_date)
+        self.ensure(start_day)
+        state = self.ensure(end_day)
+        sessions = state['sessions']
+        found = sessions[
+            np.searchsorted(sessions, start_day, side='left'):
+            np.searchsorted(sessions, end_day, side='right')]
+        if not fmt:
+            return found
+        if fmt == '%Y-%m-%d':
+            return np.datetime_as_string(found, unit='D').tolist()
+        return [
+            d.strftime(fmt)
+            for d in found.astype(datetime.date).tolist()
+        ]
+    # end of sessions_between
+
+    def expiration_for(
+            self,
+            date):
+        """expiration_for
+
+        Return the option expiration for the cycle ``date`` is in
+        as a ``datetime.datetime`` (matches ``option_expiration``)
+
+        :param date: date string, ``datetime``, ``date`` or
+            ``numpy.datetime64``
+        """
+        day = to_day(date)
+        state = self.ensure(day)
+        return to_datetime(state['expirations'][np.searchsorted(
+            state['third_fridays'],
+            day,
+            side='left')])
+    # end of expiration_for
+
+# end of TradingCalendar
+
+
+def get_calendar():
+    """get_calendar
+
+    Get the process-wide ``TradingCalendar``
+    """
+    cal = CALENDAR['calendar']
+    if cal is None:
+        with CALENDAR_LOCK:
+            cal = CALENDAR['calendar']
+            if cal is None:
+                cal = TradingCalendar()
+                CALENDAR['calendar'] = cal
+    return cal
+# end of get_calendar
@@ -0,0 +1,829 @@
+"""
+Screen a universe of cached tickers with vectorized filters
+
+``start_screener_analysis`` pulls tickers from FinViz and then
+handles each ticker on its own. The universe screener loads the
+latest ``num_days`` cached daily bars for thousands of tickers
+(pipelined redis ``GET`` calls on the ``<TICKER>_<DATE>_daily``
+keys) into one ``tickers x trading sessions`` array per field,
+computes the indicators for every ticker at once and applies
+``pandas.eval`` filter expressions to the whole universe. The
+result is a ranked ticker list for ``run_algo``:
+
+.. code-block:: python
+
+    import analysis_engine.run_algo as run_algo
+    import analysis_engine.universe_screener as universe_screener
+
+    res = universe_screener.run_screener(
+        filters=[
+            'close > 5',
+            'avg_volume_20 > 1000000',
+            'close > sma_50',
+            'rsi_14 < 35'
+        ],
+        rank_by='change_5',
+        ascending=True,
+        limit=10)
+    print(res['rec']['df'])
+    algo_res = run_algo.run_algo(
+        tickers=res['rec']['tickers'],
+        start_date='2019-01-02 00:00:00',
+        end_date='2019-02-15 00:00:00')
+
+Without ``tickers`` every ticker with a cached daily dataset for
+the ``date`` (default is the last close) is screened.
+
+**Features**
+
+Filters and ``rank_by`` can use the latest ``open``, ``high``,
+``low``, ``close`` and ``volume``, ``num_bars`` (sessions with
+a close) and these windowed features (``<name>_<window>``):
+
+- ``sma``, ``ema`` - moving averages of the close
+- ``rsi`` - relative strength index of the close (simple
+  averages of the gains and losses)
+- ``willr`` - Williams %R
+- ``change`` - percent change of the close over the window
+- ``volatility`` - standard deviation of the daily percent
+  changes of the close
+- ``avg_volume``, ``dollar_volume`` - average volume and
+  average ``close * volume``
+- ``high``, ``low`` - highest high and lowest low
+
+A ticker without a bar on the latest session has ``NaN``
+features so it does not pass any comparison. The ``sma``,
+``ema``, ``rsi``, ``avg_volume``, ``dollar_volume``, ``high``
+and ``low`` features are ``NaN`` for a ticker without a bar in
+every session of the window (for example ``sma_50`` with only
+21 days of history or ``num_days`` below 50).
+
+**Supported environment variables**
+
+::
+
+    export SCREENER_NUM_DAYS=60
+    export SCREENER_BATCH_SIZE=500
+    export SCREENER_LIMIT=25
+"""
+
+import re
+import json
+import time
+import zlib
+import warnings
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.utils as ae_utils
+import analysis_engine.build_result as build_result
+import analysis_engine.trading_calendar as trading_calendar
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+DAILY_FIELDS = [
+    'open',
+    'high',
+    'low',
+    'close',
+    'volume'
+]
+FEATURE_NAME = re.compile(r'\b([a-z][a-z_]*?)_(\d+)\b')
+
+
+def get_cached_tickers(
+        client,
+        date=None,
+        dataset='daily'):
+    """get_cached_tickers
+
+    Return the sorted tickers with a ``<TICKER>_<date>_<dataset>``
+    key in redis
+
+    :param client: redis client
+    :param date: optional - date string ``YYYY-MM-DD``
+        (default is the last close)
+    :param dataset: optional - dataset name (default is ``daily``)
+    """
+    use_date = date or ae_utils.get_last_close_str()
+    suffix = f'_{use_date}_{dataset}'
+    tickers = set()
+    for key in client.scan_iter(
+            match=f'*{suffix}',
+            count=1000):
+        if isinstance(key, bytes):
+            key = key.decode('utf-8')
+        tickers.add(key[0:-len(suffix)])
+    return sorted(tickers)
+# end of get_cached_tickers
+
+
+def decode_records(
+        raw,
+        encoding='utf-8'):
+    """decode_records
+
+    Decode a cached dataset value (zlib compressed or plain
+    json holding a ``to_json(orient='records')`` string) to a
+    list of records
+
+    :param raw: value from redis
+    :param encoding: optional - string encoding
+    """
+    if not raw:
+        return []
+    if isinstance(raw, bytes):
+        try:
+            raw = zlib.decompress(raw)
+        except zlib.error:
+            pass
+        raw = raw.decode(encoding)
+    data = json.loads(raw)
+    if isinstance(data, str):
+        data = json.loads(data)
+    if isinstance(data, dict):
+        data = list(data.values())
+    return data
+# end of decode_records
+
+
+def to_days(
+        values):
+    """to_days
+
+    Convert a list of ``date`` values (iso strings or epoch
+    milliseconds) to a ``datetime64[D]`` array
+
+    :param values: list of dates
+    """
+    if len(values) and isinstance(values[0], (int, float)):
+        return np.array(
+            values,
+            dtype='datetime64[ms]').astype('datetime64[D]')
+    return np.array(
+        [str(v)[0:10] for v in values],
+        dtype='datetime64[D]')
+# end of to_days
+
+
+def records_to_columns(
+        records,
+        max_rows=None):
+    """records_to_columns
+
+    Convert the newest ``max_rows`` daily records to a dictionary
+    of ``numpy`` arrays with the ``date`` as ``datetime64[D]``
+
+    :param records: list of daily bar dictionaries
+    :param max_rows: optional - newest rows to keep
+    """
+    if max_rows:
+        records = records[-max_rows:]
+    records = [r for r in records if r.get('date', None)]
+    columns = {
+        'date': to_days([r['date'] for r in records])
+    }
+    for field in DAILY_FIELDS:
+        columns[field] = np.array(
+            [r.get(field, None) for r in records],
+            dtype='float64')
+    return columns
+# end of records_to_columns
+
+
+def frame_to_columns(
+        df,
+        max_rows=None):
+    """frame_to_columns
+
+    Convert the newest ``max_rows`` rows of a daily
+    ``pandas.DataFrame`` to a dictionary of ``numpy`` arrays
+
+    :param df: daily ``pandas.DataFrame`` with a ``date`` column
+    :param max_rows: optional - newest rows to keep
+    """
+    if max_rows:
+        df = df.iloc[-max_rows:]
+    df = df[df['date'].notnull()]
+    columns = {
+        'date': pd.to_datetime(df['date']).values.astype('datetime64[D]')
+    }
+    for field in DAILY_FIELDS:
+        if field in df:
+            columns[field] = pd.to_numeric(
+                df[field],
+                errors='coerce').values.astype('float64')
+        else:
+            columns[field] = np.full(len(df.index), np.nan)
+    return columns
+# end of frame_to_columns
+
+
+def build_sessions(
+        num_days,
+        date=None):
+    """build_sessions
+
+    Return the last ``num_days`` trading sessions up to ``date``
+    as a ``datetime64[D]`` array
+
+    :param num_days: number of sessions
+    :param date: optional - last date (default is the last close)
+    """
+    use_date = date or ae_utils.get_last_close_str()
+    end_day = trading_calendar.to_day(use_date)
+    # about 252 sessions per 365 days plus room for holidays
+    start_day = end_day - np.timedelta64(int(num_days * 1.5) + 10, 'D')
+    return trading_calendar.get_calendar().sessions_between(
+        start_date=start_day,
+        end_date=end_day)[-num_days:]
+# end of build_sessions
+
+
+def build_universe(
+        columns_by_ticker,
+        sessions):
+    """build_universe
+
+    Build the universe dictionary with one ``tickers x sessions``
+    ``float64`` array per daily field. Bars are placed in the
+    column of their trading session and missing bars are ``NaN``.
+
+    :param columns_by_ticker: dictionary of ticker to the
+        columns from ``records_to_columns`` or
+        ``frame_to_columns``
+    :param sessions: ``datetime64[D]`` array from
+        ``build_sessions``
+    """
+    tickers = list(columns_by_ticker.keys())
+    num_days = len(sessions)
+    universe = {
+        'tickers': tickers,
+        'sessions': sessions
+    }
+    for field in DAILY_FIELDS:
+        universe[field] = np.full(
+            (len(tickers), num_days),
+            np.nan)
+    for idx, ticker in enumerate(tickers):
+        columns = columns_by_ticker[ticker]
+        days = columns['date']
+        if not len(days) or not num_days:
+            continue
+        pos = np.searchsorted(sessions, days)
+        valid = pos < num_days
+        valid[valid] = sessions[pos[valid]] == days[valid]
+        for field in DAILY_FIELDS:
+            universe[field][idx, pos[valid]] = columns[field][valid]
+    # end of for all tickers
+    return universe
+# end of build_universe
+
+
+def load_universe(
+        tickers=None,
+        num_days=ae_consts.SCREENER_NUM_DAYS,
+        date=None,
+        client=None,
+        redis_address=ae_consts.REDIS_ADDRESS,
+        redis_db=ae_consts.REDIS_DB,
+        redis_password=ae_consts.REDIS_PASSWORD,
+        batch_size=ae_consts.SCREENER_BATCH_SIZE,
+        label='screener'):
+    """load_universe
+
+    Load the latest ``num_days`` daily bars for the tickers from
+    the cached ``<TICKER>_<date>_daily`` datasets in redis with
+    one pipelined round trip per ``batch_size`` tickers
+
+    :param tickers: optional - list of tickers (default is
+        every ticker with a cached daily dataset for ``date``)
+    :param num_days: optional - number of trading sessions
+    :param date: optional - dataset date ``YYYY-MM-DD``
+        (default is the last close)
+    :param client: optional - redis client
+    :param redis_address: optional - redis address ``host:port``
+    :param redis_db: optional - redis db
+    :param redis_password: optional - redis password
+    :param batch_size: optional - GETs per pipeline round trip
+    :param label: optional - log label
+    """
+    use_date = date or ae_utils.get_last_close_str()
+    if not client:
+        import redis
+        redis_host, redis_port = ae_consts.get_redis_host_and_port(
+            addr=redis_address)
+        client = redis.Redis(
+            host=redis_host,
+            port=redis_port,
+            password=redis_password,
+            db=redis_db)
+    if tickers is None:
+        tickers = get_cached_tickers(
+            client=client,
+            date=use_date)
+    sessions = build_sessions(
+        num_days=num_days,
+        date=use_date)
+    # room for bars outside the sessions (stale or extra rows)
+    max_rows = 2 * num_days + 10
+    columns_by_ticker = {}
+    batch_size = max(1, int(batch_size))
+    for first in range(0, len(tickers), batch_size):
+        batch = [
+            str(t).upper()
+            for t in tickers[first:first + batch_size]
+        ]
+        pipe = client.pipeline(transaction=False)
+        for ticker in batch:
+            pipe.get(f'{ticker}_{use_date}_daily')
+        for ticker, raw in zip(batch, pipe.execute()):
+            try:
+                records = decode_records(raw)
+            except Exception as e:
+                log.error(
+                    f'{label} - failed decoding {ticker}_{use_date}_daily '
+                    f'ex={e}')
+                records = []
+            columns_by_ticker[ticker] = records_to_columns(
+                records=records,
+                max_rows=max_rows)
+    # end of for all batches
+    log.debug(
+        f'{label} - loaded tickers={len(columns_by_ticker)} '
+        f'days={len(sessions)} date={use_date}')
+    return build_universe(
+        columns_by_ticker=columns_by_ticker,
+        sessions=sessions)
+# end of load_universe
+
+
+def load_universe_from_frames(
+        frames,
+        num_days=ae_consts.SCREENER_NUM_DAYS,
+        date=None):
+    """load_universe_from_frames
+
+    Build the universe from daily ``pandas.DataFrame`` objects
+    (for example ``extract`` results or files)
+
+    :param frames: dictionary of ticker to daily
+        ``pandas.DataFrame``
+    :param num_days: optional - number of trading sessions
+    :param date: optional - last date (default is the last close)
+    """
+    max_rows = 2 * num_days + 10
+    return build_universe(
+        columns_by_ticker={
+            ticker: frame_to_columns(
+                df=df,
+                max_rows=max_rows)
+            for ticker, df in frames.items()
+        },
+        sessions=build_sessions(
+            num_days=num_days,
+            date=date))
+# end of load_universe_from_frames
+
+
+def window_of(
+        values,
+        window):
+    """window_of
+
+    Return the last ``window`` columns of a 2-D array
+
+    :param values: ``tickers x sessions`` array
+    :param window: number of sessions
+    """
+    return values[:, -max(1, int(window)):]
+# end of window_of
+
+
+def full_window(
+        value,
+        values,
+        window):
+    """full_window
+
+    Set ``value`` to ``NaN`` for the tickers with fewer than
+    ``window`` bars in ``values`` and return it
+
+    :param value: feature array with one value per ticker
+    :param values: windowed ``tickers x sessions`` array
+    :param window: number of sessions the feature needs
+    """
+    num_bars = np.count_nonzero(~np.isnan(values), axis=1)
+    value = np.asarray(value, dtype=float)
+    value[num_bars < max(1, int(window))] = np.nan
+    return value
+# end of full_window
+
+
+def sma(
+        universe,
+        window):
+    """sma
+
+    Simple moving average of the close
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    close = window_of(universe['close'], window)
+    return full_window(
+        value=np.nanmean(close, axis=1),
+        values=close,
+        window=window)
+# end of sma
+
+
+def ema(
+        universe,
+        window):
+    """ema
+
+    Exponential moving average of the close over the loaded
+    sessions (``alpha = 2 / (window + 1)``)
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    alpha = 2.0 / (int(window) + 1.0)
+    close = universe['close']
+    value = np.full(close.shape[0], np.nan)
+    for col in range(close.shape[1]):
+        cur = close[:, col]
+        value = np.where(
+            np.isnan(value),
+            cur,
+            np.where(
+                np.isnan(cur),
+                value,
+                alpha * cur + (1.0 - alpha) * value))
+    return full_window(
+        value=value,
+        values=window_of(close, window),
+        window=window)
+# end of ema
+
+
+def rsi(
+        universe,
+        window):
+    """rsi
+
+    Relative strength index of the close with simple averages
+    of the gains and losses
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    deltas = np.diff(window_of(universe['close'], int(window) + 1), axis=1)
+    gains = np.nanmean(np.where(deltas > 0, deltas, 0.0), axis=1)
+    losses = np.nanmean(np.where(deltas < 0, -deltas, 0.0), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        value = 100.0 - 100.0 / (1.0 + gains / losses)
+    value[(losses == 0) & (gains > 0)] = 100.0
+    return full_window(
+        value=value,
+        values=deltas,
+        window=window)
+# end of rsi
+
+
+def willr(
+        universe,
+        window):
+    """willr
+
+    Williams %R
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    highest = np.nanmax(window_of(universe['high'], window), axis=1)
+    lowest = np.nanmin(window_of(universe['low'], window), axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (highest - universe['close'][:, -1]) / (
+            highest - lowest) * -100.0
+# end of willr
+
+
+def change(
+        universe,
+        window):
+    """change
+
+    Percent change of the close over the window
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    close = window_of(universe['close'], int(window) + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return (close[:, -1] / close[:, 0] - 1.0) * 100.0
+# end of change
+
+
+def volatility(
+        universe,
+        window):
+    """volatility
+
+    Standard deviation of the daily percent changes of the close
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    close = window_of(universe['close'], int(window) + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct = (close[:, 1:] / close[:, :-1] - 1.0) * 100.0
+    return np.nanstd(pct, axis=1)
+# end of volatility
+
+
+def avg_volume(
+        universe,
+        window):
+    """avg_volume
+
+    Average volume
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    volume = window_of(universe['volume'], window)
+    return full_window(
+        value=np.nanmean(volume, axis=1),
+        values=volume,
+        window=window)
+# end of avg_volume
+
+
+def dollar_volume(
+        universe,
+        window):
+    """dollar_volume
+
+    Average ``close * volume``
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    dollars = window_of(universe['close'] * universe['volume'], window)
+    return full_window(
+        value=np.nanmean(dollars, axis=1),
+        values=dollars,
+        window=window)
+# end of dollar_volume
+
+
+def high(
+        universe,
+        window):
+    """high
+
+    Highest high
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    highs = window_of(universe['high'], window)
+    return full_window(
+        value=np.nanmax(highs, axis=1),
+        values=highs,
+        window=window)
+# end of high
+
+
+def low(
+        universe,
+        window):
+    """low
+
+    Lowest low
+
+    :param universe: universe dictionary
+    :param window: number of sessions
+    """
+    lows = window_of(universe['low'], window)
+    return full_window(
+        value=np.nanmin(lows, axis=1),
+        values=lows,
+        window=window)
+# end of low
+
+
+FEATURES = {
+    'sma': sma,
+    'ema': ema,
+    'rsi': rsi,
+    'willr': willr,
+    'change': change,
+    'volatility': volatility,
+    'avg_volume': avg_volume,
+    'dollar_volume': dollar_volume,
+    'high': high,
+    'low': low
+}
+
+
+def get_feature_names(
+        expressions):
+    """get_feature_names
+
+    Return the feature names used in the filter and rank
+    expressions
+
+    :param expressions: list of expression strings
+    """
+    names = []
+    for expression in expressions:
+        for prefix, window in FEATURE_NAME.findall(expression):
+            name = f'{prefix}_{window}'
+            if prefix in FEATURES and name not in names:
+                names.append(name)
+    return names
+# end of get_feature_names
+
+
+def build_features(
+        universe,
+        names=None):
+    """build_features
+
+    Compute the latest fields and the named features for every
+    ticker and return a ``pandas.DataFrame`` indexed by ticker
+
+    :param universe: universe dictionary
+    :param names: optional - list of ``<feature>_<window>`` names
+    """
+    data = {
+        field: universe[field][:, -1] if universe[field].shape[1] else
+        np.full(len(universe['tickers']), np.nan)
+        for field in DAILY_FIELDS
+    }
+    data['num_bars'] = (~np.isnan(universe['close'])).sum(axis=1)
+    with warnings.catch_warnings():
+        # all-NaN rows are expected for tickers without bars
+        warnings.simplefilter('ignore', category=RuntimeWarning)
+        for name in names or []:
+            prefix, window = name.rsplit('_', 1)
+            if prefix not in FEATURES:
+                raise ValueError(
+                    f'unsupported screener feature={name} '
+                    f'supported={list(FEATURES.keys())}')
+            data[name] = FEATURES[prefix](
+                universe=universe,
+                window=int(window))
+    return pd.DataFrame(
+        data,
+        index=pd.Index(universe['tickers'], name='ticker'))
+# end of build_features
+
+
+def screen(
+        universe,
+        filters=None,
+        rank_by=None,
+        ascending=False,
+        limit=ae_consts.SCREENER_LIMIT):
+    """screen
+
+    Apply the filter expressions to the whole universe and
+    return the matching tickers' features ranked by ``rank_by``
+
+    :param universe: universe dictionary
+    :param filters: optional - list of ``pandas.eval`` boolean
+        expressions over the features (all must be ``True``)
+    :param rank_by: optional - feature name or expression to
+        rank by (default is ``dollar_volume_20``)
+    :param ascending: optional - rank the smallest first
+        (default is ``False``)
+    :param limit: optional - number of tickers to return
+        (``0`` returns every match)
+    """
+    filters = filters or []
+    rank_by = rank_by or 'dollar_volume_20'
+    features = build_features(
+        universe=universe,
+        names=get_feature_names(
+            expressions=filters + [rank_by]))
+    mask = np.ones(len(features.index), dtype=bool)
+    for expression in filters:
+        mask &= np.asarray(
+            features.eval(expression),
+            dtype=bool)
+    matches = features[mask].copy()
+    matches['score'] = matches.eval(rank_by)
+    matches = matches[matches['score'].notnull()].sort_values(
+        by=['score'],
+        ascending=ascending,
+        kind='mergesort')
+    if limit:
+        matches = matches.iloc[0:int(limit)]
+    matches['rank'] = np.arange(1, len(matches.index) + 1)
+    return matches
+# end of screen
+
+
+def run_screener(
+        tickers=None,
+        filters=None,
+        rank_by=None,
+        ascending=False,
+        limit=ae_consts.SCREENER_LIMIT,
+        num_days=ae_consts.SCREENER_NUM_DAYS,
+        date=None,
+        frames=None,
+        client=None,
+        redis_address=ae_consts.REDIS_ADDRESS,
+        redis_db=ae_consts.REDIS_DB,
+        redis_password=ae_consts.REDIS_PASSWORD,
+        batch_size=ae_consts.SCREENER_BATCH_SIZE,
+        label='screener'):
+    """run_screener
+
+    Load the universe and screen it. Returns a
+    ``build_result`` dictionary where ``rec['tickers']`` is the
+    ranked ticker list for ``run_algo(tickers=...)`` and
+    ``rec['df']`` has the features of each ranked ticker.
+
+    :param tickers: optional - list of tickers (default is
+        every ticker with a cached daily dataset)
+    :param filters: optional - list of filter expressions
+    :param rank_by: optional - feature name or expression
+    :param ascending: optional - rank the smallest first
+    :param limit: optional - number of tickers to return
+    :param num_days: optional - number of trading sessions
+    :param date: optional - dataset date ``YYYY-MM-DD``
+    :param frames: optional - dictionary of ticker to daily
+        ``pandas.DataFrame`` to screen instead of redis
+    :param client: optional - redis client
+    :param redis_address: optional - redis address ``host:port``
+    :param redis_db: optional - redis db
+    :param redis_password: optional - redis password
+    :param batch_size: optional - GETs per pipeline round trip
+    :param label: optional - log label
+    """
+    rec = {
+        'tickers': [],
+        'df': None,
+        'num_tickers': 0,
+        'num_matches': 0,
+        'load_seconds': 0.0,
+        'screen_seconds': 0.0
+    }
+    try:
+        start_time = time.time()
+        if frames is not None:
+            universe = load_universe_from_frames(
+                frames=frames,
+                num_days=num_days,
+                date=date)
+        else:
+            universe = load_universe(
+                tickers=tickers,
+                num_days=num_days,
+                date=date,
+                client=client,
+                redis_address=redis_address,
+                redis_db=redis_db,
+                redis_password=redis_password,
+                batch_size=batch_size,
+                label=label)
+        screen_time = time.time()
+        ranked_df = screen(
+            universe=universe,
+            filters=filters,
+            rank_by=rank_by,
+            ascending=ascending,
+            limit=limit)
+        done_time = time.time()
+        rec['tickers'] = ranked_df.index.tolist()
+        rec['df'] = ranked_df
+        rec['num_tickers'] = len(universe['tickers'])
+        rec['num_matches'] = len(ranked_df.index)
+        rec['load_seconds'] = screen_time - start_time
+        rec['screen_seconds'] = done_time - screen_time
+        log.info(
+            f'{label} - screened tickers={rec["num_tickers"]} '
+            f'days={len(universe["sessions"])} '
+            f'matches={rec["num_matches"]} '
+            f'load={rec["load_seconds"]:.2f}s '
+            f'screen={rec["screen_seconds"]:.2f}s')
+        return build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+    except Exception as e:
+        err = f'{label} - failed screening ex={e}'
+        log.error(err)
+        return build_result.build_result(
+            status=ae_consts.ERR,
+            err=err,
+            rec=rec)
+# end of run_screener
@@ -12,7 +12,9 @@ def url_helper(
         sess=None,
         retries=10,
         backoff_factor=0.3,
-        status_forcelist=(500, 502, 504)):
+        status_forcelist=(500, 502, 504),
+        pool_connections=10,
+        pool_maxsize=10):
     """url_helper
 
     :param sess: ``requests.Session``
@@ -35,6 +37,12 @@ def url_helper(
     :param status_forcelist: optional tuple list
         of retry error HTTP status codes
         default is ``500, 502, 504``
+    :param pool_connections: optional - number of host
+        connection pools to cache
+        default is ``10``
+    :param pool_maxsize: optional - max keep-alive
+        connections per host pool
+        default is ``10``
     """
     session = sess or requests.Session()
     retry = requests_retry.Retry(
@@ -44,7 +52,10 @@ def url_helper(
         backoff_factor=backoff_factor,
         status_forcelist=status_forcelist,
     )
-    adapter = adapters.HTTPAdapter(max_retries=retry)
+    adapter = adapters.HTTPAdapter(
+        max_retries=retry,
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize)
     session.mount('http://', adapter)
     session.mount('https://', adapter)
     return session
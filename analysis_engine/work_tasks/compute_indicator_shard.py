@@ -0,0 +1,104 @@
+"""
+**Compute Indicator Shard Task**
+
+Run the indicators for one shard of a backtest built by
+``analysis_engine.indicator_shards.run_sharded_backtest``. The
+task loads the shard's dataset rows (with the lookback warm-up
+overlap) from redis, stores each step's indicator reports as
+compact arrays back in redis and returns the reference:
+
+.. code-block:: python
+
+    {
+        'status': SUCCESS,
+        'err': None,
+        'rec': {
+            'shard': 3,
+            'num_steps': 24570,
+            'result_ref': {
+                'store': 'redis',
+                'key': 'ae:indshard:0b6c...:out',
+                ...
+            }
+        }
+    }
+
+.. tip:: This task uses the `analysis_engine.work_tasks.
+    custom_task.CustomTask class <https://github.com/A
+    lgoTraders/stock-analysis-engine/blob/master/anal
+    ysis_engine/work_tasks/custom_task.py>`__ for
+    task event handling.
+
+**Supported Environment Variables**
+
+::
+
+    export INDICATOR_SHARD_KEY_PREFIX=ae:indshard
+    export INDICATOR_SHARD_EXPIRE=3600
+"""
+
+import celery
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.indicator_shards as indicator_shards
+import analysis_engine.work_tasks.custom_task as custom_task
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+@celery.task(
+    bind=True,
+    base=custom_task.CustomTask,
+    queue='compute_indicator_shard')
+def compute_indicator_shard(
+        self,
+        work_dict):
+    """compute_indicator_shard
+
+    Compute the indicator reports for one shard
+
+    :param work_dict: shard request from
+        ``analysis_engine.indicator_shards.run_sharded_backtest``
+    """
+
+    label = work_dict.get(
+        'label',
+        'compute_indicator_shard')
+    shard = work_dict.get(
+        'shard',
+        {})
+
+    log.debug(
+        f'task - {label} - start '
+        f'shard={shard.get("shard", None)} '
+        f'steps={shard.get("num_steps", None)}')
+
+    try:
+        result_ref = indicator_shards.run_shard_request(
+            work_dict=work_dict)
+        res = build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec={
+                'shard': shard.get('shard', None),
+                'num_steps': shard.get('num_steps', None),
+                'result_ref': result_ref
+            })
+    except Exception as e:
+        err = (
+            f'{label} - failed computing '
+            f'shard={shard.get("shard", None)} ex={e}')
+        log.error(err)
+        res = build_result.build_result(
+            status=ae_consts.ERR,
+            err=err,
+            rec={})
+    # end of try/ex
+
+    log.debug(
+        f'task - compute_indicator_shard done - '
+        f'{label} - status={ae_consts.get_status(res["status"])}')
+
+    return res
+# end of compute_indicator_shard
@@ -12,10 +12,21 @@ Debug values with the environment variable:
 
     export DEBUG_TASK=1
 
+Every task also records its queue wait, run time, payload
+sizes and retries with ``analysis_engine.task_metrics``:
+
+::
+
+    export TASK_METRICS_ENABLED=1
+    export TASK_METRICS_EXPORT=file,redis,http
+
 """
 
+import time
 import celery
+import celery.exceptions
 import analysis_engine.consts as ae_consts
+import analysis_engine.task_metrics as task_metrics
 import analysis_engine.send_to_slack as slack_utils
 import spylunking.log.setup_logging as log_utils
 
@@ -27,6 +38,47 @@ class CustomTask(celery.Task):
 
     log_label = 'custom_task'
 
+    def __call__(
+            self,
+            *args,
+            **kwargs):
+        """__call__
+
+        Run the task and record its metrics with
+        ``analysis_engine.task_metrics``
+
+        :param args: arguments passed into task
+        :param kwargs: keyword arguments passed into task
+        """
+        if not ae_consts.TASK_METRICS_ENABLED:
+            return super().__call__(*args, **kwargs)
+
+        start_time = time.time()
+        status = 'failure'
+        retval = None
+        try:
+            retval = super().__call__(*args, **kwargs)
+            status = 'success'
+            return retval
+        except celery.exceptions.Retry:
+            status = 'retry'
+            raise
+        finally:
+            try:
+                task_metrics.record_task(
+                    task_name=self.name,
+                    run_seconds=time.time() - start_time,
+                    queue_wait_seconds=task_metrics.get_queue_wait(
+                        request=self.request,
+                        start_time=start_time),
+                    args=args,
+                    kwargs=kwargs,
+                    retval=retval,
+                    status=status)
+            except Exception as e:
+                log.error(f'failed recording task metrics ex={e}')
+    # end of __call__
+
     def build_log_label_from_args(
             self,
             args):
@@ -114,4 +166,26 @@ class CustomTask(celery.Task):
                                       f'exc={use_exc}'])
     # end of on_failure
 
+    def on_retry(
+            self,
+            exc,
+            task_id,
+            args,
+            kwargs,
+            einfo):
+        """on_retry
+
+        Count the retry in the task metrics
+
+        :param exc: exception
+        :param task_id: task id
+        :param args: arguments passed into task
+        :param kwargs: keyword arguments passed into task
+        :param einfo: exception info
+        """
+        if ae_consts.TASK_METRICS_ENABLED:
+            task_metrics.record_retry(
+                task_name=self.name)
+    # end of on_retry
+
 # end of CustomTask
@@ -4,6 +4,8 @@ Get a Celery Application Helper
 
 import os
 import celery
+import analysis_engine.consts as ae_consts
+import analysis_engine.task_metrics as task_metrics
 import spylunking.log.setup_logging as log_utils
 
 log = log_utils.build_colorized_logger(name=__name__)
@@ -28,6 +30,7 @@ def get_celery_app(
         worker_log_format=os.getenv(
             'WORKER_LOG_FORMAT',
             '%(asctime)s: %(levelname)s %(message)s'),
+        warmup=False,
         **kwargs):
     """get_celery_app
 
@@ -68,6 +71,9 @@ def get_celery_app(
         (default is ``analysis_engine.work_tasks.celery_config``
         or ``analysis_engine.consts.WORKER_CELERY_CONFIG_MODULE``)
     :param worker_log_format: format for logs
+    :param warmup: optional - bool to warm each worker process
+        with ``analysis_engine.worker_warmup`` from the
+        ``worker_process_init`` signal (default is ``False``)
     """
 
     if len(include_tasks) == 0:
@@ -101,5 +107,13 @@ def get_celery_app(
     if len(include_tasks) > 0:
         app.autodiscover_tasks(include_tasks)
 
+    if ae_consts.TASK_METRICS_ENABLED:
+        task_metrics.connect_signals()
+
+    if warmup:
+        import analysis_engine.worker_warmup as worker_warmup
+        worker_warmup.connect_signals()
+        log.info(f'warming worker processes for app={name}')
+
     return app
 # end of get_celery_app
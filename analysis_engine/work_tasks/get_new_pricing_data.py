@@ -66,6 +66,20 @@ analysis_engine/api_requests.py#L49>`__
 
     export DEBUG_RESULTS=1
 
+**Concurrent Fetching**
+
+The IEX and Tradier datasets are fetched on a bounded thread
+pool (``FETCH_MAX_WORKERS`` or ``work_dict['fetch_max_workers']``)
+with per-provider request limits (``FETCH_IEX_CONCURRENCY``
+and ``FETCH_TD_CONCURRENCY``) over pooled keep-alive sessions
+from ``analysis_engine.http_sessions``. Each dataset is
+published as soon as its fetch finishes.
+
+The ``get_new_pricing_data_chunk`` task fetches the IEX
+datasets of all its tickers with IEX Cloud batch requests
+first and passes each ticker's json-serialized datasets in
+``work_dict['iex_batch_data']`` so they are not fetched again.
+
 """
 
 import datetime
@@ -84,6 +98,8 @@ import analysis_engine.work_tasks.publish_pricing_update as publisher
 import analysis_engine.yahoo.get_data as yahoo_data
 import analysis_engine.iex.get_data as iex_data
 import analysis_engine.td.get_data as td_data
+import analysis_engine.fetch_pool as fetch_pool
+import analysis_engine.fetch_modes as fetch_modes
 import analysis_engine.send_to_slack as slack_utils
 import spylunking.log.setup_logging as log_utils
 
@@ -178,6 +194,9 @@ def get_new_pricing_data(
         iex_datasets = work_dict.get(
             'iex_datasets',
             iex_consts.DEFAULT_FETCH_DATASETS)
+        iex_batch_data = work_dict.get(
+            'iex_batch_data',
+            None) or {}
         td_datasets = work_dict.get(
             'td_datasets',
             td_consts.DEFAULT_FETCH_DATASETS_TD)
@@ -190,7 +209,6 @@ def get_new_pricing_data(
         td_token = work_dict.get(
             'td_token',
             td_consts.TD_TOKEN)
-        str_fetch_mode = str(fetch_mode).lower()
         backfill_date = work_dict.get(
             'backfill_date',
             None)
@@ -199,134 +217,13 @@ def get_new_pricing_data(
             False)
 
         # control flags to deal with feed issues:
-        get_iex_data = True
-        get_td_data = True
-
-        if (
-                fetch_mode == ae_consts.FETCH_MODE_ALL
-                or str_fetch_mode == 'initial'):
-            get_iex_data = True
-            get_td_data = True
-            iex_datasets = ae_consts.IEX_INITIAL_DATASETS
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_ALL
-                or str_fetch_mode == 'all'):
-            get_iex_data = True
-            get_td_data = True
-            iex_datasets = ae_consts.IEX_DATASETS_DEFAULT
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_YHO
-                or str_fetch_mode == 'yahoo'):
-            get_iex_data = False
-            get_td_data = False
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_IEX
-                or str_fetch_mode == 'iex-all'):
-            get_iex_data = True
-            get_td_data = False
-            iex_datasets = ae_consts.IEX_DATASETS_DEFAULT
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_IEX
-                or str_fetch_mode == 'iex'):
-            get_iex_data = True
-            get_td_data = False
-            iex_datasets = ae_consts.IEX_INTRADAY_DATASETS
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_INTRADAY
-                or str_fetch_mode == 'intra'):
-            get_iex_data = True
-            get_td_data = True
-            iex_datasets = ae_consts.IEX_INTRADAY_DATASETS
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_DAILY
-                or str_fetch_mode == 'daily'):
-            get_iex_data = True
-            get_td_data = False
-            iex_datasets = ae_consts.IEX_DAILY_DATASETS
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_WEEKLY
-                or str_fetch_mode == 'weekly'):
-            get_iex_data = True
-            get_td_data = False
-            iex_datasets = ae_consts.IEX_WEEKLY_DATASETS
-        elif (
-                fetch_mode == ae_consts.FETCH_MODE_TD
-                or str_fetch_mode == 'td'):
-            get_iex_data = False
-            get_td_data = True
-        else:
-            get_iex_data = False
-            get_td_data = False
-
-            fetch_arr = str_fetch_mode.split(',')
-            found_fetch = False
-            iex_datasets = []
-            for fetch_name in fetch_arr:
-                if fetch_name not in iex_datasets:
-                    if fetch_name == 'iex_min':
-                        iex_datasets.append('minute')
-                    elif fetch_name == 'min':
-                        iex_datasets.append('minute')
-                    elif fetch_name == 'minute':
-                        iex_datasets.append('minute')
-                    elif fetch_name == 'day':
-                        iex_datasets.append('daily')
-                    elif fetch_name == 'daily':
-                        iex_datasets.append('daily')
-                    elif fetch_name == 'iex_day':
-                        iex_datasets.append('daily')
-                    elif fetch_name == 'quote':
-                        iex_datasets.append('quote')
-                    elif fetch_name == 'iex_quote':
-                        iex_datasets.append('quote')
-                    elif fetch_name == 'iex_stats':
-                        iex_datasets.append('stats')
-                    elif fetch_name == 'stats':
-                        iex_datasets.append('stats')
-                    elif fetch_name == 'peers':
-                        iex_datasets.append('peers')
-                    elif fetch_name == 'iex_peers':
-                        iex_datasets.append('peers')
-                    elif fetch_name == 'news':
-                        iex_datasets.append('news')
-                    elif fetch_name == 'iex_news':
-                        iex_datasets.append('news')
-                    elif fetch_name == 'fin':
-                        iex_datasets.append('financials')
-                    elif fetch_name == 'iex_fin':
-                        iex_datasets.append('financials')
-                    elif fetch_name == 'earn':
-                        iex_datasets.append('earnings')
-                    elif fetch_name == 'iex_earn':
-                        iex_datasets.append('earnings')
-                    elif fetch_name == 'div':
-                        iex_datasets.append('dividends')
-                    elif fetch_name == 'iex_div':
-                        iex_datasets.append('dividends')
-                    elif fetch_name == 'comp':
-                        iex_datasets.append('company')
-                    elif fetch_name == 'iex_comp':
-                        iex_datasets.append('company')
-                    elif fetch_name == 'td':
-                        get_td_data = True
-                    else:
-                        log.warn(
-                            'unsupported IEX dataset '
-                            f'{fetch_name}')
-            found_fetch = (
-                len(iex_datasets) != 0)
-            if not found_fetch:
-                log.error(
-                    f'{label} - unsupported '
-                    f'fetch_mode={fetch_mode} value')
-            else:
-                get_iex_data = True
-                log.debug(
-                    f'{label} - '
-                    f'fetching={len(iex_datasets)} '
-                    f'{iex_datasets} '
-                    f'fetch_mode={fetch_mode}')
-        # end of screening custom fetch_mode settings
+        fetch_datasets = fetch_modes.get_fetch_datasets(
+            fetch_mode=fetch_mode,
+            iex_datasets=iex_datasets,
+            label=label)
+        get_iex_data = fetch_datasets['get_iex_data']
+        get_td_data = fetch_datasets['get_td_data']
+        iex_datasets = fetch_datasets['iex_datasets']
 
         num_tokens = 0
 
@@ -458,6 +355,7 @@ def get_new_pricing_data(
                     f'status={status_str} err={yahoo_res["err"]}')
         # end of get from yahoo
 
+        fetch_jobs = []
         if get_iex_data:
             num_iex_ds = len(iex_datasets)
             log.debug(f'{label} IEX datasets={num_iex_ds}')
@@ -465,57 +363,45 @@ def get_new_pricing_data(
                 dataset_field = iex_consts.get_ft_str(
                     ft_type=ft_type)
 
+                if dataset_field in iex_batch_data:
+                    # fetched and published by the chunk's batch request
+                    log.debug(
+                        f'{label} IEX={idx}/{num_iex_ds} '
+                        f'field={dataset_field} ticker={ticker} '
+                        'from batch')
+                    if dataset_field == 'news':
+                        rec['iex_news'] = iex_batch_data[dataset_field]
+                    else:
+                        rec[dataset_field] = iex_batch_data[dataset_field]
+                    num_success += 1
+                    continue
+
                 log.debug(
                     f'{label} IEX={idx}/{num_iex_ds} '
                     f'field={dataset_field} ticker={ticker}')
                 iex_label = f'{label}-{dataset_field}'
                 iex_req = copy.deepcopy(work_dict)
+                iex_req.pop('iex_batch_data', None)
                 iex_req['label'] = iex_label
                 iex_req['ft_type'] = ft_type
                 iex_req['field'] = dataset_field
                 iex_req['ticker'] = ticker
                 iex_req['backfill_date'] = backfill_date
                 iex_req['verbose'] = verbose
-
-                iex_res = iex_data.get_data_from_iex(
-                    work_dict=iex_req)
-
-                status_str = (
-                    ae_consts.get_status(status=iex_res['status']))
-                if iex_res['status'] == ae_consts.SUCCESS:
-                    iex_rec = iex_res['rec']
-                    rk = f'{redis_key}_{dataset_field}'
-                    if backfill_date:
-                        rk = (
-                            f'{ticker}_{backfill_date}_'
-                            f'{dataset_field}')
-                    msg = (
-                        f'{label} IEX ticker={ticker} '
-                        f'redis_key={rk} '
-                        f'field={dataset_field} '
-                        f'status={status_str} '
-                        f'err={iex_res["err"]}')
-                    if ae_consts.ev('SHOW_SUCCESS', '0') == '1':
-                        log.info(msg)
-                    else:
-                        log.debug(msg)
-                    if dataset_field == 'news':
-                        rec['iex_news'] = iex_rec['data']
-                    else:
-                        rec[dataset_field] = iex_rec['data']
-                    num_success += 1
-                else:
-                    log.debug(
-                        f'{label} failed IEX ticker={ticker} '
-                        f'field={dataset_field} '
-                        f'status={status_str} err={iex_res["err"]}')
-                # end of if/else succcess
+                fetch_jobs.append({
+                    'provider': 'iex',
+                    'func': iex_data.get_data_from_iex,
+                    'field': dataset_field,
+                    'work_dict': iex_req
+                })
             # end idx, ft_type in enumerate(iex_datasets):
         # end of if get_iex_data
 
         if get_td_data:
             num_td_ds = len(td_datasets)
 
+            # the options scrubbing uses the last cached close
+            # which is read before any of the new fetches start
             latest_pricing = None
             try:
                 latest_pricing = iex_pricing.get_pricing_on_date(
@@ -541,43 +427,84 @@ def get_new_pricing_data(
                 td_label = (
                     f'{label}-{dataset_field}')
                 td_req = copy.deepcopy(work_dict)
+                td_req.pop('iex_batch_data', None)
                 td_req['label'] = td_label
                 td_req['ft_type'] = ft_type
                 td_req['field'] = dataset_field
                 td_req['ticker'] = ticker
                 td_req['latest_pricing'] = latest_pricing
-                td_res = td_data.get_data_from_td(
-                    work_dict=td_req)
+                fetch_jobs.append({
+                    'provider': 'td',
+                    'func': td_data.get_data_from_td,
+                    'field': dataset_field,
+                    'work_dict': td_req
+                })
+            # end idx, ft_type in enumerate(td_datasets):
+        # end of if get_td_data
 
-                status_str = (
-                    ae_consts.get_status(status=td_res['status']))
-                if td_res['status'] == ae_consts.SUCCESS:
-                    td_rec = td_res['rec']
+        # each get_data_from_* call publishes its own dataset
+        # key as soon as it finishes
+        max_workers = work_dict.get(
+            'fetch_max_workers',
+            ae_consts.FETCH_MAX_WORKERS)
+        for job, fetch_res in fetch_pool.run_fetch_jobs(
+                jobs=fetch_jobs,
+                max_workers=max_workers):
+            dataset_field = job['field']
+            status_str = (
+                ae_consts.get_status(status=fetch_res['status']))
+            if job['provider'] == 'iex':
+                if fetch_res['status'] == ae_consts.SUCCESS:
+                    iex_rec = fetch_res['rec']
+                    rk = f'{redis_key}_{dataset_field}'
+                    if backfill_date:
+                        rk = (
+                            f'{ticker}_{backfill_date}_'
+                            f'{dataset_field}')
+                    msg = (
+                        f'{label} IEX ticker={ticker} '
+                        f'redis_key={rk} '
+                        f'field={dataset_field} '
+                        f'status={status_str} '
+                        f'err={fetch_res["err"]}')
+                    if ae_consts.ev('SHOW_SUCCESS', '0') == '1':
+                        log.info(msg)
+                    else:
+                        log.debug(msg)
+                    if dataset_field == 'news':
+                        rec['iex_news'] = iex_rec['data']
+                    else:
+                        rec[dataset_field] = iex_rec['data']
+                    num_success += 1
+                else:
+                    log.debug(
+                        f'{label} failed IEX ticker={ticker} '
+                        f'field={dataset_field} '
+                        f'status={status_str} err={fetch_res["err"]}')
+                # end of if/else succcess
+            else:
+                if fetch_res['status'] == ae_consts.SUCCESS:
+                    td_rec = fetch_res['rec']
                     msg = (
                         f'{label} TD ticker={ticker} '
                         f'redis_key={redis_key}_{dataset_field} '
                         f'field={dataset_field} '
                         f'status={status_str} '
-                        f'err={td_res["err"]}')
+                        f'err={fetch_res["err"]}')
                     if ae_consts.ev('SHOW_SUCCESS', '0') == '1':
                         log.info(msg)
                     else:
                         log.debug(msg)
-                    if dataset_field == 'tdcalls':
-                        rec['tdcalls'] = td_rec['data']
-                    if dataset_field == 'tdputs':
-                        rec['tdputs'] = td_rec['data']
-                    else:
-                        rec[dataset_field] = td_rec['data']
+                    rec[dataset_field] = td_rec['data']
                     num_success += 1
                 else:
                     log.critical(
                         f'{label} failed TD ticker={ticker} '
                         f'field={dataset_field} '
-                        f'status={status_str} err={td_res["err"]}')
+                        f'status={status_str} err={fetch_res["err"]}')
                 # end of if/else succcess
-            # end idx, ft_type in enumerate(td_datasets):
-        # end of if get_td_data
+            # end of if/else provider
+        # end of for all fetch results in completion order
 
         rec['num_success'] = num_success
 
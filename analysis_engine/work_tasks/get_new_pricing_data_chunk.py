@@ -0,0 +1,152 @@
+"""
+**Get New Pricing Data for a Chunk of Tickers Task**
+
+Fetch and publish the datasets for many tickers in one task
+with ``analysis_engine.fetch_chunks.run_chunk``. This cuts the
+broker messages, task starts and result backend writes for
+large universes to one per ``FETCH_CHUNK_SIZE`` tickers, and
+the chunk's IEX datasets are fetched with IEX Cloud batch
+requests instead of one request per ticker and dataset.
+
+.. code-block:: python
+
+    import analysis_engine.api_requests as api_requests
+    import analysis_engine.fetch_chunks as fetch_chunks
+    from analysis_engine.work_tasks.get_new_pricing_data_chunk \\
+        import run_get_new_pricing_data_chunk
+
+    work = api_requests.build_get_new_pricing_request(
+        label='universe')
+    for chunk_req in fetch_chunks.build_chunk_requests(
+            work_dict=work,
+            tickers=['SPY', 'AAPL', 'MSFT']):
+        chunk_req['celery_disabled'] = True
+        res = run_get_new_pricing_data_chunk(
+            chunk_req)
+
+.. tip:: This task uses the `analysis_engine.work_tasks.
+    custom_task.CustomTask class <https://github.com/A
+    lgoTraders/stock-analysis-engine/blob/master/anal
+    ysis_engine/work_tasks/custom_task.py>`__ for
+    task event handling.
+
+**Supported Environment Variables**
+
+::
+
+    export DEBUG_RESULTS=1
+    export FETCH_CHUNK_SIZE=50
+    export FETCH_CHUNK_MAX_WORKERS=4
+    export FETCH_IEX_BATCH=1
+"""
+
+import celery
+import analysis_engine.consts as ae_consts
+import analysis_engine.build_result as build_result
+import analysis_engine.fetch_chunks as fetch_chunks
+import analysis_engine.get_task_results as get_task_results
+import analysis_engine.work_tasks.custom_task as custom_task
+import analysis_engine.work_tasks.get_new_pricing_data as task_pricing
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+@celery.task(
+    bind=True,
+    base=custom_task.CustomTask,
+    queue='get_new_pricing_data_chunk')
+def get_new_pricing_data_chunk(
+        self,
+        work_dict):
+    """get_new_pricing_data_chunk
+
+    Get the datasets for every ticker in ``work_dict['tickers']``
+
+    :param work_dict: chunk request from
+        ``analysis_engine.fetch_chunks.build_chunk_requests``
+    """
+
+    label = work_dict.get(
+        'label',
+        'get_new_pricing_data_chunk')
+
+    log.debug(
+        f'task - {label} - start '
+        f'tickers={len(work_dict.get("tickers", []))}')
+
+    res = fetch_chunks.run_chunk(
+        work_dict=work_dict,
+        fetch_func=task_pricing.run_get_new_pricing_data)
+
+    log.debug(
+        f'task - get_new_pricing_data_chunk done - '
+        f'{label} - status={ae_consts.get_status(res["status"])}')
+
+    return get_task_results.get_task_results(
+        work_dict=work_dict,
+        result=res)
+# end of get_new_pricing_data_chunk
+
+
+def run_get_new_pricing_data_chunk(
+        work_dict):
+    """run_get_new_pricing_data_chunk
+
+    Celery wrapper for running without celery
+
+    :param work_dict: task data
+    """
+
+    label = work_dict.get(
+        'label',
+        '')
+
+    log.debug(f'run_get_new_pricing_data_chunk - {label} - start')
+
+    response = build_result.build_result(
+        status=ae_consts.NOT_RUN,
+        err=None,
+        rec={})
+    task_res = {}
+
+    # allow running without celery
+    if ae_consts.is_celery_disabled(
+            work_dict=work_dict):
+        work_dict['celery_disabled'] = True
+        task_res = get_new_pricing_data_chunk(
+            work_dict)
+        if task_res:
+            response = task_res.get(
+                'result',
+                task_res)
+        else:
+            log.error(
+                f'{label} celery was disabled but the task={response} '
+                'did not return anything')
+        # end of if response
+    else:
+        task_res = get_new_pricing_data_chunk.delay(
+            work_dict=work_dict)
+        rec = {
+            'task_id': task_res
+        }
+        response = build_result.build_result(
+            status=ae_consts.SUCCESS,
+            err=None,
+            rec=rec)
+    # if celery enabled
+
+    if response:
+        log.debug(
+            f'run_get_new_pricing_data_chunk - {label} - done '
+            f'status={ae_consts.get_status(response["status"])} '
+            f'err={response["err"]}')
+    else:
+        log.debug(
+            f'run_get_new_pricing_data_chunk - {label} - done '
+            'no response')
+    # end of if/else response
+
+    return response
+# end of run_get_new_pricing_data_chunk
@@ -32,11 +32,28 @@ analysis_engine/api_requests.py#L344>`__
     ysis_engine/work_tasks/custom_task.py>`__ for
     task event handling.
 
+**Redis Streams**
+
+Set ``'stream_enabled': True`` in the ``work_dict`` (or
+``export ENABLED_REDIS_STREAM=1``) to also ``XADD`` each new
+``minute`` bar and ``quote`` snapshot to the ticker's capped
+stream. Consume the bars with
+``analysis_engine.get_bars_from_stream.get_bars_from_stream``.
+
+**Shared Clients**
+
+Inside an ``analysis_engine.shared_clients.shared()`` block
+(used by the ``get_new_pricing_data_chunk`` task) the redis
+client and S3 resource are reused across publishes and each
+bucket is only checked once per process.
+
 **Supported Environment Variables**
 
 ::
 
     export DEBUG_RESULTS=1
+    export ENABLED_REDIS_STREAM=1
+    export REDIS_STREAM_MAXLEN=1440
 
 """
 
@@ -49,6 +66,8 @@ import analysis_engine.build_result as build_result
 import analysis_engine.get_task_results as get_task_results
 import analysis_engine.work_tasks.custom_task as custom_task
 import analysis_engine.set_data_in_redis_key as redis_set
+import analysis_engine.publish_to_stream as stream_publisher
+import analysis_engine.shared_clients as shared_clients
 import celery.task as celery_task
 import spylunking.log.setup_logging as log_utils
 
@@ -87,6 +106,7 @@ def publish_pricing_update(
         's3_bucket': None,
         's3_key': None,
         'redis_key': None,
+        'stream_key': None,
         'updated': None
     }
     res = build_result.build_result(
@@ -139,6 +159,9 @@ def publish_pricing_update(
         encoding = work_dict.get(
             'encoding',
             'utf-8')
+        enable_stream_publish = work_dict.get(
+            'stream_enabled',
+            ae_consts.ENABLED_REDIS_STREAM)
 
         rec['ticker'] = ticker
         rec['ticker_id'] = ticker_id
@@ -174,19 +197,33 @@ def publish_pricing_update(
                 f'{label} building s3 endpoint_url={endpoint_url} '
                 f'region={region_name}')
 
-            s3 = boto3.resource(
-                's3',
-                endpoint_url=endpoint_url,
-                aws_access_key_id=access_key,
-                aws_secret_access_key=secret_key,
-                region_name=region_name,
-                config=boto3.session.Config(
-                    signature_version='s3v4')
-            )
+            use_shared = shared_clients.is_shared()
+            if use_shared:
+                s3 = shared_clients.get_s3_resource(
+                    address=service_address,
+                    access_key=access_key,
+                    secret_key=secret_key,
+                    region_name=region_name,
+                    secure=secure)
+            else:
+                s3 = boto3.resource(
+                    's3',
+                    endpoint_url=endpoint_url,
+                    aws_access_key_id=access_key,
+                    aws_secret_access_key=secret_key,
+                    region_name=region_name,
+                    config=boto3.session.Config(
+                        signature_version='s3v4')
+                )
 
             try:
                 log.debug(f'{label} checking bucket={s3_bucket_name} exists')
-                if s3.Bucket(s3_bucket_name) not in s3.buckets.all():
+                if use_shared:
+                    shared_clients.ensure_bucket(
+                        s3=s3,
+                        bucket_name=s3_bucket_name,
+                        address=service_address)
+                elif s3.Bucket(s3_bucket_name) not in s3.buckets.all():
                     log.debug(f'{label} creating bucket={s3_bucket_name}')
                     s3.create_bucket(
                         Bucket=s3_bucket_name)
@@ -260,11 +297,18 @@ def publish_pricing_update(
                     f'db={redis_db} key={redis_key} '
                     f'updated={updated} expire={redis_expire}')
 
-                rc = redis.Redis(
-                    host=redis_host,
-                    port=redis_port,
-                    password=redis_password,
-                    db=redis_db)
+                if shared_clients.is_shared():
+                    rc = shared_clients.get_redis_client(
+                        host=redis_host,
+                        port=redis_port,
+                        password=redis_password,
+                        db=redis_db)
+                else:
+                    rc = redis.Redis(
+                        host=redis_host,
+                        port=redis_port,
+                        password=redis_password,
+                        db=redis_db)
 
                 already_compressed = False
                 uses_data = data
@@ -296,6 +340,29 @@ def publish_pricing_update(
                     f'status={ae_consts.get_status(redis_set_res["status"])} '
                     f'err={redis_set_res["err"]}')
 
+                stream_dataset = work_dict.get(
+                    'stream_dataset',
+                    str(redis_key).split('_')[-1])
+                if (
+                        enable_stream_publish and
+                        stream_dataset in ae_consts.REDIS_STREAM_DATASETS):
+                    stream_res = stream_publisher.publish_to_stream(
+                        client=rc,
+                        ticker=ticker,
+                        dataset=stream_dataset,
+                        data=data,
+                        maxlen=work_dict.get(
+                            'stream_maxlen',
+                            ae_consts.REDIS_STREAM_MAXLEN),
+                        label=label,
+                        encoding=encoding)
+                    rec['stream_key'] = stream_res['rec']['stream_key']
+                    log.debug(
+                        f'{label} xadd '
+                        f'status={ae_consts.get_status(stream_res["status"])} '
+                        f'added={stream_res["rec"]["num_added"]}')
+                # end of publishing new bars to the stream
+
             except Exception as e:
                 log.error(
                     f'{label} failed - redis publish to '
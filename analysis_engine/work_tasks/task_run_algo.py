@@ -15,10 +15,12 @@ scalable worker pool architecture.
 import inspect
 import types
 import importlib.machinery
+import time
 import datetime
 import celery.task as celery_task
 import analysis_engine.consts as ae_consts
 import analysis_engine.build_result as build_result
+import analysis_engine.algo_result_store as algo_result_store
 import analysis_engine.work_tasks.custom_task as custom_task
 import analysis_engine.run_algo as run_algo
 import analysis_engine.algo as ae_algo  # base algo
@@ -116,6 +118,9 @@ def task_run_algo(
     raise_on_err = algo_req.get(
         'raise_on_err',
         True)
+    result_by_reference = algo_req.get(
+        'result_by_reference',
+        ae_consts.ALGO_RESULT_BY_REFERENCE)
     report_config = algo_req.get(
         'report_config',
         None)
@@ -255,6 +260,7 @@ def task_run_algo(
                 log.info(
                     f'{name} - run START ticker={ticker} '
                     f'from {use_start_date} to {use_end_date}')
+            run_start_time = time.time()
             if algo_req.get('backtest', False):
                 algo_res = run_algo.run_algo(
                     algo=new_algo_object,
@@ -265,6 +271,7 @@ def task_run_algo(
                     algo=new_algo_object,
                     **algo_req)
                 created_algo_object = new_algo_object
+            run_seconds = time.time() - run_start_time
 
             if verbose:
                 log.info(
@@ -321,7 +328,13 @@ def task_run_algo(
             return task_result
         # end of stop early
 
-        if should_publish_extract_dataset or dataset_publish_extract:
+        if (not created_algo_object.has_input_datasets() and (
+                should_publish_extract_dataset or dataset_publish_extract)):
+            # event loop streams and cache hits do not keep the datasets
+            log.info(
+                f'{name} - not publishing the algorithm-ready dataset '
+                f'for ticker={ticker}')
+        elif should_publish_extract_dataset or dataset_publish_extract:
             s3_log = ''
             redis_log = ''
             file_log = ''
@@ -506,8 +519,17 @@ def task_run_algo(
                 f'{name} - done publishing datasets for ticker={ticker} '
                 f'from {use_start_date} to {use_end_date}')
 
-        rec['history_config'] = history_config
-        rec['report_config'] = report_config
+        if result_by_reference:
+            # return a pointer to the stored history and report
+            # instead of sending them through the result backend
+            rec = algo_result_store.store_algo_result(
+                algo=created_algo_object,
+                algo_req=algo_req,
+                run_seconds=run_seconds,
+                task_id=self.request.id)
+        else:
+            rec['history_config'] = history_config
+            rec['report_config'] = report_config
 
         res = build_result.build_result(
             status=ae_consts.SUCCESS,
@@ -538,5 +560,7 @@ def task_run_algo(
         'algo_req': algo_req,
         'rec': rec
     }
+    if result_by_reference and res['status'] == ae_consts.SUCCESS:
+        task_result.pop('algo_req')
     return task_result
 # end of task_run_algo
@@ -0,0 +1,476 @@
+"""
+Warm Celery worker processes before the first task
+
+Each prefork worker process pays for importing the algorithm,
+indicator and TA-Lib modules, compiling the indicator and algo
+files, building the redis/S3 clients and the first pandas
+parsing on its first backtest. ``warm_worker`` runs those steps
+from the ``worker_process_init`` signal so the first task runs
+as fast as the later ones:
+
+1. import ``WORKER_WARMUP_MODULES``
+2. compile and load the algo and indicator files from the
+   ``WORKER_WARMUP_ALGO_CONFIG`` algorithm config and the
+   ``WORKER_WARMUP_FILES`` (this also writes the ``.pyc`` files
+   the ``SourceFileLoader`` reuses for every new algorithm)
+3. build the pooled redis client and S3 resource in
+   ``analysis_engine.shared_clients``, the pooled HTTP sessions
+   and the provider rate limiters
+4. extract the latest cached datasets for the
+   ``WORKER_WARMUP_TICKERS`` (off by default)
+
+``analysis_engine.start_worker`` connects the hooks with
+``get_celery_app(warmup=True)``. The first task in each process
+also records the time-to-first-task in ``get_warmup_state()``:
+
+.. code-block:: python
+
+    {
+        'pid': 2121,
+        'warmup_seconds': 2.41,
+        'steps': {
+            'modules': 1.93,
+            'files': 0.32,
+            'clients': 0.15,
+            'datasets': 0.0
+        },
+        'first_task': (
+            'analysis_engine.work_tasks.task_run_algo.task_run_algo'),
+        'first_task_seconds': 0.62,
+        'time_to_first_task': 14.2
+    }
+
+.. note:: ``worker_process_init`` is only sent for the prefork
+    pool (the default for ``start-workers.sh``)
+
+**Supported environment variables**
+
+::
+
+    export WORKER_WARMUP_ENABLED=1
+    # comma-separated modules to import in each worker process
+    export WORKER_WARMUP_MODULES=analysis_engine.algo,analysis_engine.ae_talib
+    # algorithm config with the algo_path and indicator module_path files
+    export WORKER_WARMUP_ALGO_CONFIG=/opt/sa/cfg/default_algo.json
+    # comma-separated extra algo or indicator files
+    export WORKER_WARMUP_FILES=
+    export WORKER_WARMUP_CLIENTS=1
+    # comma-separated tickers to extract from redis
+    export WORKER_WARMUP_TICKERS=SPY
+"""
+
+import os
+import json
+import time
+import types
+import uuid
+import threading
+import importlib
+import importlib.machinery
+import py_compile
+import celery
+import analysis_engine.consts as ae_consts
+import analysis_engine.http_sessions as http_sessions
+import analysis_engine.rate_limiter as rate_limiter
+import analysis_engine.shared_clients as shared_clients
+import spylunking.log.setup_logging as log_utils
+
+log = log_utils.build_colorized_logger(name=__name__)
+
+
+STATE_LOCK = threading.Lock()
+WARMUP_STATE = {
+    'pid': None,
+    'process_start': None,
+    'warmup_seconds': None,
+    'steps': {},
+    'errors': [],
+    'first_task': None,
+    'first_task_start': None,
+    'first_task_seconds': None,
+    'time_to_first_task': None
+}
+SIGNAL_STATE = {
+    'connected': False
+}
+
+
+def split_values(
+        value):
+    """split_values
+
+    Split a comma-separated environment variable into a list
+
+    :param value: string or list of values
+    """
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [
+        v.strip()
+        for v in value
+        if v and v.strip()
+    ]
+# end of split_values
+
+
+def preload_modules(
+        modules=None):
+    """preload_modules
+
+    Import modules and return the number of modules imported
+
+    :param modules: optional - list of module names
+        (default is ``WORKER_WARMUP_MODULES``)
+    """
+    if modules is None:
+        modules = ae_consts.WORKER_WARMUP_MODULES
+    num_loaded = 0
+    for module_name in split_values(modules):
+        try:
+            importlib.import_module(module_name)
+            num_loaded += 1
+        except Exception as e:
+            WARMUP_STATE['errors'].append(f'module={module_name} ex={e}')
+            log.error(f'failed warmup import module={module_name} ex={e}')
+    return num_loaded
+# end of preload_modules
+
+
+def get_algo_config_files(
+        algo_config=None):
+    """get_algo_config_files
+
+    Get the ``algo_path`` and the indicator ``module_path``
+    files from an algorithm config file
+
+    :param algo_config: optional - path to an algorithm config
+        json file (default is ``WORKER_WARMUP_ALGO_CONFIG``)
+    """
+    if algo_config is None:
+        algo_config = ae_consts.WORKER_WARMUP_ALGO_CONFIG
+    if not algo_config or not os.path.exists(algo_config):
+        return []
+    with open(algo_config, 'r') as cur_file:
+        config_dict = json.loads(cur_file.read())
+    files = []
+    if config_dict.get('algo_path', None):
+        files.append(config_dict['algo_path'])
+    for ind in config_dict.get('indicators', []):
+        module_path = ind.get('module_path', None)
+        if module_path and module_path not in files:
+            files.append(module_path)
+    return files
+# end of get_algo_config_files
+
+
+def precompile_files(
+        files=None,
+        algo_config=None):
+    """precompile_files
+
+    Compile each algo and indicator file to a ``.pyc`` and
+    load it once so its imports are cached in the process.
+    Returns the number of files loaded.
+
+    :param files: optional - list of file paths
+        (default is ``WORKER_WARMUP_FILES``)
+    :param algo_config: optional - path to an algorithm config
+        json file (default is ``WORKER_WARMUP_ALGO_CONFIG``)
+    """
+    if files is None:
+        files = ae_consts.WORKER_WARMUP_FILES
+    use_files = split_values(files)
+    for path in get_algo_config_files(
+            algo_config=algo_config):
+        if path not in use_files:
+            use_files.append(path)
+    num_loaded = 0
+    for path in use_files:
+        if not os.path.exists(path):
+            log.debug(f'skipping missing warmup file={path}')
+            continue
+        try:
+            try:
+                py_compile.compile(
+                    path,
+                    doraise=True)
+            except (OSError, py_compile.PyCompileError) as e:
+                # read-only source trees still load the module
+                log.debug(f'unable to write bytecode file={path} ex={e}')
+            module_name = (
+                f'warmup_{os.path.basename(path).replace(".py", "")}_'
+                f'{uuid.uuid4().hex[0:8]}')
+            loader = importlib.machinery.SourceFileLoader(
+                module_name,
+                path)
+            loader.exec_module(
+                types.ModuleType(loader.name))
+            num_loaded += 1
+        except Exception as e:
+            WARMUP_STATE['errors'].append(f'file={path} ex={e}')
+            log.error(f'failed warmup load file={path} ex={e}')
+    return num_loaded
+# end of precompile_files
+
+
+def open_clients():
+    """open_clients
+
+    Build the pooled redis client, S3 resource, HTTP sessions
+    and rate limiters for this process
+    """
+    redis_host, redis_port = ae_consts.REDIS_ADDRESS.split(':')
+    client = shared_clients.get_redis_client(
+        host=redis_host,
+        port=redis_port,
+        password=ae_consts.REDIS_PASSWORD,
+        db=ae_consts.REDIS_DB)
+    # check with the rate limiter's fail-fast client first so a
+    # missing redis does not hold the worker up with retries
+    if rate_limiter.get_redis_script():
+        try:
+            rate_limiter.REDIS_STATE['client'].ping()
+            client.ping()
+        except Exception as e:
+            log.error(
+                f'failed warmup redis ping '
+                f'address={ae_consts.REDIS_ADDRESS} ex={e}')
+    shared_clients.get_s3_resource(
+        address=ae_consts.S3_ADDRESS,
+        access_key=ae_consts.S3_ACCESS_KEY,
+        secret_key=ae_consts.S3_SECRET_KEY,
+        region_name=ae_consts.S3_REGION_NAME,
+        secure=ae_consts.S3_SECURE)
+    for provider in ['iex', 'td', 'finviz']:
+        http_sessions.get_session(provider)
+        rate_limiter.get_limiter(provider)
+# end of open_clients
+
+
+def prewarm_datasets(
+        tickers=None,
+        extract_func=None):
+    """prewarm_datasets
+
+    Extract the latest cached datasets for each ticker and
+    return the number of tickers extracted
+
+    :param tickers: optional - list of tickers
+        (default is ``WORKER_WARMUP_TICKERS``)
+    :param extract_func: optional - function called with
+        ``ticker=`` (default is ``analysis_engine.extract.extract``)
+    """
+    if tickers is None:
+        tickers = ae_consts.WORKER_WARMUP_TICKERS
+    tickers = split_values(tickers)
+    if tickers and not extract_func:
+        import analysis_engine.extract as ae_extract
+        extract_func = ae_extract.extract
+    num_loaded = 0
+    for ticker in tickers:
+        try:
+            extract_func(
+                ticker=ticker.upper())
+            num_loaded += 1
+        except Exception as e:
+            WARMUP_STATE['errors'].append(f'ticker={ticker} ex={e}')
+            log.error(f'failed warmup extract ticker={ticker} ex={e}')
+    return num_loaded
+# end of prewarm_datasets
+
+
+def warm_worker(
+        modules=None,
+        files=None,
+        algo_config=None,
+        clients=None,
+        tickers=None,
+        extract_func=None):
+    """warm_worker
+
+    Run every warmup step and return the warmup state
+
+    :param modules: optional - list of module names
+        (default is ``WORKER_WARMUP_MODULES``)
+    :param files: optional - list of algo or indicator files
+        (default is ``WORKER_WARMUP_FILES``)
+    :param algo_config: optional - path to an algorithm config
+        json file (default is ``WORKER_WARMUP_ALGO_CONFIG``)
+    :param clients: optional - bool to build the pooled clients
+        (default is ``WORKER_WARMUP_CLIENTS``)
+    :param tickers: optional - list of tickers to extract
+        (default is ``WORKER_WARMUP_TICKERS``)
+    :param extract_func: optional - dataset extract function
+        for testing
+    """
+    if clients is None:
+        clients = ae_consts.WORKER_WARMUP_CLIENTS
+    start_time = time.time()
+    with STATE_LOCK:
+        WARMUP_STATE['pid'] = os.getpid()
+        if not WARMUP_STATE['process_start']:
+            WARMUP_STATE['process_start'] = start_time
+        WARMUP_STATE['steps'] = {}
+        WARMUP_STATE['errors'] = []
+
+    steps = [
+        ('modules', lambda: preload_modules(
+            modules=modules)),
+        ('files', lambda: precompile_files(
+            files=files,
+            algo_config=algo_config)),
+        ('clients', lambda: open_clients() if clients else None),
+        ('datasets', lambda: prewarm_datasets(
+            tickers=tickers,
+            extract_func=extract_func))
+    ]
+    for name, step in steps:
+        step_start = time.time()
+        try:
+            step()
+        except Exception as e:
+            WARMUP_STATE['errors'].append(f'step={name} ex={e}')
+            log.error(f'failed warmup step={name} ex={e}')
+        WARMUP_STATE['steps'][name] = round(time.time() - step_start, 3)
+    # end of for all steps
+
+    WARMUP_STATE['warmup_seconds'] = round(time.time() - start_time, 3)
+    log.info(
+        f'worker warmup done pid={WARMUP_STATE["pid"]} '
+        f'seconds={WARMUP_STATE["warmup_seconds"]} '
+        f'steps={WARMUP_STATE["steps"]} '
+        f'errors={len(WARMUP_STATE["errors"])}')
+    return get_warmup_state()
+# end of warm_worker
+
+
+def get_warmup_state():
+    """get_warmup_state
+
+    Get a copy of this process's warmup and first task timings
+    """
+    with STATE_LOCK:
+        state = dict(WARMUP_STATE)
+        state['steps'] = dict(WARMUP_STATE['steps'])
+        state['errors'] = list(WARMUP_STATE['errors'])
+    return state
+# end of get_warmup_state
+
+
+def record_task_start(
+        task_name,
+        now=None):
+    """record_task_start
+
+    Record the start of the first task in this process
+
+    :param task_name: task name
+    :param now: optional - start time for testing
+    """
+    with STATE_LOCK:
+        if WARMUP_STATE['first_task']:
+            return
+        WARMUP_STATE['first_task'] = task_name
+        WARMUP_STATE['first_task_start'] = now or time.time()
+        if not WARMUP_STATE['process_start']:
+            WARMUP_STATE['process_start'] = WARMUP_STATE['first_task_start']
+# end of record_task_start
+
+
+def record_task_done(
+        task_name,
+        now=None):
+    """record_task_done
+
+    Record the run time of the first task and the
+    time-to-first-task since the process started
+
+    :param task_name: task name
+    :param now: optional - finish time for testing
+    """
+    with STATE_LOCK:
+        if (WARMUP_STATE['first_task'] != task_name or
+                WARMUP_STATE['first_task_seconds'] is not None):
+            return
+        done_time = now or time.time()
+        WARMUP_STATE['first_task_seconds'] = round(
+            done_time - WARMUP_STATE['first_task_start'], 3)
+        WARMUP_STATE['time_to_first_task'] = round(
+            done_time - WARMUP_STATE['process_start'], 3)
+    log.info(
+        f'first task={task_name} pid={os.getpid()} '
+        f'seconds={WARMUP_STATE["first_task_seconds"]} '
+        f'time_to_first_task={WARMUP_STATE["time_to_first_task"]} '
+        f'warmup_seconds={WARMUP_STATE["warmup_seconds"]}')
+# end of record_task_done
+
+
+def on_worker_process_init(
+        **kwargs):
+    """on_worker_process_init
+
+    ``worker_process_init`` signal handler
+
+    :param kwargs: signal keyword arguments
+    """
+    with STATE_LOCK:
+        WARMUP_STATE['process_start'] = time.time()
+        WARMUP_STATE['first_task'] = None
+        WARMUP_STATE['first_task_start'] = None
+        WARMUP_STATE['first_task_seconds'] = None
+        WARMUP_STATE['time_to_first_task'] = None
+    warm_worker()
+# end of on_worker_process_init
+
+
+def on_task_prerun(
+        sender=None,
+        **kwargs):
+    """on_task_prerun
+
+    ``task_prerun`` signal handler
+
+    :param sender: task object
+    :param kwargs: signal keyword arguments
+    """
+    record_task_start(
+        task_name=getattr(sender, 'name', str(sender)))
+# end of on_task_prerun
+
+
+def on_task_postrun(
+        sender=None,
+        **kwargs):
+    """on_task_postrun
+
+    ``task_postrun`` signal handler
+
+    :param sender: task object
+    :param kwargs: signal keyword arguments
+    """
+    record_task_done(
+        task_name=getattr(sender, 'name', str(sender)))
+# end of on_task_postrun
+
+
+def connect_signals():
+    """connect_signals
+
+    Connect the warmup and first task handlers to the Celery
+    signals once per process
+    """
+    if SIGNAL_STATE['connected']:
+        return
+    celery.signals.worker_process_init.connect(
+        on_worker_process_init,
+        weak=False)
+    celery.signals.task_prerun.connect(
+        on_task_prerun,
+        weak=False)
+    celery.signals.task_postrun.connect(
+        on_task_postrun,
+        weak=False)
+    SIGNAL_STATE['connected'] = True
+# end of connect_signals
@@ -124,6 +124,7 @@ setup(
         'analysis_engine/scripts/backtest_with_runner.py',
         'analysis_engine/scripts/fetch_new_stock_datasets.py',
         'analysis_engine/scripts/inspect_datasets.py',
+        'analysis_engine/scripts/manage_redis_budget.py',
         'analysis_engine/scripts/plot_history_from_local_file.py',
         'analysis_engine/scripts/publish_from_s3_to_redis.py',
         'analysis_engine/scripts/publish_ticker_aggregate_from_s3.py',
@@ -0,0 +1,385 @@
+"""
+Test file for - the multi-ticker event loop
+"""
+
+import copy
+import json
+import zlib
+import mock
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.algo as base_algo
+import analysis_engine.algo_event_loop as algo_event_loop
+import analysis_engine.run_algo as run_algo
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+MOCK_REDIS = mock_redis.MockRedis()
+
+
+def build_shared_redis(
+        *args,
+        **kwargs):
+    """build_shared_redis
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_REDIS
+# end of build_shared_redis
+
+
+class RecordingAlgo(base_algo.BaseAlgo):
+    """RecordingAlgo
+
+    Buys one share when the close drops and sells when it rises
+    and records what ``process()`` sees
+    """
+
+    def __init__(
+            self,
+            **kwargs):
+        """__init__
+
+        :param kwargs: ``BaseAlgo`` keyword arguments
+        """
+        super().__init__(**kwargs)
+        self.buy_shares = 1
+        # only trade off the process() signals
+        self.min_buy_indicators = 1
+        self.min_sell_indicators = 1
+        self.events = []
+        self.prev_closes = {}
+    # end of __init__
+
+    def process(
+            self,
+            algo_id,
+            ticker,
+            dataset):
+        """process
+
+        :param algo_id: string - algo identifier label
+        :param ticker: string - ticker
+        :param dataset: dataset node
+        """
+        close = self.latest_close
+        self.events.append({
+            'ticker': ticker,
+            'self_ticker': self.ticker,
+            'minute': self.use_minute,
+            'close': close,
+            'first_close': (
+                self.df_minute['close'].iloc[0]
+                if 'close' in self.df_minute else None),
+            'ds_id': self.ds_id,
+            'views': {
+                t: view['latest_close']
+                for t, view in self.ticker_views.items()
+            }
+        })
+        prev_close = self.prev_closes.get(ticker, None)
+        if prev_close is not None:
+            self.should_buy = close < prev_close
+            self.should_sell = close > prev_close
+        self.prev_closes[ticker] = close
+    # end of process
+
+# end of RecordingAlgo
+
+
+class TestAlgoEventLoop(BaseTestCase):
+    """TestAlgoEventLoop"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        minute_df = pd.read_json(
+            'tests/datasets/spy-minute.json',
+            orient='records')
+        minute_df['date'] = minute_df['date'].dt.tz_localize(None)
+        self.minute_df = minute_df
+        self.daily_df = pd.read_json(
+            'tests/datasets/spy-daily.json',
+            orient='records')
+        self.dates = ['2018-11-06', '2018-11-07']
+    # end of setUp
+
+    def build_nodes(
+            self,
+            ticker,
+            scale=1.0,
+            with_minutes=True):
+        """build_nodes
+
+        :param ticker: ticker for the dataset ids
+        :param scale: optional - multiply the prices
+        :param with_minutes: optional - include the minute data
+        """
+        nodes = []
+        for day_idx, date in enumerate(self.dates):
+            minute_df = self.minute_df.copy()
+            minute_df['date'] = (
+                minute_df['date'] +
+                pd.Timedelta(days=day_idx - 1))
+            daily_df = self.daily_df.iloc[0:(90 + day_idx)].copy()
+            for column in ['open', 'high', 'low', 'close']:
+                minute_df[column] = minute_df[column] * scale
+                daily_df[column] = daily_df[column] * scale
+            node = {
+                'id': f'{ticker}_{date}',
+                'date': date,
+                'data': {
+                    'daily': daily_df
+                }
+            }
+            if with_minutes:
+                node['data']['minute'] = minute_df
+            nodes.append(node)
+        return nodes
+    # end of build_nodes
+
+    def build_algo(
+            self,
+            tickers,
+            timeseries='minute'):
+        """build_algo
+
+        :param tickers: list of tickers
+        :param timeseries: optional - ``minute`` or ``day``
+        """
+        return RecordingAlgo(
+            ticker=None,
+            tickers=tickers,
+            balance=1000.0,
+            commission=1.0,
+            timeseries=timeseries,
+            name='test-event-loop')
+    # end of build_algo
+
+    def test_one_ticker_matches_handle_data(self):
+        """test_one_ticker_matches_handle_data"""
+        data = {
+            'SPY': self.build_nodes('SPY')
+        }
+        expected = self.build_algo(['SPY'])
+        expected.handle_data(
+            data=copy.deepcopy(data))
+        algo = self.build_algo(['SPY'])
+        num_events = algo_event_loop.run_event_loop(
+            algo=algo,
+            data=data)
+        self.assertEqual(num_events, 2 * len(self.minute_df.index))
+        self.assertGreater(len(algo.buys), 0)
+        self.assertEqual(algo.balance, expected.balance)
+        self.assertEqual(
+            [o['buy_price'] for o in algo.buys],
+            [o['buy_price'] for o in expected.buys])
+        self.assertEqual(
+            [h['minute'] for h in algo.order_history],
+            [h['minute'] for h in expected.order_history])
+        self.assertEqual(
+            [h['balance'] for h in algo.order_history],
+            [h['balance'] for h in expected.order_history])
+        self.assertEqual(
+            [n['date'] for n in algo.create_report_dataset()['SPY']],
+            self.dates)
+    # end of test_one_ticker_matches_handle_data
+
+    def test_start_row_and_show_balance_match_handle_data(self):
+        """test_start_row_and_show_balance_match_handle_data"""
+        nodes = self.build_nodes('SPY')
+        nodes[0]['start_row'] = 40
+        # past the last minute
+        nodes[1]['start_row'] = len(self.minute_df.index) + 1
+        results = []
+        for use_event_loop in [False, True]:
+            algo = self.build_algo(['SPY'])
+            algo.show_balance = True
+            data = {
+                'SPY': copy.deepcopy(nodes)
+            }
+            with mock.patch.object(
+                    algo,
+                    'plot_trading_history_with_balance') as plot:
+                if use_event_loop:
+                    algo_event_loop.run_event_loop(
+                        algo=algo,
+                        data=data)
+                else:
+                    algo.handle_data(
+                        data=data)
+            results.append((algo, plot.call_count))
+        (expected, expected_plots), (algo, plots) = results
+        self.assertEqual(
+            len(algo.events),
+            len(self.minute_df.index) - 40)
+        self.assertEqual(
+            [e['minute'] for e in algo.events],
+            [e['minute'] for e in expected.events])
+        self.assertGreater(len(algo.buys), 0)
+        self.assertEqual(algo.balance, expected.balance)
+        self.assertEqual(plots, expected_plots)
+        self.assertEqual(plots, 2)
+    # end of test_start_row_and_show_balance_match_handle_data
+
+    def test_minutes_are_merged_across_tickers(self):
+        """test_minutes_are_merged_across_tickers"""
+        spy_nodes = self.build_nodes('SPY')
+        qqq_nodes = self.build_nodes(
+            'QQQ',
+            scale=0.5)
+        algo = self.build_algo(['SPY', 'QQQ'])
+        algo_event_loop.run_event_loop(
+            algo=algo,
+            data={
+                # datasets are streamed from generators
+                'SPY': (node for node in spy_nodes),
+                'QQQ': (node for node in qqq_nodes)
+            })
+        events = algo.events
+        self.assertEqual(len(events), 4 * len(self.minute_df.index))
+        minutes = [e['minute'] for e in events]
+        self.assertEqual(minutes, sorted(minutes))
+        # minutes of both tickers keep the order of the tickers
+        self.assertEqual(
+            [e['ticker'] for e in events[0:4]],
+            ['SPY', 'QQQ', 'SPY', 'QQQ'])
+        spy_closes = self.minute_df['close'].tolist()
+        for event in events:
+            self.assertEqual(event['ticker'], event['self_ticker'])
+            self.assertTrue(event['ds_id'].startswith(event['ticker']))
+            # the ticker's own minute data and latest bar
+            scale = 1.0 if event['ticker'] == 'SPY' else 0.5
+            self.assertEqual(
+                event['first_close'],
+                spy_closes[0] * scale)
+            self.assertIn(event['close'] / scale, spy_closes)
+        qqq_views = [
+            e['views']['QQQ'] for e in events
+            if e['ticker'] == 'SPY' and e['views']['QQQ']
+        ]
+        self.assertGreater(len(qqq_views), 0)
+        for close in qqq_views:
+            self.assertIn(close * 2, spy_closes)
+
+        # the tickers share one balance and keep their own positions
+        self.assertEqual(
+            {b['ticker'] for b in algo.buys},
+            {'SPY', 'QQQ'})
+        history = algo.create_history_dataset()
+        self.assertEqual(history['tickers'], ['SPY', 'QQQ'])
+        for ticker in ['SPY', 'QQQ']:
+            self.assertEqual(
+                {node['ticker'] for node in history[ticker]},
+                {ticker})
+        self.assertEqual(
+            len(history['SPY']) + len(history['QQQ']),
+            len(algo.order_history))
+        self.assertEqual(
+            algo.last_handle_data['QQQ'],
+            [
+                {'id': f'QQQ_{date}', 'date': date, 'data': {}}
+                for date in self.dates
+            ])
+        self.assertEqual(
+            algo.ticker_views['QQQ']['ds_id'],
+            'QQQ_2018-11-07')
+    # end of test_minutes_are_merged_across_tickers
+
+    def test_days_are_merged_across_tickers(self):
+        """test_days_are_merged_across_tickers"""
+        algo = self.build_algo(
+            ['SPY', 'QQQ'],
+            timeseries='day')
+        algo_event_loop.run_event_loop(
+            algo=algo,
+            data={
+                'SPY': self.build_nodes(
+                    'SPY',
+                    with_minutes=False),
+                'QQQ': self.build_nodes(
+                    'QQQ',
+                    scale=0.5,
+                    with_minutes=False)
+            })
+        self.assertEqual(
+            [(e['ticker'], e['ds_id']) for e in algo.events],
+            [
+                ('SPY', 'SPY_2018-11-06'),
+                ('QQQ', 'QQQ_2018-11-06'),
+                ('SPY', 'SPY_2018-11-07'),
+                ('QQQ', 'QQQ_2018-11-07')
+            ])
+        self.assertEqual(
+            [e['close'] for e in algo.events],
+            [
+                self.daily_df['close'].iloc[89],
+                self.daily_df['close'].iloc[89] * 0.5,
+                self.daily_df['close'].iloc[90],
+                self.daily_df['close'].iloc[90] * 0.5
+            ])
+        self.assertEqual(
+            [h['minute'] for h in algo.order_history],
+            [
+                '2018-11-06 16:00:00',
+                '2018-11-06 16:00:00',
+                '2018-11-07 16:00:00',
+                '2018-11-07 16:00:00'
+            ])
+        self.assertEqual(
+            algo.timeseries_value,
+            ae_consts.ALGO_TIMESERIES_DAY)
+    # end of test_days_are_merged_across_tickers
+
+    @mock.patch(
+        'redis.Redis',
+        new=build_shared_redis)
+    def test_run_algo_streams_the_event_loop(self):
+        """test_run_algo_streams_the_event_loop"""
+        MOCK_REDIS.cache_dict = {}
+        dates = self.daily_df['date'].dt.strftime('%Y-%m-%d').tolist()
+        for ticker, scale in [('SPY', 1.0), ('QQQ', 0.5)]:
+            for num_rows in range(96, len(dates) + 1):
+                daily_df = self.daily_df.iloc[0:num_rows].copy()
+                daily_df['close'] = daily_df['close'] * scale
+                MOCK_REDIS.cache_dict[
+                    f'{ticker}_{dates[num_rows - 1]}_daily'] = zlib.compress(
+                        json.dumps(daily_df.to_json(
+                            orient='records',
+                            date_format='iso')).encode('utf-8'))
+        algo = self.build_algo(
+            ['SPY', 'QQQ'],
+            timeseries='day')
+        res = run_algo.run_algo(
+            tickers=['SPY', 'QQQ'],
+            algo=algo,
+            start_date=f'{dates[95]} 00:00:00',
+            end_date=f'{dates[-1]} 00:00:00',
+            datasets=['daily'],
+            s3_enabled=False,
+            label='test-event-loop',
+            event_loop=True)
+        self.assertEqual(res['status'], ae_consts.SUCCESS)
+        use_dates = dates[95:]
+        self.assertEqual(
+            [e['ds_id'] for e in algo.events],
+            [
+                f'{ticker}_{date}'
+                for date in use_dates
+                for ticker in ['SPY', 'QQQ']
+            ])
+        self.assertEqual(
+            [e['close'] for e in algo.events[-2:]],
+            [
+                self.daily_df['close'].iloc[-1],
+                self.daily_df['close'].iloc[-1] * 0.5
+            ])
+        self.assertEqual(
+            [n['date'] for n in algo.create_report_dataset()['QQQ']],
+            use_dates)
+    # end of test_run_algo_streams_the_event_loop
+
+# end of TestAlgoEventLoop
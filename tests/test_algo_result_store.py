@@ -0,0 +1,196 @@
+"""
+Test file for - distributed algorithm results by reference
+"""
+
+import os
+import json
+import tempfile
+import mock
+import numpy as np
+import pandas as pd
+import analysis_engine.algo_result_store as algo_result_store
+import analysis_engine.algo_runner as algo_runner
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+
+
+def build_order_history(
+        num_rows):
+    """build_order_history
+
+    :param num_rows: number of minute rows
+    """
+    history = []
+    for idx in range(num_rows):
+        minute = pd.Timestamp('2019-01-02 09:30:00') + pd.Timedelta(
+            minutes=idx)
+        history.append({
+            'ticker': 'SPY',
+            'date': '2019-01-02',
+            'minute': minute.strftime('%Y-%m-%d %H:%M:%S'),
+            'close': 250.0 + idx * 0.01,
+            'num_owned': idx % 3,
+            'status': 'buy' if idx % 2 else 'sell',
+            'note': None if idx % 5 else 'rebalance',
+            'details': {
+                'idx': idx
+            }
+        })
+    return history
+# end of build_order_history
+
+
+def build_algo(
+        num_rows):
+    """build_algo
+
+    Stand-in for a finished ``BaseAlgo``
+
+    :param num_rows: number of trading history rows
+    """
+    algo = mock.Mock()
+    algo.order_history = build_order_history(
+        num_rows=num_rows)
+    algo.starting_balance = 10000.0
+    algo.get_balance.return_value = 10125.5
+    algo.get_buys.return_value = [{}, {}, {}]
+    algo.get_sells.return_value = [{}, {}]
+    algo.get_tickers.return_value = ['SPY']
+    algo.create_report_dataset.return_value = {
+        'SPY': [
+            {
+                'id': 'SPY_2019-01-02',
+                'date': '2019-01-02',
+                'data': {}
+            }
+        ]
+    }
+    return algo
+# end of build_algo
+
+
+class TestAlgoResultStore(BaseTestCase):
+    """TestAlgoResultStore"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.client = mock_redis.MockRedis()
+        self.algo_req = {
+            'ticker': 'SPY',
+            'history_config': {
+                'redis_address': 'localhost:6379',
+                'redis_db': 0
+            }
+        }
+    # end of setUp
+
+    def test_encode_decode_round_trip(self):
+        """test_encode_decode_round_trip"""
+        df = pd.DataFrame(build_order_history(num_rows=20))
+        df['minute'] = pd.to_datetime(df['minute'])
+        data = algo_result_store.encode_result(
+            frames={
+                'history': df
+            },
+            summary={
+                'balance': 1.5
+            })
+        decoded = algo_result_store.decode_result(data)
+        self.assertEqual(decoded['summary'], {'balance': 1.5})
+        pd.testing.assert_frame_equal(decoded['history'], df)
+        self.assertTrue(
+            np.issubdtype(decoded['history']['close'].dtype, np.floating))
+        self.assertIsNone(decoded['history']['note'].iloc[1])
+        self.assertEqual(decoded['history']['details'].iloc[7], {'idx': 7})
+        # repeated strings are stored once so the payload is far
+        # smaller than the json records the task used to return
+        big_df = pd.DataFrame(build_order_history(num_rows=5000))
+        self.assertLess(
+            len(algo_result_store.encode_result(frames={'h': big_df})),
+            len(big_df.to_json(orient='records')) / 5)
+    # end of test_encode_decode_round_trip
+
+    def test_store_returns_pointer_and_summary(self):
+        """test_store_returns_pointer_and_summary"""
+        rec = algo_result_store.store_algo_result(
+            algo=build_algo(num_rows=100),
+            algo_req=self.algo_req,
+            run_seconds=12.3456,
+            task_id='task-1',
+            client=self.client)
+        ref = rec['result_ref']
+        self.assertEqual(ref['store'], 'redis')
+        self.assertEqual(ref['key'], 'ae:algoresult:SPY:task-1')
+        self.assertEqual(ref['redis_db'], 0)
+        summary = rec['summary']
+        self.assertEqual(summary['balance'], 10125.5)
+        self.assertEqual(summary['num_buys'], 3)
+        self.assertEqual(summary['num_sells'], 2)
+        self.assertEqual(summary['num_history_rows'], 100)
+        self.assertEqual(summary['num_report_rows'], 1)
+        self.assertEqual(summary['start_date'], '2019-01-02 09:30:00')
+        self.assertEqual(summary['run_seconds'], 12.346)
+        # the task result stays small no matter how long the history is
+        self.assertLess(len(json.dumps(rec)), 1024)
+
+        loaded = algo_result_store.load_result(
+            ref=ref,
+            client=self.client)
+        self.assertEqual(len(loaded['history'].index), 100)
+        self.assertEqual(loaded['report']['id'].iloc[0], 'SPY_2019-01-02')
+        self.assertEqual(loaded['summary']['num_history_rows'], 100)
+    # end of test_store_returns_pointer_and_summary
+
+    def test_runner_loads_history_on_first_use(self):
+        """test_runner_loads_history_on_first_use"""
+        rec = algo_result_store.store_algo_result(
+            algo=build_algo(num_rows=30),
+            algo_req=self.algo_req,
+            run_seconds=1.0,
+            client=self.client)
+        task = mock.Mock()
+        task.get.return_value = {
+            'status': SUCCESS,
+            'err': None,
+            'rec': rec
+        }
+        with open('./cfg/default_algo.json', 'r') as cur_file:
+            config_dict = json.loads(cur_file.read())
+        config_dict['algo_path'] = os.path.abspath(
+            'analysis_engine/algo.py')
+        with tempfile.NamedTemporaryFile(
+                mode='w',
+                suffix='.json') as config_file:
+            config_file.write(json.dumps(config_dict))
+            config_file.flush()
+            runner = algo_runner.AlgoRunner(
+                ticker='SPY',
+                algo_config=config_file.name,
+                run_on_engine=True)
+        runner.algo_res = {
+            'status': SUCCESS,
+            'rec': {
+                'task_id': task
+            }
+        }
+        with mock.patch(
+                'redis.Redis',
+                return_value=self.client) as redis_client:
+            runner.wait_for_algo_to_finish()
+            self.assertEqual(runner.num_rows, 30)
+            self.assertEqual(runner.result_summary['num_buys'], 3)
+            redis_client.assert_not_called()
+            df = runner.get_history()
+            redis_client.assert_called_once()
+            self.assertEqual(len(df.index), 30)
+            self.assertEqual(
+                str(runner.end_date),
+                '2019-01-02 09:59:00')
+            runner.get_history()
+            redis_client.assert_called_once()
+    # end of test_runner_loads_history_on_first_use
+
+# end of TestAlgoResultStore
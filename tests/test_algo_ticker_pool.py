@@ -0,0 +1,220 @@
+"""
+Test file for - per-ticker backtests in a process pool
+"""
+
+import copy
+import json
+import zlib
+import mock
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.algo_ticker_pool as ticker_pool
+import analysis_engine.run_custom_algo as run_custom_algo
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+MOCK_REDIS = mock_redis.MockRedis()
+TICKERS = ['SPY', 'QQQ', 'IWM']
+
+
+def build_shared_redis(
+        *args,
+        **kwargs):
+    """build_shared_redis
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_REDIS
+# end of build_shared_redis
+
+
+def willr(
+        high,
+        low,
+        close,
+        timeperiod):
+    """willr
+
+    Williams %R for tests without TA-Lib
+
+    :param high: high values
+    :param low: low values
+    :param close: close values
+    :param timeperiod: number of values
+    """
+    highest = np.max(high[-timeperiod:])
+    lowest = np.min(low[-timeperiod:])
+    value = -50.0
+    if highest != lowest:
+        value = (highest - close[-1]) / (highest - lowest) * -100.0
+    return np.array([value])
+# end of willr
+
+
+@mock.patch(
+    'redis.Redis',
+    new=build_shared_redis)
+@mock.patch(
+    'analysis_engine.ae_talib.WILLR',
+    new=willr)
+class TestAlgoTickerPool(BaseTestCase):
+    """TestAlgoTickerPool"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        MOCK_REDIS.cache_dict = {}
+        daily_df = pd.DataFrame(json.loads(
+            open('tests/datasets/spy-daily.json', 'r').read()))
+        dates = daily_df['date'].str[0:10].tolist()
+        for idx, ticker in enumerate(TICKERS):
+            ticker_df = daily_df.copy()
+            # a different price path per ticker
+            wave = 3.0 * np.sin(np.arange(len(ticker_df.index)) / (2 + idx))
+            for column in ['open', 'high', 'low', 'close']:
+                ticker_df[column] = ticker_df[column] + wave
+            for num_rows in range(60, len(dates) + 1):
+                MOCK_REDIS.cache_dict[
+                    f'{ticker}_{dates[num_rows - 1]}_daily'] = zlib.compress(
+                        json.dumps(ticker_df.iloc[0:num_rows].to_json(
+                            orient='records')).encode('utf-8'))
+        self.start_date = f'{dates[60]} 00:00:00'
+        self.end_date = f'{dates[-1]} 00:00:00'
+        self.config_dict = {
+            'name': 'test-pool',
+            'timeseries': 'day',
+            'trade_strategy': 'count',
+            'buy_shares': 5,
+            'positions': {},
+            'buy_rules': {
+                'min_indicators': 1
+            },
+            'sell_rules': {
+                'min_indicators': 1
+            },
+            'indicators': [
+                {
+                    'name': 'willr',
+                    'module_path': (
+                        'analysis_engine/mocks/'
+                        'example_indicator_williamsr.py'),
+                    'category': 'momentum',
+                    'type': 'momentum',
+                    'uses_data': 'daily',
+                    'num_points': 10,
+                    'buy_below': -70,
+                    'sell_above': -30
+                }
+            ]
+        }
+    # end of setUp
+
+    def run_backtest(
+            self,
+            **kwargs):
+        """run_backtest
+
+        :param kwargs: ``run_custom_algo`` keyword arguments
+        """
+        return run_custom_algo.run_custom_algo(
+            mod_path=None,
+            balance=10000.0,
+            start_date=self.start_date,
+            end_date=self.end_date,
+            config_dict=copy.deepcopy(self.config_dict),
+            timeseries='day',
+            publish_to_s3=False,
+            publish_to_redis=False,
+            publish_to_slack=False,
+            s3_enabled=False,
+            use_cache=False,
+            **kwargs)
+    # end of run_backtest
+
+    def without_created(
+            self,
+            records):
+        """without_created
+
+        ``created`` is the wall clock time of the trade record
+
+        :param records: list of trade dictionaries
+        """
+        return pd.DataFrame(records).drop(
+            columns=['created'],
+            errors='ignore')
+    # end of without_created
+
+    def test_pool_matches_single_ticker_runs(self):
+        """test_pool_matches_single_ticker_runs"""
+        expected = {
+            ticker: self.run_backtest(ticker=ticker)
+            for ticker in TICKERS
+        }
+        res = self.run_backtest(
+            tickers=TICKERS,
+            ticker_workers=2)
+        self.assertEqual(res['status'], ae_consts.SUCCESS)
+        rec = res['rec']
+        self.assertEqual(rec['tickers'], TICKERS)
+        for ticker in TICKERS:
+            single = expected[ticker]['rec']
+            self.assertGreater(len(single['buys']), 0)
+            self.assertEqual(
+                rec['by_ticker'][ticker]['balance'],
+                single['balance'])
+            pd.testing.assert_frame_equal(
+                self.without_created(rec['by_ticker'][ticker]['history']),
+                self.without_created(single['history']))
+        self.assertAlmostEqual(
+            rec['balance'],
+            sum(expected[t]['rec']['balance'] for t in TICKERS))
+        self.assertEqual(
+            len(rec['buys']),
+            sum(len(expected[t]['rec']['buys']) for t in TICKERS))
+
+        # the merged algo publishes one history list per ticker
+        algo = res['algo']
+        self.assertIsInstance(algo, ticker_pool.TickerPoolAlgo)
+        history = algo.create_history_dataset()
+        self.assertEqual(history['tickers'], TICKERS)
+        for ticker in TICKERS:
+            self.assertEqual(
+                {node['ticker'] for node in history[ticker]},
+                {ticker})
+        report = algo.create_report_dataset()
+        self.assertEqual(
+            [node['date'] for node in report['SPY']],
+            [node['date'] for node in expected['SPY']['algo'].
+             create_report_dataset()['SPY']])
+
+        # the extract dataset stays in the worker processes
+        self.assertFalse(algo.has_input_datasets())
+        self.assertEqual(
+            algo.publish_input_dataset(
+                output_file='/tmp/not-published.json'),
+            ae_consts.ERR)
+        with self.assertRaises(NotImplementedError):
+            algo.create_algorithm_ready_dataset()
+    # end of test_pool_matches_single_ticker_runs
+
+    def test_pool_in_process_without_data(self):
+        """test_pool_in_process_without_data"""
+        res = self.run_backtest(
+            tickers=['spy', 'NODATA'],
+            ticker_workers=1)
+        self.assertEqual(res['status'], ae_consts.SUCCESS)
+        rec = res['rec']
+        self.assertEqual(rec['tickers'], ['SPY', 'NODATA'])
+        self.assertEqual(rec['by_ticker']['NODATA']['buys'], [])
+        self.assertEqual(rec['by_ticker']['NODATA']['balance'], 10000.0)
+        self.assertEqual(
+            rec['balance'],
+            rec['by_ticker']['SPY']['balance'] + 10000.0)
+    # end of test_pool_in_process_without_data
+
+# end of TestAlgoTickerPool
@@ -0,0 +1,160 @@
+"""
+Test file for - trading-day-aware concurrent backfills
+"""
+
+import os
+import json
+import tempfile
+import threading
+import analysis_engine.backfill as backfill
+from analysis_engine.mocks.mock_redis import MockRedis
+from analysis_engine.mocks.mock_boto3_s3 import MockBotoS3
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+from analysis_engine.consts import ERR
+
+
+class TestBackfill(BaseTestCase):
+    """TestBackfill"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.redis_client = MockRedis()
+        self.redis_client.set(
+            name='SPY_2018-12-20_minute',
+            value=b'cached')
+        self.s3 = MockBotoS3()
+        self.s3.Bucket('pricing').put_object(
+            Key='SPY_2018-12-21_minute',
+            Body='cached')
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.progress_file = os.path.join(
+            self.tmp_dir.name,
+            'progress.json')
+        self.fetched = []
+        self.fail_dates = ['2019-01-03']
+        self.lock = threading.Lock()
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        self.tmp_dir.cleanup()
+        super().tearDown()
+    # end of tearDown
+
+    def mock_fetch(
+            self,
+            work_dict):
+        """mock_fetch
+
+        :param work_dict: fetch request dictionary
+        """
+        with self.lock:
+            self.fetched.append(
+                f'{work_dict["ticker"]}_{work_dict["backfill_date"]}')
+        if work_dict['backfill_date'] in self.fail_dates:
+            return {
+                'status': ERR,
+                'err': 'test failure',
+                'rec': {}
+            }
+        return {
+            'status': SUCCESS,
+            'err': None,
+            'rec': {}
+        }
+    # end of mock_fetch
+
+    def run_backfill(
+            self):
+        """run_backfill"""
+        return backfill.run_backfill(
+            tickers=['spy', 'QQQ'],
+            start_date='2018-12-20',
+            end_date='2019-01-04',
+            work_dict={
+                's3_bucket': 'pricing'
+            },
+            fetch_func=self.mock_fetch,
+            max_workers=4,
+            max_per_second=0,
+            progress_file=self.progress_file,
+            redis_client=self.redis_client,
+            s3=self.s3)
+    # end of run_backfill
+
+    def test_trading_sessions_skip_holidays(self):
+        """test_trading_sessions_skip_holidays"""
+        self.assertEqual(
+            backfill.get_trading_sessions(
+                start_date='2018-12-20',
+                end_date='2019-01-04'),
+            [
+                '2018-12-20',
+                '2018-12-21',
+                '2018-12-24',
+                '2018-12-26',
+                '2018-12-27',
+                '2018-12-28',
+                '2018-12-31',
+                '2019-01-02',
+                '2019-01-03',
+                '2019-01-04'
+            ])
+    # end of test_trading_sessions_skip_holidays
+
+    def test_plan_skips_cached_dates(self):
+        """test_plan_skips_cached_dates"""
+        plan, num_skipped = backfill.plan_backfill(
+            tickers=['SPY'],
+            start_date='2018-12-20',
+            end_date='2018-12-28',
+            redis_client=self.redis_client,
+            s3=self.s3,
+            s3_bucket='pricing',
+            progress={
+                'done': ['SPY_2018-12-24']
+            })
+        self.assertEqual(num_skipped, 3)
+        self.assertEqual(
+            plan,
+            [
+                ('SPY', '2018-12-26'),
+                ('SPY', '2018-12-27'),
+                ('SPY', '2018-12-28')
+            ])
+    # end of test_plan_skips_cached_dates
+
+    def test_backfill_resumes(self):
+        """test_backfill_resumes"""
+        res = self.run_backfill()
+        self.assertEqual(res['status'], ERR)
+        self.assertEqual(res['rec']['num_planned'], 18)
+        self.assertEqual(res['rec']['num_skipped'], 2)
+        self.assertEqual(res['rec']['num_done'], 16)
+        self.assertEqual(res['rec']['num_failed'], 2)
+        self.assertEqual(len(self.fetched), 18)
+        with open(self.progress_file, 'r') as f:
+            progress = json.load(f)
+        self.assertEqual(
+            sorted(progress['failed'].keys()),
+            ['QQQ_2019-01-03', 'SPY_2019-01-03'])
+
+        # the second run only retries the failed fetches
+        self.fetched.clear()
+        self.fail_dates = []
+        res = self.run_backfill()
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(
+            sorted(self.fetched),
+            ['QQQ_2019-01-03', 'SPY_2019-01-03'])
+        with open(self.progress_file, 'r') as f:
+            progress = json.load(f)
+        self.assertEqual(progress['failed'], {})
+        self.assertEqual(len(progress['done']), 18)
+    # end of test_backfill_resumes
+
+# end of TestBackfill
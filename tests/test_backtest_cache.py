@@ -0,0 +1,235 @@
+"""
+Test file for - content-addressed backtest result cache
+"""
+
+import tempfile
+import mock
+import analysis_engine.backtest_cache as backtest_cache
+import analysis_engine.run_custom_algo as run_custom_algo
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+
+
+MOCK_REDIS = mock_redis.MockRedis()
+
+
+def build_shared_redis(
+        *args,
+        **kwargs):
+    """build_shared_redis
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_REDIS
+# end of build_shared_redis
+
+
+def mock_write_to_file(
+        output_file,
+        data):
+    """mock_write_to_file
+
+    :param output_file: not used
+    :param data: not used
+    """
+    return True
+# end of mock_write_to_file
+
+
+@mock.patch(
+    'redis.Redis',
+    new=build_shared_redis)
+@mock.patch(
+    'analysis_engine.write_to_file.write_to_file',
+    new=mock_write_to_file)
+class TestBacktestCache(BaseTestCase):
+    """TestBacktestCache"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        MOCK_REDIS.cache_dict = {}
+        self.config_dict = {
+            'name': 'test-cache',
+            'indicators': [
+                {
+                    'name': 'willr',
+                    'module_path': (
+                        'analysis_engine/indicators/williamsr.py'),
+                    'category': 'momentum',
+                    'type': 'momentum',
+                    'uses_data': 'daily',
+                    'num_points': 10
+                }
+            ]
+        }
+    # end of setUp
+
+    def run_backtest(
+            self,
+            **kwargs):
+        """run_backtest
+
+        :param kwargs: optional - ``run_custom_algo`` keyword arguments
+        """
+        return run_custom_algo.run_custom_algo(
+            mod_path=None,
+            ticker='SPY',
+            start_date='2019-01-02 00:00:00',
+            end_date='2019-01-04 00:00:00',
+            config_dict=self.config_dict,
+            publish_to_s3=False,
+            publish_to_redis=False,
+            publish_to_slack=False,
+            s3_enabled=False,
+            use_cache=True,
+            cache_store='redis',
+            **kwargs)
+    # end of run_backtest
+
+    def test_cache_key_changes_with_inputs(self):
+        """test_cache_key_changes_with_inputs"""
+        MOCK_REDIS.set(
+            name='SPY_2019-01-02_daily',
+            value=b'a')
+        keys = backtest_cache.build_dataset_keys(
+            extract_datasets=['SPY_2019-01-02'],
+            datasets=['daily', 'news'])
+        self.assertEqual(
+            keys,
+            ['SPY_2019-01-02_daily', 'SPY_2019-01-02_news1'])
+
+        def build_key(config_dict):
+            return backtest_cache.build_cache_key(
+                mod_path=None,
+                config_dict=config_dict,
+                tickers=['SPY'],
+                start_date='2019-01-02',
+                end_date='2019-01-04',
+                dataset_fingerprint=(
+                    backtest_cache.build_dataset_fingerprint(
+                        redis_keys=keys,
+                        client=MOCK_REDIS)))
+
+        first_key = build_key(self.config_dict)
+        self.assertEqual(first_key, build_key(self.config_dict))
+        self.config_dict['indicators'][0]['num_points'] = 20
+        self.assertNotEqual(first_key, build_key(self.config_dict))
+        self.config_dict['indicators'][0]['num_points'] = 10
+        MOCK_REDIS.set(
+            name='SPY_2019-01-02_daily',
+            value=b'b')
+        self.assertNotEqual(first_key, build_key(self.config_dict))
+    # end of test_cache_key_changes_with_inputs
+
+    def test_file_store(self):
+        """test_file_store"""
+        cached = {
+            'version': backtest_cache.CACHE_VERSION,
+            'elapsed_seconds': 1.5,
+            'result': {
+                'history': [
+                    {
+                        'close': 1.0
+                    }
+                ]
+            }
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            self.assertIsNone(backtest_cache.get_cached_result(
+                cache_key='test_key',
+                store='file',
+                cache_dir=tmp_dir))
+            self.assertTrue(backtest_cache.set_cached_result(
+                cache_key='test_key',
+                cached=cached,
+                store='file',
+                cache_dir=tmp_dir))
+            self.assertEqual(
+                backtest_cache.get_cached_result(
+                    cache_key='test_key',
+                    store='file',
+                    cache_dir=tmp_dir),
+                cached)
+    # end of test_file_store
+
+    def test_run_custom_algo_uses_cache(self):
+        """test_run_custom_algo_uses_cache"""
+        metrics = backtest_cache.get_cache_metrics(
+            client=MOCK_REDIS)
+        self.assertEqual(metrics['hit_rate'], 0.0)
+
+        first_res = self.run_backtest()
+        self.assertEqual(first_res['status'], SUCCESS)
+        self.assertFalse(first_res['cache_hit'])
+        self.assertTrue(first_res['cache_key'] in MOCK_REDIS.cache_dict)
+
+        second_res = self.run_backtest()
+        self.assertEqual(second_res['status'], SUCCESS)
+        self.assertTrue(second_res['cache_hit'])
+        self.assertEqual(second_res['cache_key'], first_res['cache_key'])
+        self.assertEqual(
+            second_res['rec']['history'],
+            first_res['rec']['history'])
+        self.assertEqual(
+            second_res['algo'].get_balance(),
+            first_res['algo'].get_balance())
+
+        metrics = backtest_cache.get_cache_metrics(
+            client=MOCK_REDIS)
+        self.assertEqual(metrics['hits'], 1)
+        self.assertEqual(metrics['misses'], 1)
+        self.assertEqual(metrics['stores'], 1)
+        self.assertEqual(metrics['hit_rate'], 0.5)
+
+        # new data for a date in the backtest is a miss
+        MOCK_REDIS.set(
+            name='SPY_2019-01-03_daily',
+            value=b'new data')
+        third_res = self.run_backtest()
+        self.assertFalse(third_res['cache_hit'])
+        self.assertNotEqual(third_res['cache_key'], first_res['cache_key'])
+    # end of test_run_custom_algo_uses_cache
+
+    def test_cache_hit_publishes_report_without_extract(self):
+        """test_cache_hit_publishes_report_without_extract"""
+        publish_args = {
+            'dataset_publish_extract': True,
+            'dataset_publish_report': True,
+            'extract_file': '/tmp/test-cache-extract.json',
+            'report_file': '/tmp/test-cache-report.json'
+        }
+        written = []
+
+        def record_write_to_file(
+                output_file,
+                data):
+            written.append(output_file)
+            return True
+
+        with mock.patch(
+                'analysis_engine.write_to_file.write_to_file',
+                new=record_write_to_file):
+            first_res = self.run_backtest(**publish_args)
+            self.assertEqual(first_res['status'], SUCCESS)
+            self.assertFalse(first_res['cache_hit'])
+            self.assertEqual(
+                written,
+                [publish_args['extract_file'], publish_args['report_file']])
+
+            written.clear()
+            second_res = self.run_backtest(**publish_args)
+        self.assertEqual(second_res['status'], SUCCESS)
+        self.assertTrue(second_res['cache_hit'])
+        # the extracted datasets are not cached
+        self.assertFalse(second_res['algo'].has_input_datasets())
+        self.assertEqual(written, [publish_args['report_file']])
+        self.assertEqual(
+            second_res['algo'].cached_report_dataset,
+            first_res['algo'].create_report_dataset())
+    # end of test_cache_hit_publishes_report_without_extract
+
+# end of TestBacktestCache
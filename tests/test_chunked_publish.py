@@ -0,0 +1,271 @@
+"""
+Test file for - streaming chunked publishing
+"""
+
+import os
+import json
+import zlib
+import tempfile
+import mock
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.chunked_publish as chunked_publish
+import analysis_engine.compress_data as compress_data
+import analysis_engine.publish as publish
+import analysis_engine.mocks.mock_boto3_s3 as mock_s3
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+
+
+MOCK_S3 = mock_s3.MockBotoS3()
+MOCK_REDIS = mock_redis.MockRedis()
+
+
+def build_shared_s3(
+        *args,
+        **kwargs):
+    """build_shared_s3
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_S3
+# end of build_shared_s3
+
+
+def build_shared_redis(
+        *args,
+        **kwargs):
+    """build_shared_redis
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_REDIS
+# end of build_shared_redis
+
+
+def build_history(
+        num_rows):
+    """build_history
+
+    :param num_rows: number of trading history rows
+    """
+    return {
+        'algo_name': 'test',
+        'tickers': [
+            'SPY'
+        ],
+        'SPY': [
+            {
+                'date': f'2019-01-{1 + (idx % 28):02d}',
+                'close': 250.0 + idx,
+                'balance': 10000.0 - idx
+            }
+            for idx in range(num_rows)
+        ]
+    }
+# end of build_history
+
+
+# the tests use small parts that the mock s3 accepts
+@mock.patch(
+    'analysis_engine.consts.S3_MIN_PART_SIZE',
+    new=256)
+@mock.patch(
+    'boto3.resource',
+    new=build_shared_s3)
+@mock.patch(
+    'redis.Redis',
+    new=build_shared_redis)
+class TestChunkedPublish(BaseTestCase):
+    """TestChunkedPublish"""
+
+    def publish_chunked(
+            self,
+            data,
+            **kwargs):
+        """publish_chunked
+
+        :param data: data to publish
+        :param kwargs: keyword args for ``publish.publish``
+        """
+        return publish.publish(
+            data=data,
+            label='test_chunked',
+            chunked=True,
+            part_size=1024,
+            redis_enabled=True,
+            redis_key='test_chunked_key',
+            redis_address='localhost:6379',
+            redis_db=0,
+            s3_enabled=True,
+            s3_key='test_chunked_key',
+            s3_address='localhost:9000',
+            s3_bucket='testchunked',
+            **kwargs)
+    # end of publish_chunked
+
+    def test_chunked_history_matches_compress_data(self):
+        """test_chunked_history_matches_compress_data"""
+        data = build_history(num_rows=2000)
+        status = self.publish_chunked(
+            data=data,
+            df_compress=True)
+        self.assertEqual(status, SUCCESS)
+        expected = zlib.decompress(compress_data.compress_data(data=data))
+
+        s3_data = MOCK_S3.Bucket('testchunked').get_data(
+            Key='test_chunked_key')
+        self.assertEqual(zlib.decompress(s3_data), expected)
+        # payload was larger than the part size so it used multipart
+        self.assertTrue(len(s3_data) > 1024)
+
+        redis_data = MOCK_REDIS.get('test_chunked_key')
+        self.assertEqual(zlib.decompress(redis_data), expected)
+        self.assertTrue(
+            'test_chunked_key:publishing' not in MOCK_REDIS.cache_dict)
+    # end of test_chunked_history_matches_compress_data
+
+    def test_chunked_df_matches_compress_data(self):
+        """test_chunked_df_matches_compress_data"""
+        df = pd.DataFrame(build_history(num_rows=500)['SPY'])
+        status = self.publish_chunked(
+            data=df,
+            df_compress=True,
+            chunk_rows=64)
+        self.assertEqual(status, SUCCESS)
+        expected = zlib.decompress(compress_data.compress_data(data=df))
+        s3_data = MOCK_S3.Bucket('testchunked').get_data(
+            Key='test_chunked_key')
+        self.assertEqual(zlib.decompress(s3_data), expected)
+    # end of test_chunked_df_matches_compress_data
+
+    def test_chunked_small_payload_and_file(self):
+        """test_chunked_small_payload_and_file"""
+        data = build_history(num_rows=2)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'history.json')
+            status = self.publish_chunked(
+                data=data,
+                compress=True,
+                convert_to_json=True,
+                output_file=output_file)
+            self.assertEqual(status, SUCCESS)
+            with open(output_file, 'r') as cur_file:
+                self.assertEqual(json.loads(cur_file.read()), data)
+        redis_data = MOCK_REDIS.get('test_chunked_key')
+        self.assertEqual(
+            json.loads(zlib.decompress(redis_data).decode('utf-8')),
+            data)
+    # end of test_chunked_small_payload_and_file
+
+    def test_chunked_part_size_below_minimum(self):
+        """test_chunked_part_size_below_minimum"""
+        MOCK_REDIS.cache_dict = {}
+        with mock.patch(
+                'analysis_engine.consts.S3_MIN_PART_SIZE',
+                new=5242880):
+            status = self.publish_chunked(
+                data=build_history(num_rows=2000),
+                df_compress=True)
+        self.assertEqual(status, ae_consts.ERR)
+        self.assertEqual(MOCK_REDIS.cache_dict, {})
+    # end of test_chunked_part_size_below_minimum
+
+    def publish_both(
+            self,
+            data,
+            s3_enabled=True,
+            **kwargs):
+        """publish_both
+
+        Publish ``data`` with and without streaming and return
+        the redis values, s3 objects and files for both
+
+        :param data: data to publish
+        :param s3_enabled: optional - publish to s3
+        :param kwargs: keyword args for ``publish.publish``
+        """
+        found = []
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            for chunked in [False, True]:
+                MOCK_REDIS.cache_dict = {}
+                output_file = os.path.join(tmp_dir, f'{chunked}.json')
+                status = publish.publish(
+                    data=data,
+                    label='test_chunked',
+                    chunked=chunked,
+                    part_size=1024,
+                    chunk_rows=64,
+                    redis_enabled=True,
+                    redis_key='test_chunked_key',
+                    redis_address='localhost:6379',
+                    redis_db=0,
+                    s3_enabled=s3_enabled,
+                    s3_key=f'test_chunked_{chunked}',
+                    s3_address='localhost:9000',
+                    s3_bucket='testchunked',
+                    output_file=(
+                        None if ae_consts.is_df(df=data)
+                        else output_file),
+                    **kwargs)
+                self.assertEqual(status, SUCCESS)
+                res = {
+                    'redis': MOCK_REDIS.get('test_chunked_key'),
+                    's3': None,
+                    'file': None
+                }
+                if s3_enabled:
+                    res['s3'] = MOCK_S3.Bucket('testchunked').get_data(
+                        Key=f'test_chunked_{chunked}')
+                if os.path.exists(output_file):
+                    with open(output_file, 'r') as cur_file:
+                        res['file'] = cur_file.read()
+                found.append(res)
+        return found
+    # end of publish_both
+
+    def test_chunked_matches_publish(self):
+        """test_chunked_matches_publish"""
+        history = build_history(num_rows=300)
+        history['note'] = 'quotes " and \\ and \u00e9'
+        df = pd.DataFrame(history['SPY'])
+        json_str = json.dumps(history)
+        # dict objects are stored with json.dumps
+        self.assertEqual(
+            ''.join(chunked_publish.build_json_chunks(data={'a': 1})),
+            '{"a": 1}')
+        expected, found = self.publish_both(
+            data=history,
+            s3_enabled=False)
+        self.assertEqual(found, expected)
+        self.assertEqual(json.loads(found['redis']), history)
+        expected, found = self.publish_both(
+            data=json_str)
+        self.assertEqual(found, expected)
+        self.assertEqual(json.loads(found['redis']), json_str)
+        expected, found = self.publish_both(
+            data=json_str,
+            convert_to_json=True)
+        self.assertEqual(found, expected)
+        expected, found = self.publish_both(
+            data=df,
+            is_df=True)
+        self.assertEqual(found, expected)
+        self.assertEqual(
+            json.loads(found['redis']),
+            df.to_json(orient='records', date_format='iso'))
+        expected, found = self.publish_both(
+            data=history,
+            convert_to_json=True,
+            compress=True)
+        self.assertEqual(found['file'], expected['file'])
+        for name in ['redis', 's3']:
+            self.assertEqual(
+                zlib.decompress(found[name]),
+                zlib.decompress(expected[name]))
+    # end of test_chunked_matches_publish
+
+# end of TestChunkedPublish
@@ -0,0 +1,57 @@
+"""
+Test file for - command line tool import budgets
+"""
+
+import subprocess
+import sys
+import analysis_engine.perf.benchmark_cli_startup as bench_cli
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class TestCLIStartup(BaseTestCase):
+    """TestCLIStartup"""
+
+    def test_help_skips_heavy_imports(self):
+        """test_help_skips_heavy_imports"""
+        env = bench_cli.build_env()
+        baseline = {
+            row[0]
+            for row in bench_cli.run_importtime(
+                args=['-c', 'pass'],
+                env=env)
+        }
+        for name, budget in bench_cli.CLI_BUDGETS.items():
+            res = bench_cli.measure_cli(
+                name=name,
+                env=env,
+                baseline=baseline)
+            self.assertEqual(res['heavy_modules'], [], name)
+            self.assertGreater(res['import_seconds'], 0.0, name)
+            self.assertLess(res['import_seconds'], budget, name)
+    # end of test_help_skips_heavy_imports
+
+    def test_next_exp_is_lazy(self):
+        """test_next_exp_is_lazy"""
+        output = subprocess.check_output(
+            [
+                sys.executable,
+                '-c',
+                'import sys\n'
+                'import analysis_engine.consts as ae_consts\n'
+                'print("pandas" in sys.modules)\n'
+                'print(ae_consts.get_next_exp_str() == '
+                'ae_consts.get_next_exp().strftime("%Y-%m-%d"))\n'
+                'print(ae_consts.get_next_exp() is '
+                'ae_consts.get_next_exp())\n'
+                'from analysis_engine.consts import NEXT_EXP\n'
+                'print(NEXT_EXP is ae_consts.NEXT_EXP)\n'
+                'print(ae_consts.NEXT_EXP_STR == '
+                'ae_consts.get_next_exp_str())\n'
+            ],
+            env=bench_cli.build_env())
+        self.assertEqual(
+            output.decode('utf-8').split(),
+            ['False', 'True', 'True', 'True', 'True'])
+    # end of test_next_exp_is_lazy
+
+# end of TestCLIStartup
@@ -0,0 +1,147 @@
+"""
+Test file for - multi-ticker panel extraction
+"""
+
+import json
+import zlib
+import numpy as np
+import pandas as pd
+import analysis_engine.extract_panel as extract_panel
+from analysis_engine.mocks.mock_redis import MockRedis
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class TestExtractPanel(BaseTestCase):
+    """TestExtractPanel"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.daily_df = pd.read_json(
+            'tests/datasets/spy-daily.json',
+            orient='records')
+        self.minute_df = pd.read_json(
+            'tests/datasets/spy-minute.json',
+            orient='records')
+        self.client = MockRedis()
+        for ticker, scale in [('SPY', 1.0), ('QQQ', 0.5)]:
+            # each daily key holds the history up to its date
+            for date, num_rows in [
+                    ('2018-11-05', 97),
+                    ('2018-11-06', 98),
+                    ('2018-11-07', 99)]:
+                df = self.daily_df.iloc[0:num_rows].copy()
+                df['close'] = df['close'] * scale
+                self.store(
+                    key=f'{ticker}_{date}_daily',
+                    df=df,
+                    compress=(ticker == 'SPY'))
+            self.store(
+                key=f'{ticker}_2018-11-07_minute',
+                df=self.minute_df)
+        self.client.set(
+            name='SPY_2018-11-07_quote',
+            value=json.dumps(json.dumps([{
+                'symbol': 'SPY',
+                'latestPrice': 276.3
+            }])))
+    # end of setUp
+
+    def store(
+            self,
+            key,
+            df,
+            compress=False):
+        """store
+
+        :param key: redis key
+        :param df: ``pandas.DataFrame``
+        :param compress: optional - zlib compress the value
+        """
+        data = json.dumps(df.to_json(
+            orient='records',
+            date_format='iso'))
+        if compress:
+            data = zlib.compress(data.encode('utf-8'))
+        self.client.set(
+            name=key,
+            value=data)
+    # end of store
+
+    def test_extract_panel(self):
+        """test_extract_panel"""
+        panels = extract_panel.extract_panel(
+            tickers=['spy', 'QQQ', 'IWM'],
+            datasets=['daily', 'minute', 'quote'],
+            start_date='2018-11-01',
+            end_date='2018-11-07',
+            client=self.client,
+            max_workers=3,
+            batch_size=4)
+        daily_df = panels['daily']
+        self.assertEqual(daily_df.index.names, ['ticker', 'timestamp'])
+        self.assertTrue(daily_df.index.is_unique)
+        self.assertTrue(daily_df.index.is_monotonic_increasing)
+        self.assertEqual(
+            sorted(set(daily_df.index.get_level_values('ticker'))),
+            ['QQQ', 'SPY'])
+        spy_df = daily_df.loc['SPY']
+        expected = self.daily_df[
+            self.daily_df['date'] >= '2018-11-01']
+        self.assertEqual(
+            spy_df.index.strftime('%Y-%m-%d').tolist(),
+            expected['date'].dt.strftime('%Y-%m-%d').tolist())
+        self.assertTrue(np.allclose(
+            spy_df['close'].values,
+            expected['close'].values))
+        self.assertTrue(np.allclose(
+            daily_df.loc['QQQ', 'close'].values,
+            expected['close'].values * 0.5))
+        self.assertEqual(daily_df['close'].dtype, np.dtype('float32'))
+        self.assertEqual(daily_df['volume'].dtype, np.dtype('int32'))
+        self.assertEqual(daily_df['label'].dtype.name, 'category')
+        self.assertNotIn('date', daily_df)
+
+        minute_df = panels['minute']
+        self.assertEqual(len(minute_df.index), 2 * len(self.minute_df.index))
+        self.assertEqual(
+            minute_df.xs(
+                pd.Timestamp('2018-11-07 15:58:00'),
+                level='timestamp')['close'].index.tolist(),
+            ['QQQ', 'SPY'])
+
+        # datasets without a date column use the key's date
+        quote_df = panels['quote']
+        self.assertEqual(
+            quote_df.index.tolist(),
+            [('SPY', pd.Timestamp('2018-11-07'))])
+    # end of test_extract_panel
+
+    def test_missing_datasets_and_full_precision(self):
+        """test_missing_datasets_and_full_precision"""
+        panels = extract_panel.extract_panel(
+            tickers=['IWM'],
+            datasets=['daily'],
+            end_date='2018-11-07',
+            client=self.client)
+        self.assertEqual(len(panels['daily'].index), 0)
+        self.assertEqual(
+            panels['daily'].index.names,
+            ['ticker', 'timestamp'])
+
+        panels = extract_panel.extract_panel(
+            tickers=['SPY'],
+            datasets=['daily'],
+            start_date='2018-06-01',
+            end_date='2018-11-07',
+            client=self.client,
+            float_dtype='float64')
+        daily_df = panels['daily']
+        self.assertEqual(len(daily_df.index), len(self.daily_df.index))
+        self.assertEqual(
+            daily_df['close'].values.tolist(),
+            self.daily_df['close'].values.tolist())
+    # end of test_missing_datasets_and_full_precision
+
+# end of TestExtractPanel
@@ -0,0 +1,226 @@
+"""
+Test file for - chunked multi-ticker fetches
+"""
+
+import threading
+import mock
+import analysis_engine.fetch_chunks as fetch_chunks
+import analysis_engine.shared_clients as shared_clients
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+from analysis_engine.consts import ERR
+
+
+class TestFetchChunks(BaseTestCase):
+    """TestFetchChunks"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.fetched = []
+        self.shared_during_fetch = []
+        self.lock = threading.Lock()
+        shared_clients.close_clients()
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        shared_clients.close_clients()
+        super().tearDown()
+    # end of tearDown
+
+    def mock_fetch(
+            self,
+            work_dict):
+        """mock_fetch
+
+        :param work_dict: ticker request dictionary
+        """
+        with self.lock:
+            self.fetched.append(work_dict)
+            self.shared_during_fetch.append(shared_clients.is_shared())
+        if work_dict['ticker'] == 'BAD':
+            raise Exception('test fetch failure')
+        return {
+            'status': SUCCESS,
+            'err': None,
+            'rec': {
+                'num_success': 3,
+                'daily': '[{"close": 1.0}]'
+            }
+        }
+    # end of mock_fetch
+
+    def test_build_chunk_requests(self):
+        """test_build_chunk_requests"""
+        self.assertEqual(
+            fetch_chunks.build_ticker_chunks(
+                tickers=['spy', 'AAPL', 'SPY', ' msft ', '', 'amzn'],
+                chunk_size=2),
+            [['SPY', 'AAPL'], ['MSFT', 'AMZN']])
+        chunk_reqs = fetch_chunks.build_chunk_requests(
+            work_dict={
+                'label': 'test',
+                'ticker': 'SPY',
+                's3_bucket': 'pricing'
+            },
+            tickers=['SPY', 'AAPL', 'MSFT'],
+            chunk_size=2)
+        self.assertEqual(len(chunk_reqs), 2)
+        self.assertNotIn('ticker', chunk_reqs[0])
+        self.assertEqual(chunk_reqs[1]['tickers'], ['MSFT'])
+        self.assertEqual(chunk_reqs[1]['label'], 'test-chunk-1')
+        self.assertEqual(chunk_reqs[1]['s3_bucket'], 'pricing')
+    # end of test_build_chunk_requests
+
+    def test_run_chunk_summary(self):
+        """test_run_chunk_summary"""
+        res = fetch_chunks.run_chunk(
+            work_dict={
+                'label': 'test-chunk-0',
+                'tickers': ['SPY', 'BAD', 'AAPL'],
+                'date': '2019-02-15'
+            },
+            fetch_func=self.mock_fetch,
+            max_workers=3)
+        self.assertEqual(res['status'], ERR)
+        rec = res['rec']
+        self.assertEqual(rec['num_tickers'], 3)
+        self.assertEqual(rec['num_success'], 2)
+        self.assertEqual(rec['failed'], ['BAD'])
+        self.assertEqual(
+            rec['tickers']['SPY'],
+            {
+                'status': 'SUCCESS',
+                'num_success': 3
+            })
+        # the datasets are published by each fetch and
+        # not returned in the chunk result
+        self.assertNotIn('daily', rec['tickers']['SPY'])
+        self.assertEqual(
+            sorted(w['redis_key'] for w in self.fetched),
+            ['AAPL_2019-02-15', 'BAD_2019-02-15', 'SPY_2019-02-15'])
+        self.assertTrue(all(self.shared_during_fetch))
+        self.assertFalse(shared_clients.is_shared())
+    # end of test_run_chunk_summary
+
+    def test_run_chunk_uses_iex_batch(self):
+        """test_run_chunk_uses_iex_batch"""
+        batch_reqs = []
+
+        def mock_batch(
+                work_dict):
+            batch_reqs.append(work_dict)
+            return {
+                'status': SUCCESS,
+                'err': None,
+                'rec': {
+                    'data': {
+                        'SPY': {
+                            'quote': '[{"close": 1.0}]'
+                        }
+                    }
+                }
+            }
+        # end of mock_batch
+
+        res = fetch_chunks.run_chunk(
+            work_dict={
+                'label': 'test-chunk-0',
+                'tickers': ['SPY', 'AAPL'],
+                'date': '2019-02-15',
+                'fetch_mode': 'iex_day,iex_quote,td',
+                'iex_token': 'test-token',
+                'incremental': True
+            },
+            fetch_func=self.mock_fetch,
+            batch_func=mock_batch)
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(len(batch_reqs), 1)
+        self.assertEqual(batch_reqs[0]['tickers'], ['SPY', 'AAPL'])
+        # incremental daily bars are left to the per-ticker fetch
+        self.assertEqual(batch_reqs[0]['fields'], ['quote'])
+        self.assertEqual(batch_reqs[0]['date'], '2019-02-15')
+        batch_data = {
+            w['ticker']: w['iex_batch_data']
+            for w in self.fetched
+        }
+        self.assertEqual(
+            batch_data,
+            {
+                'SPY': {
+                    'quote': '[{"close": 1.0}]'
+                },
+                'AAPL': None
+            })
+    # end of test_run_chunk_uses_iex_batch
+
+    def test_iex_batch_is_skipped(self):
+        """test_iex_batch_is_skipped"""
+        def failed_batch(
+                work_dict):
+            raise Exception('test batch failure')
+        # end of failed_batch
+
+        work = {
+            'label': 'test-chunk-0',
+            'fetch_mode': 'iex',
+            'iex_token': 'test-token'
+        }
+        self.assertEqual(
+            fetch_chunks.fetch_iex_batch(
+                work_dict=work,
+                tickers=['SPY'],
+                date_str='2019-02-15',
+                batch_func=failed_batch),
+            {})
+        for skip in [
+                {'iex_batch': False},
+                {'backfill_date': '2019-02-14'},
+                {'iex_token': None},
+                {'fetch_mode': 'td'}]:
+            skip_work = dict(work)
+            skip_work.update(skip)
+            self.assertEqual(
+                fetch_chunks.fetch_iex_batch(
+                    work_dict=skip_work,
+                    tickers=['SPY'],
+                    date_str='2019-02-15',
+                    batch_func=self.fail),
+                {})
+    # end of test_iex_batch_is_skipped
+
+    def test_shared_clients_are_reused(self):
+        """test_shared_clients_are_reused"""
+        client = shared_clients.get_redis_client(
+            host='localhost',
+            port=6379,
+            db=0)
+        self.assertIs(
+            shared_clients.get_redis_client(
+                host='localhost',
+                port='6379',
+                db='0'),
+            client)
+        self.assertIsNot(
+            shared_clients.get_redis_client(
+                host='localhost',
+                port=6379,
+                db=1),
+            client)
+
+        s3 = mock.Mock()
+        s3.buckets.all.return_value = []
+        for _ in range(3):
+            shared_clients.ensure_bucket(
+                s3=s3,
+                bucket_name='pricing')
+        # the bucket is only listed and created once per process
+        self.assertEqual(s3.buckets.all.call_count, 1)
+        s3.create_bucket.assert_called_once_with(
+            Bucket='pricing')
+    # end of test_shared_clients_are_reused
+
+# end of TestFetchChunks
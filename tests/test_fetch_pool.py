@@ -0,0 +1,115 @@
+"""
+Test file for - concurrent dataset fetching with pooled
+sessions and per-provider limits
+"""
+
+import time
+import threading
+import mock
+import analysis_engine.fetch_pool as fetch_pool
+import analysis_engine.http_sessions as http_sessions
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+from analysis_engine.consts import ERR
+
+
+class TestFetchPool(BaseTestCase):
+    """TestFetchPool"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        http_sessions.close_sessions()
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        http_sessions.close_sessions()
+        super().tearDown()
+    # end of tearDown
+
+    def slow_fetch(
+            self,
+            work_dict):
+        """slow_fetch
+
+        :param work_dict: dictionary with a ``sleep`` value
+        """
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(work_dict['sleep'])
+        with self.lock:
+            self.active -= 1
+        if work_dict.get('fail'):
+            raise Exception('test failure')
+        return {
+            'status': SUCCESS,
+            'err': None,
+            'rec': {
+                'data': work_dict['label']
+            }
+        }
+    # end of slow_fetch
+
+    def test_session_is_reused(self):
+        """test_session_is_reused"""
+        session = http_sessions.get_session('iex')
+        self.assertTrue(session is http_sessions.get_session('iex'))
+        self.assertFalse(session is http_sessions.get_session('td'))
+        adapter = session.get_adapter('https://cloud.iexapis.com')
+        self.assertTrue(adapter._pool_maxsize >= 1)
+    # end of test_session_is_reused
+
+    @mock.patch(
+        'analysis_engine.consts.FETCH_IEX_CONCURRENCY',
+        2)
+    def test_provider_limit_and_completion_order(self):
+        """test_provider_limit_and_completion_order"""
+        jobs = [
+            {
+                'provider': 'iex',
+                'func': self.slow_fetch,
+                'work_dict': {
+                    'label': f'job-{idx}',
+                    'sleep': 0.2 if idx == 0 else 0.01
+                }
+            }
+            for idx in range(6)
+        ]
+        results = list(fetch_pool.run_fetch_jobs(
+            jobs=jobs,
+            max_workers=6))
+        self.assertEqual(len(results), 6)
+        self.assertEqual(self.max_active, 2)
+        # the slow first job finishes last
+        self.assertEqual(results[-1][1]['rec']['data'], 'job-0')
+        for job, res in results:
+            self.assertEqual(res['status'], SUCCESS)
+    # end of test_provider_limit_and_completion_order
+
+    def test_job_errors_are_results(self):
+        """test_job_errors_are_results"""
+        jobs = [
+            {
+                'provider': 'td',
+                'func': self.slow_fetch,
+                'work_dict': {
+                    'label': 'failing',
+                    'sleep': 0,
+                    'fail': True
+                }
+            }
+        ]
+        results = list(fetch_pool.run_fetch_jobs(
+            jobs=jobs))
+        self.assertEqual(results[0][1]['status'], ERR)
+        self.assertTrue('test failure' in results[0][1]['err'])
+    # end of test_job_errors_are_results
+
+# end of TestFetchPool
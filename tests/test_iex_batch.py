@@ -0,0 +1,205 @@
+"""
+Test file for - IEX Cloud batch fetching against a local
+HTTP server returning recorded payloads
+"""
+
+import json
+import threading
+import http.server
+import urllib.parse
+import mock
+import analysis_engine.http_sessions as http_sessions
+import analysis_engine.iex.fetch_api as iex_fetch
+import analysis_engine.iex.fetch_data as iex_fetch_data
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+RECORDED = {
+    'SPY': {
+        'quote': {
+            'symbol': 'SPY',
+            'latestPrice': 280.5,
+            'latestTime': 'February 15, 2019',
+            'close': 280.5
+        },
+        'stats': {
+            'companyName': 'SPDR S&P 500 ETF Trust',
+            'marketcap': 100,
+            'week52high': 293.94
+        },
+        'chart': [
+            {
+                'date': '2019-02-14',
+                'open': 272.0,
+                'high': 274.0,
+                'low': 271.0,
+                'close': 273.0,
+                'volume': 100
+            },
+            {
+                'date': '2019-02-15',
+                'open': 274.0,
+                'high': 281.0,
+                'low': 273.0,
+                'close': 280.5,
+                'volume': 200
+            }
+        ]
+    },
+    'AAPL': {
+        'quote': {
+            'symbol': 'AAPL',
+            'latestPrice': 170.4,
+            'latestTime': 'February 15, 2019',
+            'close': 170.4
+        },
+        'chart': [
+            {
+                'date': '2019-02-15',
+                'open': 171.0,
+                'high': 171.7,
+                'low': 169.8,
+                'close': 170.4,
+                'volume': 300
+            }
+        ]
+    }
+}
+
+REQUESTS = []
+
+
+class RecordedIEXHandler(http.server.BaseHTTPRequestHandler):
+    """RecordedIEXHandler"""
+
+    def do_GET(
+            self):
+        """do_GET"""
+        parsed = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(parsed.query)
+        REQUESTS.append({
+            'path': parsed.path,
+            'query': query
+        })
+        symbols = query['symbols'][0].split(',')
+        types = query['types'][0].split(',')
+        body = {
+            s: {
+                t: RECORDED[s][t]
+                for t in types
+                if t in RECORDED.get(s, {})
+            }
+            for s in symbols
+        }
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    # end of do_GET
+
+    def log_message(
+            self,
+            *args):
+        """log_message"""
+        return
+    # end of log_message
+
+# end of RecordedIEXHandler
+
+
+class TestIEXBatch(BaseTestCase):
+    """TestIEXBatch"""
+
+    @classmethod
+    def setUpClass(
+            cls):
+        """setUpClass"""
+        cls.server = http.server.ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            RecordedIEXHandler)
+        cls.thread = threading.Thread(
+            target=cls.server.serve_forever,
+            daemon=True)
+        cls.thread.start()
+        cls.url_base = f'http://127.0.0.1:{cls.server.server_port}'
+    # end of setUpClass
+
+    @classmethod
+    def tearDownClass(
+            cls):
+        """tearDownClass"""
+        cls.server.shutdown()
+        cls.server.server_close()
+        http_sessions.close_sessions()
+    # end of tearDownClass
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        REQUESTS.clear()
+        self.patches = [
+            mock.patch(
+                'analysis_engine.iex.consts.IEX_URL_BASE',
+                self.url_base),
+            mock.patch(
+                'analysis_engine.iex.consts.IEX_TOKEN',
+                'testtoken')
+        ]
+        for p in self.patches:
+            p.start()
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        for p in self.patches:
+            p.stop()
+        super().tearDown()
+    # end of tearDown
+
+    def test_build_batch_urls(self):
+        """test_build_batch_urls"""
+        batch_urls = iex_fetch.build_batch_urls(
+            tickers=[f'T{idx}' for idx in range(250)],
+            fields=['daily', 'quote', 'minute', 'news'])
+        # 2 chart ranges x 3 chunks of 100 symbols
+        self.assertEqual(len(batch_urls), 6)
+        self.assertEqual(len(batch_urls[0]['tickers']), 100)
+        self.assertEqual(len(batch_urls[2]['tickers']), 50)
+        self.assertTrue(
+            '&types=chart,quote,news&range=1m&last=5'
+            in batch_urls[0]['url'])
+        self.assertTrue('&range=1d' in batch_urls[-1]['url'])
+    # end of test_build_batch_urls
+
+    def test_fetch_batch_splits_by_ticker(self):
+        """test_fetch_batch_splits_by_ticker"""
+        dfs = iex_fetch_data.fetch_batch_data(
+            work_dict={
+                'tickers': ['spy', 'AAPL'],
+                'fields': ['daily', 'quote', 'stats']
+            })
+        self.assertEqual(len(REQUESTS), 1)
+        self.assertEqual(REQUESTS[0]['path'], '/stock/market/batch')
+        self.assertEqual(REQUESTS[0]['query']['token'], ['testtoken'])
+        self.assertEqual(sorted(dfs.keys()), ['AAPL', 'SPY'])
+
+        single_daily = iex_fetch.fetch_daily(
+            ticker='SPY',
+            resp_json=RECORDED['SPY']['chart'])
+        self.assertTrue(dfs['SPY']['daily'].equals(single_daily))
+        self.assertEqual(len(dfs['AAPL']['daily'].index), 1)
+        self.assertEqual(
+            dfs['AAPL']['quote']['latestPrice'].iloc[0],
+            170.4)
+        self.assertEqual(
+            dfs['SPY']['stats']['week52high'].iloc[0],
+            293.94)
+        # missing types in the response are empty
+        self.assertEqual(len(dfs['AAPL']['stats'].index), 0)
+    # end of test_fetch_batch_splits_by_ticker
+
+# end of TestIEXBatch
@@ -0,0 +1,243 @@
+"""
+Test file for - incremental IEX daily and minute fetches
+"""
+
+import json
+import zlib
+import mock
+import pandas as pd
+import analysis_engine.iex.fetch_incremental as iex_incremental
+import analysis_engine.iex.helpers_for_iex_api as iex_helpers
+import analysis_engine.mocks.mock_iex as mock_iex
+from analysis_engine.mocks.mock_redis import MockRedis
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+
+
+MINUTE_CHART = mock_iex.build_minute_chart(
+    date_str='2019-02-15',
+    num_minutes=60)
+REQUESTED_URLS = []
+
+
+def mock_get_from_iex(
+        url,
+        token=None,
+        version=None,
+        verbose=False):
+    """mock_get_from_iex
+
+    return the minutes from the ``chartLast`` ending
+    at ``10:02`` or the whole chart
+
+    :param url: IEX resource url
+    :param token: not used - IEX token
+    :param version: not used - IEX version
+    :param verbose: not used - debug logging
+    """
+    REQUESTED_URLS.append(url)
+    if 'chartLast=' in url:
+        num_bars = int(url.split('chartLast=')[-1])
+        return MINUTE_CHART[33 - num_bars:33]
+    return MINUTE_CHART
+# end of mock_get_from_iex
+
+
+DAILY_CHART = [
+    {
+        'date': date.strftime('%Y-%m-%d'),
+        'open': 270.0 + idx,
+        'high': 271.0 + idx,
+        'low': 269.0 + idx,
+        'close': 270.5 + idx,
+        'volume': 1000 + idx
+    }
+    for idx, date in enumerate(pd.bdate_range(
+        '2019-01-16',
+        '2019-02-15'))
+]
+DAILY_END = [len(DAILY_CHART)]
+
+
+def mock_get_daily(
+        url,
+        token=None,
+        version=None,
+        verbose=False):
+    """mock_get_daily
+
+    return the days from the ``chartLast`` ending
+    at ``DAILY_END`` or every day until then
+
+    :param url: IEX resource url
+    :param token: not used - IEX token
+    :param version: not used - IEX version
+    :param verbose: not used - debug logging
+    """
+    REQUESTED_URLS.append(url)
+    end = DAILY_END[0]
+    if 'chartLast=' in url:
+        num_bars = int(url.split('chartLast=')[-1])
+        return DAILY_CHART[end - num_bars:end]
+    return DAILY_CHART[:end]
+# end of mock_get_daily
+
+
+@mock.patch(
+    'analysis_engine.iex.helpers_for_iex_api.get_from_iex',
+    new=mock_get_from_iex)
+class TestIEXIncremental(BaseTestCase):
+    """TestIEXIncremental"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        REQUESTED_URLS.clear()
+        self.client = MockRedis()
+        self.work_dict = {
+            'ticker': 'SPY',
+            'field': 'minute',
+            'label': 'test-incremental',
+            'redis_key': 'SPY_2019-02-15_minute'
+        }
+        self.now = pd.Timestamp('2019-02-15 10:02:30')
+    # end of setUp
+
+    def cache_minutes(
+            self,
+            records):
+        """cache_minutes
+
+        publish minute records to the mock redis the same
+        way ``get_data_from_iex`` serializes them
+
+        :param records: IEX minute chart records
+        """
+        df = iex_helpers.format_datetime_columns(
+            df=iex_incremental.fetch_api.fetch_minute(
+                ticker='SPY',
+                resp_json=records))
+        data = df.to_json(
+            orient='records',
+            date_format='iso')
+        self.client.set(
+            name=self.work_dict['redis_key'],
+            value=zlib.compress(json.dumps(data).encode('utf-8')))
+    # end of cache_minutes
+
+    def test_minute_fetches_only_new_bars(self):
+        """test_minute_fetches_only_new_bars"""
+        self.cache_minutes(MINUTE_CHART[:30])
+        res = iex_incremental.fetch_incremental(
+            work_dict=self.work_dict,
+            client=self.client,
+            now=self.now)
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(
+            REQUESTED_URLS,
+            ['/stock/SPY/chart/1d?chartLast=4'])
+        df = res['rec']['data']
+        self.assertEqual(res['rec']['num_cached'], 30)
+        self.assertEqual(res['rec']['num_new'], 3)
+        self.assertEqual(len(df.index), 33)
+        self.assertFalse(df['date'].duplicated().any())
+        self.assertEqual(
+            df['date'].iloc[-1],
+            pd.Timestamp('2019-02-15 10:02:00'))
+    # end of test_minute_fetches_only_new_bars
+
+    def test_no_cache_fetches_everything(self):
+        """test_no_cache_fetches_everything"""
+        res = iex_incremental.fetch_incremental(
+            work_dict=self.work_dict,
+            client=self.client,
+            now=self.now)
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(REQUESTED_URLS, ['/stock/SPY/chart/1d'])
+        self.assertEqual(res['rec']['num_cached'], 0)
+        self.assertEqual(res['rec']['num_new'], 60)
+    # end of test_no_cache_fetches_everything
+
+    def test_daily_bars_carry_over_to_the_next_day(self):
+        """test_daily_bars_carry_over_to_the_next_day"""
+        work_dict = {
+            'ticker': 'SPY',
+            'field': 'daily',
+            'label': 'test-incremental-daily',
+            'redis_key': 'SPY_2019-02-14_daily'
+        }
+        with mock.patch(
+                'analysis_engine.iex.helpers_for_iex_api.get_from_iex',
+                new=mock_get_daily):
+            DAILY_END[0] = len(DAILY_CHART) - 1
+            first_res = iex_incremental.fetch_incremental(
+                work_dict=work_dict,
+                client=self.client,
+                now=pd.Timestamp('2019-02-14 16:00:00'))
+            self.assertEqual(first_res['status'], SUCCESS)
+            self.assertEqual(first_res['rec']['num_cached'], 0)
+            self.assertIsNotNone(
+                self.client.get('SPY_incremental_daily'))
+
+            # the next day publishes to a new key but only
+            # requests the new day
+            DAILY_END[0] = len(DAILY_CHART)
+            work_dict['redis_key'] = 'SPY_2019-02-15_daily'
+            res = iex_incremental.fetch_incremental(
+                work_dict=work_dict,
+                client=self.client,
+                now=pd.Timestamp('2019-02-15 16:00:00'))
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(
+            REQUESTED_URLS,
+            [
+                '/stock/SPY/chart/1m',
+                '/stock/SPY/chart/5d?chartLast=2'
+            ])
+        self.assertEqual(res['rec']['cached_key'], 'SPY_incremental_daily')
+        self.assertEqual(res['rec']['num_cached'], len(DAILY_CHART) - 1)
+        self.assertEqual(res['rec']['num_new'], 1)
+        self.assertEqual(
+            res['rec']['data']['date'].iloc[-1],
+            pd.Timestamp('2019-02-15'))
+        self.assertEqual(
+            len(iex_incremental.get_cached_bars(
+                work_dict=work_dict,
+                client=self.client,
+                key='SPY_incremental_daily').index),
+            len(DAILY_CHART))
+    # end of test_daily_bars_carry_over_to_the_next_day
+
+    def test_build_incremental_url(self):
+        """test_build_incremental_url"""
+        self.assertEqual(
+            iex_incremental.build_incremental_url(
+                ticker='SPY',
+                field='daily',
+                last_date='2019-02-13',
+                now=self.now),
+            '/stock/SPY/chart/5d?chartLast=3')
+        self.assertEqual(
+            iex_incremental.build_incremental_url(
+                ticker='SPY',
+                field='daily',
+                last_date='2019-01-31',
+                now=self.now),
+            '/stock/SPY/chart/1m?chartLast=12')
+        # a new session or a gap over a month gets everything
+        self.assertIsNone(
+            iex_incremental.build_incremental_url(
+                ticker='SPY',
+                field='minute',
+                last_date='2019-02-14 15:59:00',
+                now=self.now))
+        self.assertIsNone(
+            iex_incremental.build_incremental_url(
+                ticker='SPY',
+                field='daily',
+                last_date='2018-11-01',
+                now=self.now))
+    # end of test_build_incremental_url
+
+# end of TestIEXIncremental
@@ -0,0 +1,97 @@
+"""
+Test file for - vectorized IEX ingest date normalization
+"""
+
+import pandas as pd
+import analysis_engine.dataset_scrub_utils as dataset_utils
+import analysis_engine.iex.consts as iex_consts
+import analysis_engine.iex.fetch_api as iex_fetch
+import analysis_engine.iex.helpers_for_iex_api as iex_helpers
+import analysis_engine.perf.benchmark_iex_ingest as bench_iex
+import analysis_engine.mocks.mock_iex as mock_iex
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import IEX_MINUTE_DATE_FORMAT
+
+
+class TestIEXIngest(BaseTestCase):
+    """TestIEXIngest"""
+
+    def test_build_dates_matches_row_loop(self):
+        """test_build_dates_matches_row_loop"""
+        for src_col, src_format, vals in [
+                ('minute', None, ['09:30', '12:00', '15:59']),
+                ('label', IEX_MINUTE_DATE_FORMAT, ['9 AM', '12 PM'])]:
+            df = pd.DataFrame({src_col: vals})
+            args = {
+                'df': df,
+                'use_date_str': '2019-02-15',
+                'src_col': src_col
+            }
+            if src_format:
+                args['src_date_format'] = src_format
+            self.assertEqual(
+                dataset_utils.build_dates_from_df_col(**args),
+                bench_iex.build_date_rows(**args))
+    # end of test_build_dates_matches_row_loop
+
+    def test_daily_labels(self):
+        """test_daily_labels"""
+        df = pd.DataFrame({
+            'label': ['Aug 29, 18', 'Oct 3'],
+            'close': [1.0, 2.0]
+        })
+        out_df = dataset_utils.ingress_scrub_dataset(
+            label='test-daily-labels',
+            datafeed_type=iex_consts.DATAFEED_DAILY,
+            df=df)
+        self.assertEqual(
+            out_df['date'].iloc[0],
+            pd.Timestamp('2018-08-29'))
+        self.assertEqual(out_df['date'].iloc[1].month, 10)
+        self.assertEqual(out_df['date'].iloc[1].day, 3)
+    # end of test_daily_labels
+
+    def test_fetch_minute_keeps_datetime64(self):
+        """test_fetch_minute_keeps_datetime64"""
+        resp_json = mock_iex.build_minute_chart(
+            date_str='2019-02-15',
+            num_minutes=30)
+        df = iex_fetch.fetch_minute(
+            ticker='SPY',
+            resp_json=resp_json)
+        self.assertTrue(
+            pd.api.types.is_datetime64_any_dtype(df['date']))
+        self.assertEqual(
+            df['date'].iloc[0],
+            pd.Timestamp('2019-02-15 09:30:00'))
+        cache_df = iex_helpers.format_datetime_columns(
+            df=df)
+        self.assertEqual(
+            cache_df['date'].iloc[-1],
+            '2019-02-15 09:59:00')
+        # the fetched frame is not modified
+        self.assertTrue(
+            pd.api.types.is_datetime64_any_dtype(df['date']))
+        self.assertTrue(
+            cache_df.equals(
+                bench_iex.normalize_minute_rows(resp_json)))
+    # end of test_fetch_minute_keeps_datetime64
+
+    def test_fetch_minute_format_dates(self):
+        """test_fetch_minute_format_dates"""
+        resp_json = mock_iex.build_minute_chart(
+            date_str='2019-02-15',
+            num_minutes=30)
+        df = iex_fetch.fetch_minute(
+            ticker='SPY',
+            resp_json=resp_json,
+            format_dates=True)
+        self.assertEqual(
+            df['date'].iloc[0],
+            '2019-02-15 09:30:00')
+        self.assertTrue(
+            df.equals(
+                bench_iex.normalize_minute_rows(resp_json)))
+    # end of test_fetch_minute_format_dates
+
+# end of TestIEXIngest
@@ -0,0 +1,259 @@
+"""
+Test file for - IEX conditional-request response cache
+"""
+
+import json
+import tempfile
+import mock
+import analysis_engine.iex.response_cache as iex_cache
+from analysis_engine.mocks.mock_redis import MockRedis
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class MockIEXResponse:
+    """MockIEXResponse"""
+
+    def __init__(
+            self,
+            status_code,
+            data=None,
+            headers=None):
+        """__init__
+
+        :param status_code: HTTP status code
+        :param data: json response data
+        :param headers: response headers
+        """
+        self.status_code = status_code
+        self.data = data
+        self.content = json.dumps(data).encode('utf-8')
+        self.text = self.content.decode('utf-8')
+        self.headers = headers or {}
+    # end of __init__
+
+    def json(
+            self):
+        """json"""
+        return self.data
+    # end of json
+
+# end of MockIEXResponse
+
+
+class TestIEXResponseCache(BaseTestCase):
+    """TestIEXResponseCache"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.dir_patch = mock.patch(
+            'analysis_engine.iex.consts.IEX_CACHE_DIR',
+            self.tmp_dir.name)
+        self.dir_patch.start()
+        iex_cache.reset_metrics()
+        self.url = '/stock/SPY/financials'
+        self.responses = []
+        self.requests = []
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        self.dir_patch.stop()
+        self.tmp_dir.cleanup()
+        iex_cache.reset_metrics()
+        super().tearDown()
+    # end of tearDown
+
+    def mock_send(
+            self,
+            url,
+            token=None,
+            headers=None):
+        """mock_send
+
+        :param url: IEX resource url
+        :param token: IEX token
+        :param headers: request headers
+        """
+        self.requests.append({
+            'url': url,
+            'token': token,
+            'headers': headers
+        })
+        return self.responses.pop(0)
+    # end of mock_send
+
+    def get(
+            self,
+            now,
+            backend=None):
+        """get
+
+        :param now: epoch seconds for the request
+        :param backend: optional - cache backend
+        """
+        return iex_cache.get_with_cache(
+            url=self.url,
+            send_func=self.mock_send,
+            token='secret',
+            backend=backend,
+            now=now)
+    # end of get
+
+    def test_endpoint_and_key(self):
+        """test_endpoint_and_key"""
+        self.assertEqual(
+            iex_cache.get_endpoint('/stock/SPY/dividends/3m'),
+            'dividends')
+        self.assertIsNone(
+            iex_cache.get_endpoint('/stock/SPY/chart/1d'))
+        self.assertIsNone(
+            iex_cache.get_endpoint(
+                '/stock/market/batch?symbols=SPY&types=stats'))
+        self.assertEqual(
+            iex_cache.get_cache_key(
+                '/stock/SPY/stats?token=secret&period=annual'),
+            '/stock/SPY/stats?period=annual')
+    # end of test_endpoint_and_key
+
+    def test_fresh_hit_skips_request(self):
+        """test_fresh_hit_skips_request"""
+        data = {'financials': [{'totalRevenue': 100}]}
+        self.responses.append(MockIEXResponse(200, data))
+        self.assertEqual(self.get(now=1000.0), data)
+        self.assertEqual(self.get(now=2000.0), data)
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(iex_cache.get_last_state()['status'], 'hit')
+        metrics = iex_cache.get_metrics('financials')
+        self.assertEqual(metrics['miss'], 1)
+        self.assertEqual(metrics['hit'], 1)
+        self.assertEqual(
+            metrics['bytes_saved'],
+            len(json.dumps(data)))
+        self.assertEqual(metrics['credits_saved'], 5000)
+        self.assertEqual(
+            iex_cache.get_metrics()['total']['requests'],
+            2)
+    # end of test_fresh_hit_skips_request
+
+    def test_stale_entry_sends_conditional_request(self):
+        """test_stale_entry_sends_conditional_request"""
+        data = {'financials': [{'totalRevenue': 100}]}
+        self.responses.append(MockIEXResponse(
+            200,
+            data,
+            headers={
+                'ETag': '"v1"',
+                'Last-Modified': 'Fri, 15 Feb 2019 21:00:00 GMT'
+            }))
+        self.responses.append(MockIEXResponse(304))
+        self.get(now=1000.0)
+        self.assertEqual(self.get(now=1000.0 + 86400), data)
+        self.assertIsNone(self.requests[0]['headers'])
+        self.assertEqual(
+            self.requests[1]['headers'],
+            {
+                'If-None-Match': '"v1"',
+                'If-Modified-Since': 'Fri, 15 Feb 2019 21:00:00 GMT'
+            })
+        self.assertEqual(
+            iex_cache.get_last_state()['status'],
+            'not_modified')
+        self.assertEqual(
+            iex_cache.get_metrics('financials')['not_modified'],
+            1)
+    # end of test_stale_entry_sends_conditional_request
+
+    def test_entries_expire(self):
+        """test_entries_expire"""
+        data = {'financials': [{'totalRevenue': 100}]}
+        self.responses.append(MockIEXResponse(200, data))
+        self.responses.append(MockIEXResponse(200, data))
+        self.get(now=1000.0)
+        key = iex_cache.get_cache_key(self.url)
+        self.assertIsNotNone(iex_cache.get_entry(
+            key=key,
+            now=1000.0 + 86400))
+        with mock.patch(
+                'analysis_engine.iex.consts.IEX_CACHE_ENTRY_SECONDS',
+                3600):
+            self.assertIsNone(iex_cache.get_entry(
+                key=key,
+                now=1000.0 + 86400))
+            # the expired entry was removed so the
+            # next fetch is not a conditional request
+            self.get(now=1000.0 + 86400)
+            self.assertIsNone(self.requests[1]['headers'])
+            self.assertEqual(
+                iex_cache.get_last_state()['status'],
+                'miss')
+            redis_client = mock.Mock()
+            with mock.patch.dict(
+                    iex_cache.CACHE_STATE,
+                    {'client': redis_client}):
+                iex_cache.set_entry(
+                    key=key,
+                    entry={'fetched': 1000.0},
+                    backend='redis')
+            self.assertEqual(
+                redis_client.set.call_args[1]['ex'],
+                3600)
+    # end of test_entries_expire
+
+    def test_publish_tracking(self):
+        """test_publish_tracking"""
+        client = MockRedis()
+        data = {'financials': [{'totalRevenue': 100}]}
+        changed = {'financials': [{'totalRevenue': 200}]}
+        self.responses.append(MockIEXResponse(200, data))
+        self.responses.append(MockIEXResponse(200, data))
+        self.responses.append(MockIEXResponse(200, changed))
+        with mock.patch.dict(
+                iex_cache.CACHE_STATE,
+                {'client': client}):
+            self.get(now=1000.0, backend='redis')
+            state = iex_cache.get_last_state()
+            self.assertFalse(iex_cache.is_published(
+                state=state,
+                publish_key='SPY_2019-02-15_financials'))
+            iex_cache.mark_published(
+                state=state,
+                publish_key='SPY_2019-02-15_financials',
+                backend='redis')
+            client.set('SPY_2019-02-15_financials', b'published')
+
+            # the same response is not published again
+            self.get(now=1000.0 + 86400, backend='redis')
+            state = iex_cache.get_last_state()
+            self.assertEqual(state['status'], 'not_modified')
+            self.assertTrue(iex_cache.is_published(
+                state=state,
+                publish_key='SPY_2019-02-15_financials',
+                backend='redis'))
+            # an expired or flushed dataset is published again
+            client.delete('SPY_2019-02-15_financials')
+            self.assertFalse(iex_cache.is_published(
+                state=state,
+                publish_key='SPY_2019-02-15_financials',
+                backend='redis'))
+            client.set('SPY_2019-02-15_financials', b'published')
+            # a new date key still gets published
+            self.assertFalse(iex_cache.is_published(
+                state=state,
+                publish_key='SPY_2019-02-19_financials',
+                backend='redis'))
+
+            # a changed response is published
+            self.assertEqual(
+                self.get(now=1000.0 + 2 * 86400, backend='redis'),
+                changed)
+            self.assertFalse(iex_cache.is_published(
+                state=iex_cache.get_last_state(),
+                publish_key='SPY_2019-02-15_financials',
+                backend='redis'))
+    # end of test_publish_tracking
+
+# end of TestIEXResponseCache
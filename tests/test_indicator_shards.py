@@ -0,0 +1,389 @@
+"""
+Test file for - sharded indicator precomputation with a
+sequential trade replay
+"""
+
+import json
+import mock
+import celery.exceptions
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.algo as base_algo
+import analysis_engine.algo_result_store as algo_result_store
+import analysis_engine.indicator_shards as indicator_shards
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+def willr(
+        high,
+        low,
+        close,
+        timeperiod):
+    """willr
+
+    Williams %R for tests without TA-Lib
+
+    :param high: high values
+    :param low: low values
+    :param close: close values
+    :param timeperiod: number of values
+    """
+    highest = np.max(high[-timeperiod:])
+    lowest = np.min(low[-timeperiod:])
+    value = -50.0
+    if highest != lowest:
+        value = (highest - close[-1]) / (highest - lowest) * -100.0
+    return np.array([value])
+# end of willr
+
+
+def build_indicator(
+        name,
+        path,
+        uses_data,
+        num_points,
+        buy_below,
+        sell_above):
+    """build_indicator
+
+    :param name: indicator name
+    :param path: module path
+    :param uses_data: dataset name
+    :param num_points: lookback rows
+    :param buy_below: buy threshold
+    :param sell_above: sell threshold
+    """
+    return {
+        'name': name,
+        'module_path': path,
+        'category': 'technical',
+        'type': 'momentum',
+        'uses_data': uses_data,
+        'num_points': num_points,
+        'buy_below': buy_below,
+        'sell_above': sell_above
+    }
+# end of build_indicator
+
+
+class TestIndicatorShards(BaseTestCase):
+    """TestIndicatorShards"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.minute_df = pd.DataFrame(json.loads(
+            open('tests/datasets/spy-minute.json', 'r').read()))
+        self.minute_df['date'] = pd.to_datetime(
+            self.minute_df['date']).dt.tz_localize(None)
+        self.daily_df = pd.DataFrame(json.loads(
+            open('tests/datasets/spy-daily.json', 'r').read()))
+        self.daily_df['date'] = pd.to_datetime(self.daily_df['date'])
+        self.willr_path = (
+            'analysis_engine/mocks/example_indicator_williamsr.py')
+        self.willr_open_path = (
+            'analysis_engine/mocks/example_indicator_williamsr_open.py')
+    # end of setUp
+
+    def build_data(
+            self,
+            num_days):
+        """build_data
+
+        :param num_days: number of days of minute data
+        """
+        nodes = []
+        for day in range(num_days):
+            minute_df = self.minute_df.copy()
+            minute_df['date'] = minute_df['date'] + pd.Timedelta(days=day)
+            wave = np.sin(np.arange(len(minute_df.index)) / (3.0 + day))
+            for column in ['open', 'high', 'low', 'close']:
+                minute_df[column] = minute_df[column] + wave
+            use_date = minute_df['date'].iloc[0].strftime('%Y-%m-%d')
+            nodes.append({
+                'id': f'SPY_{use_date}',
+                'date': use_date,
+                'data': {
+                    'daily': self.daily_df.iloc[0:60 + day],
+                    'minute': minute_df,
+                    'calls': pd.DataFrame([]),
+                    'puts': pd.DataFrame([])
+                }
+            })
+        return {
+            'SPY': nodes
+        }
+    # end of build_data
+
+    def build_config(
+            self,
+            timeseries):
+        """build_config
+
+        :param timeseries: ``minute`` or ``day``
+        """
+        uses_data = 'minute' if timeseries == 'minute' else 'daily'
+        return {
+            'name': 'test-shards',
+            'ticker': 'SPY',
+            'timeseries': timeseries,
+            'trade_strategy': 'count',
+            'balance': 10000.0,
+            'buy_shares': 5,
+            'positions': {},
+            'buy_rules': {
+                'min_indicators': 1
+            },
+            'sell_rules': {
+                'min_indicators': 2
+            },
+            'indicators': [
+                build_indicator(
+                    name='willr_close',
+                    path=self.willr_path,
+                    uses_data=uses_data,
+                    num_points=10,
+                    buy_below=-80,
+                    sell_above=-20),
+                build_indicator(
+                    name='willr_open',
+                    path=self.willr_open_path,
+                    uses_data=uses_data,
+                    num_points=15,
+                    buy_below=-90,
+                    sell_above=-10),
+                build_indicator(
+                    name='willr_daily',
+                    path=self.willr_path,
+                    uses_data='daily',
+                    num_points=20,
+                    buy_below=-70,
+                    sell_above=-30)
+            ]
+        }
+    # end of build_config
+
+    def run_algo(
+            self,
+            timeseries,
+            num_days,
+            num_shards=0,
+            **kwargs):
+        """run_algo
+
+        :param timeseries: ``minute`` or ``day``
+        :param num_days: number of days of data
+        :param num_shards: shards (``0`` runs ``handle_data``)
+        :param kwargs: ``run_sharded_backtest`` keyword arguments
+        """
+        algo = base_algo.BaseAlgo(
+            ticker='SPY',
+            balance=10000.0,
+            config_dict=self.build_config(
+                timeseries=timeseries))
+        data = self.build_data(
+            num_days=num_days)
+        with mock.patch(
+                'analysis_engine.ae_talib.WILLR',
+                new=willr):
+            if num_shards:
+                indicator_shards.run_sharded_backtest(
+                    algo=algo,
+                    data=data,
+                    num_shards=num_shards,
+                    **kwargs)
+            else:
+                algo.handle_data(
+                    data=data)
+        return algo
+    # end of run_algo
+
+    def assert_same_results(
+            self,
+            expected,
+            algo):
+        """assert_same_results
+
+        :param expected: ``BaseAlgo`` from ``handle_data``
+        :param algo: ``BaseAlgo`` from ``run_sharded_backtest``
+        """
+        self.assertEqual(algo.get_balance(), expected.get_balance())
+        self.assertEqual(algo.get_owned_shares('SPY'),
+                         expected.get_owned_shares('SPY'))
+        # ``created`` is the wall clock time of the trade record
+        for name in ['buys', 'sells', 'order_history']:
+            pd.testing.assert_frame_equal(
+                pd.DataFrame(getattr(algo, name)).drop(
+                    columns=['created'],
+                    errors='ignore'),
+                pd.DataFrame(getattr(expected, name)).drop(
+                    columns=['created'],
+                    errors='ignore'))
+    # end of assert_same_results
+
+    def test_shards_overlap_by_lookback(self):
+        """test_shards_overlap_by_lookback"""
+        config_dict = self.build_config(
+            timeseries='minute')
+        lookback = indicator_shards.get_lookback(
+            config_dict=config_dict)
+        self.assertEqual(lookback, 20)
+        steps = indicator_shards.build_steps(
+            data=self.build_data(num_days=2),
+            tickers=['SPY'],
+            timeseries_value=ae_consts.ALGO_TIMESERIES_MINUTE)
+        self.assertEqual(len(steps), 198)
+        shards = indicator_shards.build_shards(
+            steps=steps,
+            num_shards=4,
+            lookback=lookback)
+        self.assertEqual(sum(s['num_steps'] for s in shards), 198)
+        # the second shard starts mid-day with the lookback rows
+        segment = shards[1]['segments'][0]
+        self.assertEqual(segment['rows'][0], 51)
+        self.assertEqual(segment['start_row'], 30)
+        # a shard starting on a new day has nothing to warm up
+        self.assertEqual(shards[2]['segments'][-1]['start_row'], 0)
+        config_dict['indicators'][0].pop('num_points')
+        self.assertIsNone(indicator_shards.get_lookback(
+            config_dict=config_dict))
+    # end of test_shards_overlap_by_lookback
+
+    def test_minute_replay_matches_base_algo(self):
+        """test_minute_replay_matches_base_algo"""
+        expected = self.run_algo(
+            timeseries='minute',
+            num_days=3)
+        self.assertGreater(len(expected.get_buys()), 0)
+        self.assertGreater(len(expected.get_sells()), 0)
+        algo = self.run_algo(
+            timeseries='minute',
+            num_days=3,
+            num_shards=5,
+            max_workers=1)
+        self.assert_same_results(
+            expected=expected,
+            algo=algo)
+        self.assertEqual(algo.iproc.num_replayed, 297)
+        self.assertEqual(algo.iproc.num_computed, 0)
+    # end of test_minute_replay_matches_base_algo
+
+    def test_daily_replay_matches_base_algo(self):
+        """test_daily_replay_matches_base_algo"""
+        expected = self.run_algo(
+            timeseries='day',
+            num_days=6)
+        algo = self.run_algo(
+            timeseries='day',
+            num_days=6,
+            num_shards=4,
+            max_workers=1)
+        self.assert_same_results(
+            expected=expected,
+            algo=algo)
+        self.assertEqual(algo.iproc.num_replayed, 6)
+    # end of test_daily_replay_matches_base_algo
+
+    def test_shard_request_through_redis(self):
+        """test_shard_request_through_redis"""
+        client = mock_redis.MockRedis()
+        config_dict = self.build_config(
+            timeseries='minute')
+        data = self.build_data(
+            num_days=2)
+        lookback = indicator_shards.get_lookback(
+            config_dict=config_dict)
+        shard = indicator_shards.build_shards(
+            steps=indicator_shards.build_steps(
+                data=data,
+                tickers=['SPY'],
+                timeseries_value=ae_consts.ALGO_TIMESERIES_MINUTE),
+            num_shards=3,
+            lookback=lookback)[1]
+        nodes = indicator_shards.build_shard_input(
+            data=data,
+            shard=shard,
+            lookback=lookback)
+        input_ref = indicator_shards.store_shard_data(
+            data=indicator_shards.encode_shard_input(
+                nodes=nodes),
+            client=client)
+        with mock.patch(
+                'analysis_engine.ae_talib.WILLR',
+                new=willr):
+            output_ref = indicator_shards.run_shard_request(
+                work_dict={
+                    'config_dict': config_dict,
+                    'shard': shard,
+                    'lookback': lookback,
+                    'input_ref': input_ref
+                },
+                client=client)
+            local = algo_result_store.decode_result(
+                data=indicator_shards.compute_shard(
+                    config_dict=config_dict,
+                    shard=shard,
+                    nodes=nodes,
+                    lookback=lookback))
+        remote = algo_result_store.load_result(
+            ref=output_ref,
+            client=client)
+        self.assertEqual(remote['summary']['num_steps'], 66)
+        pd.testing.assert_frame_equal(
+            remote['reports'],
+            local['reports'])
+    # end of test_shard_request_through_redis
+
+    def test_timed_out_shard_is_computed_locally(self):
+        """test_timed_out_shard_is_computed_locally"""
+        config_dict = self.build_config(
+            timeseries='minute')
+        data = self.build_data(
+            num_days=2)
+        lookback = indicator_shards.get_lookback(
+            config_dict=config_dict)
+        shard = indicator_shards.build_shards(
+            steps=indicator_shards.build_steps(
+                data=data,
+                tickers=['SPY'],
+                timeseries_value=ae_consts.ALGO_TIMESERIES_MINUTE),
+            num_shards=3,
+            lookback=lookback)[1]
+        shard_task = mock.Mock()
+        shard_task.get.side_effect = celery.exceptions.TimeoutError()
+        with mock.patch(
+                'analysis_engine.ae_talib.WILLR',
+                new=willr):
+            res = indicator_shards.get_shard_result(
+                shard_task=shard_task,
+                config_dict=config_dict,
+                shard=shard,
+                data=data,
+                lookback=lookback,
+                client=mock_redis.MockRedis(),
+                timeout=0.5)
+        shard_task.get.assert_called_with(
+            timeout=0.5,
+            disable_sync_subtasks=False)
+        shard_task.revoke.assert_called_once_with()
+        self.assertEqual(res['summary']['num_steps'], 66)
+
+        shard_task = mock.Mock()
+        shard_task.get.return_value = {
+            'status': ae_consts.ERR,
+            'err': 'test failure'
+        }
+        with self.assertRaises(Exception):
+            indicator_shards.get_shard_result(
+                shard_task=shard_task,
+                config_dict=config_dict,
+                shard=shard,
+                data=data,
+                lookback=lookback,
+                client=mock_redis.MockRedis())
+    # end of test_timed_out_shard_is_computed_locally
+
+# end of TestIndicatorShards
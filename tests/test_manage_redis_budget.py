@@ -0,0 +1,195 @@
+"""
+Test file for - redis keyspace budget manager and the
+S3 extraction fallback
+"""
+
+import json
+import zlib
+import datetime
+import mock
+import pandas as pd
+import analysis_engine.extract_utils as extract_utils
+import analysis_engine.manage_redis_budget as budget
+import analysis_engine.mocks.mock_boto3_s3 as mock_s3
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+from analysis_engine.iex.consts import DATAFEED_MINUTE
+
+
+MOCK_S3 = mock_s3.MockBotoS3()
+MOCK_REDIS = mock_redis.MockRedis()
+
+
+def build_shared_s3(
+        *args,
+        **kwargs):
+    """build_shared_s3
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_S3
+# end of build_shared_s3
+
+
+def build_shared_redis(
+        *args,
+        **kwargs):
+    """build_shared_redis
+
+    :param args: positional args
+    :param kwargs: keyword args dict
+    """
+    return MOCK_REDIS
+# end of build_shared_redis
+
+
+def build_minute_value(
+        date_str,
+        num_rows=10):
+    """build_minute_value
+
+    Build a redis value like ``publish_pricing_update``
+
+    :param date_str: date for the minute bars
+    :param num_rows: number of minute bars
+    """
+    df = pd.DataFrame([
+        {
+            'date': f'{date_str} 09:{30 + idx:02d}:00',
+            'close': 100.0 + idx,
+            'volume': 1000 + idx
+        }
+        for idx in range(num_rows)
+    ])
+    data = df.to_json(orient='records', date_format='iso')
+    return zlib.compress(json.dumps(data).encode('utf-8'))
+# end of build_minute_value
+
+
+@mock.patch(
+    'boto3.resource',
+    new=build_shared_s3)
+@mock.patch(
+    'redis.Redis',
+    new=build_shared_redis)
+class TestManageRedisBudget(BaseTestCase):
+    """TestManageRedisBudget"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        MOCK_REDIS.cache_dict = {}
+        # 2019-01-02 through 2019-01-08 skipping the weekend
+        self.dates = [
+            '2019-01-02',
+            '2019-01-03',
+            '2019-01-04',
+            '2019-01-07',
+            '2019-01-08'
+        ]
+        for date_str in self.dates:
+            MOCK_REDIS.set(
+                name=f'SPY_{date_str}_minute',
+                value=build_minute_value(date_str))
+            MOCK_REDIS.set(
+                name=f'SPY_{date_str}_daily',
+                value=build_minute_value(date_str, num_rows=1))
+        MOCK_REDIS.set(
+            name='SPY_latest',
+            value=b'not a dataset key')
+        self.today = datetime.datetime(2019, 1, 8)
+    # end of setUp
+
+    def test_parse_dataset_key(self):
+        """test_parse_dataset_key"""
+        self.assertEqual(
+            budget.parse_dataset_key(b'SPY_2019-01-02_tdcalls'),
+            {
+                'ticker': 'SPY',
+                'date': '2019-01-02',
+                'dataset': 'tdcalls'
+            })
+        self.assertIsNone(budget.parse_dataset_key('SPY_latest'))
+    # end of test_parse_dataset_key
+
+    def test_dry_run_report(self):
+        """test_dry_run_report"""
+        res = budget.manage_redis_budget(
+            hot_days=2,
+            datasets=['minute'],
+            today=self.today)
+        self.assertEqual(res['status'], SUCCESS)
+        rec = res['rec']
+        self.assertEqual(rec['num_keys'], 10)
+        self.assertEqual(rec['cutoff_date'], '2019-01-07')
+        self.assertEqual(
+            sorted(rec['usage']['SPY'].keys()),
+            ['daily', 'minute'])
+        self.assertEqual(
+            [node['date'] for node in rec['offload']],
+            self.dates[:3])
+        self.assertEqual(rec['num_offloaded'], 0)
+        # nothing changed in dry-run mode
+        self.assertTrue('SPY_2019-01-02_minute' in MOCK_REDIS.cache_dict)
+    # end of test_dry_run_report
+
+    def test_offload_by_budget(self):
+        """test_offload_by_budget"""
+        one_key_bytes = budget.get_key_size(
+            client=MOCK_REDIS,
+            key='SPY_2019-01-08_minute')
+        res = budget.manage_redis_budget(
+            hot_days=5,
+            datasets=['minute'],
+            max_mb=(one_key_bytes * 2) / (1024 * 1024),
+            today=self.today)
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(
+            [node['reason'] for node in res['rec']['offload']],
+            ['budget'] * 3)
+    # end of test_offload_by_budget
+
+    def test_offload_and_extract_from_s3(self):
+        """test_offload_and_extract_from_s3"""
+        res = budget.manage_redis_budget(
+            hot_days=2,
+            datasets=['minute'],
+            s3_bucket='testbudget',
+            today=self.today,
+            dry_run=False)
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(res['rec']['num_offloaded'], 3)
+        self.assertTrue(res['rec']['bytes_freed'] > 0)
+        key = 'SPY_2019-01-02_minute'
+        self.assertTrue(key not in MOCK_REDIS.cache_dict)
+        self.assertTrue('SPY_2019-01-02_daily' in MOCK_REDIS.cache_dict)
+        self.assertTrue('SPY_2019-01-08_minute' in MOCK_REDIS.cache_dict)
+
+        work_dict = {
+            'ticker': 'SPY',
+            'redis_key': key,
+            's3_key': key,
+            's3_bucket': 'testbudget',
+            's3_enabled': True,
+            's3_fallback': True
+        }
+        status, df = extract_utils.perform_extract(
+            df_type=DATAFEED_MINUTE,
+            df_str='minute',
+            work_dict=work_dict)
+        self.assertEqual(status, SUCCESS)
+        self.assertEqual(len(df.index), 10)
+        self.assertEqual(df['close'].iloc[-1], 109.0)
+
+        work_dict['s3_fallback'] = False
+        status, df = extract_utils.perform_extract(
+            df_type=DATAFEED_MINUTE,
+            df_str='minute',
+            work_dict=work_dict)
+        self.assertIsNone(df)
+    # end of test_offload_and_extract_from_s3
+
+# end of TestManageRedisBudget
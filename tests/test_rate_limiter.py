@@ -0,0 +1,189 @@
+"""
+Test file for - provider token-bucket rate limits
+"""
+
+import time
+import mock
+import analysis_engine.rate_limiter as rate_limiter
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class MockResponse:
+    """MockResponse"""
+
+    def __init__(
+            self,
+            status_code):
+        """__init__
+
+        :param status_code: HTTP status code
+        """
+        self.status_code = status_code
+        self.headers = {}
+    # end of __init__
+
+# end of MockResponse
+
+
+class MockThrottledSession:
+    """MockThrottledSession"""
+
+    def __init__(
+            self,
+            status_codes):
+        """__init__
+
+        :param status_codes: list of status codes to return
+        """
+        self.status_codes = list(status_codes)
+        self.urls = []
+    # end of __init__
+
+    def get(
+            self,
+            url,
+            **kwargs):
+        """get
+
+        :param url: requested url
+        :param kwargs: not used - request args
+        """
+        self.urls.append(url)
+        return MockResponse(self.status_codes.pop(0))
+    # end of get
+
+# end of MockThrottledSession
+
+
+class TestRateLimiter(BaseTestCase):
+    """TestRateLimiter"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        rate_limiter.reset_metrics()
+        rate_limiter.REDIS_STATE['disabled_until'] = 0.0
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        rate_limiter.reset_metrics()
+        rate_limiter.REDIS_STATE['disabled_until'] = 0.0
+        super().tearDown()
+    # end of tearDown
+
+    def test_local_bucket_waits_for_tokens(self):
+        """test_local_bucket_waits_for_tokens"""
+        limiter = rate_limiter.TokenBucketLimiter(
+            provider='test',
+            rate=20,
+            capacity=2,
+            backend='local')
+        self.assertEqual(limiter.acquire(), 0.0)
+        self.assertEqual(limiter.acquire(), 0.0)
+        start = time.monotonic()
+        waited = limiter.acquire()
+        self.assertTrue(waited > 0.0)
+        self.assertTrue(time.monotonic() - start >= 0.04)
+    # end of test_local_bucket_waits_for_tokens
+
+    def test_disabled_limit(self):
+        """test_disabled_limit"""
+        limiter = rate_limiter.TokenBucketLimiter(
+            provider='test',
+            rate=0,
+            backend='local')
+        for _ in range(100):
+            self.assertEqual(limiter.acquire(), 0.0)
+    # end of test_disabled_limit
+
+    def test_redis_script_wait(self):
+        """test_redis_script_wait"""
+        calls = []
+        waits = [20, 0]
+
+        def mock_script(
+                keys,
+                args):
+            calls.append((keys, args))
+            return waits.pop(0)
+
+        limiter = rate_limiter.TokenBucketLimiter(
+            provider='iex',
+            rate=50,
+            capacity=100,
+            script=mock_script)
+        self.assertAlmostEqual(limiter.acquire(), 0.02)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(calls[0][0], ['ae:ratelimit:iex'])
+        self.assertEqual(calls[0][1], [50.0, 100.0, 1])
+    # end of test_redis_script_wait
+
+    @mock.patch(
+        'analysis_engine.rate_limiter.get_redis_script',
+        side_effect=Exception('test redis is down'))
+    def test_redis_fallback_to_local(
+            self,
+            mock_get_script):
+        """test_redis_fallback_to_local
+
+        :param mock_get_script: patched redis script getter
+        """
+        limiter = rate_limiter.TokenBucketLimiter(
+            provider='iex',
+            rate=10,
+            capacity=1,
+            backend='redis')
+        self.assertEqual(limiter.try_acquire(), 0.0)
+        self.assertTrue(limiter.try_acquire() > 0.0)
+        self.assertTrue(
+            rate_limiter.REDIS_STATE['disabled_until'] > time.time())
+    # end of test_redis_fallback_to_local
+
+    @mock.patch(
+        'analysis_engine.rate_limiter.get_backoff_seconds',
+        return_value=0.0)
+    def test_limited_get_retries_429(
+            self,
+            mock_backoff):
+        """test_limited_get_retries_429
+
+        :param mock_backoff: patched backoff
+        """
+        rate_limiter.LIMITERS['test'] = rate_limiter.TokenBucketLimiter(
+            provider='test',
+            rate=0)
+        session = MockThrottledSession([429, 429, 200])
+        res = rate_limiter.limited_get(
+            provider='test',
+            url='http://test/quote',
+            session=session)
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(session.urls), 3)
+        metrics = rate_limiter.get_metrics('test')
+        self.assertEqual(metrics['requests'], 3)
+        self.assertEqual(metrics['throttled'], 2)
+        self.assertTrue(metrics['requests_per_second'] > 0)
+
+        session = MockThrottledSession([429, 429])
+        res = rate_limiter.limited_get(
+            provider='test',
+            url='http://test/quote',
+            session=session,
+            max_retries=1)
+        self.assertEqual(res.status_code, 429)
+    # end of test_limited_get_retries_429
+
+    def test_backoff_is_capped(self):
+        """test_backoff_is_capped"""
+        for attempt in range(10):
+            backoff = rate_limiter.get_backoff_seconds(
+                attempt=attempt,
+                base=0.5,
+                max_seconds=2.0)
+            self.assertTrue(0.0 <= backoff <= 2.0)
+    # end of test_backoff_is_capped
+
+# end of TestRateLimiter
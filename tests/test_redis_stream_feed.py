@@ -0,0 +1,121 @@
+"""
+Test file for - redis stream feed for live minute bars
+"""
+
+import json
+import analysis_engine.mocks.mock_redis as mock_redis
+import analysis_engine.publish_to_stream as publish_to_stream
+import analysis_engine.get_bars_from_stream as get_bars_from_stream
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+from analysis_engine.consts import EMPTY
+
+
+def build_minute_bars(
+        start_min,
+        num_bars):
+    """build_minute_bars
+
+    :param start_min: starting minute for the hour ``09:MM``
+    :param num_bars: number of bars to build
+    """
+    bars = []
+    for idx in range(num_bars):
+        bars.append({
+            'date': f'2019-01-02 09:{start_min + idx:02d}:00',
+            'open': 100.0 + idx,
+            'high': 101.0 + idx,
+            'low': 99.0 + idx,
+            'close': 100.5 + idx,
+            'volume': 1000 + idx
+        })
+    return bars
+# end of build_minute_bars
+
+
+class TestRedisStreamFeed(BaseTestCase):
+    """TestRedisStreamFeed"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.client = mock_redis.MockRedis()
+        self.ticker = 'SPY'
+    # end of setUp
+
+    def test_publish_only_new_bars(self):
+        """test_publish_only_new_bars"""
+        res = publish_to_stream.publish_to_stream(
+            client=self.client,
+            ticker=self.ticker,
+            dataset='minute',
+            data=json.dumps(build_minute_bars(30, 3)))
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(res['rec']['num_added'], 3)
+        self.assertEqual(res['rec']['stream_key'], 'stream:SPY:minute')
+
+        # republishing the whole day should only add the newest bar
+        res = publish_to_stream.publish_to_stream(
+            client=self.client,
+            ticker=self.ticker,
+            dataset='minute',
+            data=build_minute_bars(30, 4))
+        self.assertEqual(res['status'], SUCCESS)
+        self.assertEqual(res['rec']['num_added'], 1)
+        self.assertEqual(self.client.xlen('stream:SPY:minute'), 4)
+    # end of test_publish_only_new_bars
+
+    def test_publish_empty(self):
+        """test_publish_empty"""
+        res = publish_to_stream.publish_to_stream(
+            client=self.client,
+            ticker=self.ticker,
+            dataset='minute',
+            data='[]')
+        self.assertEqual(res['status'], EMPTY)
+    # end of test_publish_empty
+
+    def test_publish_caps_maxlen(self):
+        """test_publish_caps_maxlen"""
+        publish_to_stream.publish_to_stream(
+            client=self.client,
+            ticker=self.ticker,
+            dataset='minute',
+            data=build_minute_bars(0, 10),
+            maxlen=5)
+        self.assertEqual(self.client.xlen('stream:SPY:minute'), 5)
+    # end of test_publish_caps_maxlen
+
+    def test_consume_bars(self):
+        """test_consume_bars"""
+        publish_to_stream.publish_to_stream(
+            client=self.client,
+            ticker=self.ticker,
+            dataset='minute',
+            data=build_minute_bars(30, 3))
+        bars = list(get_bars_from_stream.get_bars_from_stream(
+            ticker=self.ticker,
+            client=self.client,
+            last_id='0',
+            max_empty_reads=1))
+        self.assertEqual(len(bars), 3)
+        self.assertEqual(bars[0]['date'], '2019-01-02 09:30:00')
+        self.assertEqual(bars[-1]['close'], 102.5)
+
+        # resume after the last seen id
+        publish_to_stream.publish_to_stream(
+            client=self.client,
+            ticker=self.ticker,
+            dataset='minute',
+            data=build_minute_bars(30, 5))
+        new_bars = list(get_bars_from_stream.get_bars_from_stream(
+            ticker=self.ticker,
+            client=self.client,
+            last_id=bars[-1]['stream_id'],
+            max_bars=1))
+        self.assertEqual(len(new_bars), 1)
+        self.assertEqual(new_bars[0]['date'], '2019-01-02 09:33:00')
+    # end of test_consume_bars
+
+# end of TestRedisStreamFeed
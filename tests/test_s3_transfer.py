@@ -0,0 +1,189 @@
+"""
+Test file for - parallel s3 transfers
+"""
+
+import os
+import json
+import zlib
+import mock
+import analysis_engine.consts as ae_consts
+import analysis_engine.s3_transfer as s3_transfer
+import analysis_engine.s3_read_contents_from_key as s3_read
+import analysis_engine.mocks.mock_boto3_s3 as mock_s3
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+# the tests use small parts that the mock s3 accepts
+@mock.patch(
+    'analysis_engine.consts.S3_MIN_PART_SIZE',
+    new=256)
+class TestS3Transfer(BaseTestCase):
+    """TestS3Transfer"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.s3 = mock_s3.MockBotoS3()
+        self.bucket = 'testtransfer'
+        self.key = 'SPY_2019-01-02'
+        self.data = os.urandom(10000)
+    # end of setUp
+
+    def test_multipart_upload_and_download(self):
+        """test_multipart_upload_and_download"""
+        s3_transfer.upload_data(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            data=self.data,
+            part_size=1024,
+            max_workers=4)
+        bucket = self.s3.Bucket(self.bucket)
+        self.assertEqual(len(bucket.part_lens[self.key]), 10)
+        head = self.s3.meta.client.head_object(
+            Bucket=self.bucket,
+            Key=self.key)
+        self.assertTrue(head['ETag'].endswith('-10"'))
+        contents = s3_transfer.download_key(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            part_size=1024,
+            max_workers=4)
+        self.assertEqual(contents, self.data)
+    # end of test_multipart_upload_and_download
+
+    def test_ranged_download(self):
+        """test_ranged_download"""
+        s3_transfer.upload_data(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            data=self.data)
+        self.assertTrue(
+            self.key not in self.s3.Bucket(self.bucket).part_lens)
+        contents = s3_transfer.download_key(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            part_size=999,
+            max_workers=3)
+        self.assertEqual(contents, self.data)
+    # end of test_ranged_download
+
+    def test_download_checksum_mismatch(self):
+        """test_download_checksum_mismatch"""
+        s3_transfer.upload_data(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            data=self.data,
+            part_size=1024)
+        client = self.s3.meta.client
+        head = client.head_object(
+            Bucket=self.bucket,
+            Key=self.key)
+        original_get = client.get_object
+
+        def corrupt_get_object(
+                **kwargs):
+            res = original_get(**kwargs)
+            body = bytearray(res['Body'].read())
+            body[0] = (body[0] + 1) % 256
+            res['Body'] = mock_s3.io.BytesIO(bytes(body))
+            return res
+
+        client.head_object = lambda **kwargs: head
+        client.get_object = corrupt_get_object
+        with self.assertRaises(Exception):
+            s3_transfer.download_key(
+                s3=self.s3,
+                s3_bucket=self.bucket,
+                s3_key=self.key,
+                part_size=1024)
+    # end of test_download_checksum_mismatch
+
+    def test_s3_read_contents_from_key_compressed(self):
+        """test_s3_read_contents_from_key_compressed"""
+        history = {
+            'SPY': [
+                {
+                    'close': 250.0 + idx
+                }
+                for idx in range(500)
+            ]
+        }
+        s3_transfer.upload_data(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            data=zlib.compress(json.dumps(history).encode('utf-8')),
+            part_size=512)
+        data = s3_read.s3_read_contents_from_key(
+            s3=self.s3,
+            s3_bucket_name=self.bucket,
+            s3_key=self.key,
+            convert_as_json=True,
+            compress=True,
+            part_size=512)
+        self.assertEqual(data, history)
+    # end of test_s3_read_contents_from_key_compressed
+
+    def test_upload_part_size_below_minimum(self):
+        """test_upload_part_size_below_minimum"""
+        with mock.patch(
+                'analysis_engine.consts.S3_MIN_PART_SIZE',
+                new=5242880):
+            with self.assertRaises(Exception):
+                s3_transfer.upload_data(
+                    s3=self.s3,
+                    s3_bucket=self.bucket,
+                    s3_key=self.key,
+                    data=self.data,
+                    part_size=1024)
+        self.assertEqual(self.s3.meta.client.uploads, {})
+        self.assertEqual(ae_consts.S3_MIN_PART_SIZE, 256)
+    # end of test_upload_part_size_below_minimum
+
+    def test_upload_part_retries(self):
+        """test_upload_part_retries"""
+        client = self.s3.meta.client
+        original_upload_part = client.upload_part
+        calls = []
+
+        def corrupt_first_upload_part(
+                **kwargs):
+            calls.append(kwargs['PartNumber'])
+            res = original_upload_part(**kwargs)
+            if len(calls) == 1:
+                res['ETag'] = '"00000000000000000000000000000000"'
+            return res
+
+        client.upload_part = corrupt_first_upload_part
+        s3_transfer.upload_data(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key,
+            data=self.data,
+            part_size=5000,
+            max_workers=1,
+            verify=True)
+        self.assertEqual(calls, [1, 1, 2])
+        contents = s3_transfer.download_key(
+            s3=self.s3,
+            s3_bucket=self.bucket,
+            s3_key=self.key)
+        self.assertEqual(contents, self.data)
+        with self.assertRaises(Exception):
+            s3_transfer.upload_part(
+                client=client,
+                s3_bucket=self.bucket,
+                s3_key=self.key,
+                upload_id='missing-upload',
+                part_number=1,
+                part=self.data,
+                retries=1)
+    # end of test_upload_part_retries
+
+# end of TestS3Transfer
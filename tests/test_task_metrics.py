@@ -0,0 +1,329 @@
+"""
+Test file for - task-level performance metrics
+"""
+
+import os
+import json
+import time
+import types
+import signal
+import functools
+import tempfile
+import urllib.request
+import mock
+import celery
+import analysis_engine.task_metrics as task_metrics
+import analysis_engine.mocks.mock_redis as mock_redis
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.work_tasks.custom_task import CustomTask
+
+
+class TestTaskMetrics(BaseTestCase):
+    """TestTaskMetrics"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        task_metrics.reset_metrics()
+        self.client = mock_redis.MockRedis()
+    # end of setUp
+
+    def tearDown(
+            self):
+        """tearDown"""
+        task_metrics.stop_http_server()
+        task_metrics.reset_metrics()
+    # end of tearDown
+
+    def record_runs(
+            self,
+            task_name,
+            run_times):
+        """record_runs
+
+        :param task_name: task name
+        :param run_times: list of run times in seconds
+        """
+        for run_seconds in run_times:
+            task_metrics.record_task(
+                task_name=task_name,
+                run_seconds=run_seconds,
+                queue_wait_seconds=0.02,
+                args=[{'ticker': 'SPY'}],
+                retval={'status': 0},
+                flush=False)
+    # end of record_runs
+
+    def test_custom_task_records_metrics(self):
+        """test_custom_task_records_metrics"""
+        app = celery.Celery('test-task-metrics')
+
+        @app.task(bind=True, base=CustomTask, name='ok_task')
+        def ok_task(self, work_dict):
+            return {'status': 0, 'rec': work_dict}
+
+        @app.task(bind=True, base=CustomTask, name='bad_task')
+        def bad_task(self, work_dict):
+            raise Exception('test failure')
+
+        with mock.patch.object(
+                task_metrics,
+                'flush_metrics') as flush, mock.patch(
+                    'analysis_engine.consts.TASK_METRICS_PAYLOAD_SIZES',
+                    True):
+            ok_task.apply(args=[{'ticker': 'SPY'}])
+            ok_task.apply(args=[{'ticker': 'SPY'}])
+            bad_task.apply(args=[{'ticker': 'SPY'}])
+            self.assertEqual(flush.call_count, 3)
+        metrics = task_metrics.get_metrics()
+        self.assertEqual(metrics['ok_task']['success'], 2)
+        self.assertEqual(metrics['ok_task']['run_seconds']['count'], 2)
+        self.assertEqual(
+            metrics['ok_task']['payload_in_bytes']['sum'],
+            2 * len('[{"ticker": "SPY"}]'))
+        self.assertEqual(
+            metrics['ok_task']['payload_out_bytes']['count'], 2)
+        # eager tasks are never published so there is no queue wait
+        self.assertEqual(
+            metrics['ok_task']['queue_wait_seconds']['count'], 0)
+        self.assertEqual(metrics['bad_task']['failure'], 1)
+        self.assertEqual(
+            metrics['bad_task']['payload_out_bytes']['count'], 0)
+
+        # payload sizes are off by default
+        task_metrics.reset_metrics()
+        ok_task.apply(args=[{'ticker': 'SPY'}])
+        metrics = task_metrics.get_metrics()
+        self.assertEqual(metrics['ok_task']['success'], 1)
+        self.assertEqual(
+            metrics['ok_task']['payload_in_bytes']['count'], 0)
+    # end of test_custom_task_records_metrics
+
+    def test_queue_wait_from_publish_header(self):
+        """test_queue_wait_from_publish_header"""
+        headers = {}
+        task_metrics.on_before_task_publish(
+            headers=headers)
+        published = headers[task_metrics.PUBLISHED_HEADER]
+        request = types.SimpleNamespace(
+            ae_published=published,
+            eta=None)
+        self.assertAlmostEqual(
+            task_metrics.get_queue_wait(
+                request=request,
+                start_time=published + 1.5),
+            1.5)
+        request = types.SimpleNamespace(
+            headers={
+                task_metrics.PUBLISHED_HEADER: published
+            },
+            eta=None)
+        self.assertAlmostEqual(
+            task_metrics.get_queue_wait(
+                request=request,
+                start_time=published + 2.0),
+            2.0)
+        self.assertIsNone(
+            task_metrics.get_queue_wait(
+                request=types.SimpleNamespace(headers=None),
+                start_time=published))
+        # countdown tasks only wait from their eta
+        eta_time = 1550241000.0
+        request = types.SimpleNamespace(
+            ae_published=eta_time - 10.0,
+            eta='2019-02-15T14:30:00+00:00')
+        self.assertAlmostEqual(
+            task_metrics.get_queue_wait(
+                request=request,
+                start_time=eta_time + 0.5),
+            0.5)
+    # end of test_queue_wait_from_publish_header
+
+    def test_p99_offender_and_prometheus_text(self):
+        """test_p99_offender_and_prometheus_text"""
+        self.record_runs(
+            task_name='get_new_pricing_data',
+            run_times=[0.2] * 100)
+        self.record_runs(
+            task_name='prepare_pricing_dataset',
+            run_times=[0.05] * 97 + [45.0] * 3)
+        task_metrics.record_retry(
+            task_name='get_new_pricing_data')
+        slowest = task_metrics.get_slowest_tasks(
+            metric='run_seconds',
+            quantile=0.99)
+        self.assertEqual(slowest[0]['task'], 'prepare_pricing_dataset')
+        self.assertGreater(slowest[0]['value'], 30.0)
+        # the median still looks fine
+        self.assertEqual(
+            task_metrics.get_slowest_tasks(
+                quantile=0.5)[0]['task'],
+            'get_new_pricing_data')
+
+        text = task_metrics.build_prometheus_text(
+            worker='w1')
+        self.assertIn('# TYPE ae_task_run_seconds histogram', text)
+        self.assertIn(
+            'ae_task_run_seconds_bucket{task="prepare_pricing_dataset",'
+            'worker="w1",le="0.05"} 97',
+            text)
+        self.assertIn(
+            'ae_task_run_seconds_bucket{task="prepare_pricing_dataset",'
+            'worker="w1",le="+Inf"} 100',
+            text)
+        self.assertIn(
+            'ae_task_retries_total{task="get_new_pricing_data",'
+            'worker="w1"} 1',
+            text)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = task_metrics.write_prometheus_file(
+                path=os.path.join(tmp_dir, 'metrics-{pid}.prom'))
+            self.assertTrue(path.endswith(f'metrics-{os.getpid()}.prom'))
+            self.assertEqual(os.listdir(tmp_dir), [os.path.basename(path)])
+
+        port = task_metrics.start_http_server(
+            port=19808,
+            host='127.0.0.1')
+        self.assertIsNotNone(port)
+        with urllib.request.urlopen(
+                f'http://127.0.0.1:{port}/metrics') as res:
+            body = res.read().decode('utf-8')
+        self.assertIn('ae_task_success_total', body)
+    # end of test_p99_offender_and_prometheus_text
+
+    def test_only_workers_export_and_remove_files(self):
+        """test_only_workers_export_and_remove_files"""
+        self.record_runs(
+            task_name='get_new_pricing_data',
+            run_times=[0.5])
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path_tmpl = os.path.join(tmp_dir, 'metrics-{pid}.prom')
+            with mock.patch(
+                    'analysis_engine.consts.TASK_METRICS_FILE',
+                    path_tmpl):
+                # cli tools running tasks inline never export
+                self.assertFalse(
+                    task_metrics.flush_metrics(
+                        export='file',
+                        now=1000.0))
+                self.assertEqual(os.listdir(tmp_dir), [])
+                task_metrics.on_worker_process_init()
+                self.assertTrue(
+                    task_metrics.flush_metrics(
+                        export='file',
+                        now=1000.0))
+                self.assertEqual(len(os.listdir(tmp_dir)), 1)
+                task_metrics.on_worker_process_shutdown()
+                self.assertEqual(os.listdir(tmp_dir), [])
+                self.assertFalse(
+                    task_metrics.EXPORT_STATE['worker'])
+    # end of test_only_workers_export_and_remove_files
+
+    def test_forked_workers_serve_their_own_metrics(self):
+        """test_forked_workers_serve_their_own_metrics"""
+        worker = types.SimpleNamespace(pool_cls='prefork')
+        with mock.patch(
+                'analysis_engine.consts.TASK_METRICS_EXPORT',
+                'http'):
+            # the prefork parent does not export
+            task_metrics.on_worker_init(
+                sender=worker)
+            self.assertFalse(task_metrics.EXPORT_STATE['worker'])
+            self.assertIsNone(task_metrics.EXPORT_STATE['http_server'])
+            # a parent server (like a solo worker) is inherited
+            parent_port = task_metrics.start_http_server(
+                port=19820,
+                host='127.0.0.1')
+            self.assertIsNotNone(parent_port)
+            read_fd, write_fd = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                status = 1
+                try:
+                    os.close(read_fd)
+                    task_metrics.record_task(
+                        task_name='child_task',
+                        run_seconds=0.1,
+                        flush=False)
+                    task_metrics.start_http_server = functools.partial(
+                        task_metrics.start_http_server,
+                        host='127.0.0.1')
+                    task_metrics.on_worker_process_init()
+                    port = task_metrics.EXPORT_STATE['http_port']
+                    with urllib.request.urlopen(
+                            f'http://127.0.0.1:{port}/metrics',
+                            timeout=5) as res:
+                        body = res.read().decode('utf-8')
+                    task_metrics.on_worker_process_shutdown()
+                    os.write(write_fd, json.dumps({
+                        'port': port,
+                        'served': 'child_task' in body,
+                        'stopped': (
+                            task_metrics.EXPORT_STATE['http_server']
+                            is None)
+                    }).encode('utf-8'))
+                    status = 0
+                finally:
+                    os._exit(status)
+            # end of the child process
+            os.close(write_fd)
+            for _ in range(100):
+                done_pid, status = os.waitpid(pid, os.WNOHANG)
+                if done_pid:
+                    break
+                time.sleep(0.1)
+            else:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                self.fail('the forked worker hung')
+            with os.fdopen(read_fd) as cur_file:
+                res = json.loads(cur_file.read())
+        self.assertEqual(status, 0)
+        self.assertNotEqual(res['port'], parent_port)
+        self.assertTrue(res['served'])
+        self.assertTrue(res['stopped'])
+        # the parent server still works after the child stopped
+        with urllib.request.urlopen(
+                f'http://127.0.0.1:{parent_port}/metrics',
+                timeout=5) as res:
+            self.assertEqual(res.status, 200)
+    # end of test_forked_workers_serve_their_own_metrics
+
+    def test_redis_hash_aggregates_workers(self):
+        """test_redis_hash_aggregates_workers"""
+        self.record_runs(
+            task_name='prepare_pricing_dataset',
+            run_times=[0.05, 45.0])
+        self.assertGreater(
+            task_metrics.publish_to_redis(
+                client=self.client),
+            0)
+        # nothing new to send
+        self.assertEqual(
+            task_metrics.publish_to_redis(
+                client=self.client),
+            0)
+        # another worker process adds its own runs
+        task_metrics.reset_metrics()
+        self.record_runs(
+            task_name='prepare_pricing_dataset',
+            run_times=[0.05])
+        task_metrics.publish_to_redis(
+            client=self.client)
+        metrics = task_metrics.get_redis_metrics(
+            client=self.client)
+        hist = metrics['prepare_pricing_dataset']['run_seconds']
+        self.assertEqual(hist['count'], 3)
+        self.assertAlmostEqual(hist['sum'], 45.1)
+        self.assertEqual(
+            hist['counts'][hist['buckets'].index(0.05)], 2)
+        self.assertEqual(metrics['prepare_pricing_dataset']['success'], 3)
+        self.assertGreater(
+            task_metrics.get_slowest_tasks(
+                metrics=metrics)[0]['value'],
+            30.0)
+    # end of test_redis_hash_aggregates_workers
+
+# end of TestTaskMetrics
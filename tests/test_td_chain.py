@@ -0,0 +1,154 @@
+"""
+Test file for - fetching the Tradier option chain once
+for calls and puts
+"""
+
+import mock
+import analysis_engine.td.fetch_api as td_fetch
+import analysis_engine.perf.benchmark_td_options as bench_td
+import analysis_engine.mocks.mock_tradier as mock_tradier
+from analysis_engine.mocks.base_test import BaseTestCase
+from analysis_engine.consts import SUCCESS
+from analysis_engine.consts import OPTION_CALL
+from analysis_engine.consts import OPTION_PUT
+
+
+MOCK_SESSION = mock_tradier.MockTradierSession()
+
+
+def get_mock_session(
+        provider,
+        pool_maxsize=None):
+    """get_mock_session
+
+    :param provider: not used - provider name
+    :param pool_maxsize: not used - pool size
+    """
+    return MOCK_SESSION
+# end of get_mock_session
+
+
+@mock.patch(
+    'analysis_engine.http_sessions.get_session',
+    new=get_mock_session)
+class TestTDChain(BaseTestCase):
+    """TestTDChain"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        MOCK_SESSION.urls = []
+        td_fetch.CHAIN_CACHE.clear()
+        td_fetch.CHAIN_LOCKS.clear()
+        self.work_dict = {
+            'ticker': 'SPY',
+            'label': 'test-chain',
+            'latest_pricing': {
+                'close': 280.0
+            }
+        }
+    # end of setUp
+
+    def test_calls_and_puts_share_one_request(self):
+        """test_calls_and_puts_share_one_request"""
+        calls_status, calls_df = td_fetch.fetch_calls(
+            work_dict=self.work_dict)
+        puts_status, puts_df = td_fetch.fetch_puts(
+            work_dict=self.work_dict)
+        self.assertEqual(calls_status, SUCCESS)
+        self.assertEqual(puts_status, SUCCESS)
+        self.assertEqual(len(MOCK_SESSION.urls), 1)
+        self.assertEqual(
+            calls_df['opt_type'].unique().tolist(),
+            [int(OPTION_CALL)])
+        self.assertEqual(
+            puts_df['opt_type'].unique().tolist(),
+            [int(OPTION_PUT)])
+        # strikes within 10 of the close
+        self.assertEqual(len(calls_df.index), 21)
+        self.assertEqual(len(puts_df.index), 21)
+    # end of test_calls_and_puts_share_one_request
+
+    def test_fetch_calls_and_puts(self):
+        """test_fetch_calls_and_puts"""
+        status, calls_df, puts_df = td_fetch.fetch_calls_and_puts(
+            work_dict=self.work_dict)
+        self.assertEqual(status, SUCCESS)
+        self.assertEqual(len(MOCK_SESSION.urls), 1)
+        self.assertEqual(len(calls_df.index), 21)
+        self.assertEqual(len(puts_df.index), 21)
+        self.assertEqual(
+            sorted(calls_df['strike'].tolist()),
+            calls_df['strike'].tolist())
+    # end of test_fetch_calls_and_puts
+
+    def test_fetch_multiple_expirations(self):
+        """test_fetch_multiple_expirations"""
+        chains = td_fetch.fetch_chains(
+            work_dict=self.work_dict,
+            num_expirations=2)
+        self.assertEqual(
+            sorted(chains.keys()),
+            ['2019-02-15', '2019-02-22'])
+        # 1 expirations request + 1 request per expiration
+        self.assertEqual(len(MOCK_SESSION.urls), 3)
+        for exp_date, (status, calls_df, puts_df) in chains.items():
+            self.assertEqual(status, SUCCESS)
+            self.assertEqual(
+                calls_df['exp_date'].unique().tolist(),
+                [exp_date])
+    # end of test_fetch_multiple_expirations
+
+    def test_chains_are_evicted(self):
+        """test_chains_are_evicted"""
+        for exp_date in ['2019-02-15', '2019-02-22', '2019-03-01']:
+            status, records = td_fetch.fetch_chain(
+                ticker='SPY',
+                exp_date=exp_date)
+            self.assertEqual(status, SUCCESS)
+        self.assertEqual(len(td_fetch.CHAIN_CACHE), 3)
+        self.assertEqual(len(td_fetch.CHAIN_LOCKS), 3)
+        # the oldest chains over the limit go with their locks
+        self.assertEqual(
+            td_fetch.evict_chains(
+                cache_seconds=30,
+                max_entries=1),
+            2)
+        self.assertEqual(
+            list(td_fetch.CHAIN_CACHE.keys()),
+            [('SPY', '2019-03-01')])
+        self.assertEqual(
+            list(td_fetch.CHAIN_LOCKS.keys()),
+            [('SPY', '2019-03-01')])
+        # expired chains are dropped before the next fetch
+        td_fetch.fetch_chain(
+            ticker='QQQ',
+            exp_date='2019-02-15',
+            cache_seconds=0)
+        self.assertEqual(len(td_fetch.CHAIN_CACHE), 0)
+        self.assertEqual(len(td_fetch.CHAIN_LOCKS), 1)
+        td_fetch.evict_chains(
+            cache_seconds=0)
+        self.assertEqual(len(td_fetch.CHAIN_LOCKS), 0)
+    # end of test_chains_are_evicted
+
+    def test_columnar_matches_row_normalization(self):
+        """test_columnar_matches_row_normalization"""
+        records = mock_tradier.build_option_chain(
+            num_strikes=100)['options']['option']
+        for option_type in ['call', 'put']:
+            norm_args = {
+                'records': records,
+                'option_type': option_type,
+                'ticker': 'SPY',
+                'last_close_date': '2019-02-15 16:00:00',
+                'created_minute': '2019-02-15 15:59:00'
+            }
+            row_df = bench_td.normalize_option_rows(**norm_args)
+            col_df = td_fetch.normalize_option_records(**norm_args)
+            self.assertTrue(row_df.equals(col_df))
+            self.assertIsNone(col_df['trade_date'].iloc[0])
+    # end of test_columnar_matches_row_normalization
+
+# end of TestTDChain
@@ -0,0 +1,118 @@
+"""
+Test file for - cached trading calendar
+"""
+
+import datetime
+import numpy as np
+import pandas as pd
+import analysis_engine.holidays as ae_holidays
+import analysis_engine.options_dates as opt_dates
+import analysis_engine.trading_calendar as trading_calendar
+import analysis_engine.build_algo_request as build_algo_request
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class TestTradingCalendar(BaseTestCase):
+    """TestTradingCalendar"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.cal = trading_calendar.TradingCalendar(
+            start_year=2010,
+            end_year=2020)
+    # end of setUp
+
+    def test_sessions_match_pandas_calendar(self):
+        """test_sessions_match_pandas_calendar"""
+        expected = pd.date_range(
+            start='2012-01-01',
+            end='2019-12-31',
+            freq=pd.offsets.CustomBusinessDay(
+                calendar=ae_holidays.USTradingCalendar()))
+        found = self.cal.sessions_between(
+            start_date='2012-01-01',
+            end_date=datetime.datetime(2019, 12, 31, 16, 0, 0))
+        self.assertEqual(found.dtype, np.dtype('datetime64[D]'))
+        self.assertEqual(
+            np.datetime_as_string(found).tolist(),
+            expected.strftime('%Y-%m-%d').tolist())
+        self.assertEqual(
+            self.cal.sessions_between(
+                start_date='2018-12-28',
+                end_date='2019-01-03',
+                fmt='%m/%d/%Y'),
+            ['12/28/2018', '12/31/2018', '01/02/2019', '01/03/2019'])
+    # end of test_sessions_match_pandas_calendar
+
+    def test_trading_day_queries(self):
+        """test_trading_day_queries"""
+        self.assertFalse(self.cal.is_trading_day('2019-01-01'))
+        self.assertFalse(self.cal.is_trading_day(datetime.date(2019, 1, 5)))
+        self.assertTrue(self.cal.is_trading_day(
+            datetime.datetime(2019, 1, 2, 9, 30)))
+        self.assertEqual(
+            self.cal.next_trading_day('2018-12-24'),
+            datetime.datetime(2018, 12, 26))
+        self.assertEqual(
+            self.cal.next_trading_day('2019-04-18'),
+            datetime.datetime(2019, 4, 22))
+        self.assertEqual(
+            self.cal.prev_trading_day('2019-01-02'),
+            datetime.datetime(2018, 12, 31))
+        # queries outside the built years grow the calendar
+        self.assertEqual(
+            self.cal.next_trading_day('2025-12-24'),
+            datetime.datetime(2025, 12, 26))
+        self.assertEqual(
+            self.cal.prev_trading_day('2004-07-06'),
+            datetime.datetime(2004, 7, 2))
+        self.assertEqual(self.cal.state['start_year'], 2003)
+        self.assertEqual(self.cal.state['end_year'], 2026)
+    # end of test_trading_day_queries
+
+    def test_expirations_match_option_expiration(self):
+        """test_expirations_match_option_expiration"""
+        # Good Friday moves the April 2019 expiration to Thursday
+        self.assertEqual(
+            self.cal.expiration_for('2019-04-01'),
+            datetime.datetime(2019, 4, 18))
+        self.assertEqual(
+            self.cal.expiration_for('2019-04-20'),
+            datetime.datetime(2019, 5, 17))
+        cur_date = datetime.datetime(2014, 1, 1, 10, 30)
+        while cur_date.year < 2020:
+            exp_date = opt_dates.option_expiration(cur_date)
+            self.assertEqual(
+                exp_date.date(),
+                self.cal.expiration_for(cur_date).date())
+            # keeps the time of day
+            self.assertEqual(exp_date.time(), cur_date.time())
+            cur_date += datetime.timedelta(days=5)
+    # end of test_expirations_match_option_expiration
+
+    def test_build_algo_request_skips_holidays(self):
+        """test_build_algo_request_skips_holidays"""
+        req = build_algo_request.build_algo_request(
+            ticker='SPY',
+            start_date='2018-12-21 00:00:00',
+            end_date='2019-01-02 00:00:00',
+            balance=10000.0,
+            label='test')
+        self.assertEqual(
+            req['extract_datasets'],
+            [
+                'SPY_2018-12-21',
+                'SPY_2018-12-24',
+                'SPY_2018-12-26',
+                'SPY_2018-12-27',
+                'SPY_2018-12-28',
+                'SPY_2018-12-31',
+                'SPY_2019-01-02'
+            ])
+        self.assertTrue(ae_holidays.is_holiday(date_str='2018-12-25'))
+        self.assertFalse(ae_holidays.is_holiday(date_str='2018-12-26'))
+    # end of test_build_algo_request_skips_holidays
+
+# end of TestTradingCalendar
@@ -0,0 +1,202 @@
+"""
+Test file for - universe screener
+"""
+
+import json
+import zlib
+import numpy as np
+import pandas as pd
+import analysis_engine.consts as ae_consts
+import analysis_engine.universe_screener as universe_screener
+from analysis_engine.mocks.mock_redis import MockRedis
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class TestUniverseScreener(BaseTestCase):
+    """TestUniverseScreener"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.date = '2018-11-07'
+        self.daily_df = pd.read_json(
+            'tests/datasets/spy-daily.json',
+            orient='records')
+        self.frames = {
+            'SPY': self.daily_df,
+            # same volume and a falling close
+            'DOWN': self.scaled(
+                price=lambda c: c.iloc[::-1].values),
+            'PENNY': self.scaled(
+                price=lambda c: c * 0.01),
+            'THIN': self.scaled(
+                volume=lambda v: v * 0.0001),
+            # no bar for the last session
+            'STALE': self.daily_df.iloc[0:-1].copy()
+        }
+        self.client = MockRedis()
+        for ticker, df in self.frames.items():
+            data = json.dumps(df.to_json(
+                orient='records',
+                date_format='iso'))
+            if ticker == 'SPY':
+                data = zlib.compress(data.encode('utf-8'))
+            self.client.set(
+                name=f'{ticker}_{self.date}_daily',
+                value=data)
+        self.client.set(
+            name=f'SPY_{self.date}_minute',
+            value='[]')
+    # end of setUp
+
+    def scaled(
+            self,
+            price=None,
+            volume=None):
+        """scaled
+
+        :param price: optional - function for the price columns
+        :param volume: optional - function for the volume column
+        """
+        df = self.daily_df.copy()
+        if price:
+            for field in ['open', 'high', 'low', 'close']:
+                df[field] = price(df[field])
+        if volume:
+            df['volume'] = volume(df['volume'])
+        return df
+    # end of scaled
+
+    def test_load_universe_from_redis(self):
+        """test_load_universe_from_redis"""
+        universe = universe_screener.load_universe(
+            num_days=30,
+            date=self.date,
+            client=self.client,
+            batch_size=2)
+        self.assertEqual(
+            universe['tickers'],
+            ['DOWN', 'PENNY', 'SPY', 'STALE', 'THIN'])
+        self.assertEqual(universe['close'].shape, (5, 30))
+        self.assertEqual(str(universe['sessions'][-1]), self.date)
+        spy = universe['tickers'].index('SPY')
+        self.assertTrue(np.allclose(
+            universe['close'][spy],
+            self.daily_df['close'].values[-30:]))
+        stale = universe['tickers'].index('STALE')
+        self.assertTrue(np.isnan(universe['close'][stale, -1]))
+        self.assertTrue(np.allclose(
+            universe['close'][stale, 0:-1],
+            self.daily_df['close'].values[-30:-1]))
+    # end of test_load_universe_from_redis
+
+    def test_features_match_pandas(self):
+        """test_features_match_pandas"""
+        universe = universe_screener.load_universe_from_frames(
+            frames=self.frames,
+            num_days=60,
+            date=self.date)
+        features = universe_screener.build_features(
+            universe=universe,
+            names=['sma_20', 'change_5', 'avg_volume_10', 'ema_10'])
+        close = self.daily_df['close'].iloc[-60:]
+        spy = features.loc['SPY']
+        self.assertAlmostEqual(
+            spy['sma_20'],
+            close.rolling(20).mean().iloc[-1])
+        self.assertAlmostEqual(
+            spy['change_5'],
+            close.pct_change(5).iloc[-1] * 100.0)
+        self.assertAlmostEqual(
+            spy['avg_volume_10'],
+            self.daily_df['volume'].iloc[-10:].mean())
+        self.assertAlmostEqual(
+            spy['ema_10'],
+            close.ewm(span=10, adjust=False).mean().iloc[-1])
+        self.assertEqual(spy['num_bars'], 60)
+        self.assertTrue(np.isnan(features.loc['STALE', 'close']))
+        with self.assertRaises(ValueError):
+            universe_screener.build_features(
+                universe=universe,
+                names=['macd_12'])
+    # end of test_features_match_pandas
+
+    def test_short_history_has_nan_features(self):
+        """test_short_history_has_nan_features"""
+        names = [
+            'sma_50',
+            'ema_50',
+            'rsi_50',
+            'avg_volume_50',
+            'dollar_volume_50',
+            'high_50',
+            'low_50',
+            'sma_20'
+        ]
+        features = universe_screener.build_features(
+            universe=universe_screener.load_universe_from_frames(
+                frames={
+                    'SPY': self.daily_df,
+                    'NEW': self.daily_df.iloc[-21:].copy()
+                },
+                num_days=60,
+                date=self.date),
+            names=names)
+        self.assertEqual(features.loc['NEW', 'num_bars'], 21)
+        for name in names[0:-1]:
+            self.assertTrue(np.isnan(features.loc['NEW', name]), name)
+            self.assertFalse(np.isnan(features.loc['SPY', name]), name)
+        self.assertAlmostEqual(
+            features.loc['NEW', 'sma_20'],
+            features.loc['SPY', 'sma_20'])
+        # fewer loaded sessions than the window
+        features = universe_screener.build_features(
+            universe=universe_screener.load_universe_from_frames(
+                frames=self.frames,
+                num_days=30,
+                date=self.date),
+            names=['sma_50'])
+        self.assertTrue(features['sma_50'].isna().all())
+    # end of test_short_history_has_nan_features
+
+    def test_run_screener_ranks_tickers(self):
+        """test_run_screener_ranks_tickers"""
+        res = universe_screener.run_screener(
+            filters=[
+                'close > 5',
+                'avg_volume_20 > 1000000',
+                'rsi_14 >= 0'
+            ],
+            rank_by='change_5',
+            ascending=False,
+            date=self.date,
+            client=self.client)
+        self.assertEqual(res['status'], ae_consts.SUCCESS)
+        rec = res['rec']
+        self.assertEqual(rec['num_tickers'], 5)
+        self.assertEqual(
+            rec['tickers'],
+            rec['df'].sort_values(
+                by='change_5',
+                ascending=False).index.tolist())
+        self.assertEqual(sorted(rec['tickers']), ['DOWN', 'SPY'])
+        self.assertEqual(rec['df']['rank'].tolist(), [1, 2])
+
+        res = universe_screener.run_screener(
+            tickers=['SPY', 'PENNY', 'THIN'],
+            rank_by='dollar_volume_20',
+            limit=1,
+            date=self.date,
+            client=self.client)
+        self.assertEqual(res['rec']['tickers'], ['SPY'])
+
+        res = universe_screener.run_screener(
+            filters=['close > sma_nope'],
+            frames=self.frames,
+            date=self.date)
+        self.assertEqual(res['status'], ae_consts.ERR)
+        self.assertEqual(res['rec']['tickers'], [])
+    # end of test_run_screener_ranks_tickers
+
+# end of TestUniverseScreener
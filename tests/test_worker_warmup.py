@@ -0,0 +1,99 @@
+"""
+Test file for - warm Celery worker processes
+"""
+
+import os
+import json
+import tempfile
+import analysis_engine.worker_warmup as worker_warmup
+from analysis_engine.mocks.base_test import BaseTestCase
+
+
+class TestWorkerWarmup(BaseTestCase):
+    """TestWorkerWarmup"""
+
+    def setUp(
+            self):
+        """setUp"""
+        super().setUp()
+        self.extracted = []
+        for k in ['first_task', 'first_task_start', 'first_task_seconds',
+                  'time_to_first_task', 'process_start']:
+            worker_warmup.WARMUP_STATE[k] = None
+    # end of setUp
+
+    def mock_extract(
+            self,
+            ticker):
+        """mock_extract
+
+        :param ticker: ticker to extract
+        """
+        if ticker == 'BAD':
+            raise Exception('test extract failure')
+        self.extracted.append(ticker)
+        return {}
+    # end of mock_extract
+
+    def test_warm_worker(self):
+        """test_warm_worker"""
+        indicator_path = os.path.abspath(
+            'analysis_engine/mocks/example_indicator_williamsr.py')
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            algo_config = os.path.join(tmp_dir, 'algo.json')
+            with open(algo_config, 'w') as cur_file:
+                cur_file.write(json.dumps({
+                    'algo_path': os.path.join(tmp_dir, 'missing.py'),
+                    'indicators': [
+                        {
+                            'module_path': indicator_path
+                        },
+                        {
+                            'module_path': indicator_path
+                        }
+                    ]
+                }))
+            self.assertEqual(
+                worker_warmup.get_algo_config_files(
+                    algo_config=algo_config),
+                [os.path.join(tmp_dir, 'missing.py'), indicator_path])
+            state = worker_warmup.warm_worker(
+                modules='analysis_engine.algo, not_a_real_module',
+                files=[],
+                algo_config=algo_config,
+                clients=False,
+                tickers='spy,BAD',
+                extract_func=self.mock_extract)
+        self.assertEqual(
+            sorted(state['steps']),
+            ['clients', 'datasets', 'files', 'modules'])
+        self.assertEqual(len(state['errors']), 2)
+        self.assertIn('not_a_real_module', state['errors'][0])
+        self.assertEqual(self.extracted, ['SPY'])
+        self.assertEqual(state['pid'], os.getpid())
+        self.assertIsNotNone(state['warmup_seconds'])
+    # end of test_warm_worker
+
+    def test_time_to_first_task(self):
+        """test_time_to_first_task"""
+        worker_warmup.WARMUP_STATE['process_start'] = 100.0
+        worker_warmup.record_task_start(
+            task_name='task_run_algo',
+            now=105.0)
+        # later tasks do not change the first task timings
+        worker_warmup.record_task_start(
+            task_name='other',
+            now=106.0)
+        worker_warmup.record_task_done(
+            task_name='other',
+            now=107.0)
+        worker_warmup.record_task_done(
+            task_name='task_run_algo',
+            now=107.5)
+        state = worker_warmup.get_warmup_state()
+        self.assertEqual(state['first_task'], 'task_run_algo')
+        self.assertEqual(state['first_task_seconds'], 2.5)
+        self.assertEqual(state['time_to_first_task'], 7.5)
+    # end of test_time_to_first_task
+
+# end of TestWorkerWarmup
@@ -43,44 +43,15 @@ echo ""
 anmt "--------------------------------"
 anmt "Backfilling minute data for ${ticker} between ${start_date} to ${today}"
 
-days_back=0
-while [[ $days_back -ne ${num_days} ]]; do
-    cur_date=""
-    day_of_week=$(date +"%a")
-    if [[ ${days_back} -eq 0 ]]; then
-        cur_date="${today}"
-    else
-        case "$os_type" in
-            Linux*)
-                cur_date=$(date --date="${days_back} day ago" +"%Y-%m-%d")
-                day_of_week=$(date --date="${days_back} day ago" +"%a")
-                ;;
-            Darwin*)
-                cur_date=$(date -v -${days_back}d +"%Y-%m-%d")
-                day_of_week=$(date -v -${days_back}d +"%a")
-                ;;
-            *)
-                warn "Unsupported OS, exiting."
-                exit 1
-                ;;
-        esac
-    fi
-
-    if [[ "${day_of_week}" != "Sat" ]] && [[ "${day_of_week}" != "Sun" ]]; then
-        inf " - Fetching IEX Cloud minute data for ${ticker} on ${cur_date} with:"
-        echo "fetch -t ${ticker} -F ${cur_date} -g iex_min"
-        fetch -t ${ticker} -F ${cur_date} -g iex_min
-        if [[ "$?" != "0" ]]; then
-            err "Stopping - failed fetching ${ticker} on ${cur_date}"
-            exit 1
-        fi
-    else
-        inf " - Skipping ${day_of_week}"
-    fi
-
-    let "days_back=days_back+1"
-
-done
+# the backfill mode only fetches trading sessions that
+# are not already cached and resumes after failures
+inf " - Fetching IEX Cloud minute data for ${ticker} with:"
+echo "fetch -t ${ticker} -g backfill -F ${start_date} -E ${today}"
+fetch -t ${ticker} -g backfill -F ${start_date} -E ${today}
+if [[ "$?" != "0" ]]; then
+    err "Stopping - failed backfilling ${ticker} from ${start_date}"
+    exit 1
+fi
 
 good "Done backfilling minute data for ${ticker} between ${start_date} to ${today}"
 